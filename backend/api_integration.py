@@ -52,6 +52,11 @@ except ImportError:
         }
 
 
+try:
+    from .ws_broker import RoomBroker, room_broker, user_topic
+except ImportError:
+    from ws_broker import RoomBroker, room_broker, user_topic
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -426,36 +431,34 @@ def calculate_payout(picks: List[SelectedPick], bet_amount: float) -> float:
 
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.user_connections: Dict[str, List[WebSocket]] = {}
+    """Socket bookkeeping on the room broker shared with the ws.py router"""
+
+    def __init__(self, broker: RoomBroker = room_broker):
+        self.broker = broker
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return self.broker.connections()
 
     async def connect(self, websocket: WebSocket, user_id: Optional[str] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
-        if user_id:
-            if user_id not in self.user_connections:
-                self.user_connections[user_id] = []
-            self.user_connections[user_id].append(websocket)
+        self.broker.register(websocket, [user_topic(user_id)] if user_id else [])
 
     def disconnect(self, websocket: WebSocket, user_id: Optional[str] = None):
-        self.active_connections.remove(websocket)
-        if user_id and user_id in self.user_connections:
-            self.user_connections[user_id].remove(websocket)
-            if not self.user_connections[user_id]:
-                del self.user_connections[user_id]
+        self.broker.unregister(websocket)
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+    async def send_personal_message(self, message: str, websocket: WebSocket) -> bool:
+        """False once the socket has failed or timed out and been evicted"""
+        return await self.broker.send(websocket, message)
 
     async def send_to_user(self, message: str, user_id: str):
-        if user_id in self.user_connections:
-            for connection in self.user_connections[user_id]:
-                await connection.send_text(message)
+        await self.broker.publish(user_topic(user_id), message)
+
+    async def publish(self, topic: str, message: str):
+        await self.broker.publish(topic, message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        await self.broker.broadcast(message)
 
 
 manager = ConnectionManager()
@@ -1059,7 +1062,10 @@ async def websocket_odds(websocket: WebSocket):
                 },
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
-            await manager.send_personal_message(json.dumps(odds_update), websocket)
+            if not await manager.send_personal_message(
+                json.dumps(odds_update), websocket
+            ):
+                break
             await asyncio.sleep(30)  # Update every 30 seconds
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -1085,9 +1091,10 @@ async def websocket_predictions(websocket: WebSocket):
                 },
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
-            await manager.send_personal_message(
+            if not await manager.send_personal_message(
                 json.dumps(prediction_update), websocket
-            )
+            ):
+                break
             await asyncio.sleep(60)  # Update every minute
     except WebSocketDisconnect:
         manager.disconnect(websocket)
@@ -1099,7 +1106,9 @@ async def websocket_notifications(websocket: WebSocket, user_id: str):
     await manager.connect(websocket, user_id)
     try:
         while True:
-            await asyncio.sleep(1)  # Keep connection alive
+            # Clients may also join sport/event rooms on this socket
+            message = await websocket.receive_text()
+            await manager.broker.handle_message(websocket, message)
     except WebSocketDisconnect:
         manager.disconnect(websocket, user_id)
 
@@ -0,0 +1,420 @@
+"""Incremental Arbitrage Price Book
+Best and second-best price per outcome, re-evaluated per quote update
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from arbitrage_scanner import ArbitrageHit, are_complementary, quote_line
+
+logger = logging.getLogger(__name__)
+
+MarketKey = Tuple[Any, Any, Optional[float]]  # (event_id, market_type, line)
+PricedQuote = Tuple[float, Dict[str, Any]]
+
+
+class ArbitrageSignalType(str, Enum):
+    """Lifecycle changes of a market's arbitrage"""
+
+    OPENED = "opened"
+    UPDATED = "updated"  # Legs or margin changed while still an arbitrage
+    CLOSED = "closed"
+
+
+@dataclass
+class ArbitrageSignal:
+    """Arbitrage state change caused by one quote update"""
+
+    signal_type: ArbitrageSignalType
+    hit: ArbitrageHit  # For CLOSED, the last hit before it disappeared
+    detected_at: float  # time.time() of the update that caused the change
+
+
+@dataclass
+class PriceBookMetrics:
+    """Price book update counters"""
+
+    updates: int = 0
+    top_changes: int = 0  # Updates that moved a best or second-best price
+    evaluations: int = 0
+    rejected: int = 0  # Quotes missing event, market, outcome or sportsbook
+    opened: int = 0
+    updated: int = 0
+    closed: int = 0
+    evaluation_seconds: float = 0.0
+
+    def count(self, signal: "ArbitrageSignal"):
+        """Count an emitted signal"""
+        name = signal.signal_type.value
+        setattr(self, name, getattr(self, name) + 1)
+
+
+def quote_price(quote: Dict[str, Any]) -> Optional[float]:
+    """Usable decimal price of a quote, or None if it withdraws the price"""
+    if quote.get("suspended"):
+        return None
+    try:
+        price = float(quote["odds"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return price if price > 1.0 else None
+
+
+class _OutcomeBook:
+    """All sportsbook prices for one outcome with the top two cached"""
+
+    __slots__ = ("prices", "best", "second")
+
+    def __init__(self):
+        self.prices: Dict[Any, PricedQuote] = {}
+        self.best: Optional[PricedQuote] = None
+        self.second: Optional[PricedQuote] = None
+
+    def set(self, sportsbook: Any, price: float, quote: Dict[str, Any]) -> bool:
+        """Record a price; returns whether the top two changed"""
+        entry = (price, quote)
+        previous = self.prices.get(sportsbook)
+        self.prices[sportsbook] = entry
+        best, second = self.best, self.second
+
+        if previous is not None and previous[0] == price:
+            # Same price re-sent: refresh the stored quote, ranking is unchanged
+            if best is not None and _book(best) == sportsbook:
+                self.best = entry
+            elif second is not None and _book(second) == sportsbook:
+                self.second = entry
+            return False
+
+        if best is not None and _book(best) == sportsbook:
+            if second is None or price >= second[0]:
+                self.best = entry
+                return True
+            return self._rank()
+        if second is not None and _book(second) == sportsbook:
+            if price > best[0]:
+                self.best, self.second = entry, best
+                return True
+            if price >= self._third_price():
+                self.second = entry
+                return True
+            return self._rank()
+
+        if best is None or price > best[0]:
+            self.best, self.second = entry, best
+            return True
+        if second is None or price > second[0]:
+            self.second = entry
+            return True
+        return False
+
+    def remove(self, sportsbook: Any) -> bool:
+        """Withdraw a sportsbook's price; returns whether the top two changed"""
+        if self.prices.pop(sportsbook, None) is None:
+            return False
+        if any(
+            entry is not None and _book(entry) == sportsbook
+            for entry in (self.best, self.second)
+        ):
+            return self._rank()
+        return False
+
+    def _third_price(self) -> float:
+        best_book, second_book = _book(self.best), _book(self.second)
+        return max(
+            (
+                price
+                for book, (price, _) in self.prices.items()
+                if book != best_book and book != second_book
+            ),
+            default=0.0,
+        )
+
+    def _rank(self) -> bool:
+        best = second = None
+        for entry in self.prices.values():
+            if best is None or entry[0] > best[0]:
+                best, second = entry, best
+            elif second is None or entry[0] > second[0]:
+                second = entry
+        self.best, self.second = best, second
+        return True
+
+
+def _book(entry: PricedQuote) -> Any:
+    return entry[1].get("sportsbook")
+
+
+class IncrementalPriceBook:
+    """Always-on two-way/three-way arbitrage detection over quote deltas.
+
+    Each (event, market) keeps every sportsbook's price per outcome plus the
+    best and second-best of them. A quote update only touches its own
+    outcome; when that outcome's top two move, the market's implied
+    probability sum is recomputed from its two or three best prices and an
+    OPENED, UPDATED or CLOSED signal is returned immediately. The second-best
+    price gives the best cross-book pair when one sportsbook holds both best
+    prices of a two-way market.
+
+    Market rules match VectorizedArbitrageScanner: two-way markets need
+    exactly two complementary outcomes priced by different books, three-way
+    markets exactly three outcomes.
+    """
+
+    def __init__(self, min_edge: float = 0.0):
+        self.min_edge = min_edge  # Required 1 - margin
+        self.metrics = PriceBookMetrics()
+        self._markets: Dict[MarketKey, Dict[str, _OutcomeBook]] = {}
+        self._hits: Dict[MarketKey, ArbitrageHit] = {}
+        self._event_markets: Dict[Any, set] = {}
+        # Quotes may arrive from the event loop and from fetcher threads
+        self._lock = threading.Lock()
+
+    def apply_quote(self, quote: Dict[str, Any]) -> Optional[ArbitrageSignal]:
+        """Apply one quote; a missing or unusable price withdraws it"""
+        with self._lock:
+            return self._apply(quote)
+
+    def apply_quotes(self, quotes: Iterable[Dict[str, Any]]) -> List[ArbitrageSignal]:
+        """Apply quotes in order and return every signal they caused"""
+        signals = []
+        with self._lock:
+            for quote in quotes:
+                signal = self._apply(quote)
+                if signal:
+                    signals.append(signal)
+        return signals
+
+    def remove_quote(
+        self,
+        event_id: Any,
+        market_type: Any,
+        outcome: str,
+        sportsbook: Any,
+        line: Optional[float] = None,
+    ) -> Optional[ArbitrageSignal]:
+        """Withdraw one sportsbook's price for an outcome"""
+        return self.apply_quote(
+            {
+                "event_id": event_id,
+                "market_type": market_type,
+                "line": line,
+                "outcome": outcome,
+                "sportsbook": sportsbook,
+                "odds": None,
+            }
+        )
+
+    def replace_event(
+        self, event_id: Any, quotes: Iterable[Dict[str, Any]]
+    ) -> List[ArbitrageSignal]:
+        """Make ``quotes`` the event's complete set of prices"""
+        signals = []
+        with self._lock:
+            seen = set()
+            for quote in quotes:
+                quote = {**quote, "event_id": event_id}
+                seen.add(self._cell_of(quote))
+                signal = self._apply(quote)
+                if signal:
+                    signals.append(signal)
+
+            for key in list(self._event_markets.get(event_id, ())):
+                for outcome, outcome_book in list(self._markets[key].items()):
+                    for sportsbook in list(outcome_book.prices):
+                        if (key, outcome, sportsbook) not in seen:
+                            signal = self._withdraw(key, outcome, sportsbook)
+                            if signal:
+                                signals.append(signal)
+        return signals
+
+    def remove_event(self, event_id: Any) -> List[ArbitrageSignal]:
+        """Drop every market of a finished or suspended event"""
+        signals = []
+        with self._lock:
+            for key in self._event_markets.pop(event_id, ()):
+                self._markets.pop(key, None)
+                signal = arbitrage_signal(self._hits.pop(key, None), None)
+                if signal:
+                    self.metrics.count(signal)
+                    signals.append(signal)
+        return signals
+
+    def active_hits(
+        self, event_ids: Optional[Iterable[Any]] = None
+    ) -> List[ArbitrageHit]:
+        """Current arbitrage, optionally limited to some events"""
+        with self._lock:
+            if event_ids is None:
+                return list(self._hits.values())
+            wanted = set(event_ids)
+            return [hit for key, hit in self._hits.items() if key[0] in wanted]
+
+    def best_prices(
+        self, event_id: Any, market_type: Any, line: Optional[float] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Best quote per outcome of one market"""
+        with self._lock:
+            market = self._markets.get((event_id, market_type, line), {})
+            return {
+                outcome: book.best[1]
+                for outcome, book in market.items()
+                if book.best is not None
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Book size and update counters"""
+        with self._lock:
+            return {
+                "events": len(self._event_markets),
+                "markets": len(self._markets),
+                "active_arbitrage": len(self._hits),
+                "updates": self.metrics.updates,
+                "top_changes": self.metrics.top_changes,
+                "evaluations": self.metrics.evaluations,
+                "rejected": self.metrics.rejected,
+                "opened": self.metrics.opened,
+                "updated": self.metrics.updated,
+                "closed": self.metrics.closed,
+                "avg_evaluation_us": (
+                    self.metrics.evaluation_seconds / self.metrics.evaluations * 1e6
+                    if self.metrics.evaluations
+                    else 0.0
+                ),
+            }
+
+    # Internals (callers hold the lock)
+
+    @staticmethod
+    def _cell_of(quote: Dict[str, Any]) -> Tuple[MarketKey, str, Any]:
+        key = (quote.get("event_id"), quote.get("market_type"), quote_line(quote))
+        outcome = str(quote.get("outcome", "unknown")).lower()
+        return key, outcome, quote.get("sportsbook")
+
+    def _apply(self, quote: Dict[str, Any]) -> Optional[ArbitrageSignal]:
+        self.metrics.updates += 1
+        key, outcome, sportsbook = self._cell_of(quote)
+        if key[0] is None or key[1] is None or sportsbook is None:
+            self.metrics.rejected += 1
+            return None
+
+        price = quote_price(quote)
+        if price is None:
+            return self._withdraw(key, outcome, sportsbook)
+        if quote["odds"] != price:
+            quote = {**quote, "odds": price}  # Stored legs carry numeric odds
+
+        market = self._markets.get(key)
+        if market is None:
+            market = self._markets[key] = {}
+            self._event_markets.setdefault(key[0], set()).add(key)
+        outcome_book = market.get(outcome)
+        if outcome_book is None:
+            outcome_book = market[outcome] = _OutcomeBook()
+
+        if not outcome_book.set(sportsbook, price, quote):
+            return None
+        return self._evaluate(key, market)
+
+    def _withdraw(
+        self, key: MarketKey, outcome: str, sportsbook: Any
+    ) -> Optional[ArbitrageSignal]:
+        market = self._markets.get(key)
+        outcome_book = market.get(outcome) if market else None
+        if outcome_book is None or not outcome_book.remove(sportsbook):
+            return None
+
+        if not outcome_book.prices:
+            del market[outcome]
+        if not market:
+            del self._markets[key]
+            event_markets = self._event_markets.get(key[0])
+            if event_markets is not None:
+                event_markets.discard(key)
+                if not event_markets:
+                    del self._event_markets[key[0]]
+        return self._evaluate(key, market)
+
+    def _evaluate(
+        self, key: MarketKey, market: Dict[str, _OutcomeBook]
+    ) -> Optional[ArbitrageSignal]:
+        started = time.perf_counter()
+        self.metrics.top_changes += 1
+        self.metrics.evaluations += 1
+        hit = self._market_hit(key, market)
+        previous = self._hits.get(key)
+        self.metrics.evaluation_seconds += time.perf_counter() - started
+
+        if hit is None:
+            self._hits.pop(key, None)
+        else:
+            self._hits[key] = hit
+        signal = arbitrage_signal(previous, hit)
+        if signal:
+            self.metrics.count(signal)
+        return signal
+
+    def _market_hit(
+        self, key: MarketKey, market: Dict[str, _OutcomeBook]
+    ) -> Optional[ArbitrageHit]:
+        outcomes = list(market)
+        if len(outcomes) == 2:
+            if not are_complementary(*outcomes):
+                return None
+            legs = self._best_two_way_legs(market[outcomes[0]], market[outcomes[1]])
+        elif len(outcomes) == 3:
+            legs = [market[outcome].best for outcome in outcomes]
+        else:
+            return None
+
+        if legs is None:
+            return None
+        margin = sum(1.0 / price for price, _ in legs)
+        if margin >= 1.0 - self.min_edge:
+            return None
+        return ArbitrageHit(
+            event_id=key[0],
+            market_type=key[1],
+            outcomes=outcomes,
+            quotes=[quote for _, quote in legs],
+            margin=margin,
+        )
+
+    @staticmethod
+    def _best_two_way_legs(
+        first: _OutcomeBook, second: _OutcomeBook
+    ) -> Optional[List[PricedQuote]]:
+        if _book(first.best) != _book(second.best):
+            return [first.best, second.best]
+
+        # One book holds both best prices; pair each with the other's runner-up
+        pairs = [
+            [a, b]
+            for a, b in ((first.best, second.second), (first.second, second.best))
+            if a is not None and b is not None
+        ]
+        if not pairs:
+            return None
+        return min(pairs, key=lambda pair: 1.0 / pair[0][0] + 1.0 / pair[1][0])
+
+
+def arbitrage_signal(
+    previous: Optional[ArbitrageHit], hit: Optional[ArbitrageHit]
+) -> Optional[ArbitrageSignal]:
+    """Signal for a market whose arbitrage went from ``previous`` to ``hit``"""
+    if hit is None:
+        if previous is None:
+            return None
+        return ArbitrageSignal(ArbitrageSignalType.CLOSED, previous, time.time())
+    if previous is None:
+        return ArbitrageSignal(ArbitrageSignalType.OPENED, hit, time.time())
+    if _legs(previous) == _legs(hit):
+        return None
+    return ArbitrageSignal(ArbitrageSignalType.UPDATED, hit, time.time())
+
+
+def _legs(hit: ArbitrageHit) -> List[Tuple[Any, Any]]:
+    return [(quote.get("sportsbook"), quote.get("odds")) for quote in hit.quotes]
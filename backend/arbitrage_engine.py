@@ -2,14 +2,21 @@
 Real-time arbitrage detection, market making opportunities, and inefficiency exploitation
 """
 
+import asyncio
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
+from arbitrage_book import ArbitrageSignal, ArbitrageSignalType, IncrementalPriceBook
+from arbitrage_graph import MarketGraph, MultiLegHit
+from arbitrage_scanner import ArbitrageHit, VectorizedArbitrageScanner
+from arbitrage_sharding import InefficiencyScreen, ShardedOpportunityScanner
+from config import config_manager
+from opportunity_history import OpportunityHistory
 
 logger = logging.getLogger(__name__)
 
@@ -39,7 +46,7 @@ class MarketInefficiencyType(str, Enum):
     REVERSE_LINE = "reverse_line"  # Line moving against public money
 
 
-@dataclass
+@dataclass(slots=True)
 class ArbitrageOpportunity:
     """Comprehensive arbitrage opportunity"""
 
@@ -85,7 +92,7 @@ class ArbitrageOpportunity:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketInefficiency:
     """Market inefficiency opportunity"""
 
@@ -136,34 +143,40 @@ class MarketInefficiency:
 class ArbitrageCalculator:
     """Advanced arbitrage calculation engine"""
 
-    def __init__(self):
-        self.calculation_methods = {
-            ArbitrageType.TWO_WAY: self._calculate_two_way_arbitrage,
-            ArbitrageType.THREE_WAY: self._calculate_three_way_arbitrage,
-            ArbitrageType.CROSS_MARKET: self._calculate_cross_market_arbitrage,
-            ArbitrageType.TRIANGULAR: self._calculate_triangular_arbitrage,
-            ArbitrageType.SYNTHETIC: self._calculate_synthetic_arbitrage,
+    def __init__(self, max_legs: int = 4):
+        # Two-way and three-way markets are scanned together in one NumPy pass
+        self.scanner = VectorizedArbitrageScanner()
+        # Cross-market, triangular and synthetic covers share one event graph
+        self.max_legs = max_legs
+        self.multi_leg_types = {
+            ArbitrageType.CROSS_MARKET,
+            ArbitrageType.TRIANGULAR,
+            ArbitrageType.SYNTHETIC,
         }
 
     async def detect_arbitrage_opportunities(
-        self, odds_data: List[Dict[str, Any]]
+        self, odds_data: List[Dict[str, Any]], include_vectorized: bool = True
     ) -> List[ArbitrageOpportunity]:
         """Detect all types of arbitrage opportunities from odds data"""
         opportunities = []
 
         try:
-            # Group odds by event and market
-            grouped_odds = self._group_odds_data(odds_data)
-
-            for event_market, odds_list in grouped_odds.items():
-                if len(odds_list) < 2:
-                    continue
-
-                # Check for different types of arbitrage
-                for arb_type in ArbitrageType:
-                    if arb_type in self.calculation_methods:
-                        arb_ops = await self.calculation_methods[arb_type](odds_list)
-                        opportunities.extend(arb_ops)
+            if include_vectorized:
+                for hit in self.scanner.scan(odds_data):
+                    opportunity = self._build_opportunity_from_hit(hit)
+                    if opportunity:
+                        opportunities.append(opportunity)
+
+            # Multi-leg covers span markets, so they are solved per event
+            if self.multi_leg_types:
+                for odds_list in self._group_odds_by_event(odds_data).values():
+                    if len(odds_list) < 2:
+                        continue
+                    opportunities.extend(
+                        await self._calculate_multi_leg_arbitrage(
+                            odds_list, self.multi_leg_types
+                        )
+                    )
 
             # Sort by profit percentage
             opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
@@ -174,86 +187,73 @@ class ArbitrageCalculator:
             logger.error(f"Arbitrage detection failed: {e!s}")
             return []
 
-    def _group_odds_data(
+    def _build_opportunity_from_hit(
+        self, hit: ArbitrageHit
+    ) -> Optional[ArbitrageOpportunity]:
+        """Turn a scanner, price book or market graph hit into a full opportunity"""
+        if isinstance(hit, MultiLegHit):
+            return self._build_multi_leg_opportunity(hit)
+        if hit.outcome_count == 2:
+            odds1, odds2 = hit.quotes
+            arb_result = self._calculate_two_way_math(odds1, odds2)
+            if arb_result and arb_result["profit_percentage"] > 0:
+                return self._build_two_way_opportunity(odds1, odds2, arb_result)
+            return None
+
+        return self._build_three_way_opportunity(dict(zip(hit.outcomes, hit.quotes)))
+
+    def _group_odds_by_event(
         self, odds_data: List[Dict[str, Any]]
-    ) -> Dict[str, List[Dict]]:
-        """Group odds data by event and market type"""
+    ) -> Dict[Any, List[Dict]]:
+        """Group odds data by event across market types"""
         grouped = defaultdict(list)
 
         for odds in odds_data:
-            key = f"{odds.get('event_id')}_{odds.get('market_type')}"
-            grouped[key].append(odds)
+            grouped[odds.get("event_id")].append(odds)
 
         return dict(grouped)
 
-    async def _calculate_two_way_arbitrage(
-        self, odds_list: List[Dict[str, Any]]
-    ) -> List[ArbitrageOpportunity]:
-        """Calculate two-way arbitrage opportunities"""
-        opportunities = []
-
-        try:
-            # Find all possible pairs
-            for i, odds1 in enumerate(odds_list):
-                for odds2 in odds_list[i + 1 :]:
-                    if odds1["sportsbook"] == odds2["sportsbook"]:
-                        continue
-
-                    # Check if they're for opposite outcomes
-                    if self._are_opposite_outcomes(odds1, odds2):
-                        arb_result = self._calculate_two_way_math(odds1, odds2)
-
-                        if arb_result and arb_result["profit_percentage"] > 0:
-                            opportunity = ArbitrageOpportunity(
-                                id=f"arb_2way_{odds1['event_id']}_{int(datetime.now().timestamp())}",
-                                arbitrage_type=ArbitrageType.TWO_WAY,
-                                sportsbooks=[odds1["sportsbook"], odds2["sportsbook"]],
-                                event_id=odds1["event_id"],
-                                market_type=odds1["market_type"],
-                                guaranteed_profit=arb_result["guaranteed_profit"],
-                                profit_percentage=arb_result["profit_percentage"],
-                                total_stake_required=arb_result["total_stake"],
-                                stake_distribution={
-                                    odds1["sportsbook"]: arb_result["stake1"],
-                                    odds2["sportsbook"]: arb_result["stake2"],
-                                },
-                                roi=arb_result["profit_percentage"],
-                                execution_risk=self._calculate_execution_risk(
-                                    [odds1, odds2]
-                                ),
-                                liquidity_risk=self._calculate_liquidity_risk(
-                                    [odds1, odds2]
-                                ),
-                                timing_risk=self._calculate_timing_risk([odds1, odds2]),
-                                credit_risk=0.1,  # Default credit risk
-                                regulatory_risk=0.05,  # Default regulatory risk
-                                odds_data=[odds1, odds2],
-                                implied_probabilities=[
-                                    1 / odds1["odds"],
-                                    1 / odds2["odds"],
-                                ],
-                                theoretical_probability=0.5,  # For two-way markets
-                                market_efficiency=arb_result["market_efficiency"],
-                                optimal_stakes=arb_result["optimal_stakes"],
-                                execution_window=timedelta(minutes=5),
-                                minimum_profit=arb_result["guaranteed_profit"] * 0.5,
-                                maximum_exposure=arb_result["total_stake"] * 2,
-                                confidence_score=arb_result["confidence"],
-                                detection_time=datetime.utcnow(),
-                                expiry_time=datetime.utcnow() + timedelta(minutes=30),
-                                source_quality=min(
-                                    odds1.get("quality", 0.8), odds2.get("quality", 0.8)
-                                ),
-                                historical_success_rate=0.85,  # Historical average
-                                metadata=arb_result.get("metadata", {}),
-                            )
-                            opportunities.append(opportunity)
-
-            return opportunities
-
-        except Exception as e:
-            logger.error(f"Two-way arbitrage calculation failed: {e!s}")
-            return []
+    def _build_two_way_opportunity(
+        self,
+        odds1: Dict[str, Any],
+        odds2: Dict[str, Any],
+        arb_result: Dict[str, Any],
+    ) -> ArbitrageOpportunity:
+        """Create a two-way opportunity from its math result"""
+        return ArbitrageOpportunity(
+            id=f"arb_2way_{odds1['event_id']}_{int(datetime.now().timestamp())}",
+            arbitrage_type=ArbitrageType.TWO_WAY,
+            sportsbooks=[odds1["sportsbook"], odds2["sportsbook"]],
+            event_id=odds1["event_id"],
+            market_type=odds1["market_type"],
+            guaranteed_profit=arb_result["guaranteed_profit"],
+            profit_percentage=arb_result["profit_percentage"],
+            total_stake_required=arb_result["total_stake"],
+            stake_distribution={
+                odds1["sportsbook"]: arb_result["stake1"],
+                odds2["sportsbook"]: arb_result["stake2"],
+            },
+            roi=arb_result["profit_percentage"],
+            execution_risk=self._calculate_execution_risk([odds1, odds2]),
+            liquidity_risk=self._calculate_liquidity_risk([odds1, odds2]),
+            timing_risk=self._calculate_timing_risk([odds1, odds2]),
+            credit_risk=0.1,  # Default credit risk
+            regulatory_risk=0.05,  # Default regulatory risk
+            odds_data=[odds1, odds2],
+            implied_probabilities=[1 / odds1["odds"], 1 / odds2["odds"]],
+            theoretical_probability=0.5,  # For two-way markets
+            market_efficiency=arb_result["market_efficiency"],
+            optimal_stakes=arb_result["optimal_stakes"],
+            execution_window=timedelta(minutes=5),
+            minimum_profit=arb_result["guaranteed_profit"] * 0.5,
+            maximum_exposure=arb_result["total_stake"] * 2,
+            confidence_score=arb_result["confidence"],
+            detection_time=datetime.utcnow(),
+            expiry_time=datetime.utcnow() + timedelta(minutes=30),
+            source_quality=min(odds1.get("quality", 0.8), odds2.get("quality", 0.8)),
+            historical_success_rate=0.85,  # Historical average
+            metadata=arb_result.get("metadata", {}),
+        )
 
     def _calculate_two_way_math(
         self, odds1: Dict[str, Any], odds2: Dict[str, Any]
@@ -311,150 +311,144 @@ class ArbitrageCalculator:
             logger.error(f"Two-way arbitrage math failed: {e!s}")
             return None
 
-    async def _calculate_three_way_arbitrage(
-        self, odds_list: List[Dict[str, Any]]
-    ) -> List[ArbitrageOpportunity]:
-        """Calculate three-way arbitrage opportunities (Win/Draw/Loss)"""
-        opportunities = []
-
-        try:
-            # Group by outcome type
-            outcome_groups = defaultdict(list)
-            for odds in odds_list:
-                outcome = odds.get("outcome", "unknown")
-                outcome_groups[outcome].append(odds)
-
-            # Need exactly 3 outcomes for three-way arbitrage
-            if len(outcome_groups) != 3:
-                return opportunities
-
-            outcome_types = list(outcome_groups.keys())
-
-            # Find best odds for each outcome across all sportsbooks
-            best_odds = {}
-            for outcome in outcome_types:
-                best = max(outcome_groups[outcome], key=lambda x: x["odds"])
-                best_odds[outcome] = best
-
-            # Calculate three-way arbitrage
-            odds_values = [best_odds[outcome]["odds"] for outcome in outcome_types]
-            sportsbooks = [
-                best_odds[outcome]["sportsbook"] for outcome in outcome_types
-            ]
-
-            arbitrage_percentage = sum(1 / odds for odds in odds_values)
-
-            if arbitrage_percentage < 1.0:
-                # Arbitrage exists
-                total_stake = 100.0
-                stakes = [
-                    total_stake / (arbitrage_percentage * odds) for odds in odds_values
-                ]
+    def _build_three_way_opportunity(
+        self, best_odds: Dict[str, Dict[str, Any]]
+    ) -> Optional[ArbitrageOpportunity]:
+        """Create a three-way opportunity from the best quote per outcome"""
+        outcome_types = list(best_odds.keys())
+        quotes = list(best_odds.values())
+        first = quotes[0]
+        odds_values = [quote["odds"] for quote in quotes]
+        sportsbooks = [quote["sportsbook"] for quote in quotes]
+
+        arbitrage_percentage = sum(1 / odds for odds in odds_values)
+        if arbitrage_percentage >= 1.0:
+            return None
 
-                guaranteed_profit = min(
-                    stakes[i] * odds_values[i] - total_stake for i in range(3)
-                )
+        total_stake = 100.0
+        stakes = [total_stake / (arbitrage_percentage * odds) for odds in odds_values]
+        guaranteed_profit = min(
+            stakes[i] * odds_values[i] - total_stake for i in range(3)
+        )
+        if guaranteed_profit <= 0:
+            return None
 
-                if guaranteed_profit > 0:
-                    opportunity = ArbitrageOpportunity(
-                        id=f"arb_3way_{odds_list[0]['event_id']}_{int(datetime.now().timestamp())}",
-                        arbitrage_type=ArbitrageType.THREE_WAY,
-                        sportsbooks=sportsbooks,
-                        event_id=odds_list[0]["event_id"],
-                        market_type=odds_list[0]["market_type"],
-                        guaranteed_profit=guaranteed_profit,
-                        profit_percentage=guaranteed_profit / total_stake * 100,
-                        total_stake_required=sum(stakes),
-                        stake_distribution={
-                            sportsbooks[i]: stakes[i] for i in range(3)
-                        },
-                        roi=guaranteed_profit / total_stake * 100,
-                        execution_risk=self._calculate_execution_risk(
-                            list(best_odds.values())
-                        ),
-                        liquidity_risk=self._calculate_liquidity_risk(
-                            list(best_odds.values())
-                        ),
-                        timing_risk=self._calculate_timing_risk(
-                            list(best_odds.values())
-                        ),
-                        credit_risk=0.15,  # Higher for three-way
-                        regulatory_risk=0.05,
-                        odds_data=list(best_odds.values()),
-                        implied_probabilities=[1 / odds for odds in odds_values],
-                        theoretical_probability=1.0,
-                        market_efficiency=arbitrage_percentage,
-                        optimal_stakes={sportsbooks[i]: stakes[i] for i in range(3)},
-                        execution_window=timedelta(minutes=3),
-                        minimum_profit=guaranteed_profit * 0.5,
-                        maximum_exposure=sum(stakes) * 2,
-                        confidence_score=0.8,
-                        detection_time=datetime.utcnow(),
-                        expiry_time=datetime.utcnow() + timedelta(minutes=20),
-                        source_quality=min(
-                            odds.get("quality", 0.8) for odds in best_odds.values()
-                        ),
-                        historical_success_rate=0.75,
-                        metadata={
-                            "calculation_method": "three_way_standard",
-                            "outcome_types": outcome_types,
-                            "arbitrage_percentage": arbitrage_percentage,
-                        },
-                    )
-                    opportunities.append(opportunity)
+        return ArbitrageOpportunity(
+            id=f"arb_3way_{first['event_id']}_{int(datetime.now().timestamp())}",
+            arbitrage_type=ArbitrageType.THREE_WAY,
+            sportsbooks=sportsbooks,
+            event_id=first["event_id"],
+            market_type=first["market_type"],
+            guaranteed_profit=guaranteed_profit,
+            profit_percentage=guaranteed_profit / total_stake * 100,
+            total_stake_required=sum(stakes),
+            stake_distribution={sportsbooks[i]: stakes[i] for i in range(3)},
+            roi=guaranteed_profit / total_stake * 100,
+            execution_risk=self._calculate_execution_risk(quotes),
+            liquidity_risk=self._calculate_liquidity_risk(quotes),
+            timing_risk=self._calculate_timing_risk(quotes),
+            credit_risk=0.15,  # Higher for three-way
+            regulatory_risk=0.05,
+            odds_data=quotes,
+            implied_probabilities=[1 / odds for odds in odds_values],
+            theoretical_probability=1.0,
+            market_efficiency=arbitrage_percentage,
+            optimal_stakes={sportsbooks[i]: stakes[i] for i in range(3)},
+            execution_window=timedelta(minutes=3),
+            minimum_profit=guaranteed_profit * 0.5,
+            maximum_exposure=sum(stakes) * 2,
+            confidence_score=0.8,
+            detection_time=datetime.utcnow(),
+            expiry_time=datetime.utcnow() + timedelta(minutes=20),
+            source_quality=min(quote.get("quality", 0.8) for quote in quotes),
+            historical_success_rate=0.75,
+            metadata={
+                "calculation_method": "three_way_standard",
+                "outcome_types": outcome_types,
+                "arbitrage_percentage": arbitrage_percentage,
+            },
+        )
 
+    async def _calculate_multi_leg_arbitrage(
+        self, odds_list: List[Dict[str, Any]], arb_types: set
+    ) -> List[ArbitrageOpportunity]:
+        """Solve one event's market graph for profitable multi-leg covers"""
+        try:
+            opportunities = []
+            for hit in MarketGraph(max_legs=self.max_legs).scan(odds_list):
+                if ArbitrageType(hit.arbitrage_type) in arb_types:
+                    opportunity = self._build_multi_leg_opportunity(hit)
+                    if opportunity:
+                        opportunities.append(opportunity)
             return opportunities
 
         except Exception as e:
-            logger.error(f"Three-way arbitrage calculation failed: {e!s}")
+            logger.error(f"Multi-leg arbitrage calculation failed: {e!s}")
             return []
 
-    async def _calculate_cross_market_arbitrage(
-        self, odds_list: List[Dict[str, Any]]
-    ) -> List[ArbitrageOpportunity]:
-        """Calculate cross-market arbitrage opportunities"""
-        # Implementation for cross-market arbitrage
-        # This would involve finding arbitrage across different market types
-        return []
-
-    async def _calculate_triangular_arbitrage(
-        self, odds_list: List[Dict[str, Any]]
-    ) -> List[ArbitrageOpportunity]:
-        """Calculate triangular arbitrage opportunities"""
-        # Implementation for triangular arbitrage
-        # This would involve three related markets forming a triangle
-        return []
-
-    async def _calculate_synthetic_arbitrage(
-        self, odds_list: List[Dict[str, Any]]
-    ) -> List[ArbitrageOpportunity]:
-        """Calculate synthetic arbitrage using combinations"""
-        # Implementation for synthetic arbitrage
-        # This would involve creating synthetic positions using multiple markets
-        return []
-
-    def _are_opposite_outcomes(
-        self, odds1: Dict[str, Any], odds2: Dict[str, Any]
-    ) -> bool:
-        """Check if two odds represent opposite outcomes"""
-        outcome1 = odds1.get("outcome", "").lower()
-        outcome2 = odds2.get("outcome", "").lower()
-
-        opposite_pairs = [
-            ("over", "under"),
-            ("yes", "no"),
-            ("home", "away"),
-            ("win", "loss"),
-            ("back", "lay"),
-        ]
+    def _build_multi_leg_opportunity(
+        self, hit: MultiLegHit
+    ) -> Optional[ArbitrageOpportunity]:
+        """Create a cross-market/triangular/synthetic opportunity from a cover"""
+        quotes = hit.quotes
+        first = quotes[0]
+        odds_values = [quote["odds"] for quote in quotes]
+        sportsbooks = [quote["sportsbook"] for quote in quotes]
+        leg_count = len(quotes)
+
+        arbitrage_percentage = hit.margin
+        if arbitrage_percentage >= 1.0:
+            return None
 
-        for pair in opposite_pairs:
-            if (outcome1 in pair[0] and outcome2 in pair[1]) or (
-                outcome1 in pair[1] and outcome2 in pair[0]
-            ):
-                return True
+        # Stakes proportional to implied probability pay the same on every leg
+        total_stake = 100.0
+        stakes = [total_stake / (arbitrage_percentage * odds) for odds in odds_values]
+        guaranteed_profit = total_stake / arbitrage_percentage - total_stake
+        if guaranteed_profit <= 0:
+            return None
 
-        return False
+        stake_distribution: Dict[str, float] = defaultdict(float)
+        for sportsbook, stake in zip(sportsbooks, stakes):
+            stake_distribution[sportsbook] += stake
+
+        return ArbitrageOpportunity(
+            id=f"arb_{hit.arbitrage_type}_{first['event_id']}_{int(datetime.now().timestamp())}",
+            arbitrage_type=ArbitrageType(hit.arbitrage_type),
+            sportsbooks=sportsbooks,
+            event_id=first["event_id"],
+            market_type=",".join(
+                dict.fromkeys(str(quote["market_type"]) for quote in quotes)
+            ),
+            guaranteed_profit=guaranteed_profit,
+            profit_percentage=guaranteed_profit / total_stake * 100,
+            total_stake_required=sum(stakes),
+            stake_distribution=dict(stake_distribution),
+            roi=guaranteed_profit / total_stake * 100,
+            execution_risk=self._calculate_execution_risk(quotes),
+            liquidity_risk=self._calculate_liquidity_risk(quotes),
+            timing_risk=self._calculate_timing_risk(quotes),
+            credit_risk=0.1 + 0.025 * leg_count,  # More books, more exposure
+            regulatory_risk=0.05,
+            odds_data=quotes,
+            implied_probabilities=[1 / odds for odds in odds_values],
+            theoretical_probability=1.0,
+            market_efficiency=arbitrage_percentage,
+            optimal_stakes=dict(stake_distribution),
+            execution_window=timedelta(minutes=3),
+            minimum_profit=guaranteed_profit * 0.5,
+            maximum_exposure=sum(stakes) * 2,
+            confidence_score=max(0.5, 0.85 - 0.05 * leg_count),
+            detection_time=datetime.utcnow(),
+            expiry_time=datetime.utcnow() + timedelta(minutes=15),
+            source_quality=min(quote.get("quality", 0.8) for quote in quotes),
+            historical_success_rate=0.7,
+            metadata={
+                "calculation_method": "market_graph_cover",
+                "settlement_axis": hit.market_type,
+                "legs": hit.outcomes,
+                "arbitrage_percentage": arbitrage_percentage,
+            },
+        )
 
     def _calculate_execution_risk(self, odds_list: List[Dict[str, Any]]) -> float:
         """Calculate execution risk for arbitrage"""
@@ -523,6 +517,7 @@ class MarketInefficiencyDetector:
         self.statistical_models = self._initialize_statistical_models()
         self.behavioral_patterns = self._initialize_behavioral_patterns()
         self.fair_value_models = self._initialize_fair_value_models()
+        self.detection_thresholds = self._initialize_detection_thresholds()
 
     def _initialize_statistical_models(self) -> Dict[str, Any]:
         """Initialize statistical models for inefficiency detection"""
@@ -560,6 +555,22 @@ class MarketInefficiencyDetector:
             "closing_line_value": True,
         }
 
+    def _initialize_detection_thresholds(self) -> Dict[str, float]:
+        """Trigger thresholds, also applied by the sharded scan's screen"""
+        return {
+            "min_mispricing_percentage": 5.0,
+            "min_value_edge": 0.02,
+            "info_lag_seconds": 300,
+            "material_info_impact": 0.3,
+            "home_bias_public_percentage": 65,
+            "favorite_bias_public_percentage": 70,
+            "min_bias_magnitude": 0.02,
+            "steam_window": 10,
+            "steam_min_observations": 3,
+            "steam_line_movement": 0.05,
+            "steam_public_percentage": 60,  # Mirrored (40) for lengthening lines
+        }
+
     async def detect_market_inefficiencies(
         self,
         market_data: List[Dict[str, Any]],
@@ -637,8 +648,9 @@ class MarketInefficiencyDetector:
                 market_prob, fair_prob, market.get("sample_size", 100)
             )
 
+            thresholds = self.detection_thresholds
             if (
-                mispricing_percentage > 5.0  # At least 5% mispricing
+                mispricing_percentage > thresholds["min_mispricing_percentage"]
                 and abs(z_score) > self.statistical_models["z_score_threshold"]
             ):
                 # Determine if it's a value bet
@@ -647,7 +659,7 @@ class MarketInefficiencyDetector:
                 ):  # Market overpricing (value bet)
                     expected_value = (fair_prob * market_price) - 1
 
-                    if expected_value > 0.02:  # At least 2% edge
+                    if expected_value > thresholds["min_value_edge"]:
                         inefficiency = MarketInefficiency(
                             id=f"pricing_error_{market['event_id']}_{int(datetime.now().timestamp())}",
                             inefficiency_type=MarketInefficiencyType.PRICING_ERROR,
@@ -752,14 +764,16 @@ class MarketInefficiencyDetector:
             last_info_update = market.get("last_info_update")
             last_odds_update = market.get("last_odds_update")
 
+            thresholds = self.detection_thresholds
+
             if last_info_update and last_odds_update:
                 info_lag = (last_odds_update - last_info_update).total_seconds()
 
-                if info_lag > 300:  # More than 5 minutes lag
+                if info_lag > thresholds["info_lag_seconds"]:
                     # Check if the information is material
                     info_impact = market.get("info_impact_score", 0)
 
-                    if info_impact > 0.3:  # Material information
+                    if info_impact > thresholds["material_info_impact"]:
                         inefficiency = MarketInefficiency(
                             id=f"info_lag_{market['event_id']}_{int(datetime.now().timestamp())}",
                             inefficiency_type=MarketInefficiencyType.INFORMATION_LAG,
@@ -812,10 +826,12 @@ class MarketInefficiencyDetector:
         inefficiencies = []
 
         try:
+            thresholds = self.detection_thresholds
+
             # 1. Home bias detection
             if market.get("is_home_team"):
                 public_percentage = market.get("public_percentage", 50)
-                if public_percentage > 65:  # Heavy public support for home team
+                if public_percentage > thresholds["home_bias_public_percentage"]:
                     bias_premium = self.behavioral_patterns["home_bias"][
                         "public_home_premium"
                     ]
@@ -832,7 +848,7 @@ class MarketInefficiencyDetector:
             # 2. Favorite bias detection
             if market.get("is_favorite"):
                 public_percentage = market.get("public_percentage", 50)
-                if public_percentage > 70:  # Heavy public support for favorite
+                if public_percentage > thresholds["favorite_bias_public_percentage"]:
                     bias_premium = self.behavioral_patterns["favorite_bias"][
                         "public_favorite_premium"
                     ]
@@ -880,7 +896,7 @@ class MarketInefficiencyDetector:
     ) -> Optional[MarketInefficiency]:
         """Create inefficiency object for behavioral bias"""
         try:
-            if bias_magnitude < 0.02:  # Minimum 2% bias
+            if bias_magnitude < self.detection_thresholds["min_bias_magnitude"]:
                 return None
 
             return MarketInefficiency(
@@ -935,25 +951,24 @@ class MarketInefficiencyDetector:
                 return inefficiencies
 
             # Look for rapid line movement with reverse public action
-            recent_odds = [
-                h.get("odds") for h in historical_data[-10:] if h.get("odds")
-            ]
-
-            if len(recent_odds) < 3:
+            recent_odds = self.steam_odds(historical_data)
+            if not recent_odds:
                 return inefficiencies
 
             # Calculate line movement
             line_movement = (recent_odds[-1] - recent_odds[0]) / recent_odds[0]
+            thresholds = self.detection_thresholds
 
-            if abs(line_movement) > 0.05:  # At least 5% movement
+            if abs(line_movement) > thresholds["steam_line_movement"]:
                 # Check if movement is against public money
                 public_percentage = market.get("public_percentage", 50)
+                public_side = thresholds["steam_public_percentage"]
 
                 # Steam move: line moves toward underdog while public backs favorite
                 if (
-                    line_movement < 0 and public_percentage > 60
+                    line_movement < 0 and public_percentage > public_side
                 ) or (  # Line shortening, public on this side
-                    line_movement > 0 and public_percentage < 40
+                    line_movement > 0 and public_percentage < 100 - public_side
                 ):  # Line lengthening, public on other side
                     steam_strength = abs(line_movement) * (
                         abs(public_percentage - 50) / 50
@@ -1005,6 +1020,18 @@ class MarketInefficiencyDetector:
             logger.error(f"Steam move detection failed: {e!s}")
             return []
 
+    def steam_odds(
+        self, historical_data: Optional[List[Dict[str, Any]]]
+    ) -> List[float]:
+        """Recent odds a steam move is measured over, empty if too few"""
+        window = self.detection_thresholds["steam_window"]
+        recent_odds = [
+            h.get("odds") for h in (historical_data or [])[-window:] if h.get("odds")
+        ]
+        if len(recent_odds) < self.detection_thresholds["steam_min_observations"]:
+            return []
+        return recent_odds
+
     async def _detect_reverse_line_movement(
         self, market: Dict[str, Any]
     ) -> List[MarketInefficiency]:
@@ -1055,7 +1082,17 @@ class UltraArbitrageEngine:
     def __init__(self):
         self.arbitrage_calculator = ArbitrageCalculator()
         self.inefficiency_detector = MarketInefficiencyDetector()
-        self.opportunity_history = deque(maxlen=10000)
+        # Arbitrage maintained per quote update: two-way/three-way in the
+        # price book, cross-market/triangular/synthetic in the market graph
+        self.price_book = IncrementalPriceBook()
+        self.market_graph = MarketGraph(
+            max_legs=self.arbitrage_calculator.max_legs
+        )
+        self.signal_listeners: List[Callable[[ArbitrageSignal], Awaitable[None]]] = []
+        # Process pool for full-market snapshot scans, started on first use
+        self._sharded_scanner: Optional[ShardedOpportunityScanner] = None
+        # Columnar summaries; full opportunities are decoded only on request
+        self.opportunity_history = OpportunityHistory(capacity=10000)
         self.execution_tracker = defaultdict(list)
         self.performance_metrics = {
             "opportunities_detected": 0,
@@ -1069,10 +1106,26 @@ class UltraArbitrageEngine:
         self,
         market_data: List[Dict[str, Any]],
         historical_data: Optional[List[Dict[str, Any]]] = None,
+        sharded: Optional[bool] = None,
     ) -> Dict[str, List]:
-        """Comprehensive scan for arbitrage and inefficiency opportunities"""
+        """Comprehensive scan for arbitrage and inefficiency opportunities.
+
+        The scan only looks at ``market_data``; the long-lived price book and
+        market graph are fed by odds updates, not snapshots. ``sharded`` runs
+        the scan on the process pool; by default large scans are sharded when
+        ``arbitrage_sharded_scan`` is enabled.
+        """
         try:
-            # Detect arbitrage opportunities
+            if sharded is None:
+                settings = config_manager.config
+                sharded = (
+                    settings.arbitrage_sharded_scan
+                    and len(market_data) >= settings.arbitrage_shard_min_quotes
+                )
+            if sharded:
+                return await self._scan_sharded(market_data, historical_data)
+
+            # Detect arbitrage opportunities in this snapshot only
             arbitrage_opportunities = (
                 await self.arbitrage_calculator.detect_arbitrage_opportunities(
                     market_data
@@ -1093,18 +1146,9 @@ class UltraArbitrageEngine:
 
             # Store in history
             for opp in arbitrage_opportunities:
-                self.opportunity_history.append(
-                    {"type": "arbitrage", "data": opp, "timestamp": datetime.utcnow()}
-                )
-
+                self._remember_arbitrage(opp)
             for opp in market_inefficiencies:
-                self.opportunity_history.append(
-                    {
-                        "type": "inefficiency",
-                        "data": opp,
-                        "timestamp": datetime.utcnow(),
-                    }
-                )
+                self._remember_inefficiency(opp)
 
             return {
                 "arbitrage_opportunities": arbitrage_opportunities,
@@ -1125,14 +1169,216 @@ class UltraArbitrageEngine:
                 "error": str(e),
             }
 
+    @property
+    def sharded_scanner(self) -> ShardedOpportunityScanner:
+        """Process-pool scanner, configured from the backend settings"""
+        if self._sharded_scanner is None:
+            settings = config_manager.config
+            self._sharded_scanner = ShardedOpportunityScanner(
+                workers=settings.arbitrage_scan_workers or None,
+                deadline_seconds=settings.arbitrage_scan_deadline_seconds,
+                max_legs=self.arbitrage_calculator.max_legs,
+            )
+        return self._sharded_scanner
+
+    async def _scan_sharded(
+        self,
+        market_data: List[Dict[str, Any]],
+        historical_data: Optional[List[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Scan a full-market snapshot across the process pool"""
+        screen = InefficiencyScreen.from_detector(
+            self.inefficiency_detector, historical_data
+        )
+        result = await self.sharded_scanner.scan(market_data, screen)
+        # Building result objects is per-hit Python work; keep it off the loop
+        arbitrage_opportunities = await asyncio.to_thread(
+            self._build_arbitrage_opportunities, result.arbitrage_hits
+        )
+
+        # Workers screened every quote; only the candidates reach the detector
+        market_inefficiencies = (
+            await self.inefficiency_detector.detect_market_inefficiencies(
+                [market_data[row] for row in result.inefficiency_rows],
+                historical_data,
+            )
+        )
+
+        for opp in arbitrage_opportunities:
+            self._remember_arbitrage(opp)
+        for opp in market_inefficiencies:
+            self._remember_inefficiency(opp)
+
+        self.performance_metrics["opportunities_detected"] += len(
+            arbitrage_opportunities
+        ) + len(market_inefficiencies)
+        now = datetime.utcnow()
+
+        return {
+            "arbitrage_opportunities": arbitrage_opportunities,
+            "market_inefficiencies": market_inefficiencies,
+            "total_opportunities": len(arbitrage_opportunities)
+            + len(market_inefficiencies),
+            "scan_timestamp": now.isoformat(),
+            "performance_metrics": self.performance_metrics,
+            "sharded_scan": {
+                "shards": result.shards,
+                "shards_completed": result.shards_completed,
+                "deadline_exceeded": result.deadline_exceeded,
+            },
+        }
+
+    def _build_arbitrage_opportunities(
+        self, hits: List[ArbitrageHit]
+    ) -> List[ArbitrageOpportunity]:
+        """Build the opportunities of a sharded scan's hits, best profit first"""
+        opportunities = []
+        for hit in hits:
+            opportunity = self.arbitrage_calculator._build_opportunity_from_hit(hit)
+            if opportunity:
+                opportunities.append(opportunity)
+        opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+        return opportunities
+
+    def _remember_arbitrage(self, opportunity: ArbitrageOpportunity):
+        self.opportunity_history.append(
+            "arbitrage",
+            opportunity,
+            opportunity_type=opportunity.arbitrage_type.value,
+            event_id=opportunity.event_id,
+            market_type=opportunity.market_type,
+            sportsbook=",".join(map(str, opportunity.sportsbooks)),
+            value=opportunity.profit_percentage,
+            confidence=opportunity.confidence_score,
+            timestamp=opportunity.detection_time,
+        )
+
+    def _remember_inefficiency(self, inefficiency: MarketInefficiency):
+        self.opportunity_history.append(
+            "inefficiency",
+            inefficiency,
+            opportunity_type=inefficiency.inefficiency_type.value,
+            event_id=inefficiency.event_id,
+            market_type=inefficiency.market_type,
+            sportsbook=inefficiency.sportsbook,
+            value=inefficiency.value_bet_edge,
+            confidence=inefficiency.statistical_significance,
+            timestamp=inefficiency.detection_time,
+        )
+
+    def get_opportunity_history(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Optional[str] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = 100,
+        materialize: bool = False,
+    ) -> List[Any]:
+        """Recorded opportunities, newest first (summaries unless materialized)"""
+        if materialize:
+            return self.opportunity_history.opportunities(
+                start, end, event_id, kind, limit
+            )
+        return self.opportunity_history.records(start, end, event_id, kind, limit)
+
+    def shutdown(self):
+        """Stop the sharded scan workers"""
+        if self._sharded_scanner is not None:
+            self._sharded_scanner.shutdown()
+
+    def add_signal_listener(
+        self, listener: Callable[[ArbitrageSignal], Awaitable[None]]
+    ):
+        """Register a coroutine called for every arbitrage open/update/close"""
+        self.signal_listeners.append(listener)
+
+    async def on_odds_message(self, message: Any):
+        """Apply one BETTING_ODDS stream message to the price book and graph"""
+        quote = dict(message.data)
+        quote.setdefault("event_id", message.event_id)
+        quote["timestamp"] = message.timestamp
+        signals = [
+            self.price_book.apply_quote(quote),
+            self.market_graph.apply_quote(quote),
+        ]
+        await self._publish_signals([signal for signal in signals if signal])
+
+    async def apply_odds_snapshot(
+        self, snapshot: Dict[Any, List[Dict[str, Any]]]
+    ) -> List[ArbitrageSignal]:
+        """Replace the prices of each event in ``snapshot`` (event_id -> quotes)"""
+        signals = []
+        for event_id, quotes in snapshot.items():
+            signals.extend(self.price_book.replace_event(event_id, quotes))
+            signals.extend(self.market_graph.replace_event(event_id, quotes))
+        await self._publish_signals(signals)
+        return signals
+
+    async def remove_events(self, event_ids: List[Any]) -> List[ArbitrageSignal]:
+        """Drop finished events and close their arbitrage"""
+        signals = []
+        for event_id in event_ids:
+            signals.extend(self.price_book.remove_event(event_id))
+            signals.extend(self.market_graph.remove_event(event_id))
+        await self._publish_signals(signals)
+        return signals
+
+    def active_hits(self, event_ids: Optional[Any] = None) -> List[ArbitrageHit]:
+        """Open arbitrage from the price book and market graph"""
+        return self.price_book.active_hits(event_ids) + self.market_graph.active_hits(
+            event_ids
+        )
+
+    def current_arbitrage_opportunities(
+        self, event_ids: Optional[Any] = None
+    ) -> List[ArbitrageOpportunity]:
+        """Open arbitrage of every type, best profit first"""
+        opportunities = []
+        for hit in self.active_hits(event_ids):
+            opportunity = self.arbitrage_calculator._build_opportunity_from_hit(hit)
+            if opportunity:
+                opportunities.append(opportunity)
+        opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+        return opportunities
+
+    async def _publish_signals(self, signals: List[ArbitrageSignal]):
+        for signal in signals:
+            if signal.signal_type == ArbitrageSignalType.OPENED:
+                self.performance_metrics["opportunities_detected"] += 1
+                opportunity = self.arbitrage_calculator._build_opportunity_from_hit(
+                    signal.hit
+                )
+                if opportunity:
+                    self._remember_arbitrage(opportunity)
+
+            for listener in self.signal_listeners:
+                try:
+                    await listener(signal)
+                except Exception as e:
+                    logger.error(f"Arbitrage signal listener failed: {e!s}")
+
     async def get_engine_health(self) -> Dict[str, Any]:
         """Get arbitrage engine health status"""
         return {
             "status": "healthy",
             "opportunity_history_size": len(self.opportunity_history),
+            "opportunity_history": self.opportunity_history.get_stats(),
             "performance_metrics": self.performance_metrics,
             "execution_tracker_size": len(self.execution_tracker),
             "arbitrage_calculator_status": "operational",
+            "last_arbitrage_scan": {
+                "quotes": self.arbitrage_calculator.scanner.metrics.quotes,
+                "markets": self.arbitrage_calculator.scanner.metrics.markets,
+                "hits": self.arbitrage_calculator.scanner.metrics.hits,
+                "scan_ms": self.arbitrage_calculator.scanner.metrics.scan_seconds
+                * 1000,
+            },
+            "price_book": self.price_book.get_stats(),
+            "market_graph": self.market_graph.get_stats(),
+            "sharded_scanner": (
+                self._sharded_scanner.get_stats() if self._sharded_scanner else None
+            ),
             "inefficiency_detector_status": "operational",
             "last_health_check": datetime.utcnow().isoformat(),
         }
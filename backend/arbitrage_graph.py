@@ -0,0 +1,434 @@
+"""Multi-Leg Arbitrage Graph
+Cross-market, triangular and synthetic arbitrage as cheapest interval covers
+on an incrementally maintained per-event market graph
+"""
+
+import logging
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from arbitrage_book import ArbitrageSignal, arbitrage_signal, quote_price
+from arbitrage_scanner import ArbitrageHit, quote_line
+
+logger = logging.getLogger(__name__)
+
+INF = math.inf
+
+# Settlement axes: every supported outcome wins on an interval of one of them
+MARGIN_AXIS = "margin"  # Home score minus away score
+TOTAL_AXIS = "total"  # Combined score
+
+RESULT_MARKETS = {"moneyline", "h2h", "match_result", "1x2", "three_way"}
+DOUBLE_CHANCE_MARKETS = {"double_chance"}
+SPREAD_MARKETS = {"spread", "spreads", "handicap", "asian_handicap", "point_spread"}
+TOTAL_MARKETS = {"total", "totals", "over_under"}
+
+_RESULT_INTERVALS = {
+    "home": (1, INF),
+    "draw": (0, 0),
+    "away": (-INF, -1),
+}
+_DOUBLE_CHANCE_INTERVALS = {
+    "home_draw": (0, INF),
+    "1x": (0, INF),
+    "draw_away": (-INF, 0),
+    "x2": (-INF, 0),
+}
+
+Span = Tuple[float, float]  # [start, end) on the integer axis
+LegKey = Tuple[Any, Any, str, Any]  # (market_type, line, outcome, sportsbook)
+GraphKey = Tuple[Any, str]  # (event_id, axis)
+
+_MIXED = "mixed"  # Cover state whose legs come from more than one market
+
+
+def outcome_interval(quote: Dict[str, Any]) -> Optional[Tuple[str, float, float]]:
+    """Axis and inclusive integer range on which a quote's outcome wins.
+
+    Only outcomes that either win or lose outright are mapped; whole-number
+    handicaps and totals can push (refund) and are skipped.
+    """
+    market = str(quote.get("market_type", "")).lower()
+    outcome = str(quote.get("outcome", "")).lower()
+
+    if market in RESULT_MARKETS:
+        interval = _RESULT_INTERVALS.get(outcome)
+        return (MARGIN_AXIS, *interval) if interval else None
+    if market in DOUBLE_CHANCE_MARKETS:
+        interval = _DOUBLE_CHANCE_INTERVALS.get(outcome)
+        return (MARGIN_AXIS, *interval) if interval else None
+
+    line = quote_line(quote)
+    if line is None or line % 1 != 0.5:
+        return None
+    if market in SPREAD_MARKETS:
+        if outcome == "home":  # Home margin + line > 0
+            return MARGIN_AXIS, math.ceil(-line), INF
+        if outcome == "away":  # Away margin + line > 0
+            return MARGIN_AXIS, -INF, math.floor(line)
+    elif market in TOTAL_MARKETS:
+        if outcome == "over":
+            return TOTAL_AXIS, math.ceil(line), INF
+        if outcome == "under":
+            return TOTAL_AXIS, -INF, math.floor(line)
+    return None
+
+
+@dataclass
+class MultiLegHit(ArbitrageHit):
+    """Outcomes from several markets that together cover every result"""
+
+    arbitrage_type: str  # ArbitrageType value: cross_market/triangular/synthetic
+
+
+@dataclass
+class MarketGraphMetrics:
+    """Market graph update counters"""
+
+    updates: int = 0
+    ignored: int = 0  # Quotes with no interval, event or sportsbook
+    edge_changes: int = 0
+    evaluations: int = 0
+    opened: int = 0
+    updated: int = 0
+    closed: int = 0
+    evaluation_seconds: float = 0.0
+
+    def count(self, signal: ArbitrageSignal):
+        """Count an emitted signal"""
+        name = signal.signal_type.value
+        setattr(self, name, getattr(self, name) + 1)
+
+
+class _CoverGraph:
+    """Interval edges of one event axis, cheapest quote cached per interval"""
+
+    __slots__ = ("quotes", "best")
+
+    def __init__(self):
+        self.quotes: Dict[Span, Dict[LegKey, Tuple[float, Dict[str, Any]]]] = {}
+        self.best: Dict[Span, Tuple[float, LegKey, Dict[str, Any]]] = {}
+
+    def set(
+        self, span: Span, leg: LegKey, cost: float, quote: Dict[str, Any]
+    ) -> bool:
+        """Record a leg; returns whether the span's cheapest edge changed"""
+        self.quotes.setdefault(span, {})[leg] = (cost, quote)
+        best = self.best.get(span)
+        if best is None or cost < best[0]:
+            self.best[span] = (cost, leg, quote)
+            return True
+        if best[1] == leg:
+            if cost == best[0]:
+                self.best[span] = (cost, leg, quote)
+                return False
+            return self._rank(span)
+        return False
+
+    def remove(self, span: Span, leg: LegKey) -> bool:
+        """Withdraw a leg; returns whether the span's cheapest edge changed"""
+        legs = self.quotes.get(span)
+        if not legs or legs.pop(leg, None) is None:
+            return False
+        if not legs:
+            del self.quotes[span]
+            del self.best[span]
+            return True
+        return self.best[span][1] == leg and self._rank(span)
+
+    def _rank(self, span: Span) -> bool:
+        leg, (cost, quote) = min(self.quotes[span].items(), key=lambda i: i[1][0])
+        self.best[span] = (cost, leg, quote)
+        return True
+
+    def __bool__(self) -> bool:
+        return bool(self.quotes)
+
+
+def find_cover(
+    edges: Dict[Span, Tuple[float, LegKey, Dict[str, Any]]],
+    max_legs: int,
+    mixed: bool = False,
+) -> Optional[Tuple[float, List[Tuple[LegKey, Dict[str, Any], Span]]]]:
+    """Cheapest set of at most ``max_legs`` intervals covering the whole axis.
+
+    Boundaries are nodes and a quote winning on [a, b) is an edge weighing
+    its implied probability 1 / price; the cover is arbitrage when its cost
+    is below one. This is a hop-bounded shortest path from -inf to +inf
+    where each leg starts at or below the ground covered so far, extends it,
+    and starts above what was covered before the previous leg (otherwise
+    that leg would be redundant). Paths are kept per market while all their
+    legs share one, so with ``mixed`` only covers spanning two or more
+    markets are returned.
+    """
+    nodes = sorted({boundary for span in edges for boundary in span})
+    if len(nodes) < 2 or nodes[0] != -INF or nodes[-1] != INF:
+        return None
+    index = {node: position for position, node in enumerate(nodes)}
+    by_start: Dict[int, List[Tuple]] = {}
+    for span, (cost, leg, quote) in edges.items():
+        by_start.setdefault(index[span[0]], []).append(
+            (index[span[1]], cost, (leg[0], leg[1]), (leg, quote, span))
+        )
+
+    # (covered up to, covered before the last leg) -> market or _MIXED -> path
+    states: Dict[Tuple[int, int], Dict[Any, Tuple[float, Tuple]]] = {
+        (0, -1): {None: (0.0, ())}
+    }
+    for _ in range(max_legs):
+        next_states = {key: dict(paths) for key, paths in states.items()}
+        for (reach, before), paths in states.items():
+            for start in range(before + 1, reach + 1):
+                for end, cost, market, leg in by_start.get(start, ()):
+                    if end <= reach:
+                        continue
+                    extended = next_states.setdefault((end, reach), {})
+                    for tag, (total, path) in paths.items():
+                        tag = market if tag is None or tag == market else _MIXED
+                        best = extended.get(tag)
+                        if best is None or total + cost < best[0]:
+                            extended[tag] = (total + cost, path + (leg,))
+        if next_states == states:
+            break
+        states = next_states
+
+    last = len(nodes) - 1
+    covers = [
+        (tag, path)
+        for (reach, _), paths in states.items()
+        if reach == last
+        for tag, path in paths.items()
+        if tag == _MIXED or not mixed
+    ]
+    if not covers:
+        return None
+    cost, legs = min((path for _, path in covers), key=lambda path: path[0])
+    return cost, list(legs)
+
+
+class MarketGraph:
+    """Incremental multi-leg arbitrage detection across an event's markets.
+
+    Each (event, axis) graph keeps every sportsbook's price per outcome
+    interval and the cheapest edge per interval. A quote update changes at
+    most one edge; only when that edge's cheapest price moves is the event's
+    graph re-solved with ``find_cover`` over that graph's cheapest edges.
+
+    Covers whose legs all come from one market are plain two-way/three-way
+    books and are left to the price book and vectorized scanner, so the
+    search only considers covers spanning at least two markets. Covers with
+    overlapping legs (results that pay more than one leg, e.g. over 2.5 with
+    under 3.5) are synthetic; disjoint covers are cross-market with two legs
+    and triangular with three or more.
+    """
+
+    def __init__(self, max_legs: int = 4, min_edge: float = 0.0):
+        self.max_legs = max_legs
+        self.min_edge = min_edge  # Required 1 - margin
+        self.metrics = MarketGraphMetrics()
+        self._graphs: Dict[GraphKey, _CoverGraph] = {}
+        self._hits: Dict[GraphKey, MultiLegHit] = {}
+        self._event_graphs: Dict[Any, set] = {}
+        self._lock = threading.Lock()
+
+    def apply_quote(self, quote: Dict[str, Any]) -> Optional[ArbitrageSignal]:
+        """Apply one quote; a missing or unusable price withdraws it"""
+        with self._lock:
+            return self._apply(quote)
+
+    def apply_quotes(self, quotes: Iterable[Dict[str, Any]]) -> List[ArbitrageSignal]:
+        """Apply quotes in order and return every signal they caused"""
+        with self._lock:
+            signals = [self._apply(quote) for quote in quotes]
+        return [signal for signal in signals if signal]
+
+    def scan(self, quotes: Iterable[Dict[str, Any]]) -> List[MultiLegHit]:
+        """Solve a snapshot of quotes once per graph, keeping no state"""
+        graphs: Dict[GraphKey, _CoverGraph] = {}
+        for quote in quotes:
+            located = self._locate(quote)
+            price = quote_price(quote) if located else None
+            if price is None:
+                continue
+            key, span, leg = located
+            if quote["odds"] != price:
+                quote = {**quote, "odds": price}
+            graphs.setdefault(key, _CoverGraph()).set(span, leg, 1.0 / price, quote)
+
+        hits = []
+        for key, graph in graphs.items():
+            hit = self._graph_hit(key, graph)
+            if hit:
+                hits.append(hit)
+        return hits
+
+    def replace_event(
+        self, event_id: Any, quotes: Iterable[Dict[str, Any]]
+    ) -> List[ArbitrageSignal]:
+        """Make ``quotes`` the event's complete set of prices"""
+        signals = []
+        with self._lock:
+            seen = set()
+            for quote in quotes:
+                quote = {**quote, "event_id": event_id}
+                located = self._locate(quote)
+                if located:
+                    seen.add(located)
+                signals.append(self._apply(quote))
+
+            for key in list(self._event_graphs.get(event_id, ())):
+                graph = self._graphs[key]
+                for span, legs in list(graph.quotes.items()):
+                    for leg in list(legs):
+                        if (key, span, leg) not in seen:
+                            signals.append(self._withdraw(key, span, leg))
+        return [signal for signal in signals if signal]
+
+    def remove_event(self, event_id: Any) -> List[ArbitrageSignal]:
+        """Drop every graph of a finished or suspended event"""
+        signals = []
+        with self._lock:
+            for key in self._event_graphs.pop(event_id, ()):
+                self._graphs.pop(key, None)
+                signal = arbitrage_signal(self._hits.pop(key, None), None)
+                if signal:
+                    self.metrics.count(signal)
+                    signals.append(signal)
+        return signals
+
+    def active_hits(
+        self, event_ids: Optional[Iterable[Any]] = None
+    ) -> List[MultiLegHit]:
+        """Current multi-leg arbitrage, optionally limited to some events"""
+        with self._lock:
+            if event_ids is None:
+                return list(self._hits.values())
+            wanted = set(event_ids)
+            return [hit for key, hit in self._hits.items() if key[0] in wanted]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Graph size and update counters"""
+        with self._lock:
+            return {
+                "events": len(self._event_graphs),
+                "graphs": len(self._graphs),
+                "edges": sum(len(graph.best) for graph in self._graphs.values()),
+                "active_arbitrage": len(self._hits),
+                "max_legs": self.max_legs,
+                "updates": self.metrics.updates,
+                "ignored": self.metrics.ignored,
+                "edge_changes": self.metrics.edge_changes,
+                "evaluations": self.metrics.evaluations,
+                "opened": self.metrics.opened,
+                "updated": self.metrics.updated,
+                "closed": self.metrics.closed,
+                "avg_evaluation_us": (
+                    self.metrics.evaluation_seconds / self.metrics.evaluations * 1e6
+                    if self.metrics.evaluations
+                    else 0.0
+                ),
+            }
+
+    # Internals (callers hold the lock)
+
+    @staticmethod
+    def _locate(quote: Dict[str, Any]) -> Optional[Tuple[GraphKey, Span, LegKey]]:
+        event_id, sportsbook = quote.get("event_id"), quote.get("sportsbook")
+        interval = outcome_interval(quote)
+        if interval is None or event_id is None or sportsbook is None:
+            return None
+        axis, low, high = interval
+        leg = (
+            quote.get("market_type"),
+            quote_line(quote),
+            str(quote.get("outcome")).lower(),
+            sportsbook,
+        )
+        return (event_id, axis), (low, high + 1), leg
+
+    def _apply(self, quote: Dict[str, Any]) -> Optional[ArbitrageSignal]:
+        self.metrics.updates += 1
+        located = self._locate(quote)
+        if located is None:
+            self.metrics.ignored += 1
+            return None
+        key, span, leg = located
+
+        price = quote_price(quote)
+        if price is None:
+            return self._withdraw(key, span, leg)
+        if quote["odds"] != price:
+            quote = {**quote, "odds": price}
+
+        graph = self._graphs.get(key)
+        if graph is None:
+            graph = self._graphs[key] = _CoverGraph()
+            self._event_graphs.setdefault(key[0], set()).add(key)
+        if not graph.set(span, leg, 1.0 / price, quote):
+            return None
+        return self._evaluate(key, graph)
+
+    def _withdraw(
+        self, key: GraphKey, span: Span, leg: LegKey
+    ) -> Optional[ArbitrageSignal]:
+        graph = self._graphs.get(key)
+        if graph is None or not graph.remove(span, leg):
+            return None
+        if not graph:
+            del self._graphs[key]
+            event_graphs = self._event_graphs.get(key[0])
+            if event_graphs is not None:
+                event_graphs.discard(key)
+                if not event_graphs:
+                    del self._event_graphs[key[0]]
+        return self._evaluate(key, graph)
+
+    def _evaluate(self, key: GraphKey, graph: _CoverGraph) -> Optional[ArbitrageSignal]:
+        started = time.perf_counter()
+        self.metrics.edge_changes += 1
+        self.metrics.evaluations += 1
+        hit = self._graph_hit(key, graph)
+        self.metrics.evaluation_seconds += time.perf_counter() - started
+
+        previous = self._hits.get(key)
+        if hit is None:
+            self._hits.pop(key, None)
+        else:
+            self._hits[key] = hit
+        signal = arbitrage_signal(previous, hit)
+        if signal:
+            self.metrics.count(signal)
+        return signal
+
+    def _graph_hit(self, key: GraphKey, graph: _CoverGraph) -> Optional[MultiLegHit]:
+        cover = find_cover(graph.best, self.max_legs, mixed=True)
+        if cover is None:
+            return None
+        margin, legs = cover
+        if margin >= 1.0 - self.min_edge:
+            return None
+
+        spans = sorted(span for _, _, span in legs)
+        if any(spans[i][1] > spans[i + 1][0] for i in range(len(spans) - 1)):
+            arbitrage_type = "synthetic"
+        elif len(legs) == 2:
+            arbitrage_type = "cross_market"
+        else:
+            arbitrage_type = "triangular"
+        return MultiLegHit(
+            event_id=key[0],
+            market_type=key[1],
+            outcomes=[_leg_label(leg) for leg, _, _ in legs],
+            quotes=[quote for _, quote, _ in legs],
+            margin=margin,
+            arbitrage_type=arbitrage_type,
+        )
+
+
+def _leg_label(leg: LegKey) -> str:
+    market_type, line, outcome, _ = leg
+    label = f"{market_type}:{outcome}"
+    return label if line is None else f"{label}:{line:+g}"
@@ -0,0 +1,306 @@
+"""Vectorized Arbitrage Scanner
+Columnar best-price reduction and single-pass two-way/three-way arbitrage detection
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Complementary outcome labels of two-way markets
+OPPOSITE_OUTCOMES = (
+    ("over", "under"),
+    ("yes", "no"),
+    ("home", "away"),
+    ("win", "loss"),
+    ("back", "lay"),
+)
+_OUTCOME_SIDES = {
+    label: (family, side)
+    for family, pair in enumerate(OPPOSITE_OUTCOMES)
+    for side, label in enumerate(pair)
+}
+
+
+def quote_line(quote: Dict[str, Any]) -> Optional[float]:
+    """Handicap or total line of a quote, if any"""
+    for field_name in ("line", "point", "handicap"):
+        value = quote.get(field_name)
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def are_complementary(first: str, second: str) -> bool:
+    """Whether two normalized outcome labels are the two sides of one market"""
+    first_family, first_side = _OUTCOME_SIDES.get(first, (-1, -1))
+    second_family, second_side = _OUTCOME_SIDES.get(second, (-1, -1))
+    return first_family >= 0 and (first_family, 1 - first_side) == (
+        second_family,
+        second_side,
+    )
+
+
+@dataclass
+class OddsColumns:
+    """Quotes as parallel arrays, one row per usable quote"""
+
+    rows: Sequence[Dict[str, Any]]
+    group_ids: np.ndarray  # (event_id, market_type, line) id per quote
+    outcome_ids: np.ndarray  # Normalized outcome label id per quote
+    odds: np.ndarray  # Decimal odds per quote
+    groups: List[Tuple[Any, Any, Optional[float]]]
+    outcomes: List[str]
+    outcome_family: np.ndarray  # OPPOSITE_OUTCOMES index per outcome id, or -1
+    outcome_side: np.ndarray  # 0/1 within the family, or -1
+
+    @classmethod
+    def from_records(cls, odds_data: List[Dict[str, Any]]) -> "OddsColumns":
+        """Intern groups and outcomes and pack odds into arrays"""
+        group_index: Dict[Tuple[Any, Any, Optional[float]], int] = {}
+        outcome_index: Dict[str, int] = {}
+        rows: List[Dict[str, Any]] = []
+        group_ids: List[int] = []
+        outcome_ids: List[int] = []
+        prices: List[float] = []
+
+        for quote in odds_data:
+            try:
+                price = float(quote["odds"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not price > 1.0:  # Not a usable decimal price (also rejects NaN)
+                continue
+
+            group = (quote.get("event_id"), quote.get("market_type"), quote_line(quote))
+            group_id = group_index.setdefault(group, len(group_index))
+            outcome = str(quote.get("outcome", "unknown")).lower()
+            outcome_id = outcome_index.setdefault(outcome, len(outcome_index))
+
+            rows.append(quote)
+            group_ids.append(group_id)
+            outcome_ids.append(outcome_id)
+            prices.append(price)
+
+        return cls.from_arrays(
+            rows=rows,
+            group_ids=np.asarray(group_ids, dtype=np.int64),
+            outcome_ids=np.asarray(outcome_ids, dtype=np.int64),
+            odds=np.asarray(prices, dtype=np.float64),
+            groups=list(group_index),
+            outcomes=list(outcome_index),
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        rows: Sequence[Dict[str, Any]],
+        group_ids: np.ndarray,
+        outcome_ids: np.ndarray,
+        odds: np.ndarray,
+        groups: List[Tuple[Any, Any, Optional[float]]],
+        outcomes: List[str],
+    ) -> "OddsColumns":
+        """Wrap already interned columns, deriving the outcome families"""
+        sides = [_OUTCOME_SIDES.get(outcome, (-1, -1)) for outcome in outcomes]
+        return cls(
+            rows=rows,
+            group_ids=group_ids,
+            outcome_ids=outcome_ids,
+            odds=odds,
+            groups=groups,
+            outcomes=outcomes,
+            outcome_family=np.asarray([s[0] for s in sides], dtype=np.int64),
+            outcome_side=np.asarray([s[1] for s in sides], dtype=np.int64),
+        )
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+
+@dataclass
+class ArbitrageHit:
+    """A market whose best prices sum to an implied probability below one"""
+
+    event_id: Any
+    market_type: Any
+    outcomes: List[str]
+    quotes: List[Dict[str, Any]]  # Best quote per outcome, in outcome order
+    margin: float  # Sum of implied probabilities of the best prices
+
+    @property
+    def outcome_count(self) -> int:
+        """Number of outcomes covered (2 or 3)"""
+        return len(self.outcomes)
+
+
+@dataclass
+class ScanMetrics:
+    """Statistics of the most recent scan"""
+
+    quotes: int = 0
+    markets: int = 0
+    hits: int = 0
+    scan_seconds: float = 0.0
+    total_scans: int = 0
+
+
+class VectorizedArbitrageScanner:
+    """Find two-way and three-way arbitrage across all markets at once.
+
+    Quotes are keyed by (event, market, outcome) cell. One argsort orders every
+    cell's quotes by price, so the first quote of each cell is its best price.
+    Summing the inverse best prices per market with ``np.add.reduceat`` yields
+    every market's book margin in the same pass; only markets whose margin is
+    below one are turned into Python objects.
+
+    Two-way markets must have exactly two complementary outcomes (e.g.
+    over/under) priced by different sportsbooks; three-way markets are any
+    market with exactly three outcomes.
+    """
+
+    def __init__(self, min_edge: float = 0.0):
+        self.min_edge = min_edge  # Required 1 - margin
+        self.metrics = ScanMetrics()
+
+    def scan(self, odds_data: List[Dict[str, Any]]) -> List[ArbitrageHit]:
+        """Scan raw quote records"""
+        return self.scan_columns(OddsColumns.from_records(odds_data))
+
+    def scan_columns(self, columns: OddsColumns) -> List[ArbitrageHit]:
+        """Scan quotes already packed into columns"""
+        started = time.perf_counter()
+        hits: List[ArbitrageHit] = []
+        self.metrics.quotes = len(columns)
+        self.metrics.markets = len(columns.groups)
+
+        if len(columns):
+            hits = self._scan(columns)
+
+        self.metrics.hits = len(hits)
+        self.metrics.scan_seconds = time.perf_counter() - started
+        self.metrics.total_scans += 1
+        return hits
+
+    def _scan(self, columns: OddsColumns) -> List[ArbitrageHit]:
+        hits = []
+        for group, outcome_ids, rows, margin in self.find_arbitrage_rows(columns):
+            event_id, market_type, _ = columns.groups[group]
+            hits.append(
+                ArbitrageHit(
+                    event_id=event_id,
+                    market_type=market_type,
+                    outcomes=[columns.outcomes[o] for o in outcome_ids],
+                    quotes=[columns.rows[row] for row in rows],
+                    margin=margin,
+                )
+            )
+        return hits
+
+    def find_arbitrage_rows(
+        self, columns: OddsColumns
+    ) -> List[Tuple[int, List[int], List[int], float]]:
+        """(group id, outcome ids, best row per outcome, margin) per arbitrage"""
+        if not len(columns):
+            return []
+        outcome_count = len(columns.outcomes)
+        cell = columns.group_ids * outcome_count + columns.outcome_ids
+
+        # Grouped max in one argsort: prices map into (cell - 0.5, cell), so the
+        # key orders by cell first and by price descending within a cell
+        order = np.argsort(cell - columns.odds / (2.0 * columns.odds.max()))
+        sorted_cell = cell[order]
+        first_in_cell = np.empty(len(sorted_cell), dtype=bool)
+        first_in_cell[0] = True
+        np.not_equal(sorted_cell[1:], sorted_cell[:-1], out=first_in_cell[1:])
+
+        best_rows = order[first_in_cell]
+        cells = sorted_cell[first_in_cell]
+        best_odds = columns.odds[best_rows]
+        cell_group = cells // outcome_count
+        cell_outcome = cells % outcome_count
+
+        # Cells of a market are contiguous because cell ids sort by group first
+        market_start = np.flatnonzero(
+            np.concatenate(([True], cell_group[1:] != cell_group[:-1]))
+        )
+        outcomes_per_market = np.diff(np.append(market_start, len(cells)))
+        margin = np.add.reduceat(1.0 / best_odds, market_start)
+
+        two_way = outcomes_per_market == 2
+        first_cell = market_start[two_way]
+        family = columns.outcome_family[cell_outcome]
+        side = columns.outcome_side[cell_outcome]
+        complementary = np.zeros(len(market_start), dtype=bool)
+        complementary[two_way] = (
+            (family[first_cell] >= 0)
+            & (family[first_cell] == family[first_cell + 1])
+            & (side[first_cell] != side[first_cell + 1])
+        )
+
+        candidates = np.flatnonzero(
+            ((two_way & complementary) | (outcomes_per_market == 3))
+            & (margin < 1.0 - self.min_edge)
+        )
+
+        found = []
+        for market in candidates.tolist():
+            start = int(market_start[market])
+            stop = start + int(outcomes_per_market[market])
+            rows = best_rows[start:stop].tolist()
+            hit_margin = float(margin[market])
+            quotes = [columns.rows[row] for row in rows]
+
+            if len(rows) == 2 and _sportsbook(quotes[0]) == _sportsbook(quotes[1]):
+                # Both best prices at one book; use the best cross-book pair
+                pair = self._best_cross_book_pair(
+                    columns, cell_group[start], cell_outcome[start:stop]
+                )
+                if pair is None:
+                    continue
+                rows, hit_margin = pair
+                if hit_margin >= 1.0 - self.min_edge:
+                    continue
+
+            found.append(
+                (
+                    int(cell_group[start]),
+                    cell_outcome[start:stop].tolist(),
+                    rows,
+                    hit_margin,
+                )
+            )
+        return found
+
+    def _best_cross_book_pair(
+        self, columns: OddsColumns, group: int, outcome_ids: np.ndarray
+    ) -> Optional[Tuple[List[int], float]]:
+        """Best two-way pair priced by different books (top two per side suffice)"""
+        in_group = np.flatnonzero(columns.group_ids == group)
+        sides = []
+        for outcome_id in outcome_ids:
+            rows = in_group[columns.outcome_ids[in_group] == outcome_id]
+            rows = rows[np.argsort(-columns.odds[rows], kind="stable")][:2]
+            sides.append(rows.tolist())
+
+        best = None
+        for first in sides[0]:
+            for second in sides[1]:
+                first_quote, second_quote = columns.rows[first], columns.rows[second]
+                if _sportsbook(first_quote) == _sportsbook(second_quote):
+                    continue
+                pair_margin = 1.0 / columns.odds[first] + 1.0 / columns.odds[second]
+                if best is None or pair_margin < best[1]:
+                    best = ([first, second], float(pair_margin))
+        return best
+
+
+def _sportsbook(quote: Dict[str, Any]) -> Any:
+    return quote.get("sportsbook")
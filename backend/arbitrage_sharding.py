@@ -0,0 +1,700 @@
+"""Sharded Opportunity Scanning
+Process-pool arbitrage and inefficiency screening over shared-memory odds columns
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from arbitrage_graph import (
+    DOUBLE_CHANCE_MARKETS,
+    RESULT_MARKETS,
+    SPREAD_MARKETS,
+    TOTAL_MARKETS,
+    MarketGraph,
+    MultiLegHit,
+)
+from arbitrage_scanner import (
+    ArbitrageHit,
+    OddsColumns,
+    VectorizedArbitrageScanner,
+    quote_line,
+)
+
+logger = logging.getLogger(__name__)
+
+# Interned codes per quote
+INT_COLUMNS = ("event", "group", "outcome", "sportsbook", "market")
+
+# Inefficiency inputs per quote, with the detector's default for a missing key
+SCREEN_FIELDS = {
+    "consensus_odds": math.nan,
+    "home_power_rating": 1500.0,
+    "away_power_rating": 1500.0,
+    "ml_prediction_odds": math.nan,
+    "pinnacle_closing_odds": math.nan,
+    "sample_size": 100.0,
+    "public_percentage": 50.0,
+    "info_impact_score": 0.0,
+    "last_info_update": math.nan,
+    "last_odds_update": math.nan,
+}
+FLAG_FIELDS = ("is_home_team", "is_favorite")
+FLOAT_COLUMNS = ("odds", "line", *SCREEN_FIELDS, *FLAG_FIELDS)
+
+_GRAPH_MARKETS = RESULT_MARKETS | DOUBLE_CHANCE_MARKETS | SPREAD_MARKETS | TOTAL_MARKETS
+_EPOCH = datetime(1970, 1, 1)
+
+
+def event_shard(event_id: Any, shard_count: int) -> int:
+    """Stable shard of an event (the same in every process and run)"""
+    return zlib.crc32(repr(event_id).encode()) % shard_count
+
+
+def _number(value: Any) -> float:
+    """Float for a packed column; NaN where the detector could not compare it"""
+    if value is None:
+        return math.nan
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            return (value - _EPOCH).total_seconds()
+        return value.timestamp()
+    if isinstance(value, (bool, int, float)):
+        return float(value)
+    return math.nan
+
+
+def _price(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _float_column(values: List[Any], convert) -> np.ndarray:
+    """Convert in one NumPy call, falling back per value for mixed types"""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.asarray([convert(value) for value in values], dtype=np.float64)
+
+
+@dataclass
+class InefficiencyScreen:
+    """Detector thresholds and market-wide inputs for the columnar prefilter.
+
+    Built with ``from_detector`` so the screen triggers on the same thresholds
+    the detector applies.
+    """
+
+    thresholds: Dict[str, float]
+    z_score_threshold: float
+    psychological_levels: Tuple[float, ...]
+    biases: Tuple[str, ...]  # Bias checks whose premium can produce a result
+    historical_closing: float = math.nan  # Mean closing odds, NaN if unknown
+    steam_direction: int = 0  # -1 line shortening, 1 lengthening, 0 no steam
+
+    @classmethod
+    def from_detector(
+        cls, detector: Any, historical_data: Optional[List[Dict[str, Any]]]
+    ) -> "InefficiencyScreen":
+        """Screen matching a MarketInefficiencyDetector and the scan's history"""
+        thresholds = dict(detector.detection_thresholds)
+        patterns = detector.behavioral_patterns
+        premiums = {
+            "home_bias": patterns["home_bias"]["public_home_premium"],
+            "favorite_bias": patterns["favorite_bias"]["public_favorite_premium"],
+            "round_number_bias": patterns["round_number_bias"]["round_odds_penalty"],
+        }
+        screen = cls(
+            thresholds=thresholds,
+            z_score_threshold=detector.statistical_models["z_score_threshold"],
+            psychological_levels=tuple(
+                patterns["round_number_bias"]["psychological_levels"]
+            ),
+            biases=tuple(
+                bias
+                for bias, premium in premiums.items()
+                if premium >= thresholds["min_bias_magnitude"]
+            ),
+        )
+        if not historical_data:
+            return screen
+
+        try:
+            closing_odds = [
+                h.get("closing_odds") for h in historical_data if h.get("closing_odds")
+            ]
+            if closing_odds:
+                screen.historical_closing = float(np.mean(closing_odds))
+
+            recent_odds = detector.steam_odds(historical_data)
+            if recent_odds:
+                line_movement = (recent_odds[-1] - recent_odds[0]) / recent_odds[0]
+                if abs(line_movement) > thresholds["steam_line_movement"]:
+                    screen.steam_direction = -1 if line_movement < 0 else 1
+        except Exception as e:
+            # The detector fails the same way, so there is nothing to screen for
+            logger.error(f"Inefficiency screen setup failed: {e!s}")
+        return screen
+
+
+def screen_inefficiencies(
+    columns: Dict[str, np.ndarray], screen: InefficiencyScreen
+) -> np.ndarray:
+    """Rows that can produce a market inefficiency.
+
+    Mirrors the trigger conditions of MarketInefficiencyDetector on packed
+    columns; rows outside the mask produce nothing, so the detector only needs
+    to run on the rows inside it.
+    """
+    thresholds = screen.thresholds
+    odds = columns["odds"]
+    public = columns["public_percentage"]
+
+    # 1. Pricing errors against the median of the available fair values
+    home = columns["home_power_rating"]
+    away = columns["away_power_rating"]
+    with np.errstate(all="ignore"):
+        power = np.where(
+            (home != 0) & (away != 0),
+            1.0 / (1.0 / (1.0 + 10.0 ** (-(home - away) / 400.0))),
+            math.nan,
+        )
+        fair_values = np.column_stack(
+            [
+                np.full(len(odds), screen.historical_closing),
+                np.where(
+                    columns["consensus_odds"] != 0, columns["consensus_odds"], np.nan
+                ),
+                power,
+                np.where(
+                    columns["ml_prediction_odds"] != 0,
+                    columns["ml_prediction_odds"],
+                    np.nan,
+                ),
+                np.where(
+                    columns["pinnacle_closing_odds"] != 0,
+                    columns["pinnacle_closing_odds"],
+                    np.nan,
+                ),
+            ]
+        )
+        priced = (odds > 1.0) & ~np.isnan(fair_values).all(axis=1)
+        fair = np.full(len(odds), np.nan)
+        if priced.any():
+            fair[priced] = np.nanmedian(fair_values[priced], axis=1)
+
+        market_prob = 1.0 / odds
+        fair_prob = 1.0 / fair
+        mispricing = np.abs(market_prob - fair_prob) / fair_prob * 100.0
+        sample_size = columns["sample_size"]
+        standard_error = np.sqrt(fair_prob * (1.0 - fair_prob) / sample_size)
+        z_score = np.where(
+            (sample_size > 0) & (standard_error != 0),
+            (market_prob - fair_prob) / standard_error,
+            0.0,
+        )
+        pricing = (
+            priced
+            & (mispricing > thresholds["min_mispricing_percentage"])
+            & (np.abs(z_score) > screen.z_score_threshold)
+            & (odds > fair)
+            & (fair_prob * odds - 1.0 > thresholds["min_value_edge"])
+        )
+
+        # 2. Odds updated well after material information
+        lag = columns["last_odds_update"] - columns["last_info_update"]
+        info_lag = (lag > thresholds["info_lag_seconds"]) & (
+            columns["info_impact_score"] > thresholds["material_info_impact"]
+        )
+
+    # 3. Behavioral biases
+    behavioral = np.zeros(len(odds), dtype=bool)
+    if "home_bias" in screen.biases:
+        behavioral |= (columns["is_home_team"] != 0) & (
+            public > thresholds["home_bias_public_percentage"]
+        )
+    if "favorite_bias" in screen.biases:
+        behavioral |= (columns["is_favorite"] != 0) & (
+            public > thresholds["favorite_bias_public_percentage"]
+        )
+    if "round_number_bias" in screen.biases:
+        behavioral |= np.isin(odds, screen.psychological_levels)
+
+    # 4. Steam moves against the public
+    public_side = thresholds["steam_public_percentage"]
+    if screen.steam_direction < 0:
+        steam = public > public_side
+    elif screen.steam_direction > 0:
+        steam = public < 100 - public_side
+    else:
+        steam = np.zeros(len(odds), dtype=bool)
+
+    return pricing | info_lag | behavioral | steam
+
+
+@dataclass
+class PackedColumns:
+    """Quotes written column by column to a shared file, grouped by shard"""
+
+    path: str
+    layout: Dict[str, Tuple[int, str]]  # Column -> (byte offset, dtype)
+    order: np.ndarray  # Packed position -> market_data index
+    odds: np.ndarray  # Parsed odds in packed order
+    bounds: List[Tuple[int, int]]  # [start, stop) of each shard
+    outcomes: List[str]
+    markets: List[Any]
+    null_event: int  # Code of a missing event_id, or -1
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+def pack_columns(
+    market_data: List[Dict[str, Any]],
+    shard_count: int,
+    directory: Optional[str] = None,
+) -> PackedColumns:
+    """Intern and pack quotes, sorted so each event-hash shard is contiguous"""
+    events: Dict[Any, int] = {}
+    event_shards: List[int] = []
+    groups: Dict[Tuple[Any, Any, Optional[float]], int] = {}
+    outcomes: Dict[str, int] = {}
+    sportsbooks: Dict[Any, int] = {}
+    markets: Dict[Any, int] = {}
+    ints: Dict[str, List[int]] = {name: [] for name in INT_COLUMNS}
+    lines: List[float] = []
+
+    for quote in market_data:
+        event_id = quote.get("event_id")
+        event = events.get(event_id)
+        if event is None:
+            event = events[event_id] = len(events)
+            event_shards.append(event_shard(event_id, shard_count))
+        market_type = quote.get("market_type")
+        line = quote_line(quote)
+        outcome = str(quote.get("outcome", "unknown")).lower()
+        sportsbook = quote.get("sportsbook")
+
+        ints["event"].append(event)
+        ints["group"].append(
+            groups.setdefault((event_id, market_type, line), len(groups))
+        )
+        ints["outcome"].append(outcomes.setdefault(outcome, len(outcomes)))
+        ints["sportsbook"].append(
+            -1
+            if sportsbook is None
+            else sportsbooks.setdefault(sportsbook, len(sportsbooks))
+        )
+        ints["market"].append(markets.setdefault(market_type, len(markets)))
+        lines.append(math.nan if line is None else line)
+
+    # Field by field, so the common all-numeric case converts in one call
+    floats = {
+        "odds": _float_column([q.get("odds") for q in market_data], _price),
+        "line": np.asarray(lines, dtype=np.float64),
+    }
+    for name, default in SCREEN_FIELDS.items():
+        floats[name] = _float_column(
+            [q.get(name, default) for q in market_data], _number
+        )
+    for name in FLAG_FIELDS:
+        floats[name] = np.asarray(
+            [1.0 if q.get(name) else 0.0 for q in market_data], dtype=np.float64
+        )
+
+    shard_of_row = np.asarray(event_shards, dtype=np.int64)[
+        np.asarray(ints["event"], dtype=np.int64)
+    ]
+    order = np.argsort(shard_of_row, kind="stable")
+    edges = np.searchsorted(shard_of_row[order], np.arange(shard_count + 1))
+
+    if directory is None:
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    path = os.path.join(directory, f"a1betting-scan-{os.getpid()}-{uuid.uuid4().hex}")
+    layout: Dict[str, Tuple[int, str]] = {}
+    offset = 0
+    packed_odds = None
+    with open(path, "wb") as handle:
+        for name in INT_COLUMNS + FLOAT_COLUMNS:
+            dtype = np.int64 if name in INT_COLUMNS else np.float64
+            values = ints[name] if name in INT_COLUMNS else floats[name]
+            column = np.asarray(values, dtype=dtype)[order]
+            column.tofile(handle)
+            layout[name] = (offset, column.dtype.str)
+            offset += column.nbytes
+            if name == "odds":
+                packed_odds = column
+
+    return PackedColumns(
+        path=path,
+        layout=layout,
+        order=order,
+        odds=packed_odds,
+        bounds=[(int(edges[i]), int(edges[i + 1])) for i in range(shard_count)],
+        outcomes=list(outcomes),
+        markets=list(markets),
+        null_event=events.get(None, -1),
+    )
+
+
+@dataclass
+class ShardTask:
+    """One worker's slice of a packed scan"""
+
+    path: str
+    layout: Dict[str, Tuple[int, str]]
+    start: int
+    stop: int
+    outcomes: List[str]
+    markets: List[Any]
+    null_event: int
+    screen: InefficiencyScreen
+    min_edge: float
+    max_legs: int
+
+
+@dataclass
+class ShardResult:
+    """Arbitrage and inefficiency candidates of one shard, as packed positions"""
+
+    # (arbitrage_type or None, market_type/axis or None, outcomes, positions, margin)
+    arbitrage: List[Tuple[Optional[str], Any, List[str], List[int], float]]
+    inefficiency_rows: List[int]
+    quotes: int
+    seconds: float
+
+
+class _ShardRows(Sequence):
+    """Row stand-ins for the scanner: only the sportsbook is read"""
+
+    def __init__(self, sportsbooks: np.ndarray, rows: np.ndarray):
+        self._sportsbooks = sportsbooks
+        self._rows = rows
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        sportsbook = int(self._sportsbooks[self._rows[index]])
+        return {"sportsbook": None if sportsbook < 0 else sportsbook}
+
+
+def scan_shard(task: ShardTask) -> ShardResult:
+    """Worker entry point: map the shard's columns and scan them"""
+    started = time.perf_counter()
+    raw = np.memmap(task.path, dtype=np.uint8, mode="r").view(np.ndarray)
+    columns = {
+        name: raw[offset + task.start * 8 : offset + task.stop * 8].view(dtype)
+        for name, (offset, dtype) in task.layout.items()
+    }
+
+    odds = columns["odds"]
+    usable = np.flatnonzero(odds > 1.0)  # Also drops unparsable (NaN) prices
+    arbitrage = []
+
+    if len(usable):
+        packed = OddsColumns.from_arrays(
+            rows=_ShardRows(columns["sportsbook"], usable),
+            group_ids=columns["group"][usable],
+            outcome_ids=columns["outcome"][usable],
+            odds=odds[usable],
+            groups=[],
+            outcomes=task.outcomes,
+        )
+        scanner = VectorizedArbitrageScanner(min_edge=task.min_edge)
+        for _, outcome_ids, rows, margin in scanner.find_arbitrage_rows(packed):
+            arbitrage.append(
+                (
+                    None,
+                    None,
+                    [task.outcomes[o] for o in outcome_ids],
+                    [task.start + int(usable[row]) for row in rows],
+                    margin,
+                )
+            )
+
+        graph_market = np.asarray(
+            [str(market).lower() in _GRAPH_MARKETS for market in task.markets]
+        )
+        graph_rows = usable[graph_market[columns["market"][usable]]]
+        quotes = []
+        for row, event, market, outcome, price, sportsbook, line in zip(
+            graph_rows.tolist(),
+            columns["event"][graph_rows].tolist(),
+            columns["market"][graph_rows].tolist(),
+            columns["outcome"][graph_rows].tolist(),
+            odds[graph_rows].tolist(),
+            columns["sportsbook"][graph_rows].tolist(),
+            columns["line"][graph_rows].tolist(),
+        ):
+            quotes.append(
+                {
+                    "event_id": None if event == task.null_event else event,
+                    "market_type": task.markets[market],
+                    "outcome": task.outcomes[outcome],
+                    "odds": price,
+                    "sportsbook": None if sportsbook < 0 else sportsbook,
+                    "line": None if math.isnan(line) else line,
+                    "position": task.start + row,
+                }
+            )
+        graph = MarketGraph(max_legs=task.max_legs, min_edge=task.min_edge)
+        for hit in graph.scan(quotes):
+            arbitrage.append(
+                (
+                    hit.arbitrage_type,
+                    hit.market_type,
+                    hit.outcomes,
+                    [quote["position"] for quote in hit.quotes],
+                    hit.margin,
+                )
+            )
+
+    candidates = np.flatnonzero(screen_inefficiencies(columns, task.screen))
+    result = ShardResult(
+        arbitrage=arbitrage,
+        inefficiency_rows=(candidates + task.start).tolist(),
+        quotes=task.stop - task.start,
+        seconds=time.perf_counter() - started,
+    )
+    del columns, raw
+    return result
+
+
+@dataclass
+class ShardedScanResult:
+    """Merged result of a sharded scan"""
+
+    arbitrage_hits: List[ArbitrageHit]
+    inefficiency_rows: List[int]  # market_data indices worth running the detector on
+    shards: int
+    shards_completed: int
+    deadline_exceeded: bool
+
+
+@dataclass
+class ShardedScanMetrics:
+    """Statistics of sharded scans"""
+
+    quotes: int = 0
+    shards: int = 0
+    shards_completed: int = 0
+    pack_seconds: float = 0.0
+    slowest_shard_seconds: float = 0.0
+    scan_seconds: float = 0.0
+    total_scans: int = 0
+    deadline_misses: int = 0
+    shard_failures: int = 0
+
+
+class ShardedOpportunityScanner:
+    """Full-market scans split by event hash across a process pool.
+
+    The parent interns the quotes once and writes the columns to a file on
+    tmpfs; workers map their contiguous shard of it instead of receiving
+    pickled quote dicts, and return packed positions only. Packing runs in a
+    thread and shards are awaited, so the event loop keeps serving requests.
+    Shards still running at the deadline are abandoned and the scan returns
+    what completed.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        deadline_seconds: float = 10.0,
+        min_edge: float = 0.0,
+        max_legs: int = 4,
+        directory: Optional[str] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.deadline_seconds = deadline_seconds
+        self.min_edge = min_edge
+        self.max_legs = max_legs
+        self.directory = directory
+        self.metrics = ShardedScanMetrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawned workers never inherit the parent's event loop or locks
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def warm_up(self):
+        """Start the workers ahead of the first scan"""
+        executor = self._get_executor()
+        await asyncio.gather(
+            *(
+                asyncio.wrap_future(executor.submit(os.getpid))
+                for _ in range(self.workers)
+            )
+        )
+
+    async def scan(
+        self,
+        market_data: List[Dict[str, Any]],
+        screen: InefficiencyScreen,
+        deadline_seconds: Optional[float] = None,
+    ) -> ShardedScanResult:
+        """Scan every shard in parallel and merge the results"""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = started + (
+            self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        )
+        if not market_data:
+            return ShardedScanResult([], [], 0, 0, False)
+
+        packed = await asyncio.to_thread(
+            pack_columns, market_data, self.workers, self.directory
+        )
+        pack_seconds = loop.time() - started
+        try:
+            executor = self._get_executor()
+            futures = [
+                asyncio.wrap_future(
+                    executor.submit(
+                        scan_shard,
+                        ShardTask(
+                            path=packed.path,
+                            layout=packed.layout,
+                            start=start,
+                            stop=stop,
+                            outcomes=packed.outcomes,
+                            markets=packed.markets,
+                            null_event=packed.null_event,
+                            screen=screen,
+                            min_edge=self.min_edge,
+                            max_legs=self.max_legs,
+                        ),
+                    )
+                )
+                for start, stop in packed.bounds
+                if stop > start
+            ]
+            done, pending = await asyncio.wait(
+                futures, timeout=max(deadline - loop.time(), 0.0)
+            )
+            for future in pending:
+                future.cancel()
+        finally:
+            # Workers that already mapped the file keep their view of it
+            os.unlink(packed.path)
+
+        results = []
+        for future in done:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                self.metrics.shard_failures += 1
+                logger.error(f"Arbitrage scan shard failed: {e!s}")
+
+        merged = await asyncio.to_thread(self._merge, market_data, packed, results)
+        merged.shards = len(futures)
+        merged.deadline_exceeded = bool(pending)
+
+        self.metrics.quotes = len(packed)
+        self.metrics.shards = merged.shards
+        self.metrics.shards_completed = merged.shards_completed
+        self.metrics.pack_seconds = pack_seconds
+        self.metrics.slowest_shard_seconds = max(
+            (result.seconds for result in results), default=0.0
+        )
+        self.metrics.scan_seconds = loop.time() - started
+        self.metrics.total_scans += 1
+        if pending:
+            self.metrics.deadline_misses += 1
+            logger.warning(
+                f"Sharded scan deadline exceeded: {len(done)}/{len(futures)} "
+                "shards completed"
+            )
+        return merged
+
+    def _merge(
+        self,
+        market_data: List[Dict[str, Any]],
+        packed: PackedColumns,
+        results: List[ShardResult],
+    ) -> ShardedScanResult:
+        """Map packed positions back to the caller's quotes"""
+        hits: List[ArbitrageHit] = []
+        inefficiency_rows: List[int] = []
+        for result in results:
+            for arbitrage_type, market_type, outcomes, positions, margin in (
+                result.arbitrage
+            ):
+                quotes = [
+                    {**market_data[packed.order[pos]], "odds": float(packed.odds[pos])}
+                    for pos in positions
+                ]
+                if arbitrage_type is None:
+                    hits.append(
+                        ArbitrageHit(
+                            event_id=quotes[0].get("event_id"),
+                            market_type=quotes[0].get("market_type"),
+                            outcomes=outcomes,
+                            quotes=quotes,
+                            margin=margin,
+                        )
+                    )
+                else:
+                    hits.append(
+                        MultiLegHit(
+                            event_id=quotes[0].get("event_id"),
+                            market_type=market_type,
+                            outcomes=outcomes,
+                            quotes=quotes,
+                            margin=margin,
+                            arbitrage_type=arbitrage_type,
+                        )
+                    )
+            inefficiency_rows.extend(
+                packed.order[result.inefficiency_rows].tolist()
+            )
+
+        inefficiency_rows.sort()
+        return ShardedScanResult(
+            arbitrage_hits=hits,
+            inefficiency_rows=inefficiency_rows,
+            shards=0,
+            shards_completed=len(results),
+            deadline_exceeded=False,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Sharded scan statistics"""
+        return {
+            "workers": self.workers,
+            "deadline_seconds": self.deadline_seconds,
+            "last_scan_quotes": self.metrics.quotes,
+            "last_scan_shards": self.metrics.shards,
+            "last_scan_shards_completed": self.metrics.shards_completed,
+            "last_pack_ms": self.metrics.pack_seconds * 1000,
+            "last_slowest_shard_ms": self.metrics.slowest_shard_seconds * 1000,
+            "last_scan_ms": self.metrics.scan_seconds * 1000,
+            "total_scans": self.metrics.total_scans,
+            "deadline_misses": self.metrics.deadline_misses,
+            "shard_failures": self.metrics.shard_failures,
+        }
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
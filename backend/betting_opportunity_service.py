@@ -3,7 +3,7 @@ Integrates with feature engineering, ensemble models, and risk assessment
 """
 
 import logging
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
@@ -11,6 +11,7 @@ from typing import Any, Callable, Dict, List, Optional
 import numpy as np
 from feature_engineering import FeatureEngineering
 from feature_flags import FeatureFlags
+from opportunity_history import OpportunityHistory, OpportunityRecord
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -36,7 +37,7 @@ class RiskLevel(str, Enum):
     EXTREME = "extreme"
 
 
-@dataclass
+@dataclass(slots=True)
 class MarketData:
     """Market data for opportunity analysis"""
 
@@ -49,7 +50,7 @@ class MarketData:
     liquidity_score: Optional[float]
 
 
-@dataclass
+@dataclass(slots=True)
 class BettingOpportunity:
     """Comprehensive betting opportunity data"""
 
@@ -110,7 +111,9 @@ class BettingOpportunityService:
 
         # Opportunity tracking
         self.active_opportunities: Dict[str, BettingOpportunity] = {}
-        self.opportunity_history: List[BettingOpportunity] = []
+        self.opportunity_history = OpportunityHistory(
+            capacity=self.config.get("history_capacity", 10000)
+        )
 
         # Configuration thresholds
         self.min_expected_value = self.config.get("min_expected_value", 0.05)
@@ -176,7 +179,7 @@ class BettingOpportunityService:
             # Update tracking
             for opp in filtered_opportunities:
                 self.active_opportunities[opp.opportunity_id] = opp
-                self.opportunity_history.append(opp)
+                self._remember_opportunity(opp)
 
             # Clean up expired opportunities
             await self._cleanup_expired_opportunities()
@@ -256,7 +259,7 @@ class BettingOpportunityService:
         # Extensibility: Add hooks for custom market data validation or enrichment here
         # Log for model training (anonymized, extensible)
         try:
-            self._log_training_data("market_data", [m.__dict__ for m in processed_data])
+            self._log_training_data("market_data", [asdict(m) for m in processed_data])
         except Exception as ex:
             logger.debug(f"Failed to log market data for training: {ex!s}")
         if data_quality_issues > 0:
@@ -877,9 +880,36 @@ class BettingOpportunityService:
         """Get specific opportunity by ID"""
         return self.active_opportunities.get(opportunity_id)
 
+    def _remember_opportunity(self, opp: BettingOpportunity):
+        best = max(opp.market_data, key=lambda m: m.odds, default=None)
+        self.opportunity_history.append(
+            "betting",
+            opp,
+            opportunity_type=opp.opportunity_type.value,
+            event_id=opp.event_id,
+            market_type=opp.market_type,
+            sportsbook=best.sportsbook if best else None,
+            value=opp.expected_value * 100,
+            confidence=opp.confidence,
+            timestamp=opp.created_at,
+        )
+
+    async def get_opportunity_history(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Optional[str] = None,
+        limit: Optional[int] = 100,
+    ) -> List[OpportunityRecord]:
+        """Past opportunity summaries, newest first"""
+        return self.opportunity_history.records(start, end, event_id, limit=limit)
+
     async def get_opportunity_statistics(self) -> Dict[str, Any]:
         """Get statistics about opportunities"""
         active_ops = await self.get_active_opportunities()
+        history = self.opportunity_history.summary(
+            start=datetime.now() - timedelta(hours=24)
+        )
 
         if not active_ops:
             return {
@@ -887,6 +917,7 @@ class BettingOpportunityService:
                 "avg_expected_value": 0,
                 "avg_confidence": 0,
                 "risk_distribution": {},
+                "history_24h": history,
             }
 
         risk_counts = {}
@@ -906,6 +937,7 @@ class BettingOpportunityService:
                 )
                 for opp_type in OpportunityType
             },
+            "history_24h": history,
         }
 
 
@@ -1517,6 +1549,27 @@ async def get_service_status():
         raise HTTPException(status_code=500, detail=f"Failed to get status: {e!s}")
 
 
+@router.get("/history")
+async def get_opportunity_history(
+    event_id: Optional[str] = None, hours: float = 24.0, limit: int = 100
+):
+    """Get recorded betting opportunities, newest first."""
+    try:
+        start = datetime.now() - timedelta(hours=hours)
+        records = await betting_opportunity_service.get_opportunity_history(
+            start=start, event_id=event_id, limit=limit
+        )
+        return {
+            "status": "success",
+            "data": [asdict(record) for record in records],
+            "summary": betting_opportunity_service.opportunity_history.summary(
+                start=start, event_id=event_id
+            ),
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get history: {e!s}")
+
+
 @router.post("/analyze")
 async def analyze_opportunity(request: Dict[str, Any]):
     """Analyze a specific betting opportunity."""
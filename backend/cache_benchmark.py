@@ -0,0 +1,659 @@
+"""Cache Benchmark and Replay Harness
+Drive InMemoryCache, MultiTierCache and @cached with synthetic or recorded key traces
+
+Examples:
+    python cache_benchmark.py --target multi_tier --workload zipfian scan_heavy
+    python cache_benchmark.py --target memory --trace keys.log --output bench.json
+    python cache_benchmark.py --baseline bench.json --tolerance 0.1  # CI gate
+
+Trace files hold one key per line, or one JSON object per line such as
+``{"key": "prediction:e1", "op": "get", "ttl": 60, "t": 12.5}`` where ``op``
+is get/set/delete and ``t`` is the offset in seconds (used with --realtime).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+import cache_optimizer
+from cache_optimizer import CacheStrategy, InMemoryCache, MultiTierCache, cached
+from local_redis import LocalRedis
+from shared_result_cache import SharedResultCache
+
+logger = logging.getLogger(__name__)
+
+
+class WorkloadType(str, Enum):
+    """Synthetic access patterns"""
+
+    ZIPFIAN = "zipfian"  # Skewed popularity, like prediction lookups
+    SCAN_HEAVY = "scan_heavy"  # Hot set interleaved with one-off sequential scans
+    BURST_ON_EXPIRY = "burst_on_expiry"  # Concurrent bursts on a few short-TTL keys
+    TRACE = "trace"  # Replay of a recorded key trace
+
+
+class BenchmarkTarget(str, Enum):
+    """Cache front-ends under test"""
+
+    MEMORY = "memory"  # InMemoryCache alone
+    MULTI_TIER = "multi_tier"  # MultiTierCache.get_or_compute over L1/L0/L2
+    DECORATOR = "decorator"  # @cached around an async loader
+
+
+@dataclass
+class TraceOperation:
+    """One cache operation of a workload"""
+
+    key: str
+    op: str = "get"
+    ttl: Optional[float] = None
+    at: Optional[float] = None  # Offset in seconds from the start of the trace
+
+
+@dataclass
+class WorkloadBatch:
+    """Operations issued concurrently, after an optional pause"""
+
+    operations: List[TraceOperation]
+    pause_before: float = 0.0
+
+
+@dataclass
+class WorkloadConfig:
+    """Workload shape"""
+
+    workload: WorkloadType = WorkloadType.ZIPFIAN
+    operations: int = 100_000
+    key_space: int = 10_000
+    zipf_exponent: float = 1.1
+    scan_fraction: float = 0.3
+    scan_length: int = 1000
+    burst_size: int = 200
+    burst_keys: int = 20
+    burst_interval: float = 0.25
+    ttl: Optional[float] = None  # Defaults to 1s for bursts, no expiry otherwise
+    value_bytes: int = 256
+    concurrency: int = 32
+    seed: int = 42
+    trace_path: Optional[str] = None
+    realtime: bool = False  # Honor trace timestamps instead of replaying flat out
+
+    @property
+    def effective_ttl(self) -> Optional[float]:
+        """TTL applied to values loaded on a miss"""
+        if self.ttl is None and self.workload == WorkloadType.BURST_ON_EXPIRY:
+            return 1.0
+        return self.ttl
+
+
+@dataclass
+class TargetConfig:
+    """Cache settings being tuned"""
+
+    target: BenchmarkTarget = BenchmarkTarget.MULTI_TIER
+    max_size: int = 5000
+    max_memory_mb: int = 256
+    strategy: CacheStrategy = CacheStrategy.W_TINYLFU
+    promotion_threshold: int = 5
+    l1_max_value_bytes: int = 10240
+    redis_latency_ms: float = 0.2
+    origin_latency_ms: float = 1.0
+    use_l0: bool = False
+
+
+@dataclass
+class BenchmarkResult:
+    """Machine-readable outcome of one workload/target run"""
+
+    name: str
+    target: str
+    workload: str
+    operations: int
+    duration_seconds: float
+    throughput_ops: float
+    hit_rate: float
+    origin_loads: int
+    tier_hit_rates: Dict[str, float]
+    latency_us: Dict[str, float]
+    memory: Dict[str, float]
+    redis_round_trips: int
+    workload_config: Dict[str, Any] = field(default_factory=dict)
+    target_config: Dict[str, Any] = field(default_factory=dict)
+
+
+def bench_key(index: int) -> str:
+    """Key for the index-th item of the synthetic key space"""
+    return f"bench:{index}"
+
+
+def zipfian_indices(
+    rng: np.random.Generator, count: int, key_space: int, exponent: float
+) -> np.ndarray:
+    """Draw key indices whose popularity follows a Zipf law over key_space"""
+    weights = np.arange(1, key_space + 1, dtype=np.float64) ** -exponent
+    # Shuffle ranks so popularity is unrelated to key order
+    popularity = rng.permutation(key_space)
+    return popularity[rng.choice(key_space, size=count, p=weights / weights.sum())]
+
+
+def load_trace(path: str) -> List[TraceOperation]:
+    """Read a trace file of plain keys or JSON operations"""
+    operations = []
+    with open(path, encoding="utf-8") as trace:
+        for line in trace:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                operations.append(
+                    TraceOperation(
+                        key=record["key"],
+                        op=record.get("op", "get"),
+                        ttl=record.get("ttl"),
+                        at=record.get("t"),
+                    )
+                )
+            else:
+                operations.append(TraceOperation(key=line))
+    return operations
+
+
+def _chunk(operations: List[TraceOperation], size: int) -> List[WorkloadBatch]:
+    return [
+        WorkloadBatch(operations[offset : offset + size])
+        for offset in range(0, len(operations), size)
+    ]
+
+
+def build_workload(config: WorkloadConfig) -> List[WorkloadBatch]:
+    """Generate the batches of operations for a workload"""
+    rng = np.random.default_rng(config.seed)
+    ttl = config.effective_ttl
+
+    if config.workload == WorkloadType.ZIPFIAN:
+        indices = zipfian_indices(
+            rng, config.operations, config.key_space, config.zipf_exponent
+        )
+        return _chunk(
+            [TraceOperation(bench_key(i), ttl=ttl) for i in indices.tolist()],
+            config.concurrency,
+        )
+
+    if config.workload == WorkloadType.SCAN_HEAVY:
+        operations: List[TraceOperation] = []
+        hot = zipfian_indices(
+            rng, config.operations, config.key_space, config.zipf_exponent
+        ).tolist()
+        cold_start = config.key_space  # Scans walk keys outside the hot set
+        cursor = 0
+        while len(operations) < config.operations:
+            length = min(config.scan_length, config.operations - len(operations))
+            if rng.random() < config.scan_fraction:
+                operations.extend(
+                    TraceOperation(bench_key(cold_start + cursor + i), ttl=ttl)
+                    for i in range(length)
+                )
+                cursor = (cursor + length) % (config.key_space * 4)
+            else:
+                offset = len(operations)
+                operations.extend(
+                    TraceOperation(bench_key(i), ttl=ttl)
+                    for i in hot[offset : offset + length]
+                )
+        return _chunk(operations, config.concurrency)
+
+    if config.workload == WorkloadType.BURST_ON_EXPIRY:
+        batches = []
+        remaining = config.operations
+        while remaining > 0:
+            size = min(config.burst_size, remaining)
+            keys = rng.integers(0, config.burst_keys, size=size).tolist()
+            batches.append(
+                WorkloadBatch(
+                    [TraceOperation(bench_key(i), ttl=ttl) for i in keys],
+                    pause_before=config.burst_interval if batches else 0.0,
+                )
+            )
+            remaining -= size
+        return batches
+
+    if config.workload == WorkloadType.TRACE:
+        if not config.trace_path:
+            raise ValueError("Trace workload requires trace_path")
+        operations = load_trace(config.trace_path)
+        for operation in operations:
+            if operation.ttl is None:
+                operation.ttl = ttl
+        if not config.realtime:
+            return _chunk(operations, config.concurrency)
+
+        # Issue each group of operations at its recorded offset
+        batches = []
+        previous_at = 0.0
+        for batch in _chunk(operations, config.concurrency):
+            at = batch.operations[0].at or previous_at
+            batch.pause_before = max(0.0, at - previous_at)
+            previous_at = at
+            batches.append(batch)
+        return batches
+
+    raise ValueError(f"Unsupported workload: {config.workload}")
+
+
+def _percentiles(latencies_ns: np.ndarray) -> Dict[str, float]:
+    if not len(latencies_ns):
+        return {"p50": 0.0, "p99": 0.0, "p999": 0.0, "max": 0.0, "mean": 0.0}
+    micros = latencies_ns / 1000
+    p50, p99, p999 = np.percentile(micros, [50, 99, 99.9])
+    return {
+        "p50": float(p50),
+        "p99": float(p99),
+        "p999": float(p999),
+        "max": float(micros.max()),
+        "mean": float(micros.mean()),
+    }
+
+
+class CacheBenchmark:
+    """Run one workload against one cache target"""
+
+    def __init__(self, workload: WorkloadConfig, target: TargetConfig):
+        self.workload = workload
+        self.target = target
+        self.origin_loads = 0
+        self.redis = LocalRedis(latency_ms=target.redis_latency_ms)
+        self._payload = np.random.default_rng(workload.seed).bytes(
+            workload.value_bytes
+        )
+        self._l0_dir: Optional[str] = None
+
+    def make_value(self, key: str) -> Dict[str, Any]:
+        """Value stored for key (distinct objects, like real results)"""
+        return {"key": key, "value": 0.5, "payload": key.encode() + self._payload}
+
+    async def _load(self, key: str) -> Dict[str, Any]:
+        """Simulated origin fetch on a miss"""
+        self.origin_loads += 1
+        await asyncio.sleep(self.target.origin_latency_ms / 1000)
+        return self.make_value(key)
+
+    def _new_memory_cache(self) -> InMemoryCache:
+        return InMemoryCache(
+            max_size=self.target.max_size,
+            max_memory_mb=self.target.max_memory_mb,
+            strategy=self.target.strategy,
+        )
+
+    def _new_multi_tier_cache(self) -> MultiTierCache:
+        cache = MultiTierCache()
+        cache.l1_cache = InMemoryCache(
+            max_size=self.target.max_size,
+            max_memory_mb=self.target.max_memory_mb,
+            strategy=self.target.strategy,
+            codec=cache.codec,
+        )
+        cache.l2_cache.redis_client = self.redis
+        cache.promotion_threshold = self.target.promotion_threshold
+        cache.l1_max_value_bytes = self.target.l1_max_value_bytes
+        if self.target.use_l0:
+            self._l0_dir = tempfile.mkdtemp(prefix="cache-bench-")
+            cache.enable_shared_memory_tier(
+                SharedResultCache(os.path.join(self._l0_dir, "bench.l0"))
+            )
+        return cache
+
+    def _operation_runner(self, cache: Any) -> Callable:
+        """Coroutine function executing one TraceOperation against the target"""
+        target = self.target.target
+
+        if target == BenchmarkTarget.MEMORY:
+
+            async def run_memory(operation: TraceOperation):
+                key = operation.key
+                if operation.op == "delete":
+                    cache.delete(key)
+                elif operation.op == "set":
+                    cache.set(key, self.make_value(key), operation.ttl)
+                elif cache.get(key) is None:
+                    self.origin_loads += 1
+                    cache.set(key, self.make_value(key), operation.ttl)
+
+            return run_memory
+
+        if target == BenchmarkTarget.DECORATOR:
+            # @cached reads the optimizer's cache at call time
+            loaders: Dict[Optional[float], Callable] = {}
+
+            def loader_for(ttl: Optional[float]) -> Callable:
+                if ttl not in loaders:
+                    loaders[ttl] = cached(ttl=ttl, key_generator=lambda key: key)(
+                        self._load
+                    )
+                return loaders[ttl]
+
+            async def run_decorated(operation: TraceOperation):
+                if operation.op == "delete":
+                    await cache.delete(operation.key)
+                elif operation.op == "set":
+                    value = self.make_value(operation.key)
+                    await cache.set(operation.key, value, operation.ttl)
+                else:
+                    await loader_for(operation.ttl)(operation.key)
+
+            return run_decorated
+
+        async def run_multi_tier(operation: TraceOperation):
+            if operation.op == "delete":
+                await cache.delete(operation.key)
+            elif operation.op == "set":
+                value = self.make_value(operation.key)
+                await cache.set(operation.key, value, operation.ttl)
+            else:
+                await cache.get_or_compute(
+                    operation.key,
+                    lambda: self._load(operation.key),
+                    ttl=operation.ttl,
+                )
+
+        return run_multi_tier
+
+    async def run(self) -> BenchmarkResult:
+        """Execute the workload and collect metrics"""
+        batches = build_workload(self.workload)
+        total = sum(len(batch.operations) for batch in batches)
+        latencies = np.zeros(total, dtype=np.int64)
+        reads = 0
+
+        target = self.target.target
+        if target == BenchmarkTarget.MEMORY:
+            cache = self._new_memory_cache()
+        else:
+            cache = self._new_multi_tier_cache()
+
+        previous_cache = cache_optimizer.ultra_cache_optimizer.cache
+        if target == BenchmarkTarget.DECORATOR:
+            cache_optimizer.ultra_cache_optimizer.cache = cache
+        runner = self._operation_runner(cache)
+
+        async def timed(operation: TraceOperation, slot: int):
+            started = time.perf_counter_ns()
+            await runner(operation)
+            latencies[slot] = time.perf_counter_ns() - started
+
+        try:
+            slot = 0
+            started = time.perf_counter()
+            for batch in batches:
+                if batch.pause_before:
+                    await asyncio.sleep(batch.pause_before)
+                await asyncio.gather(
+                    *(
+                        timed(operation, slot + index)
+                        for index, operation in enumerate(batch.operations)
+                    )
+                )
+                slot += len(batch.operations)
+                reads += sum(1 for op in batch.operations if op.op == "get")
+            # Pauses are think time, not cache work
+            duration = time.perf_counter() - started - sum(
+                batch.pause_before for batch in batches
+            )
+
+            tier_hits, memory = self._collect_tier_stats(cache, batches)
+        finally:
+            cache_optimizer.ultra_cache_optimizer.cache = previous_cache
+            self._release(cache)
+
+        return BenchmarkResult(
+            name=f"{target.value}/{self.workload.workload.value}",
+            target=target.value,
+            workload=self.workload.workload.value,
+            operations=total,
+            duration_seconds=duration,
+            throughput_ops=total / duration if duration > 0 else 0.0,
+            hit_rate=1 - self.origin_loads / reads if reads else 0.0,
+            origin_loads=self.origin_loads,
+            tier_hit_rates={
+                tier: hits / reads if reads else 0.0 for tier, hits in tier_hits.items()
+            },
+            latency_us=_percentiles(latencies),
+            memory=memory,
+            redis_round_trips=self.redis.round_trips,
+            workload_config=_config_dict(self.workload),
+            target_config=_config_dict(self.target),
+        )
+
+    def _collect_tier_stats(self, cache: Any, batches: List[WorkloadBatch]):
+        """Per-tier hit counts and memory per entry"""
+        l1 = cache if isinstance(cache, InMemoryCache) else cache.l1_cache
+        tier_hits = {"l1": l1.metrics.hits}
+        entries = len(l1.cache)
+        memory = {
+            "l1_entries": entries,
+            "l1_accounted_bytes_per_entry": (
+                l1.current_memory / entries if entries else 0.0
+            ),
+            "l1_heap_bytes_per_entry": self._heap_bytes_per_entry(batches),
+        }
+
+        if isinstance(cache, MultiTierCache):
+            # Reads that waited on another caller's load instead of the origin
+            tier_hits["coalesced"] = cache.coalescing_metrics.coalesced_computations
+            if cache.l0_cache:
+                tier_hits["l0"] = cache.l0_cache.metrics.hits
+            tier_hits["l2"] = cache.l2_cache.metrics.hits
+            info = self.redis._cmd_info()
+            keys = info["db0"]["keys"]
+            memory["l2_entries"] = keys
+            memory["l2_bytes_per_entry"] = info["used_memory"] / keys if keys else 0.0
+        return tier_hits, memory
+
+    def _heap_bytes_per_entry(self, batches: List[WorkloadBatch]) -> float:
+        """Python heap growth per L1 entry, measured on a fresh cache"""
+        keys = list(
+            dict.fromkeys(
+                operation.key for batch in batches for operation in batch.operations
+            )
+        )[: min(self.target.max_size, 2000)]
+        if not keys:
+            return 0.0
+
+        cache = self._new_memory_cache()
+        tracemalloc.start()
+        try:
+            before, _ = tracemalloc.get_traced_memory()
+            for key in keys:
+                cache.set(key, self.make_value(key), self.workload.effective_ttl)
+            after, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return (after - before) / len(keys)
+
+    def _release(self, cache: Any):
+        if isinstance(cache, MultiTierCache) and cache.l0_cache:
+            cache.disable_shared_memory_tier()
+        if self._l0_dir:
+            shutil.rmtree(self._l0_dir, ignore_errors=True)
+            self._l0_dir = None
+
+
+def _config_dict(config: Any) -> Dict[str, Any]:
+    return {
+        key: value.value if isinstance(value, Enum) else value
+        for key, value in asdict(config).items()
+    }
+
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.1,
+) -> List[str]:
+    """Compare results with a baseline run of the same names"""
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["name"])
+        if base is None:
+            continue
+        name = result["name"]
+        if result["throughput_ops"] < base["throughput_ops"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {result['throughput_ops']:.0f} ops/s "
+                f"vs baseline {base['throughput_ops']:.0f}"
+            )
+        if result["hit_rate"] < base["hit_rate"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: hit rate {result['hit_rate']:.3f} "
+                f"vs baseline {base['hit_rate']:.3f}"
+            )
+        for percentile in ("p99", "p999"):
+            current = result["latency_us"][percentile]
+            reference = base["latency_us"][percentile]
+            if reference and current > reference * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {percentile} latency {current:.1f}us "
+                    f"vs baseline {reference:.1f}us"
+                )
+    return regressions
+
+
+async def run_benchmarks(
+    workloads: List[WorkloadConfig], targets: List[TargetConfig]
+) -> List[Dict[str, Any]]:
+    """Run every workload against every target"""
+    results = []
+    for target in targets:
+        for workload in workloads:
+            result = await CacheBenchmark(workload, target).run()
+            logger.info(
+                f"{result.name}: {result.throughput_ops:.0f} ops/s, "
+                f"hit rate {result.hit_rate:.3f}, p99 {result.latency_us['p99']:.1f}us"
+            )
+            results.append(asdict(result))
+    return results
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--target",
+        nargs="+",
+        default=[BenchmarkTarget.MULTI_TIER.value],
+        choices=[target.value for target in BenchmarkTarget],
+    )
+    parser.add_argument(
+        "--workload",
+        nargs="+",
+        default=[WorkloadType.ZIPFIAN.value],
+        choices=[w.value for w in WorkloadType if w != WorkloadType.TRACE],
+    )
+    parser.add_argument("--trace", help="Replay a recorded key trace instead")
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--operations", type=int, default=100_000)
+    parser.add_argument("--key-space", type=int, default=10_000)
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--value-bytes", type=int, default=256)
+    parser.add_argument("--ttl", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-size", type=int, default=5000)
+    parser.add_argument("--max-memory-mb", type=int, default=256)
+    parser.add_argument(
+        "--strategy",
+        default=CacheStrategy.W_TINYLFU.value,
+        choices=["lru", "lfu", "fifo", "w_tinylfu"],
+    )
+    parser.add_argument("--promotion-threshold", type=int, default=5)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.2)
+    parser.add_argument("--origin-latency-ms", type=float, default=1.0)
+    parser.add_argument("--l0", action="store_true", help="Enable the shared L0 tier")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="Fail on regressions against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns 1 when a regression is detected"""
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    logging.getLogger("cache_optimizer").setLevel(logging.WARNING)
+
+    workload_types = (
+        [WorkloadType.TRACE] if args.trace else [WorkloadType(w) for w in args.workload]
+    )
+    workloads = [
+        WorkloadConfig(
+            workload=workload,
+            operations=args.operations,
+            key_space=args.key_space,
+            zipf_exponent=args.zipf_exponent,
+            ttl=args.ttl,
+            value_bytes=args.value_bytes,
+            concurrency=args.concurrency,
+            seed=args.seed,
+            trace_path=args.trace,
+            realtime=args.realtime,
+        )
+        for workload in workload_types
+    ]
+    targets = [
+        TargetConfig(
+            target=BenchmarkTarget(target),
+            max_size=args.max_size,
+            max_memory_mb=args.max_memory_mb,
+            strategy=CacheStrategy(args.strategy),
+            promotion_threshold=args.promotion_threshold,
+            redis_latency_ms=args.redis_latency_ms,
+            origin_latency_ms=args.origin_latency_ms,
+            use_l0=args.l0,
+        )
+        for target in args.target
+    ]
+
+    results = asyncio.run(run_benchmarks(workloads, targets))
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = find_regressions(
+                results, json.load(baseline_file)["results"], args.tolerance
+            )
+
+    report = json.dumps(
+        {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "results": results,
+            "regressions": regressions,
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(report)
+    else:
+        print(report)
+
+    for regression in regressions:
+        logger.error(f"Cache regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,297 @@
+"""Binary Cache Codec
+Single-pass serialization and compression shared by all cache tiers
+"""
+
+import gzip
+import logging
+import pickle
+import struct
+import zlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+class CompressionType(str, Enum):
+    """Data compression types"""
+
+    NONE = "none"
+    GZIP = "gzip"
+    ZLIB = "zlib"
+    PICKLE = "pickle"
+    LZ4 = "lz4"
+    ZSTD = "zstd"
+
+
+class SerializerType(int, Enum):
+    """Payload serializers used inside a codec frame"""
+
+    RAW_BYTES = 0
+    PICKLE5 = 1
+
+
+# Frame layout: magic, version, serializer, compression, buffer count, then one
+# little-endian uint64 length per segment (pickle payload + out-of-band buffers)
+FRAME_MAGIC = 0xA1
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<BBBBI")
+_LENGTH = struct.Struct("<Q")
+
+_COMPRESSION_IDS = {
+    CompressionType.NONE: 0,
+    CompressionType.GZIP: 1,
+    CompressionType.ZLIB: 2,
+    CompressionType.LZ4: 3,
+    CompressionType.ZSTD: 4,
+}
+_COMPRESSION_BY_ID = {value: key for key, value in _COMPRESSION_IDS.items()}
+
+
+class CodecError(ValueError):
+    """Raised when a cache frame cannot be decoded"""
+
+
+@dataclass
+class CompressionRule:
+    """Compression settings for a key namespace"""
+
+    compression: CompressionType = CompressionType.ZLIB
+    threshold_bytes: int = 1024
+    level: Optional[int] = None
+
+
+@dataclass
+class EncodedValue:
+    """Result of encoding a value once"""
+
+    data: bytes
+    raw_size: int
+    compression: CompressionType
+
+    @property
+    def size(self) -> int:
+        """Stored size in bytes"""
+        return len(self.data)
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the frame body is compressed"""
+        return self.compression != CompressionType.NONE
+
+
+def available_compressions() -> List[CompressionType]:
+    """Compression types usable in this environment"""
+    available = [CompressionType.NONE, CompressionType.GZIP, CompressionType.ZLIB]
+    if lz4_frame is not None:
+        available.append(CompressionType.LZ4)
+    if zstandard is not None:
+        available.append(CompressionType.ZSTD)
+    return available
+
+
+def fastest_compression() -> CompressionType:
+    """Fastest general-purpose compressor installed (LZ4, then Zstd, then zlib)"""
+    available = available_compressions()
+    for compression in (CompressionType.LZ4, CompressionType.ZSTD):
+        if compression in available:
+            return compression
+    return CompressionType.ZLIB
+
+
+class CacheCodec:
+    """Encode values once into self-describing frames.
+
+    Values are pickled with protocol 5 so NumPy arrays and other buffer-backed
+    objects travel as out-of-band buffers instead of being copied into the
+    pickle stream. ``bytes`` values are stored as-is. Compression is chosen per
+    key namespace (the part of the key before the first ``:``) and only applied
+    above the namespace's size threshold.
+    """
+
+    def __init__(
+        self,
+        default_rule: Optional[CompressionRule] = None,
+        namespace_rules: Optional[Dict[str, CompressionRule]] = None,
+    ):
+        self.default_rule = default_rule or CompressionRule(
+            compression=fastest_compression()
+        )
+        self.namespace_rules: Dict[str, CompressionRule] = {}
+        for namespace, rule in (namespace_rules or {}).items():
+            self.set_namespace_rule(namespace, rule)
+
+    def set_namespace_rule(self, namespace: str, rule: CompressionRule):
+        """Configure compression for keys starting with ``namespace:``"""
+        self.namespace_rules[namespace] = CompressionRule(
+            compression=self._resolve_compression(rule.compression),
+            threshold_bytes=rule.threshold_bytes,
+            level=rule.level,
+        )
+
+    def rule_for(self, key: Optional[str]) -> CompressionRule:
+        """Get the compression rule that applies to key"""
+        if key and self.namespace_rules:
+            namespace = key.split(":", 1)[0]
+            rule = self.namespace_rules.get(namespace)
+            if rule is not None:
+                return rule
+        return self.default_rule
+
+    def encode(
+        self, value: Any, key: Optional[str] = None, compress: bool = True
+    ) -> EncodedValue:
+        """Serialize (and optionally compress) value in a single pass"""
+        buffers: List[pickle.PickleBuffer] = []
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            serializer = SerializerType.RAW_BYTES
+            segments = [bytes(value)]
+        else:
+            serializer = SerializerType.PICKLE5
+            payload = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+            segments = [payload] + [buffer.raw() for buffer in buffers]
+
+        raw_size = sum(len(segment) for segment in segments)
+        compression = CompressionType.NONE
+        rule = self.rule_for(key)
+        if compress and raw_size >= rule.threshold_bytes:
+            compression = self._resolve_compression(rule.compression)
+
+        lengths = b"".join(_LENGTH.pack(len(segment)) for segment in segments)
+        body = b"".join(segments)
+        if compression != CompressionType.NONE:
+            body = self._compress(body, compression, rule.level)
+
+        header = _HEADER.pack(
+            FRAME_MAGIC,
+            FRAME_VERSION,
+            serializer,
+            _COMPRESSION_IDS[compression],
+            len(segments) - 1,
+        )
+        return EncodedValue(
+            data=b"".join((header, lengths, body)),
+            raw_size=raw_size,
+            compression=compression,
+        )
+
+    def decode(self, data: bytes) -> Any:
+        """Decode a frame produced by encode.
+
+        Plain pickles written before the codec existed are still accepted.
+        """
+        if not data or data[0] != FRAME_MAGIC:
+            return pickle.loads(data)
+
+        try:
+            _, version, serializer, compression_id, buffer_count = _HEADER.unpack_from(
+                data
+            )
+            if version != FRAME_VERSION:
+                raise CodecError(f"Unsupported cache frame version: {version}")
+
+            lengths_end = _HEADER.size + _LENGTH.size * (buffer_count + 1)
+            lengths = [
+                _LENGTH.unpack_from(data, offset)[0]
+                for offset in range(_HEADER.size, lengths_end, _LENGTH.size)
+            ]
+            compression = _COMPRESSION_BY_ID[compression_id]
+        except (struct.error, KeyError) as e:
+            raise CodecError(f"Corrupt cache frame header: {e!s}") from e
+
+        body = memoryview(data)[lengths_end:]
+        if compression != CompressionType.NONE:
+            body = memoryview(self._decompress(body, compression))
+
+        if serializer == SerializerType.RAW_BYTES:
+            return bytes(body)
+
+        if buffer_count:
+            # Out-of-band buffers must be writable for NumPy arrays to be mutable
+            body = memoryview(bytearray(body))
+
+        segments: List[memoryview] = []
+        offset = 0
+        for length in lengths:
+            segments.append(body[offset : offset + length])
+            offset += length
+
+        return pickle.loads(segments[0], buffers=segments[1:])
+
+    def describe(self, data: bytes) -> EncodedValue:
+        """Wrap an encoded frame without decoding its payload"""
+        if not data or data[0] != FRAME_MAGIC:
+            return EncodedValue(
+                data=data, raw_size=len(data), compression=CompressionType.NONE
+            )
+
+        _, _, _, compression_id, buffer_count = _HEADER.unpack_from(data)
+        raw_size = sum(
+            _LENGTH.unpack_from(data, _HEADER.size + _LENGTH.size * index)[0]
+            for index in range(buffer_count + 1)
+        )
+        return EncodedValue(
+            data=data,
+            raw_size=raw_size,
+            compression=_COMPRESSION_BY_ID[compression_id],
+        )
+
+    def _resolve_compression(self, compression: CompressionType) -> CompressionType:
+        """Fall back to zlib when the requested compressor is not installed"""
+        compression = CompressionType(compression)
+        if compression == CompressionType.PICKLE:
+            return CompressionType.NONE
+        if compression not in available_compressions():
+            logger.warning(
+                f"{compression.value} compression not available, falling back to zlib"
+            )
+            return CompressionType.ZLIB
+        return compression
+
+    def _compress(
+        self, body: bytes, compression: CompressionType, level: Optional[int]
+    ) -> bytes:
+        """Compress frame body"""
+        if compression == CompressionType.ZLIB:
+            return zlib.compress(body, 1 if level is None else level)
+        if compression == CompressionType.GZIP:
+            return gzip.compress(body, compresslevel=1 if level is None else level)
+        if compression == CompressionType.LZ4:
+            return lz4_frame.compress(
+                body, compression_level=0 if level is None else level
+            )
+        if compression == CompressionType.ZSTD:
+            compressor = zstandard.ZstdCompressor(level=3 if level is None else level)
+            return compressor.compress(body)
+        return body
+
+    def _decompress(self, body: memoryview, compression: CompressionType) -> bytes:
+        """Decompress frame body"""
+        if compression == CompressionType.ZLIB:
+            return zlib.decompress(body)
+        if compression == CompressionType.GZIP:
+            return gzip.decompress(bytes(body))
+        if compression == CompressionType.LZ4:
+            if lz4_frame is None:
+                raise CodecError("lz4 is required to decode this cache entry")
+            return lz4_frame.decompress(body)
+        if compression == CompressionType.ZSTD:
+            if zstandard is None:
+                raise CodecError("zstandard is required to decode this cache entry")
+            return zstandard.ZstdDecompressor().decompress(body)
+        return bytes(body)
+
+
+# Shared codec instance used by the cache tiers and prediction cache
+default_codec = CacheCodec()
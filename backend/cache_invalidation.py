@@ -0,0 +1,413 @@
+"""Cross-Worker Cache Invalidation Bus
+Batched key, pattern and version invalidations broadcast to every worker's L1 cache
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import redis.asyncio as redis
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[bytes], Awaitable[None]]
+
+
+@dataclass
+class InvalidationMessage:
+    """Batch of invalidations published by one worker"""
+
+    origin: str
+    sent_at: float
+    keys: List[str] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+    versions: Dict[str, int] = field(default_factory=dict)
+    clear_all: bool = False
+    host: str = ""
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact JSON payload"""
+        return json.dumps(
+            {
+                "o": self.origin,
+                "t": self.sent_at,
+                "k": self.keys,
+                "p": self.patterns,
+                "v": self.versions,
+                "c": self.clear_all,
+                "h": self.host,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "InvalidationMessage":
+        """Parse a payload produced by to_bytes"""
+        payload = json.loads(data)
+        return cls(
+            origin=payload["o"],
+            sent_at=payload["t"],
+            keys=payload.get("k", []),
+            patterns=payload.get("p", []),
+            versions=payload.get("v", {}),
+            clear_all=payload.get("c", False),
+            host=payload.get("h", ""),
+        )
+
+
+@dataclass
+class InvalidationMetrics:
+    """Invalidation bus metrics"""
+
+    published_batches: int = 0
+    published_invalidations: int = 0
+    received_batches: int = 0
+    applied_invalidations: int = 0
+    publish_errors: int = 0
+    receive_errors: int = 0
+
+
+class InvalidationTransport:
+    """Base class for invalidation bus transports"""
+
+    async def start(self, on_message: MessageHandler):
+        """Start delivering received payloads to on_message"""
+        raise NotImplementedError
+
+    async def publish(self, data: bytes):
+        """Broadcast payload to every subscribed worker"""
+        raise NotImplementedError
+
+    async def close(self):
+        """Stop receiving and release resources"""
+        raise NotImplementedError
+
+
+class RedisInvalidationTransport(InvalidationTransport):
+    """Redis pub/sub transport for multi-host deployments"""
+
+    def __init__(self, redis_url: str, channel: str = "a1betting:cache:invalidations"):
+        self.redis_url = redis_url
+        self.channel = channel
+        self.redis_client: Optional[redis.Redis] = None
+        self.pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, on_message: MessageHandler):
+        self.redis_client = redis.from_url(self.redis_url, decode_responses=False)
+        self.pubsub = self.redis_client.pubsub(ignore_subscribe_messages=True)
+        await self.pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(on_message))
+        logger.info(f"Cache invalidation bus subscribed to {self.channel}")
+
+    async def _listen(self, on_message: MessageHandler):
+        while True:
+            try:
+                async for message in self.pubsub.listen():
+                    if message.get("type") == "message":
+                        await on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Cache invalidation listener error: {e!s}")
+                await asyncio.sleep(1)
+
+    async def publish(self, data: bytes):
+        await self.redis_client.publish(self.channel, data)
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+        if self.pubsub:
+            await self.pubsub.unsubscribe(self.channel)
+            await self.pubsub.close()
+        if self.redis_client:
+            await self.redis_client.close()
+
+
+class UnixSocketInvalidationTransport(InvalidationTransport):
+    """Single-host transport over UNIX datagram sockets.
+
+    Every worker binds ``<socket_dir>/<node_id>.sock`` and publishing sends the
+    payload to every other socket in the directory. Sockets left behind by dead
+    workers are removed on the first failed send, and a full peer queue is
+    retried with backoff for up to ``send_attempts`` tries.
+    """
+
+    def __init__(
+        self, socket_dir: str, node_id: Optional[str] = None, send_attempts: int = 6
+    ):
+        self.socket_dir = socket_dir
+        self.send_attempts = send_attempts
+        self.node_id = node_id or uuid.uuid4().hex[:12]
+        self.socket_path = os.path.join(socket_dir, f"{self.node_id}.sock")
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._sender: Optional[socket.socket] = None
+
+    async def start(self, on_message: MessageHandler):
+        os.makedirs(self.socket_dir, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        loop = asyncio.get_running_loop()
+        receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        receiver.bind(self.socket_path)
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramReceiver(on_message), sock=receiver
+        )
+
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        logger.info(f"Cache invalidation bus listening on {self.socket_path}")
+
+    def peers(self) -> List[str]:
+        """Socket paths of the other workers on this host"""
+        try:
+            names = os.listdir(self.socket_dir)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.socket_dir, name)
+            for name in names
+            if name.endswith(".sock") and name != f"{self.node_id}.sock"
+        ]
+
+    async def publish(self, data: bytes):
+        for peer in self.peers():
+            await self._send(peer, data)
+
+    async def _send(self, peer: str, data: bytes):
+        """Send one datagram, backing off while the peer's queue is full"""
+        for attempt in range(self.send_attempts):
+            try:
+                self._sender.sendto(data, peer)
+                return
+            except BlockingIOError:
+                await asyncio.sleep(0.001 * 2**attempt)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Worker is gone; remove its socket so we stop sending to it
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+                return
+            except OSError as e:
+                logger.error(f"Failed to send invalidations to {peer}: {e!s}")
+                return
+        logger.warning(f"Invalidation socket {peer} is full, dropping batch")
+
+    async def close(self):
+        if self._transport:
+            self._transport.close()
+        if self._sender:
+            self._sender.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class _DatagramReceiver(asyncio.DatagramProtocol):
+    """Forward received datagrams to the bus"""
+
+    def __init__(self, on_message: MessageHandler):
+        self.on_message = on_message
+        self._tasks = set()
+
+    def datagram_received(self, data: bytes, addr: Any):
+        task = asyncio.ensure_future(self.on_message(data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+class InvalidationBus:
+    """Batch local invalidations and apply remote ones to this worker's L1.
+
+    Invalidations are collected for ``flush_interval`` seconds (or until
+    ``max_batch_size`` are pending) and published in messages of at most
+    ``max_batch_size`` entries, so a large batch still fits in a datagram.
+    Messages from other workers are handed to ``handler``; messages from this
+    worker are ignored since they were already applied locally. ``host_id`` names the
+    host, so workers sharing its L0 table can tell their own host's writes apart.
+    """
+
+    def __init__(
+        self,
+        transport: InvalidationTransport,
+        flush_interval: float = 0.01,
+        max_batch_size: int = 500,
+        node_id: Optional[str] = None,
+        host_id: Optional[str] = None,
+    ):
+        self.transport = transport
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.host_id = host_id or socket.gethostname()
+        self.node_id = node_id or (
+            f"{self.host_id}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        )
+        self.handler: Optional[Callable[[InvalidationMessage], None]] = None
+        self.metrics = InvalidationMetrics()
+        self.propagation_lags = deque(maxlen=1000)  # Seconds, most recent batches
+
+        self._pending_keys: Dict[str, None] = {}
+        self._pending_patterns: Dict[str, None] = {}
+        self._pending_versions: Dict[str, int] = {}
+        self._pending_clear = False
+        self._pending_event = asyncio.Event()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Callable[[InvalidationMessage], None]):
+        """Subscribe to the transport and start the batching loop"""
+        self.handler = handler
+        await self.transport.start(self._on_message)
+        self._flush_task = asyncio.create_task(self._flush_loop())
+
+    async def close(self):
+        """Publish anything pending and stop"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        await self.transport.close()
+
+    def invalidate_key(self, key: str):
+        """Queue invalidation of one key"""
+        self._pending_keys[key] = None
+        self._signal()
+
+    def invalidate_keys(self, keys: List[str]):
+        """Queue invalidation of several keys"""
+        self._pending_keys.update(dict.fromkeys(keys))
+        self._signal()
+
+    def invalidate_pattern(self, pattern: str):
+        """Queue invalidation of every key matching a glob pattern"""
+        self._pending_patterns[pattern] = None
+        self._signal()
+
+    def publish_version(self, namespace: str, version: int):
+        """Queue a namespace version bump"""
+        self._pending_versions[namespace] = max(
+            version, self._pending_versions.get(namespace, 0)
+        )
+        self._signal()
+
+    def invalidate_all(self):
+        """Queue a full L1 flush on every worker"""
+        self._pending_clear = True
+        self._signal()
+
+    @property
+    def pending_count(self) -> int:
+        """Invalidations waiting for the next flush"""
+        return (
+            len(self._pending_keys)
+            + len(self._pending_patterns)
+            + len(self._pending_versions)
+            + int(self._pending_clear)
+        )
+
+    async def flush(self):
+        """Publish pending invalidations in messages of at most max_batch_size"""
+        if not self.pending_count:
+            return
+
+        entries = [(key, False) for key in self._pending_keys]
+        entries.extend((pattern, True) for pattern in self._pending_patterns)
+        versions = dict(self._pending_versions)
+        clear_all = self._pending_clear
+        self._pending_keys = {}
+        self._pending_patterns = {}
+        self._pending_versions = {}
+        self._pending_clear = False
+
+        size = max(1, self.max_batch_size)
+        chunks = [
+            entries[start : start + size] for start in range(0, len(entries), size)
+        ] or [[]]
+        for index, chunk in enumerate(chunks):
+            # Version bumps and a full clear ride along with the first message
+            message = InvalidationMessage(
+                origin=self.node_id,
+                sent_at=time.time(),
+                keys=[name for name, is_pattern in chunk if not is_pattern],
+                patterns=[name for name, is_pattern in chunk if is_pattern],
+                versions=versions if index == 0 else {},
+                clear_all=clear_all and index == 0,
+                host=self.host_id,
+            )
+            count = len(chunk) + len(message.versions) + int(message.clear_all)
+            try:
+                await self.transport.publish(message.to_bytes())
+                self.metrics.published_batches += 1
+                self.metrics.published_invalidations += count
+            except Exception as e:
+                self.metrics.publish_errors += 1
+                logger.error(f"Failed to publish {count} cache invalidations: {e!s}")
+
+    def _signal(self):
+        self._pending_event.set()
+
+    async def _flush_loop(self):
+        while True:
+            await self._pending_event.wait()
+            self._pending_event.clear()
+
+            # Give concurrent writers a short window to join the batch
+            if self.pending_count < self.max_batch_size:
+                await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def _on_message(self, data: bytes):
+        try:
+            message = InvalidationMessage.from_bytes(data)
+        except Exception as e:
+            self.metrics.receive_errors += 1
+            logger.warning(f"Discarding malformed cache invalidation: {e!s}")
+            return
+
+        if message.origin == self.node_id:
+            return
+
+        self.metrics.received_batches += 1
+        self.propagation_lags.append(max(0.0, time.time() - message.sent_at))
+
+        try:
+            if self.handler:
+                self.handler(message)
+            self.metrics.applied_invalidations += (
+                len(message.keys)
+                + len(message.patterns)
+                + len(message.versions)
+                + int(message.clear_all)
+            )
+        except Exception as e:
+            self.metrics.receive_errors += 1
+            logger.error(f"Failed to apply cache invalidation batch: {e!s}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get bus statistics including propagation lag"""
+        lags_ms = sorted(lag * 1000 for lag in self.propagation_lags)
+        return {
+            "node_id": self.node_id,
+            "host_id": self.host_id,
+            "transport": type(self.transport).__name__,
+            "published_batches": self.metrics.published_batches,
+            "published_invalidations": self.metrics.published_invalidations,
+            "received_batches": self.metrics.received_batches,
+            "applied_invalidations": self.metrics.applied_invalidations,
+            "publish_errors": self.metrics.publish_errors,
+            "receive_errors": self.metrics.receive_errors,
+            "pending_invalidations": self.pending_count,
+            "propagation_lag_ms": {
+                "avg": sum(lags_ms) / len(lags_ms) if lags_ms else 0.0,
+                "p99": lags_ms[int((len(lags_ms) - 1) * 0.99)] if lags_ms else 0.0,
+                "max": lags_ms[-1] if lags_ms else 0.0,
+            },
+        }
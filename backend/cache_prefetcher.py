@@ -0,0 +1,439 @@
+"""Predictive Cache Prefetcher
+Learns from a bounded access log and refreshes likely-needed keys before demand
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from fnmatch import fnmatchcase
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+KeyLoader = Callable[[str], Awaitable[Any]]
+
+
+class BoundedCounter(OrderedDict):
+    """Counter that forgets the least recently touched keys beyond max_keys"""
+
+    def __init__(self, max_keys: int = 10000):
+        super().__init__()
+        self.max_keys = max_keys
+
+    def __missing__(self, key: str) -> int:
+        return 0
+
+    def __setitem__(self, key: str, value: int):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.max_keys:
+            self.popitem(last=False)
+
+
+class PrefetchSource:
+    """Why a key was prefetched"""
+
+    CO_OCCURRENCE = "co_occurrence"
+    TIME_OF_DAY = "time_of_day"
+    SCHEDULE = "schedule"
+
+
+@dataclass
+class ScheduledEvent:
+    """Upcoming event whose keys should be warm before it starts"""
+
+    event_id: str
+    starts_at: datetime
+    keys: List[str]
+    last_prefetched: Optional[float] = None
+
+
+@dataclass
+class KeyLoaderRule:
+    """Loader used to recompute keys matching a glob pattern"""
+
+    pattern: str
+    loader: KeyLoader
+    ttl: Optional[int] = None
+
+
+@dataclass
+class PrefetchMetrics:
+    """Prefetcher effectiveness metrics"""
+
+    accesses_recorded: int = 0
+    prefetches_issued: int = 0
+    prefetch_hits: int = 0
+    prefetches_wasted: int = 0
+    prefetch_errors: int = 0
+    skipped_over_budget: int = 0
+    skipped_already_cached: int = 0
+    cycles: int = 0
+    issued_by_source: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    hits_by_source: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class PredictivePrefetcher:
+    """Predict upcoming cache demand and load it ahead of time.
+
+    Three signals feed the predictions:
+
+    * co-occurrence: keys that followed an accessed key within
+      ``co_occurrence_window`` seconds in the past are queued right away;
+    * time of day: keys regularly requested in the upcoming time bucket;
+    * schedule: keys of events starting within ``schedule_lead_time``.
+
+    Keys with a registered loader are recomputed and written through the
+    cache; other keys are promoted from L2 into L1. Work per budget interval is
+    capped by ``max_redis_ops`` keys and ``cpu_budget_seconds`` of loader CPU.
+    """
+
+    def __init__(
+        self,
+        cache: Any,
+        history_size: int = 50000,
+        max_tracked_keys: int = 10000,
+        co_occurrence_window: float = 5.0,
+        max_followers: int = 16,
+        min_confidence: float = 0.3,
+        time_bucket_minutes: int = 15,
+        min_bucket_accesses: int = 3,
+        schedule_lead_time: int = 900,
+        prefetch_ttl: int = 900,
+        max_redis_ops: int = 500,
+        cpu_budget_seconds: float = 0.5,
+        budget_interval: float = 60.0,
+    ):
+        self.cache = cache
+        self.access_log: deque = deque(maxlen=history_size)
+        self.max_tracked_keys = max_tracked_keys
+        self.co_occurrence_window = co_occurrence_window
+        self.max_followers = max_followers
+        self.min_confidence = min_confidence
+        self.time_bucket_minutes = time_bucket_minutes
+        self.min_bucket_accesses = min_bucket_accesses
+        self.schedule_lead_time = schedule_lead_time
+        self.prefetch_ttl = prefetch_ttl
+        self.max_redis_ops = max_redis_ops
+        self.cpu_budget_seconds = cpu_budget_seconds
+        self.budget_interval = budget_interval
+
+        self.key_counts = BoundedCounter(max_tracked_keys)
+        self.followers: "OrderedDict[str, Dict[str, int]]" = OrderedDict()
+        self.time_buckets: "OrderedDict[str, Dict[int, int]]" = OrderedDict()
+        self.loaders: List[KeyLoaderRule] = []
+        self.events: Dict[str, ScheduledEvent] = {}
+        self.metrics = PrefetchMetrics()
+
+        self._recent: deque = deque(maxlen=8)  # (timestamp, key) for co-occurrence
+        self._queue: "OrderedDict[str, str]" = OrderedDict()  # key -> source
+        self._prefetched: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._budget_started = time.time()
+        self._redis_ops_used = 0
+        self._cpu_used = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._drain_task: Optional[asyncio.Task] = None
+
+    def register_loader(
+        self, pattern: str, loader: KeyLoader, ttl: Optional[int] = None
+    ):
+        """Recompute keys matching pattern with loader when prefetching them"""
+        self.loaders.append(KeyLoaderRule(pattern=pattern, loader=loader, ttl=ttl))
+
+    def schedule_event(self, event_id: str, starts_at: datetime, keys: List[str]):
+        """Warm keys for an event shortly before it starts (e.g. tip-off)"""
+        current = self.events.get(event_id)
+        if current and current.starts_at == starts_at and current.keys == keys:
+            return  # Re-announced by every odds snapshot; keep its refresh time
+        self.events[event_id] = ScheduledEvent(
+            event_id=event_id, starts_at=starts_at, keys=list(keys)
+        )
+
+    def unschedule_event(self, event_id: str):
+        """Stop warming keys for an event"""
+        self.events.pop(event_id, None)
+
+    def record_access(self, key: str):
+        """Feed one cache request (hit or miss) into the model"""
+        now = time.time()
+        self.metrics.accesses_recorded += 1
+        self.access_log.append((now, key))
+        self.key_counts[key] += 1
+
+        prefetched = self._prefetched.pop(key, None)
+        if prefetched is not None and now - prefetched[0] <= self.prefetch_ttl:
+            self.metrics.prefetch_hits += 1
+            self.metrics.hits_by_source[prefetched[1]] += 1
+
+        self._record_time_bucket(key, now)
+        self._record_co_occurrence(key, now)
+        self._recent.append((now, key))
+        self._queue.pop(key, None)
+
+        queued = False
+        for follower, _ in self.predict_followers(key):
+            if follower not in self._queue:
+                self._queue[follower] = PrefetchSource.CO_OCCURRENCE
+                queued = True
+        if queued:
+            self._schedule_drain()
+
+    def predict_followers(self, key: str) -> List[Tuple[str, float]]:
+        """Keys likely to be requested soon after key, with confidence"""
+        followers = self.followers.get(key)
+        total = self.key_counts.get(key, 0)
+        if not followers or not total:
+            return []
+
+        predictions = [
+            (follower, count / total)
+            for follower, count in followers.items()
+            if count / total >= self.min_confidence
+        ]
+        predictions.sort(key=lambda item: item[1], reverse=True)
+        return predictions
+
+    def predict_time_of_day(self, now: Optional[datetime] = None) -> List[str]:
+        """Keys regularly requested in the upcoming time bucket"""
+        upcoming = self._bucket_of(
+            (now or datetime.utcnow()) + timedelta(minutes=self.time_bucket_minutes)
+        )
+        scored = [
+            (buckets[upcoming], key)
+            for key, buckets in self.time_buckets.items()
+            if buckets.get(upcoming, 0) >= self.min_bucket_accesses
+        ]
+        scored.sort(reverse=True)
+        return [key for _, key in scored]
+
+    def predict_scheduled(self, now: Optional[datetime] = None) -> List[str]:
+        """Keys of events starting within the lead time that are not yet warmed"""
+        now = now or datetime.utcnow()
+        keys = []
+        for event_id, event in list(self.events.items()):
+            seconds_to_start = (event.starts_at - now).total_seconds()
+            if seconds_to_start < 0:
+                del self.events[event_id]
+            elif seconds_to_start <= self.schedule_lead_time and (
+                event.last_prefetched is None
+                or time.time() - event.last_prefetched >= self.prefetch_ttl
+            ):
+                event.last_prefetched = time.time()
+                keys.extend(event.keys)
+        return keys
+
+    async def run_cycle(self, now: Optional[datetime] = None) -> int:
+        """Prefetch predicted keys within the budget; returns keys prefetched"""
+        self.metrics.cycles += 1
+        self._expire_prefetched()
+
+        for key in self.predict_scheduled(now):
+            self._queue[key] = PrefetchSource.SCHEDULE
+            self._queue.move_to_end(key, last=False)  # Schedule goes first
+        for key in self.predict_time_of_day(now):
+            self._queue.setdefault(key, PrefetchSource.TIME_OF_DAY)
+
+        return await self.drain()
+
+    async def drain(self) -> int:
+        """Execute queued prefetches until the queue or the budget is exhausted"""
+        self._reset_budget_if_due()
+        promote: List[Tuple[str, str]] = []
+        issued = 0
+
+        while self._queue:
+            if self._redis_ops_used >= self.max_redis_ops:
+                self.metrics.skipped_over_budget += len(self._queue)
+                self._queue.clear()
+                break
+
+            key, source = self._queue.popitem(last=False)
+            rule = self._loader_for(key)
+
+            if rule is None:
+                if self._in_l1(key):
+                    self.metrics.skipped_already_cached += 1
+                    continue
+                promote.append((key, source))
+                self._redis_ops_used += 1
+                continue
+
+            if source != PrefetchSource.SCHEDULE and self._in_l1(key):
+                self.metrics.skipped_already_cached += 1
+                continue
+            if self._cpu_used >= self.cpu_budget_seconds:
+                self.metrics.skipped_over_budget += 1
+                continue
+
+            if await self._load(key, source, rule):
+                issued += 1
+
+        if promote:
+            issued += await self._promote(promote)
+
+        return issued
+
+    async def start(self, interval: float = 60.0):
+        """Run prediction cycles in the background"""
+
+        async def prefetch_loop():
+            while True:
+                try:
+                    await asyncio.sleep(interval)
+                    await self.run_cycle()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Predictive prefetch cycle failed: {e!s}")
+
+        if self._task is None:
+            self._task = asyncio.create_task(prefetch_loop())
+            logger.info(f"Predictive cache prefetcher running every {interval}s")
+
+    async def stop(self):
+        """Stop the background loop"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch effectiveness statistics"""
+        settled = self.metrics.prefetch_hits + self.metrics.prefetches_wasted
+        return {
+            "accesses_recorded": self.metrics.accesses_recorded,
+            "access_log_size": len(self.access_log),
+            "tracked_keys": len(self.key_counts),
+            "scheduled_events": len(self.events),
+            "prefetches_issued": self.metrics.prefetches_issued,
+            "prefetch_hits": self.metrics.prefetch_hits,
+            "prefetches_wasted": self.metrics.prefetches_wasted,
+            "prefetches_pending_outcome": len(self._prefetched),
+            "prefetch_hit_rate": (
+                (self.metrics.prefetch_hits / settled * 100) if settled > 0 else 0
+            ),
+            "prefetch_errors": self.metrics.prefetch_errors,
+            "skipped_over_budget": self.metrics.skipped_over_budget,
+            "skipped_already_cached": self.metrics.skipped_already_cached,
+            "issued_by_source": dict(self.metrics.issued_by_source),
+            "hits_by_source": dict(self.metrics.hits_by_source),
+            "budget": {
+                "redis_ops_used": self._redis_ops_used,
+                "max_redis_ops": self.max_redis_ops,
+                "cpu_seconds_used": self._cpu_used,
+                "cpu_budget_seconds": self.cpu_budget_seconds,
+                "interval_seconds": self.budget_interval,
+            },
+            "cycles": self.metrics.cycles,
+        }
+
+    def _schedule_drain(self):
+        """Drain co-occurrence predictions right away, without waiting for a cycle"""
+        if self._drain_task is not None and not self._drain_task.done():
+            return
+        try:
+            self._drain_task = asyncio.get_running_loop().create_task(self.drain())
+        except RuntimeError:
+            pass  # No running loop; the next cycle drains the queue
+
+    def _record_co_occurrence(self, key: str, now: float):
+        seen = set()
+        for timestamp, previous in reversed(self._recent):
+            if now - timestamp > self.co_occurrence_window:
+                break
+            if previous == key or previous in seen:
+                continue
+            seen.add(previous)
+
+            followers = self.followers.get(previous)
+            if followers is None:
+                followers = self.followers[previous] = {}
+                if len(self.followers) > self.max_tracked_keys:
+                    self.followers.popitem(last=False)
+            else:
+                self.followers.move_to_end(previous)
+
+            followers[key] = followers.get(key, 0) + 1
+            if len(followers) > self.max_followers * 2:
+                ranked = sorted(
+                    followers.items(), key=lambda item: item[1], reverse=True
+                )
+                self.followers[previous] = dict(ranked[: self.max_followers])
+
+    def _record_time_bucket(self, key: str, now: float):
+        buckets = self.time_buckets.get(key)
+        if buckets is None:
+            buckets = self.time_buckets[key] = {}
+            if len(self.time_buckets) > self.max_tracked_keys:
+                self.time_buckets.popitem(last=False)
+        else:
+            self.time_buckets.move_to_end(key)
+
+        bucket = self._bucket_of(datetime.utcfromtimestamp(now))
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    def _bucket_of(self, moment: datetime) -> int:
+        return (moment.hour * 60 + moment.minute) // self.time_bucket_minutes
+
+    def _loader_for(self, key: str) -> Optional[KeyLoaderRule]:
+        for rule in self.loaders:
+            if fnmatchcase(key, rule.pattern):
+                return rule
+        return None
+
+    def _in_l1(self, key: str) -> bool:
+        entry = self.cache.l1_cache.cache.get(key)
+        return entry is not None and not entry.is_expired
+
+    async def _load(self, key: str, source: str, rule: KeyLoaderRule) -> bool:
+        cpu_started = time.process_time()
+        try:
+            value = await rule.loader(key)
+            if value is None:
+                return False
+            await self.cache.set(key, value, ttl=rule.ttl)
+            self._redis_ops_used += 1
+            self._mark_prefetched(key, source)
+            return True
+        except Exception as e:
+            self.metrics.prefetch_errors += 1
+            logger.warning(f"Prefetch loader failed for key {key}: {e!s}")
+            return False
+        finally:
+            self._cpu_used += time.process_time() - cpu_started
+
+    async def _promote(self, candidates: List[Tuple[str, str]]) -> int:
+        sources = dict(candidates)
+        try:
+            promoted = await self.cache.prefetch_into_l1(list(sources))
+        except Exception as e:
+            self.metrics.prefetch_errors += 1
+            logger.warning(f"Prefetch promotion of {len(sources)} keys failed: {e!s}")
+            return 0
+
+        for key in promoted:
+            self._mark_prefetched(key, sources[key])
+        return len(promoted)
+
+    def _mark_prefetched(self, key: str, source: str):
+        self.metrics.prefetches_issued += 1
+        self.metrics.issued_by_source[source] += 1
+        self._prefetched[key] = (time.time(), source)
+        self._prefetched.move_to_end(key)
+
+    def _expire_prefetched(self):
+        cutoff = time.time() - self.prefetch_ttl
+        while self._prefetched:
+            key, (prefetched_at, _) = next(iter(self._prefetched.items()))
+            if prefetched_at > cutoff:
+                break
+            del self._prefetched[key]
+            self.metrics.prefetches_wasted += 1
+
+    def _reset_budget_if_due(self):
+        if time.time() - self._budget_started >= self.budget_interval:
+            self._budget_started = time.time()
+            self._redis_ops_used = 0
+            self._cpu_used = 0.0
@@ -49,6 +49,62 @@ class BackendConfig(BaseSettings):
     # Caching
     cache_ttl: int = 3600
     cache_max_size: int = 1000
+    cache_invalidation_enabled: bool = True
+    cache_invalidation_transport: str = "redis"  # 'redis' or 'unix' (single host)
+    cache_invalidation_socket_dir: str = "/tmp/a1betting-cache-bus"
+    cache_invalidation_flush_ms: int = 10
+    cache_l0_enabled: bool = True  # Shared-memory tier for all workers on a host
+    cache_l0_dir: Optional[str] = None  # Defaults to /dev/shm
+    cache_l0_slots: int = 8192
+    cache_l0_slot_bytes: int = 2048
+    cache_l0_prediction_slot_bytes: int = 8192  # Ensemble records carry feature maps
+
+    # Arbitrage Scanning
+    arbitrage_sharded_scan: bool = False  # Full-market scans on a process pool
+    arbitrage_shard_min_quotes: int = 20000  # Smaller scans stay in-process
+    arbitrage_scan_workers: int = 0  # 0 = one per CPU
+    arbitrage_scan_deadline_seconds: float = 10.0
+
+    # Odds Snapshots
+    odds_snapshot_sports: Dict[str, float] = {"soccer_epl": 60.0}  # sport -> seconds
+    odds_snapshot_regions: str = "eu"
+    odds_snapshot_markets: List[str] = ["h2h"]
+    odds_snapshot_timeout: float = 5.0
+
+    # Real-time Streams
+    stream_subscriber_queue_size: int = 256  # Pending messages per subscriber
+    stream_slow_consumer_policy: str = "drop_oldest"  # or 'coalesce', 'disconnect'
+    stream_lane_weights: Dict[str, int] = {  # Messages per lane per drain round
+        "critical": 8,
+        "high": 4,
+        "medium": 2,
+        "low": 1,
+    }
+    stream_lane_size: int = 10000
+    stream_batch_size: int = 64
+    stream_critical_bypass_aggregation: bool = True
+    stream_transport: str = "pubsub"  # or 'streams' for consumer-group partitions
+    stream_partitions: int = 16
+    stream_consumer_name: Optional[str] = None  # Stable per node; default hostname
+    stream_maxlen: int = 100000  # Approximate entries kept per partition
+    stream_claim_idle_ms: int = 30000  # Pending this long = consumer presumed dead
+    stream_broadcast_channel: str = "stream:broadcast"  # Owners' output to all nodes
+    stream_delta_streams: List[str] = ["betting_odds", "predictions"]
+    stream_delta_resync_every: int = 100  # Updates per key between snapshots
+    stream_delta_max_keys: int = 50000
+    prediction_trigger_window: float = 0.1  # Seconds triggers coalesce per event
+    prediction_batch_size: int = 32
+    prediction_max_in_flight: int = 4  # Concurrent prediction batches
+
+    # WebSocket Rooms
+    ws_send_timeout: float = 2.0  # Per-connection send bound before eviction
+    ws_max_topics_per_connection: int = 100
+
+    # Background Tasks
+    task_lease_seconds: int = 3600  # Unfinished claims return to their queue after
+    task_idle_wait: float = 5.0  # Longest block on an empty queue
+    task_batch_max_size: int = 32  # Batchable tasks run per call
+    task_batch_max_wait: float = 0.05  # Seconds a short batch waits to fill
 
     # ML Model Settings
     model_path: str = "./models"
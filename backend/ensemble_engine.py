@@ -3,9 +3,11 @@ Intelligent model selection, dynamic weighting, and meta-learning for optimal pr
 """
 
 import asyncio
+import json
 import logging
 import math
 import os
+import struct
 import time
 from collections import defaultdict, deque
 from concurrent.futures import ThreadPoolExecutor
@@ -17,11 +19,13 @@ from typing import Any, Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
+from cache_codec import default_codec
 from cachetools import TTLCache
 from config import config_manager
 from database import db_manager
 from feature_engineering import FeatureEngineering
 from prometheus_client import Counter, Histogram
+from shared_result_cache import SharedResultCache, default_shared_cache_path
 from sklearn.ensemble import RandomForestRegressor
 from utils.prediction_utils import (
     calculate_confidence,
@@ -150,6 +154,122 @@ class EnsembleConfiguration:
     half_life_hours: float = 72.0  # for exponential decay in recency weight
 
 
+# Shared-memory prediction record: the numeric fields at fixed offsets, then a
+# compact JSON tail (names and per-feature maps) whose length is the last field
+_PREDICTION_RECORD = struct.Struct("<7dI")
+
+# Metadata that is rebuilt from the engine's own settings rather than shared
+_UNSHARED_METADATA = frozenset({"ensemble_config"})
+
+
+def _json_scalar(value: Any) -> Any:
+    """Convert the numpy values found in feature maps to plain JSON types"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not shareable")
+
+
+class SharedPredictionCache:
+    """Ensemble results shared by every worker on the host, without pickling"""
+
+    def __init__(self, table: SharedResultCache):
+        self.table = table
+
+    @staticmethod
+    def pack(output: PredictionOutput) -> bytes:
+        """Encode a prediction into the fixed record layout"""
+        tail = json.dumps(
+            {
+                "n": output.model_name,
+                "m": getattr(output.model_type, "value", output.model_type),
+                "c": getattr(
+                    output.prediction_context, "value", output.prediction_context
+                ),
+                "f": output.feature_importance,
+                "s": output.shap_values,
+                "u": output.uncertainty_metrics,
+                "md": {
+                    name: value
+                    for name, value in output.metadata.items()
+                    if name not in _UNSHARED_METADATA
+                },
+            },
+            separators=(",", ":"),
+            default=_json_scalar,
+        ).encode("utf-8")
+        return (
+            _PREDICTION_RECORD.pack(
+                output.predicted_value,
+                output.confidence_interval[0],
+                output.confidence_interval[1],
+                output.prediction_probability,
+                output.model_agreement,
+                output.processing_time,
+                output.timestamp.timestamp(),
+                len(tail),
+            )
+            + tail
+        )
+
+    @staticmethod
+    def unpack(data: bytes) -> PredictionOutput:
+        """Rebuild a prediction from its record"""
+        (
+            predicted_value,
+            ci_low,
+            ci_high,
+            probability,
+            agreement,
+            processing_time,
+            timestamp,
+            tail_len,
+        ) = _PREDICTION_RECORD.unpack_from(data)
+        tail = json.loads(
+            data[_PREDICTION_RECORD.size : _PREDICTION_RECORD.size + tail_len]
+        )
+        try:
+            model_type = ModelType(tail["m"])
+        except ValueError:
+            model_type = tail["m"]
+        return PredictionOutput(
+            model_name=tail["n"],
+            model_type=model_type,
+            predicted_value=predicted_value,
+            confidence_interval=(ci_low, ci_high),
+            prediction_probability=probability,
+            feature_importance=tail["f"],
+            shap_values=tail["s"],
+            uncertainty_metrics=tail["u"],
+            model_agreement=agreement,
+            prediction_context=PredictionContext(tail["c"]),
+            metadata=tail["md"],
+            processing_time=processing_time,
+            timestamp=datetime.fromtimestamp(timestamp, timezone.utc),
+        )
+
+    def get(self, key: str) -> Optional[PredictionOutput]:
+        """Get a cached prediction written by any local worker"""
+        data = self.table.get(key)
+        if data is None:
+            return None
+        try:
+            return self.unpack(data)
+        except (struct.error, ValueError, KeyError) as e:
+            logger.warning(f"Dropping corrupt shared prediction {key}: {e!s}")
+            self.table.delete(key)
+            return None
+
+    def set(self, key: str, output: PredictionOutput, ttl: Optional[int]) -> bool:
+        """Share a prediction with the other local workers"""
+        try:
+            return self.table.set(key, self.pack(output), ttl)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Prediction {key} not shareable: {e!s}")
+            return False
+
+
 class ModelRegistry:
     """Advanced model registry with version control and metadata"""
 
@@ -836,6 +956,7 @@ class UltraAdvancedEnsembleEngine:
         # TTL cache for ensemble predictions
         ttl_seconds = config_manager.get("prediction_cache_ttl_seconds", 300)
         self.prediction_result_cache = TTLCache(maxsize=1000, ttl=ttl_seconds)
+        self.shared_results: Optional[SharedPredictionCache] = None
         # Limit concurrent predictions
         self._predict_semaphore = asyncio.Semaphore(
             config_manager.get("max_concurrent_predictions", 10)
@@ -890,6 +1011,7 @@ class UltraAdvancedEnsembleEngine:
                 )
             else:
                 self.redis_client = None
+            self._setup_shared_results()
 
             # Start background tasks based on config toggles
             if self.rebalancing_enabled:
@@ -905,6 +1027,22 @@ class UltraAdvancedEnsembleEngine:
             logger.error(f"Ensemble engine initialization failed: {e!s}")
             raise
 
+    def _setup_shared_results(self):
+        """Open the host-wide shared-memory prediction table"""
+        settings = config_manager.config
+        if not getattr(settings, "cache_l0_enabled", False):
+            return
+        try:
+            self.shared_results = SharedPredictionCache(
+                SharedResultCache(
+                    default_shared_cache_path("predictions", settings.cache_l0_dir),
+                    slot_count=settings.cache_l0_slots,
+                    slot_size=settings.cache_l0_prediction_slot_bytes,
+                )
+            )
+        except Exception as e:
+            logger.error(f"Shared prediction cache unavailable: {e!s}")
+
     async def predict(
         self,
         features: Dict[str, float],
@@ -926,11 +1064,20 @@ class UltraAdvancedEnsembleEngine:
                     processed = engineered.get("features", features)
                     # Cache lookup
                     key = self._make_cache_key(processed, context, config)
-                    # Try Redis cache first
+                    ttl = config_manager.get("prediction_cache_ttl_seconds", 300)
+                    # Shared-memory results from any worker on this host
+                    if self.shared_results:
+                        shared = self.shared_results.get(key)
+                        if shared is not None:
+                            return shared
+                    # Then Redis
                     if self.redis_client:
                         cached = await self.redis_client.get(key)
                         if cached:
-                            return pickle.loads(cached)
+                            output = default_codec.decode(cached)
+                            if self.shared_results:
+                                self.shared_results.set(key, output, ttl)
+                            return output
                     # Fallback to local cache
                     if self.cache_enabled and key in self.prediction_result_cache:
                         return self.prediction_result_cache[key]
@@ -981,9 +1128,10 @@ class UltraAdvancedEnsembleEngine:
                         timestamp=datetime.now(timezone.utc),
                     )
                     # Store in cache and history
-                    data = pickle.dumps(output)
+                    if self.shared_results:
+                        self.shared_results.set(key, output, ttl)
                     if self.redis_client:
-                        ttl = config_manager.get("prediction_cache_ttl_seconds", 300)
+                        data = default_codec.encode(output, key).data
                         await self.redis_client.set(key, data, ex=ttl)
                     if self.cache_enabled:
                         self.prediction_result_cache[key] = output
@@ -1006,6 +1154,16 @@ class UltraAdvancedEnsembleEngine:
             logger.error(f"Ensemble prediction failed: {e}")
             raise
 
+    async def predict_many(
+        self, requests: List[Tuple[Dict[str, float], PredictionContext]]
+    ) -> List[Any]:
+        """Predict (features, context) pairs together; failures are returned"""
+        # Concurrency stays bounded by the predict semaphore
+        return await asyncio.gather(
+            *(self.predict(features, context) for features, context in requests),
+            return_exceptions=True,
+        )
+
     async def _periodic_rebalancing(self):
         """Background task: periodically rebalance ensemble based on new metrics"""
         interval = self.default_config.rebalance_frequency * 3600
@@ -1388,6 +1546,15 @@ class UltraEnsembleEngine:
         }
         return prediction
 
+    async def predict_many(
+        self, requests: List[Tuple[Dict[str, Any], str]]
+    ) -> List[Any]:
+        """Predict (features, context) pairs together; failures are returned"""
+        return await asyncio.gather(
+            *(self.predict(features, context) for features, context in requests),
+            return_exceptions=True,
+        )
+
 
 # Instantiate the engine
 ultra_ensemble_engine = UltraEnsembleEngine()
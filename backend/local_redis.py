@@ -0,0 +1,872 @@
+"""Local Redis Stand-In
+In-process replacement for the redis.asyncio client used by benchmarks and tests
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from fnmatch import fnmatchcase
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+
+try:
+    from redis.exceptions import ResponseError
+except ImportError:
+
+    class ResponseError(Exception):
+        """Error reply from the server"""
+
+
+KeyT = Union[str, bytes]
+StreamId = Tuple[int, int]
+
+
+def _to_key(name: KeyT) -> str:
+    return name.decode("utf-8") if isinstance(name, bytes) else str(name)
+
+
+def _to_bytes(value: Any) -> bytes:
+    """Encode a value the way redis-py does before sending it"""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, (bytearray, memoryview)):
+        return bytes(value)
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    if isinstance(value, (int, float)):
+        return repr(value).encode("utf-8")
+    raise TypeError(f"Invalid input of type {type(value).__name__}")
+
+
+def _parse_id(value: Any, default_seq: int = 0) -> StreamId:
+    text = _to_key(value)
+    if text == "-":
+        return (0, 0)
+    if text == "+":
+        return (2**64 - 1, 2**64 - 1)
+    ms, _, seq = text.partition("-")
+    return (int(ms), int(seq) if seq else default_seq)
+
+
+def _format_id(stream_id: StreamId) -> bytes:
+    return f"{stream_id[0]}-{stream_id[1]}".encode("utf-8")
+
+
+class _Stream:
+    """Entries in id order plus their consumer groups"""
+
+    def __init__(self):
+        self.entries: Dict[StreamId, Dict[bytes, bytes]] = {}
+        self.last_id: StreamId = (0, 0)
+        self.groups: Dict[str, "_Group"] = {}
+
+
+class _Group:
+    def __init__(self, last_delivered: StreamId):
+        self.last_delivered = last_delivered
+        # id -> [consumer, monotonic delivery time, delivery count]
+        self.pending: Dict[StreamId, List[Any]] = {}
+
+
+class LocalRedis:
+    """Single-process Redis stand-in speaking the redis.asyncio API.
+
+    Commands behave like Redis with ``decode_responses=False``: values come
+    back as bytes and expired keys disappear lazily. Every command (or
+    pipeline ``execute``) counts as one round trip and can be delayed by
+    ``latency_ms`` to model the network hop to a real server.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.round_trips = 0
+        self.commands = 0
+        self.started_at = time.time()
+        self._data: Dict[str, bytes] = {}
+        self._expires: Dict[str, float] = {}  # Monotonic deadlines
+        self._streams: Dict[str, _Stream] = {}
+        self._stream_added = asyncio.Event()
+        self._zsets: Dict[str, Dict[bytes, float]] = {}
+        self._lists: Dict[str, Deque[bytes]] = {}
+        self._hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self._list_pushed = asyncio.Event()
+        self._channels: Dict[str, List["LocalPubSub"]] = {}
+
+    @classmethod
+    def from_url(cls, url: str = "", **kwargs) -> "LocalRedis":
+        """Mirror redis.asyncio.from_url; the URL is ignored"""
+        return cls(latency_ms=kwargs.get("latency_ms", 0.0))
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        # Always yield, as a real socket read would
+        await asyncio.sleep(self.latency)
+
+    async def _execute(self, command: str, *args, **kwargs) -> Any:
+        await self._round_trip()
+        return self._dispatch(command, args, kwargs)
+
+    def _dispatch(self, command: str, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+        self.commands += 1
+        return getattr(self, f"_cmd_{command}")(*args, **kwargs)
+
+    def pubsub(self) -> "LocalPubSub":
+        """Channel subscriber, as redis.asyncio's ``client.pubsub()``"""
+        return LocalPubSub(self)
+
+    def pipeline(self, transaction: bool = True) -> "LocalPipeline":
+        """Queue commands and send them in one round trip"""
+        return LocalPipeline(self)
+
+    def register_script(self, script: str) -> "LocalScript":
+        """Script object, as redis.asyncio's ``client.register_script()``"""
+        return LocalScript(self, script)
+
+    def __getattr__(self, name: str):
+        # Expose every _cmd_<name> as an awaitable client method
+        if name.startswith("_") or not hasattr(type(self), f"_cmd_{name}"):
+            raise AttributeError(name)
+
+        async def command(*args, **kwargs):
+            return await self._execute(name, *args, **kwargs)
+
+        return command
+
+    async def xreadgroup(
+        self,
+        groupname: str,
+        consumername: str,
+        streams: Dict[KeyT, Any],
+        count: Optional[int] = None,
+        block: Optional[int] = None,
+        noack: bool = False,
+    ) -> List:
+        """XREADGROUP; ``block`` waits up to that many ms (0 = forever) for entries"""
+        deadline = None if not block else time.monotonic() + block / 1000
+        while True:
+            await self._round_trip()
+            self._stream_added.clear()
+            reply = self._dispatch(
+                "xreadgroup",
+                (groupname, consumername, streams),
+                {"count": count, "noack": noack},
+            )
+            if reply or block is None:
+                return reply
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return reply
+            try:
+                await asyncio.wait_for(self._stream_added.wait(), remaining)
+            except asyncio.TimeoutError:
+                return reply
+
+    async def blpop(
+        self, keys: Union[KeyT, List[KeyT]], timeout: Optional[float] = 0
+    ) -> Optional[Tuple[bytes, bytes]]:
+        """BLPOP; waits up to ``timeout`` seconds (0 = forever) for a push"""
+        names = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        deadline = None if not timeout else time.monotonic() + timeout
+        while True:
+            await self._round_trip()
+            self._list_pushed.clear()
+            self.commands += 1
+            for name in names:
+                value = self._cmd_lpop(name)
+                if value is not None:
+                    return _to_bytes(name), value
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                await asyncio.wait_for(self._list_pushed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return None
+
+    async def close(self):
+        """Nothing to release; kept for API compatibility"""
+
+    async def aclose(self):
+        """Nothing to release; kept for API compatibility"""
+
+    # Keyspace helpers
+
+    def _alive(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            del self._expires[key]
+            return False
+        return key in self._data
+
+    def _set_expiry(self, key: str, seconds: Optional[float]):
+        if seconds is None:
+            self._expires.pop(key, None)
+        else:
+            self._expires[key] = time.monotonic() + seconds
+
+    # Commands
+
+    def _cmd_ping(self) -> bool:
+        return True
+
+    def _cmd_get(self, name: KeyT) -> Optional[bytes]:
+        key = _to_key(name)
+        return self._data[key] if self._alive(key) else None
+
+    def _cmd_mget(self, keys: Union[KeyT, List[KeyT]], *args: KeyT) -> List:
+        names = [keys] if isinstance(keys, (str, bytes)) else list(keys)
+        names.extend(args)
+        return [self._cmd_get(name) for name in names]
+
+    def _cmd_set(
+        self,
+        name: KeyT,
+        value: Any,
+        ex: Optional[float] = None,
+        px: Optional[float] = None,
+        nx: bool = False,
+        xx: bool = False,
+    ) -> Optional[bool]:
+        key = _to_key(name)
+        exists = self._alive(key)
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._data[key] = _to_bytes(value)
+        if px is not None:
+            ex = px / 1000
+        self._set_expiry(key, ex)
+        return True
+
+    def _cmd_setex(self, name: KeyT, time_seconds: float, value: Any) -> bool:
+        return self._cmd_set(name, value, ex=time_seconds)
+
+    def _collections(self) -> Tuple[Dict[str, Any], ...]:
+        """Stores of the non-string key types"""
+        return self._streams, self._zsets, self._lists, self._hashes
+
+    def _cmd_delete(self, *names: KeyT) -> int:
+        deleted = 0
+        for name in names:
+            key = _to_key(name)
+            if any(store.pop(key, None) is not None for store in self._collections()):
+                deleted += 1
+            elif self._alive(key):
+                del self._data[key]
+                self._expires.pop(key, None)
+                deleted += 1
+        return deleted
+
+    def _cmd_exists(self, *names: KeyT) -> int:
+        return sum(
+            1
+            for name in names
+            if any(_to_key(name) in store for store in self._collections())
+            or self._alive(_to_key(name))
+        )
+
+    def _cmd_expire(self, name: KeyT, time_seconds: float) -> bool:
+        key = _to_key(name)
+        if not self._alive(key):
+            return False
+        self._set_expiry(key, time_seconds)
+        return True
+
+    def _cmd_pttl(self, name: KeyT) -> int:
+        key = _to_key(name)
+        if not self._alive(key):
+            return -2
+        deadline = self._expires.get(key)
+        if deadline is None:
+            return -1
+        return max(0, int((deadline - time.monotonic()) * 1000))
+
+    def _cmd_ttl(self, name: KeyT) -> int:
+        pttl = self._cmd_pttl(name)
+        return pttl if pttl < 0 else math.ceil(pttl / 1000)
+
+    def _cmd_incrby(self, name: KeyT, amount: int = 1) -> int:
+        key = _to_key(name)
+        value = int(self._data[key]) + amount if self._alive(key) else amount
+        self._data[key] = str(value).encode("utf-8")
+        return value
+
+    def _cmd_incr(self, name: KeyT, amount: int = 1) -> int:
+        return self._cmd_incrby(name, amount)
+
+    def _cmd_keys(self, pattern: KeyT = "*") -> List[bytes]:
+        pattern = _to_key(pattern)
+        live = [key for key in list(self._data) if self._alive(key)]
+        return [
+            key.encode("utf-8")
+            for key in live + [key for store in self._collections() for key in store]
+            if fnmatchcase(key, pattern)
+        ]
+
+    def _cmd_dbsize(self) -> int:
+        live = sum(1 for key in list(self._data) if self._alive(key))
+        return live + sum(len(store) for store in self._collections())
+
+    def _cmd_flushdb(self) -> bool:
+        self._data.clear()
+        self._expires.clear()
+        for store in self._collections():
+            store.clear()
+        return True
+
+    # Streams
+
+    def _group(self, name: KeyT, groupname: Any) -> Tuple[_Stream, _Group]:
+        stream = self._streams.get(_to_key(name))
+        group = stream.groups.get(_to_key(groupname)) if stream else None
+        if group is None:
+            raise ResponseError(
+                f"NOGROUP No such key '{_to_key(name)}' or consumer group "
+                f"'{_to_key(groupname)}'"
+            )
+        return stream, group
+
+    def _cmd_xadd(
+        self,
+        name: KeyT,
+        fields: Dict[Any, Any],
+        id: Any = "*",
+        maxlen: Optional[int] = None,
+        approximate: bool = True,
+        nomkstream: bool = False,
+    ) -> Optional[bytes]:
+        key = _to_key(name)
+        stream = self._streams.get(key)
+        if stream is None:
+            if nomkstream:
+                return None
+            stream = self._streams[key] = _Stream()
+
+        if _to_key(id) == "*":
+            ms = int(time.time() * 1000)
+            last_ms, last_seq = stream.last_id
+            entry_id = (last_ms, last_seq + 1) if ms <= last_ms else (ms, 0)
+        else:
+            entry_id = _parse_id(id)
+            if entry_id <= stream.last_id:
+                raise ResponseError(
+                    "ERR The ID specified in XADD is equal or smaller than the "
+                    "target stream top item"
+                )
+        stream.entries[entry_id] = {
+            _to_bytes(field): _to_bytes(value) for field, value in fields.items()
+        }
+        stream.last_id = entry_id
+        if maxlen is not None:
+            while len(stream.entries) > maxlen:
+                del stream.entries[next(iter(stream.entries))]
+        self._stream_added.set()
+        return _format_id(entry_id)
+
+    def _cmd_xlen(self, name: KeyT) -> int:
+        stream = self._streams.get(_to_key(name))
+        return len(stream.entries) if stream else 0
+
+    def _cmd_xrange(
+        self, name: KeyT, min: Any = "-", max: Any = "+", count: Optional[int] = None
+    ) -> List[Tuple[bytes, Dict[bytes, bytes]]]:
+        stream = self._streams.get(_to_key(name))
+        if stream is None:
+            return []
+        low, high = _parse_id(min), _parse_id(max, default_seq=2**64 - 1)
+        found = [
+            (_format_id(entry_id), dict(fields))
+            for entry_id, fields in stream.entries.items()
+            if low <= entry_id <= high
+        ]
+        return found if count is None else found[:count]
+
+    def _cmd_xgroup_create(
+        self, name: KeyT, groupname: Any, id: Any = "$", mkstream: bool = False
+    ) -> bool:
+        key = _to_key(name)
+        stream = self._streams.get(key)
+        if stream is None:
+            if not mkstream:
+                raise ResponseError(
+                    "ERR The XGROUP subcommand requires the key to exist"
+                )
+            stream = self._streams[key] = _Stream()
+        if _to_key(groupname) in stream.groups:
+            raise ResponseError("BUSYGROUP Consumer Group name already exists")
+        start = stream.last_id if _to_key(id) == "$" else _parse_id(id)
+        stream.groups[_to_key(groupname)] = _Group(start)
+        return True
+
+    def _cmd_xreadgroup(
+        self,
+        groupname: Any,
+        consumername: Any,
+        streams: Dict[KeyT, Any],
+        count: Optional[int] = None,
+        block: Optional[int] = None,
+        noack: bool = False,
+    ) -> List:
+        consumer = _to_key(consumername)
+        now = time.monotonic()
+        reply = []
+        for name, last_id in streams.items():
+            stream, group = self._group(name, groupname)
+            entries = []
+            if _to_key(last_id) == ">":
+                for entry_id, fields in stream.entries.items():
+                    if count is not None and len(entries) >= count:
+                        break
+                    if entry_id <= group.last_delivered:
+                        continue
+                    group.last_delivered = entry_id
+                    if not noack:
+                        group.pending[entry_id] = [consumer, now, 1]
+                    entries.append((_format_id(entry_id), dict(fields)))
+                if entries:
+                    reply.append([_to_key(name).encode("utf-8"), entries])
+            else:
+                # History: this consumer's pending entries after last_id
+                after = _parse_id(last_id)
+                for entry_id in sorted(group.pending):
+                    if count is not None and len(entries) >= count:
+                        break
+                    pending = group.pending[entry_id]
+                    if entry_id <= after or pending[0] != consumer:
+                        continue
+                    pending[1], pending[2] = now, pending[2] + 1
+                    fields = stream.entries.get(entry_id)
+                    entries.append(
+                        (_format_id(entry_id), dict(fields) if fields else None)
+                    )
+                reply.append([_to_key(name).encode("utf-8"), entries])
+        return reply
+
+    def _cmd_xack(self, name: KeyT, groupname: Any, *ids: Any) -> int:
+        stream = self._streams.get(_to_key(name))
+        group = stream.groups.get(_to_key(groupname)) if stream else None
+        if group is None:
+            return 0
+        return sum(
+            1 for entry_id in ids if group.pending.pop(_parse_id(entry_id), None)
+        )
+
+    def _cmd_xpending_range(
+        self,
+        name: KeyT,
+        groupname: Any,
+        min: Any,
+        max: Any,
+        count: int,
+        consumername: Any = None,
+        idle: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        _, group = self._group(name, groupname)
+        low, high = _parse_id(min), _parse_id(max, default_seq=2**64 - 1)
+        now = time.monotonic()
+        found = []
+        for entry_id in sorted(group.pending):
+            consumer, delivered_at, times = group.pending[entry_id]
+            idle_ms = int((now - delivered_at) * 1000)
+            if not low <= entry_id <= high:
+                continue
+            if consumername is not None and consumer != _to_key(consumername):
+                continue
+            if idle is not None and idle_ms < idle:
+                continue
+            found.append(
+                {
+                    "message_id": _format_id(entry_id),
+                    "consumer": consumer.encode("utf-8"),
+                    "time_since_delivered": idle_ms,
+                    "times_delivered": times,
+                }
+            )
+            if len(found) >= count:
+                break
+        return found
+
+    def _cmd_xautoclaim(
+        self,
+        name: KeyT,
+        groupname: Any,
+        consumername: Any,
+        min_idle_time: int,
+        start_id: Any = "0-0",
+        count: Optional[int] = None,
+        justid: bool = False,
+    ) -> List:
+        stream, group = self._group(name, groupname)
+        start, limit = _parse_id(start_id), count or 100
+        now = time.monotonic()
+        claimed, deleted, next_id = [], [], b"0-0"
+        for entry_id in sorted(group.pending):
+            if entry_id < start:
+                continue
+            if len(claimed) + len(deleted) >= limit:
+                next_id = _format_id(entry_id)
+                break
+            pending = group.pending[entry_id]
+            if (now - pending[1]) * 1000 < min_idle_time:
+                continue
+            fields = stream.entries.get(entry_id)
+            if fields is None:
+                del group.pending[entry_id]
+                deleted.append(_format_id(entry_id))
+                continue
+            group.pending[entry_id] = [
+                _to_key(consumername),
+                now,
+                pending[2] + (0 if justid else 1),
+            ]
+            claimed.append((_format_id(entry_id), dict(fields)))
+        if justid:
+            return [entry_id for entry_id, _ in claimed]
+        return [next_id, claimed, deleted]
+
+    # Sorted sets
+
+    def _cmd_zadd(
+        self,
+        name: KeyT,
+        mapping: Dict[Any, float],
+        nx: bool = False,
+        xx: bool = False,
+    ) -> int:
+        members = self._zsets.setdefault(_to_key(name), {})
+        added = 0
+        for member, score in mapping.items():
+            member = _to_bytes(member)
+            exists = member in members
+            if (nx and exists) or (xx and not exists):
+                continue
+            members[member] = float(score)
+            added += not exists
+        if not members:
+            del self._zsets[_to_key(name)]
+        return added
+
+    def _cmd_zrem(self, name: KeyT, *values: Any) -> int:
+        key = _to_key(name)
+        members = self._zsets.get(key, {})
+        removed = sum(members.pop(_to_bytes(v), None) is not None for v in values)
+        if key in self._zsets and not members:
+            del self._zsets[key]
+        return removed
+
+    def _cmd_zcard(self, name: KeyT) -> int:
+        return len(self._zsets.get(_to_key(name), {}))
+
+    def _cmd_zscore(self, name: KeyT, value: Any) -> Optional[float]:
+        return self._zsets.get(_to_key(name), {}).get(_to_bytes(value))
+
+    def _ordered(self, name: KeyT) -> List[Tuple[bytes, float]]:
+        members = self._zsets.get(_to_key(name), {})
+        return sorted(members.items(), key=lambda item: (item[1], item[0]))
+
+    def _cmd_zrange(
+        self,
+        name: KeyT,
+        start: int,
+        end: int,
+        desc: bool = False,
+        withscores: bool = False,
+    ) -> List:
+        ordered = self._ordered(name)
+        if desc:
+            ordered.reverse()
+        # Inclusive bounds; negative indexes count from the end
+        if start < 0:
+            start = max(len(ordered) + start, 0)
+        if end < 0:
+            end += len(ordered)
+        selected = ordered[start : end + 1]
+        return selected if withscores else [member for member, _ in selected]
+
+    def _cmd_zrangebyscore(
+        self,
+        name: KeyT,
+        min: Any,
+        max: Any,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False,
+    ) -> List:
+        low, high = float(min), float(max)  # float() parses "-inf"/"+inf"
+        selected = [item for item in self._ordered(name) if low <= item[1] <= high]
+        if start is not None and num is not None:
+            selected = selected[start:] if num < 0 else selected[start : start + num]
+        return selected if withscores else [member for member, _ in selected]
+
+    def _cmd_zremrangebyscore(self, name: KeyT, min: Any, max: Any) -> int:
+        low, high = float(min), float(max)
+        expired = [m for m, score in self._ordered(name) if low <= score <= high]
+        return self._cmd_zrem(name, *expired) if expired else 0
+
+    # Hashes
+
+    def _cmd_hset(
+        self,
+        name: KeyT,
+        key: Optional[Any] = None,
+        value: Optional[Any] = None,
+        mapping: Optional[Dict[Any, Any]] = None,
+    ) -> int:
+        fields = dict(mapping or {})
+        if key is not None:
+            fields[key] = value
+        stored = self._hashes.setdefault(_to_key(name), {})
+        added = 0
+        for field_name, field_value in fields.items():
+            field_name = _to_bytes(field_name)
+            added += field_name not in stored
+            stored[field_name] = _to_bytes(field_value)
+        return added
+
+    def _cmd_hget(self, name: KeyT, key: Any) -> Optional[bytes]:
+        return self._hashes.get(_to_key(name), {}).get(_to_bytes(key))
+
+    def _cmd_hdel(self, name: KeyT, *keys: Any) -> int:
+        hash_key = _to_key(name)
+        stored = self._hashes.get(hash_key, {})
+        deleted = sum(stored.pop(_to_bytes(key), None) is not None for key in keys)
+        if hash_key in self._hashes and not stored:
+            del self._hashes[hash_key]
+        return deleted
+
+    def _cmd_hlen(self, name: KeyT) -> int:
+        return len(self._hashes.get(_to_key(name), {}))
+
+    # Lists
+
+    def _cmd_lpush(self, name: KeyT, *values: Any) -> int:
+        items = self._lists.setdefault(_to_key(name), deque())
+        items.extendleft(_to_bytes(value) for value in values)
+        self._list_pushed.set()
+        return len(items)
+
+    def _cmd_rpush(self, name: KeyT, *values: Any) -> int:
+        items = self._lists.setdefault(_to_key(name), deque())
+        items.extend(_to_bytes(value) for value in values)
+        self._list_pushed.set()
+        return len(items)
+
+    def _cmd_lpop(self, name: KeyT) -> Optional[bytes]:
+        key = _to_key(name)
+        items = self._lists.get(key)
+        if not items:
+            return None
+        value = items.popleft()
+        if not items:
+            del self._lists[key]
+        return value
+
+    def _cmd_llen(self, name: KeyT) -> int:
+        return len(self._lists.get(_to_key(name), ()))
+
+    def _cmd_ltrim(self, name: KeyT, start: int, end: int) -> bool:
+        key = _to_key(name)
+        items = list(self._lists.get(key, ()))
+        if start < 0:
+            start = max(len(items) + start, 0)
+        if end < 0:
+            end += len(items)
+        kept = items[start : end + 1]
+        if kept:
+            self._lists[key] = deque(kept)
+        else:
+            self._lists.pop(key, None)
+        return True
+
+    # Scripts: Python twins of the Lua scripts other modules register
+
+    def _script_claim_next_task(self, keys: List[KeyT], args: List[Any]) -> List:
+        """task_processor.CLAIM_NEXT_SCRIPT"""
+        now, lease_until = float(args[0]), float(args[1])
+        task_prefix, lock_prefix = _to_bytes(args[3]), _to_bytes(args[4])
+        *queues, in_flight = keys
+        next_due = None
+        for queue in queues:
+            while True:
+                head = self._cmd_zrange(queue, 0, 0, withscores=True)
+                if not head:
+                    break
+                task_id, score = head[0]
+                if score > now:
+                    next_due = score if next_due is None else min(next_due, score)
+                    break
+                self._cmd_zrem(queue, task_id)
+                data = self._cmd_get(task_prefix + task_id)
+                if data is not None:
+                    self._cmd_zadd(in_flight, {task_id: lease_until})
+                    self._cmd_set(lock_prefix + task_id, args[2], ex=float(args[5]))
+                    return [task_id, data]
+        return [b"", repr(next_due).encode()] if next_due is not None else []
+
+    def _script_claim_task_batch(self, keys: List[KeyT], args: List[Any]) -> List:
+        """task_processor.CLAIM_BATCH_SCRIPT"""
+        lease_until = float(args[1])
+        task_prefix, lock_prefix = _to_bytes(args[3]), _to_bytes(args[4])
+        function_name, limit, scan = _to_bytes(args[6]), int(args[7]), int(args[8])
+        *queues, in_flight, batchable = keys
+        claimed = []
+        for queue in queues:
+            due = self._cmd_zrangebyscore(queue, "-inf", args[0], start=0, num=scan)
+            for task_id in due:
+                if self._cmd_hget(batchable, task_id) != function_name:
+                    continue
+                self._cmd_zrem(queue, task_id)
+                data = self._cmd_get(task_prefix + task_id)
+                if data is None:
+                    self._cmd_hdel(batchable, task_id)
+                    continue
+                self._cmd_zadd(in_flight, {task_id: lease_until})
+                self._cmd_set(lock_prefix + task_id, args[2], ex=float(args[5]))
+                claimed += [task_id, data]
+                if len(claimed) // 2 >= limit:
+                    return claimed
+        return claimed
+
+    # Pub/sub
+
+    def _cmd_publish(self, channel: KeyT, message: Any) -> int:
+        subscribers = self._channels.get(_to_key(channel), [])
+        for pubsub in subscribers:
+            pubsub._deliver("message", _to_bytes(channel), _to_bytes(message))
+        return len(subscribers)
+
+    def _cmd_info(self, section: Optional[str] = None) -> Dict[str, Any]:
+        keys = self._cmd_dbsize()
+        return {
+            "used_memory": sum(
+                len(key) + len(value) for key, value in self._data.items()
+            ),
+            "db0": {"keys": keys, "expires": len(self._expires)},
+            "connected_clients": 1,
+            "uptime_in_seconds": int(time.time() - self.started_at),
+        }
+
+
+class LocalPipeline:
+    """Command buffer for LocalRedis, executed in one round trip"""
+
+    def __init__(self, client: LocalRedis):
+        self.client = client
+        self._queued: List[Tuple[str, Tuple, Dict[str, Any]]] = []
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or not hasattr(LocalRedis, f"_cmd_{name}"):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs) -> "LocalPipeline":
+            self._queued.append((name, args, kwargs))
+            return self
+
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        """Run queued commands; like redis-py, the first error is raised"""
+        queued, self._queued = self._queued, []
+        await self.client._round_trip()
+        results = []
+        for command, args, kwargs in queued:
+            try:
+                results.append(self.client._dispatch(command, args, kwargs))
+            except Exception as e:
+                results.append(e)
+        if raise_on_error:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    async def __aenter__(self) -> "LocalPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._queued = []
+
+
+class LocalScript:
+    """Registered script of a LocalRedis client.
+
+    Lua is not evaluated: a script whose first line is ``-- <name>`` runs
+    ``LocalRedis._script_<name>`` instead, atomically and in one round
+    trip like EVALSHA. Scripts without a twin fail with NOSCRIPT.
+    """
+
+    def __init__(self, client: LocalRedis, script: str):
+        self.client = client
+        self.script = script
+        header = script.lstrip().split("\n", 1)[0]
+        self.name = header[2:].strip() if header.startswith("--") else ""
+
+    async def __call__(
+        self,
+        keys: Optional[List[KeyT]] = None,
+        args: Optional[List[Any]] = None,
+        client: Any = None,
+    ) -> Any:
+        await self.client._round_trip()
+        twin = getattr(self.client, f"_script_{self.name}", None)
+        if twin is None:
+            raise ResponseError(f"NOSCRIPT No local twin for script {self.name!r}")
+        self.client.commands += 1
+        return twin(list(keys or []), list(args or []))
+
+
+class LocalPubSub:
+    """Channel subscription of a LocalRedis client"""
+
+    def __init__(self, client: LocalRedis):
+        self.client = client
+        self.channels: List[str] = []
+        self._messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, *channels: KeyT):
+        await self.client._round_trip()
+        for channel in channels:
+            key = _to_key(channel)
+            if key not in self.channels:
+                self.channels.append(key)
+                self.client._channels.setdefault(key, []).append(self)
+            self._deliver("subscribe", _to_bytes(channel), len(self.channels))
+
+    async def unsubscribe(self, *channels: KeyT):
+        await self.client._round_trip()
+        for key in [_to_key(c) for c in channels] or list(self.channels):
+            if key in self.channels:
+                self.channels.remove(key)
+                self.client._channels[key].remove(self)
+            self._deliver("unsubscribe", _to_bytes(key), len(self.channels))
+
+    async def get_message(
+        self, ignore_subscribe_messages: bool = False, timeout: float = 0.0
+    ) -> Optional[Dict[str, Any]]:
+        """Next message, or None once ``timeout`` seconds pass without one"""
+        while True:
+            try:
+                if timeout is not None and timeout <= 0:
+                    message = self._messages.get_nowait()
+                else:
+                    message = await asyncio.wait_for(self._messages.get(), timeout)
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                return None
+            if message["type"] == "message" or not ignore_subscribe_messages:
+                return message
+
+    async def listen(self):
+        """Yield messages, including subscribe confirmations, as they arrive"""
+        while self.channels or not self._messages.empty():
+            yield await self._messages.get()
+
+    async def close(self):
+        await self.unsubscribe()
+
+    def _deliver(self, kind: str, channel: bytes, data: Any):
+        self._messages.put_nowait(
+            {"type": kind, "pattern": None, "channel": channel, "data": data}
+        )
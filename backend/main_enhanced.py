@@ -40,7 +40,7 @@ app.add_middleware(
 
 logger = logging.getLogger(__name__)
 import time
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 import uvicorn
@@ -53,7 +53,6 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 # --- VALUE BET, ARBITRAGE, KELLY, PROFIT TRACKING ---
 import os
 import random
-import threading
 
 import pandas as pd
 import psutil
@@ -62,6 +61,8 @@ from advanced_feature_engineering import (
     FeatureEngineeringStrategy,
     advanced_feature_engineer,
 )
+from arbitrage_book import ArbitrageSignal
+from arbitrage_engine import ultra_arbitrage_engine
 from cache_optimizer import ultra_cache_optimizer
 
 # Import ultra-enhanced systems
@@ -79,9 +80,15 @@ from ensemble_optimizer import (
 )
 from feature_flags import FeatureFlags
 from model_service import model_service
+from odds_snapshot_service import OddsSnapshot, odds_snapshot_service
 from prediction_engine import router as prediction_router
 from realtime_accuracy_monitor import realtime_accuracy_monitor
-from realtime_engine import real_time_stream_manager
+from realtime_engine import (
+    StreamMessage,
+    StreamType,
+    UpdatePriority,
+    real_time_stream_manager,
+)
 from system_monitor import ultra_system_monitor
 from task_processor import ultra_task_processor
 
@@ -92,9 +99,11 @@ from ultra_accuracy_engine import (
     ultra_accuracy_engine,
 )
 from ws import router as websocket_router
+from ws_broker import room_broker
 
 # --- User Profile, Risk, and Bookmaker Integration ---
 _latest_value_bets = []
+_value_bets_by_sport: Dict[str, List[Dict[str, Any]]] = {}
 _latest_arbs = []
 _user_bets = []
 _user_profit = {}
@@ -192,115 +201,125 @@ def kelly_fraction(edge: Dict[str, Any], prob: float) -> float:
     return max(0.0, min((b * p - q) / b, 1.0))
 
 
-def fetch_value_bets():
-    """Fetch value bets from odds API and update global cache."""
-    try:
-        api_key = os.getenv("ODDS_API_KEY")
-        if not api_key:
-            return
-        url = f"https://api.the-odds-api.com/v4/sports/soccer_epl/odds/?apiKey={api_key}&regions=eu&markets=h2h&oddsFormat=decimal"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            value_bets = []
-            for event in data:
-                for bookmaker in event.get("bookmakers", []):
-                    if bookmaker["title"] not in SUPPORTED_BOOKMAKERS:
-                        continue
-                    for market in bookmaker.get("markets", []):
-                        for outcome in market.get("outcomes", []):
-                            odds = float(outcome.get("price", 0))
-                            model_prob = random.uniform(0.01, 0.99)
-                            implied = implied_prob(odds)
-                            edge = model_prob - implied
-                            if edge > 0.05:
-                                kelly = kelly_fraction(
-                                    {"odds": odds, "model_prob": model_prob}, model_prob
-                                )
-                                value_bets.append(
-                                    {
-                                        "event": event["id"],
-                                        "sport": event.get("sport_key"),
-                                        "commence_time": event.get("commence_time"),
-                                        "bookmaker": bookmaker["title"],
-                                        "outcome": outcome["name"],
-                                        "odds": odds,
-                                        "implied_prob": implied,
-                                        "model_prob": model_prob,
-                                        "edge": edge,
-                                        "kelly_fraction": kelly,
-                                        "rationale": f"Model probability {model_prob:.2f} vs implied {implied:.2f} (edge {edge:.2%})",
-                                    }
-                                )
-            global _latest_value_bets
-            _latest_value_bets = value_bets
-    except Exception as e:
-        logger.error(f"Failed to fetch value bets: {e!s}")
+def _value_bets(snapshot: OddsSnapshot) -> List[Dict[str, Any]]:
+    """Value bets among one odds snapshot's supported-bookmaker quotes."""
+    value_bets = []
+    for quote in snapshot.quotes():
+        if quote["sportsbook"] not in SUPPORTED_BOOKMAKERS:
+            continue
+        odds = float(quote["odds"] or 0)
+        model_prob = random.uniform(0.01, 0.99)
+        implied = implied_prob(odds)
+        edge = model_prob - implied
+        if edge > 0.05:
+            kelly = kelly_fraction({"odds": odds, "model_prob": model_prob}, model_prob)
+            value_bets.append(
+                {
+                    "event": quote["event_id"],
+                    "sport": quote["sport"],
+                    "commence_time": quote["commence_time"],
+                    "bookmaker": quote["sportsbook"],
+                    "outcome": quote["name"],
+                    "odds": odds,
+                    "implied_prob": implied,
+                    "model_prob": model_prob,
+                    "edge": edge,
+                    "kelly_fraction": kelly,
+                    "snapshot_version": snapshot.version,
+                    "rationale": f"Model probability {model_prob:.2f} vs implied {implied:.2f} (edge {edge:.2%})",
+                }
+            )
+    return value_bets
 
 
-def fetch_arbitrage():
-    try:
-        api_key = os.getenv("ODDS_API_KEY")
-        if not api_key:
-            return
-        url = f"https://api.the-odds-api.com/v4/sports/soccer_epl/odds/?apiKey={api_key}&regions=eu&markets=h2h&oddsFormat=decimal"
-        resp = requests.get(url, timeout=5)
-        if resp.status_code == 200:
-            data = resp.json()
-            arbs = []
-            for event in data:
-                outcomes = {}
-                for bookmaker in event.get("bookmakers", []):
-                    for market in bookmaker.get("markets", []):
-                        for outcome in market.get("outcomes", []):
-                            name = outcome["name"]
-                            odds = float(outcome.get("price", 0))
-                            if name not in outcomes or odds > outcomes[name]["odds"]:
-                                outcomes[name] = {
-                                    "odds": odds,
-                                    "bookmaker": bookmaker["title"],
-                                }
-                if len(outcomes) >= 2:
-                    inv_sum = sum(1 / o["odds"] for o in outcomes.values())
-                    if inv_sum < 1:
-                        profit_pct = (1 - inv_sum) * 100
-                        arbs.append(
-                            {
-                                "event": event["id"],
-                                "sport": event.get("sport_key"),
-                                "commence_time": event.get("commence_time"),
-                                "legs": [
-                                    {
-                                        "outcome": k,
-                                        "odds": v["odds"],
-                                        "bookmaker": v["bookmaker"],
-                                    }
-                                    for k, v in outcomes.items()
-                                ],
-                                "profit_percent": profit_pct,
-                                "rationale": f"Arbitrage: profit {profit_pct:.2f}% if bets split across outcomes",
-                            }
-                        )
-            global _latest_arbs
-            _latest_arbs = arbs
-    except Exception as e:
-        logger.error(f"Failed to fetch arbitrage: {e!s}")
+async def _update_value_bets(snapshot: OddsSnapshot):
+    """Recompute the value bets of the sport that changed."""
+    global _latest_value_bets
+    _value_bets_by_sport[snapshot.sport] = _value_bets(snapshot)
+    _latest_value_bets = [bet for bets in _value_bets_by_sport.values() for bet in bets]
+
+
+def _legacy_arbitrage(hit) -> Dict[str, Any]:
+    profit_pct = (1 - hit.margin) * 100
+    return {
+        "event": hit.event_id,
+        "sport": hit.quotes[0].get("sport"),
+        "commence_time": hit.quotes[0].get("commence_time"),
+        "legs": [
+            {
+                "outcome": quote.get("name", outcome),
+                "odds": quote["odds"],
+                "bookmaker": quote["sportsbook"],
+            }
+            for outcome, quote in zip(hit.outcomes, hit.quotes)
+        ],
+        "profit_percent": profit_pct,
+        "rationale": f"Arbitrage: profit {profit_pct:.2f}% if bets split across outcomes",
+    }
+
+
+async def _on_arbitrage_signal(signal: ArbitrageSignal):
+    """Keep the arbitrage list current and push the change to subscribers."""
+    global _latest_arbs
+    hits = ultra_arbitrage_engine.active_hits()
+    _latest_arbs = [_legacy_arbitrage(hit) for hit in hits]
+    await real_time_stream_manager.broadcast(
+        StreamMessage(
+            id=str(uuid.uuid4()),
+            stream_type=StreamType.OPPORTUNITIES,
+            priority=UpdatePriority.CRITICAL,
+            data={
+                "signal": signal.signal_type.value,
+                "arbitrage": _legacy_arbitrage(signal.hit),
+            },
+            timestamp=datetime.utcnow(),
+            source="arbitrage_price_book",
+            event_id=str(signal.hit.event_id),
+        )
+    )
 
 
-def start_valuebet_arbitrage_fetchers():
-    def loop():
-        while True:
-            fetch_value_bets()
-            fetch_arbitrage()
-            import time
+ultra_arbitrage_engine.add_signal_listener(_on_arbitrage_signal)
 
-            time.sleep(60)
 
-    t = threading.Thread(target=loop, daemon=True)
-    t.start()
+async def _apply_arbitrage_snapshot(snapshot: OddsSnapshot):
+    """Feed each new odds snapshot into the incremental arbitrage book.
 
+    Only quotes whose price changed re-evaluate their market; live
+    BETTING_ODDS stream updates reach the same book per message.
+    """
+    await ultra_arbitrage_engine.apply_odds_snapshot(snapshot.events)
+    await ultra_arbitrage_engine.remove_events(list(snapshot.removed_events))
 
-start_valuebet_arbitrage_fetchers()
+
+def _commence_time(quotes) -> Optional[datetime]:
+    """Naive UTC start time of an event from its quotes, if the API sent one."""
+    commence_time = quotes[0].get("commence_time") if quotes else None
+    try:
+        starts_at = datetime.fromisoformat(str(commence_time).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if starts_at.tzinfo is not None:
+        starts_at = starts_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return starts_at
+
+
+async def _schedule_prediction_prefetch(snapshot: OddsSnapshot):
+    """Have each event's prediction recomputed shortly before it starts."""
+    prefetcher = ultra_cache_optimizer.prefetcher
+    for event_id, quotes in snapshot.events.items():
+        starts_at = _commence_time(quotes)
+        if starts_at is not None:
+            prefetcher.schedule_event(
+                str(event_id), starts_at, [f"prediction:{event_id}"]
+            )
+    for event_id in snapshot.removed_events:
+        prefetcher.unschedule_event(str(event_id))
+
+
+odds_snapshot_service.add_listener(_update_value_bets)
+odds_snapshot_service.add_listener(_apply_arbitrage_snapshot)
+odds_snapshot_service.add_listener(_schedule_prediction_prefetch)
 
 
 @app.get("/api/v4/betting/value-bets")
@@ -830,6 +849,27 @@ async def startup_event():
         await real_time_stream_manager.initialize()
         logger.info("✅ Real-time stream manager initialized")
 
+        # Detect arbitrage on every odds update instead of per polling cycle
+        real_time_stream_manager.add_stream_listener(
+            StreamType.BETTING_ODDS, ultra_arbitrage_engine.on_odds_message
+        )
+        logger.info("✅ Incremental arbitrage price book attached to odds stream")
+
+        # Odds and prediction updates reach clients in their event/sport rooms
+        await real_time_stream_manager.subscribe(
+            "ws-rooms",
+            [StreamType.BETTING_ODDS, StreamType.PREDICTIONS],
+            callback=room_broker.publish_stream_update,
+        )
+        logger.info("✅ WebSocket event and sport rooms subscribed to updates")
+        if config.arbitrage_sharded_scan:
+            await ultra_arbitrage_engine.sharded_scanner.warm_up()
+            logger.info("✅ Sharded arbitrage scan workers started")
+
+        # One conditional odds fetch per sport feeds value bets and arbitrage
+        await odds_snapshot_service.start()
+        logger.info("✅ Odds snapshot service started")
+
         # Initialize ultra task processor
         await ultra_task_processor.initialize()
         await ultra_task_processor.start_workers(num_workers=4)
@@ -838,6 +878,10 @@ async def startup_event():
         # Initialize ultra cache optimizer
         await ultra_cache_optimizer.initialize()
         logger.info("✅ Ultra cache optimizer initialized")
+        # Scheduled prefetches recompute pre-game predictions before start
+        ultra_cache_optimizer.prefetcher.register_loader(
+            "prediction:*", real_time_stream_manager.load_prediction, ttl=1800
+        )
 
         # Initialize ultra system monitor
         asyncio.create_task(ultra_system_monitor.start_monitoring())
@@ -939,6 +983,10 @@ async def shutdown_event():
         await real_time_stream_manager.shutdown()
         logger.info("✅ Real-time stream manager shut down")
 
+        # Stop odds polling and the sharded arbitrage scan workers
+        await odds_snapshot_service.stop()
+        ultra_arbitrage_engine.shutdown()
+
         # Shutdown data pipeline
         await data_pipeline.shutdown()
         logger.info("✅ Data pipeline shut down")
@@ -1796,39 +1844,22 @@ realtime_accuracy_monitor.record_feedback = record_feedback_impl
 _latest_betting_oops = []
 
 
-def fetch_betting_opportunities():
-    """Fetch real betting opportunities from a public odds API and update global cache."""
-    try:
-        api_key = os.getenv("ODDS_API_KEY")
-        if not api_key:
-            return
-        url = f"https://api.the-odds-api.com/v4/sports/?apiKey={api_key}"
-        resp = requests.get(url, timeout=3)
-        if resp.status_code == 200:
-            sports = resp.json()
-            oops = []
-            for sport in sports:
-                if sport.get("active"):
-                    oops.append({"sport": sport["key"], "title": sport["title"]})
-            global _latest_betting_oops
-            _latest_betting_oops = oops
-    except Exception as e:
-        logger.error(f"Failed to fetch betting opportunities: {e!s}")
-
-
-def start_betting_opportunity_fetcher():
-    def loop():
-        while True:
-            fetch_betting_opportunities()
-            import time
-
-            time.sleep(60)
-
-    t = threading.Thread(target=loop, daemon=True)
-    t.start()
+async def _update_betting_opportunities(snapshot: OddsSnapshot):
+    """List every configured sport whose latest snapshot has open events."""
+    global _latest_betting_oops
+    _latest_betting_oops = [
+        {
+            "sport": sport,
+            "title": current.title or sport,
+            "events": len(current.events),
+            "snapshot_version": current.version,
+        }
+        for sport, current in odds_snapshot_service.snapshots().items()
+        if current.events
+    ]
 
 
-start_betting_opportunity_fetcher()
+odds_snapshot_service.add_listener(_update_betting_opportunities)
 
 
 @app.get("/api/v4/betting/opportunities")
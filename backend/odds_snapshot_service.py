@@ -0,0 +1,281 @@
+"""Shared Odds Snapshot Service
+One conditional odds API fetch per sport, parsed once and shared by every consumer
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Mapping, Optional
+
+import aiohttp
+from config import config_manager
+
+logger = logging.getLogger(__name__)
+
+ODDS_API_URL = "https://api.the-odds-api.com/v4/sports/{sport}/odds/"
+
+Quote = Mapping[str, Any]
+
+
+def event_quotes(event: Dict[str, Any]) -> List[Quote]:
+    """Flatten one odds API event into read-only per-bookmaker quotes"""
+    # Team names become home/away so two-outcome markets pair up
+    sides = {event.get("home_team"): "home", event.get("away_team"): "away"}
+    quotes = []
+    for bookmaker in event.get("bookmakers", []):
+        for market in bookmaker.get("markets", []):
+            for outcome in market.get("outcomes", []):
+                quotes.append(
+                    MappingProxyType(
+                        {
+                            "event_id": event["id"],
+                            "market_type": market.get("key", "h2h"),
+                            "outcome": sides.get(outcome["name"], outcome["name"]),
+                            "name": outcome["name"],
+                            "odds": outcome.get("price"),
+                            "line": outcome.get("point"),
+                            "sportsbook": bookmaker["title"],
+                            "sport": event.get("sport_key"),
+                            "commence_time": event.get("commence_time"),
+                        }
+                    )
+                )
+    return quotes
+
+
+@dataclass(frozen=True)
+class OddsSnapshot:
+    """Normalized odds for one sport at one version, shared by all consumers"""
+
+    sport: str
+    version: int
+    fetched_at: datetime
+    title: Optional[str]
+    events: Mapping[Any, tuple]  # event_id -> quotes
+    removed_events: FrozenSet[Any]  # In the previous version but not this one
+
+    def quotes(self) -> List[Quote]:
+        return [quote for quotes in self.events.values() for quote in quotes]
+
+
+SnapshotListener = Callable[[OddsSnapshot], Awaitable[None]]
+
+
+@dataclass
+class OddsSnapshotMetrics:
+    """Odds snapshot fetch metrics"""
+
+    requests: int = 0
+    not_modified: int = 0
+    unchanged: int = 0  # 200 responses whose body matched the last version
+    snapshots: int = 0
+    errors: int = 0
+    last_fetch_ms: float = 0.0
+
+
+class OddsSnapshotService:
+    """Polls the odds API once per sport and publishes versioned snapshots.
+
+    Each sport is fetched on its own cadence with all configured markets in
+    one request. ``ETag`` / ``Last-Modified`` validators are sent back so an
+    unchanged feed costs a 304, and a 200 with an identical body is also
+    dropped. New data is parsed once into an immutable ``OddsSnapshot``
+    whose version increases by one, then handed to every listener in
+    registration order, so value-bet, arbitrage and opportunity consumers
+    all see the same prices.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        sports: Optional[Dict[str, float]] = None,
+        regions: str = "eu",
+        markets: Optional[List[str]] = None,
+        odds_format: str = "decimal",
+        timeout: float = 5.0,
+        base_url: str = ODDS_API_URL,
+        session: Optional[aiohttp.ClientSession] = None,
+    ):
+        self.api_key = api_key
+        self.sports = dict(sports if sports is not None else {"soccer_epl": 60.0})
+        self.regions = regions
+        self.markets = list(markets or ["h2h"])
+        self.odds_format = odds_format
+        self.timeout = timeout
+        self.base_url = base_url
+        self.session = session
+        self._owns_session = session is None
+        self.listeners: List[SnapshotListener] = []
+        self.metrics = OddsSnapshotMetrics()
+        self._snapshots: Dict[str, OddsSnapshot] = {}
+        self._validators: Dict[str, Dict[str, str]] = {}
+        self._digests: Dict[str, bytes] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    @classmethod
+    def from_config(cls, backend_config: Any) -> "OddsSnapshotService":
+        return cls(
+            api_key=backend_config.odds_api_key or os.getenv("ODDS_API_KEY"),
+            sports=backend_config.odds_snapshot_sports,
+            regions=backend_config.odds_snapshot_regions,
+            markets=backend_config.odds_snapshot_markets,
+            timeout=backend_config.odds_snapshot_timeout,
+        )
+
+    def add_listener(self, listener: SnapshotListener):
+        """Receive every new snapshot of every sport"""
+        self.listeners.append(listener)
+
+    def snapshot(self, sport: str) -> Optional[OddsSnapshot]:
+        """Latest snapshot of ``sport``"""
+        return self._snapshots.get(sport)
+
+    def snapshots(self) -> Dict[str, OddsSnapshot]:
+        """Latest snapshot of every sport fetched so far"""
+        return dict(self._snapshots)
+
+    async def start(self):
+        """Start one polling task per configured sport"""
+        if not self.api_key:
+            logger.warning("No odds API key configured; odds snapshots disabled")
+            return
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={"Accept": "application/json"},
+            )
+        for sport, interval in self.sports.items():
+            if sport not in self._tasks:
+                self._tasks[sport] = asyncio.create_task(self._poll(sport, interval))
+
+    async def stop(self):
+        """Cancel polling and close the HTTP session"""
+        tasks = list(self._tasks.values())
+        self._tasks.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def refresh(self, sport: str) -> Optional[OddsSnapshot]:
+        """Fetch ``sport`` now; returns the new snapshot, or None if unchanged"""
+        lock = self._locks.setdefault(sport, asyncio.Lock())
+        async with lock:
+            body = await self._fetch(sport)
+            if body is None:
+                return None
+            snapshot = await asyncio.to_thread(self._build, sport, body)
+            self._snapshots[sport] = snapshot
+            self.metrics.snapshots += 1
+            # Published under the lock so listeners see versions in order
+            await self._publish(snapshot)
+        return snapshot
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Fetch counters and the current version of each sport"""
+        return {
+            "sports": {
+                sport: {
+                    "refresh_seconds": interval,
+                    "version": getattr(self._snapshots.get(sport), "version", 0),
+                    "events": len(getattr(self._snapshots.get(sport), "events", ())),
+                }
+                for sport, interval in self.sports.items()
+            },
+            "running": bool(self._tasks),
+            "requests": self.metrics.requests,
+            "not_modified": self.metrics.not_modified,
+            "unchanged": self.metrics.unchanged,
+            "snapshots": self.metrics.snapshots,
+            "errors": self.metrics.errors,
+            "last_fetch_ms": self.metrics.last_fetch_ms,
+        }
+
+    async def _poll(self, sport: str, interval: float):
+        while True:
+            try:
+                await self.refresh(sport)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.errors += 1
+                logger.error(f"Odds snapshot refresh failed for {sport}: {e!s}")
+            await asyncio.sleep(interval)
+
+    async def _fetch(self, sport: str) -> Optional[bytes]:
+        """Conditional GET; the body only when the feed changed"""
+        params = {
+            "apiKey": self.api_key,
+            "regions": self.regions,
+            "markets": ",".join(self.markets),
+            "oddsFormat": self.odds_format,
+        }
+        validators = self._validators.get(sport, {})
+        headers = {}
+        if "etag" in validators:
+            headers["If-None-Match"] = validators["etag"]
+        if "last_modified" in validators:
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        started = time.perf_counter()
+        self.metrics.requests += 1
+        async with self.session.get(
+            self.base_url.format(sport=sport), params=params, headers=headers
+        ) as response:
+            self.metrics.last_fetch_ms = (time.perf_counter() - started) * 1000
+            if response.status == 304:
+                self.metrics.not_modified += 1
+                return None
+            if response.status != 200:
+                self.metrics.errors += 1
+                logger.warning(f"Odds API returned {response.status} for {sport}")
+                return None
+            body = await response.read()
+            validators = {}
+            if response.headers.get("ETag"):
+                validators["etag"] = response.headers["ETag"]
+            if response.headers.get("Last-Modified"):
+                validators["last_modified"] = response.headers["Last-Modified"]
+            self._validators[sport] = validators
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if self._digests.get(sport) == digest:
+            self.metrics.unchanged += 1
+            return None
+        self._digests[sport] = digest
+        return body
+
+    def _build(self, sport: str, body: bytes) -> OddsSnapshot:
+        events = json.loads(body)
+        previous = self._snapshots.get(sport)
+        quotes = {event["id"]: tuple(event_quotes(event)) for event in events}
+        return OddsSnapshot(
+            sport=sport,
+            version=previous.version + 1 if previous else 1,
+            fetched_at=datetime.utcnow(),
+            title=next((e.get("sport_title") for e in events), None),
+            events=MappingProxyType(quotes),
+            removed_events=frozenset(
+                previous.events.keys() - quotes.keys() if previous else ()
+            ),
+        )
+
+    async def _publish(self, snapshot: OddsSnapshot):
+        for listener in self.listeners:
+            try:
+                await listener(snapshot)
+            except Exception as e:
+                logger.error(f"Odds snapshot listener failed: {e!s}")
+
+
+# Global odds snapshot service instance
+odds_snapshot_service = OddsSnapshotService.from_config(config_manager.config)
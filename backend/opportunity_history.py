@@ -0,0 +1,259 @@
+"""Columnar Opportunity History
+Fixed-size ring buffer of opportunity summaries with lazily decoded details
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from cache_codec import CacheCodec
+
+logger = logging.getLogger(__name__)
+
+# One row per opportunity; strings are ids into the history's interned values
+HISTORY_DTYPE = np.dtype(
+    [
+        ("timestamp", "f8"),  # Seconds since 1970-01-01 (naive datetimes as-is)
+        ("kind", "i4"),
+        ("opportunity_type", "i4"),
+        ("event", "i4"),
+        ("market", "i4"),
+        ("sportsbook", "i4"),
+        ("value", "f8"),  # Profit or edge in percent
+        ("confidence", "f8"),
+    ]
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _seconds(value: datetime) -> float:
+    if value.tzinfo is None:
+        return (value - _EPOCH).total_seconds()
+    return value.timestamp()
+
+
+@dataclass(slots=True)
+class OpportunityRecord:
+    """One history row, materialized from the columns"""
+
+    kind: str
+    opportunity_type: str
+    event_id: Any
+    market_type: Any
+    sportsbook: Any
+    value: float
+    confidence: float
+    timestamp: datetime
+
+
+class OpportunityHistory:
+    """Bounded opportunity history stored as NumPy columns.
+
+    Summaries (time, kind, type, event, market, book, value, confidence) live
+    in one structured array with strings interned to ids, so time-range and
+    per-event queries are vectorized masks. The full opportunity is kept only
+    as an encoded frame and decoded when a caller asks for it. The oldest row
+    is overwritten once ``capacity`` is reached.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        keep_details: bool = True,
+        codec: Optional[CacheCodec] = None,
+    ):
+        self.capacity = capacity
+        self.keep_details = keep_details
+        self.codec = codec or CacheCodec()
+        self._rows = np.zeros(capacity, dtype=HISTORY_DTYPE)
+        self._details: List[Optional[bytes]] = [None] * capacity
+        self._appended = 0
+        self._ids: Dict[Any, int] = {}
+        self._values: List[Any] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return min(self._appended, self.capacity)
+
+    def append(
+        self,
+        kind: str,
+        opportunity: Any,
+        *,
+        opportunity_type: str,
+        event_id: Any,
+        market_type: Any,
+        sportsbook: Any,
+        value: float,
+        confidence: float,
+        timestamp: Optional[datetime] = None,
+    ):
+        """Record one opportunity, overwriting the oldest when full"""
+        details = None
+        if self.keep_details:
+            try:
+                details = self.codec.encode(opportunity).data
+            except Exception as e:
+                logger.error(f"Opportunity history encoding failed: {e!s}")
+
+        with self._lock:
+            if len(self._values) > 4 * self.capacity + 1024:
+                self._compact()
+            slot = self._appended % self.capacity
+            self._rows[slot] = (
+                _seconds(timestamp or datetime.utcnow()),
+                self._intern(kind),
+                self._intern(opportunity_type),
+                self._intern(event_id),
+                self._intern(market_type),
+                self._intern(sportsbook),
+                value,
+                confidence,
+            )
+            self._details[slot] = details
+            self._appended += 1
+
+    def records(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Any = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[OpportunityRecord]:
+        """Matching summaries, newest first"""
+        with self._lock:
+            slots = self._select(start, end, event_id, kind, limit)
+            values = self._values
+            return [
+                OpportunityRecord(
+                    kind=values[kind_id],
+                    opportunity_type=values[type_id],
+                    event_id=values[event],
+                    market_type=values[market],
+                    sportsbook=values[sportsbook],
+                    value=value,
+                    confidence=confidence,
+                    timestamp=_EPOCH + timedelta(seconds=seconds),
+                )
+                for (
+                    seconds,
+                    kind_id,
+                    type_id,
+                    event,
+                    market,
+                    sportsbook,
+                    value,
+                    confidence,
+                ) in self._rows[slots].tolist()
+            ]
+
+    def opportunities(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Any = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Any]:
+        """Matching opportunities decoded back into their objects, newest first"""
+        with self._lock:
+            slots = self._select(start, end, event_id, kind, limit)
+            frames = [self._details[slot] for slot in slots.tolist()]
+        return [self.codec.decode(frame) for frame in frames if frame is not None]
+
+    def summary(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        event_id: Any = None,
+        kind: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Counts and value/confidence aggregates over the matching rows"""
+        with self._lock:
+            rows = self._rows[self._select(start, end, event_id, kind, None)]
+            values = self._values
+
+            def counts(column: str) -> Dict[str, int]:
+                ids, totals = np.unique(rows[column], return_counts=True)
+                return {
+                    str(values[value_id]): int(total)
+                    for value_id, total in zip(ids.tolist(), totals.tolist())
+                }
+
+            if not len(rows):
+                return {"count": 0, "by_kind": {}, "by_type": {}}
+            return {
+                "count": int(len(rows)),
+                "by_kind": counts("kind"),
+                "by_type": counts("opportunity_type"),
+                "events": int(len(np.unique(rows["event"]))),
+                "avg_value": float(rows["value"].mean()),
+                "max_value": float(rows["value"].max()),
+                "avg_confidence": float(rows["confidence"].mean()),
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Size and memory use"""
+        with self._lock:
+            detail_bytes = sum(len(frame) for frame in self._details if frame)
+            return {
+                "size": len(self),
+                "capacity": self.capacity,
+                "total_appended": self._appended,
+                "interned_values": len(self._values),
+                "column_bytes": self._rows.nbytes,
+                "detail_bytes": detail_bytes,
+            }
+
+    # Internals (callers hold the lock)
+
+    def _intern(self, value: Any) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+        return value_id
+
+    def _select(
+        self,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        event_id: Any,
+        kind: Optional[str],
+        limit: Optional[int],
+    ) -> np.ndarray:
+        """Slots of matching rows, newest first"""
+        rows = self._rows[: len(self)]
+        mask = np.ones(len(rows), dtype=bool)
+        if start is not None:
+            mask &= rows["timestamp"] >= _seconds(start)
+        if end is not None:
+            mask &= rows["timestamp"] < _seconds(end)
+        for column, value in (("event", event_id), ("kind", kind)):
+            if value is not None:
+                value_id = self._ids.get(value)
+                if value_id is None:
+                    return np.empty(0, dtype=np.int64)
+                mask &= rows[column] == value_id
+
+        slots = np.flatnonzero(mask)
+        newest = (self._appended - 1) % self.capacity
+        slots = slots[np.argsort((newest - slots) % self.capacity, kind="stable")]
+        return slots if limit is None else slots[:limit]
+
+    def _compact(self):
+        """Drop interned values no live row refers to"""
+        live = self._rows[: len(self)]
+        columns = ("kind", "opportunity_type", "event", "market", "sportsbook")
+        used = np.unique(np.concatenate([live[column] for column in columns]))
+        remap = np.zeros(len(self._values), dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        for column in columns:
+            live[column] = remap[live[column]]
+        self._values = [self._values[value_id] for value_id in used.tolist()]
+        self._ids = {value: value_id for value_id, value in enumerate(self._values)}
@@ -0,0 +1,161 @@
+"""Coalesced Prediction Triggers
+Collapse bursts of triggers per event and context into bounded prediction batches
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Set
+
+from stream_lanes import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatcherMetrics:
+    """Prediction trigger batching metrics"""
+
+    submitted: int = 0
+    coalesced: int = 0  # Superseded by a newer trigger for the same key
+    batches: int = 0
+    predictions: int = 0
+    failed_batches: int = 0
+    max_batch: int = 0
+
+
+class _Pending:
+    __slots__ = ("trigger", "first_at", "count")
+
+    def __init__(self, trigger: Any, first_at: float):
+        self.trigger = trigger
+        self.first_at = first_at
+        self.count = 1
+
+
+class PredictionBatcher:
+    """Coalesces prediction triggers and runs them as bounded batches.
+
+    Triggers are keyed by ``(event_id, context)``; a trigger for a key that
+    is already waiting replaces it, so a burst of updates for one game
+    yields one prediction made from the newest state. Pending keys are
+    collected for ``window`` seconds after the first arrives, then handed
+    to ``predict_batch`` in batches of at most ``max_batch``, with no more
+    than ``max_in_flight`` batches running. While every slot is busy new
+    triggers keep coalescing instead of queueing up work.
+
+    Latency is measured from the oldest trigger folded into a key until
+    ``predict_batch`` returns, which covers broadcasting the results.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], Awaitable[None]],
+        window: float = 0.1,
+        max_batch: int = 32,
+        max_in_flight: int = 4,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.predict_batch = predict_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+        self.clock = clock
+        self.metrics = BatcherMetrics()
+        self.latency = LatencyHistogram()
+        self._pending: "OrderedDict[Hashable, _Pending]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    @staticmethod
+    def key_of(trigger: Dict[str, Any]) -> Hashable:
+        return trigger["event_id"], trigger["prediction_context"]
+
+    def submit(self, trigger: Dict[str, Any]):
+        """Queue ``trigger``, replacing a waiting one for the same key"""
+        key = self.key_of(trigger)
+        self.metrics.submitted += 1
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = _Pending(trigger, self.clock())
+            self._ready.set()
+        else:
+            pending.trigger = trigger
+            pending.count += 1
+            self.metrics.coalesced += 1
+
+    async def flush(self) -> int:
+        """Start batches for everything pending; returns how many batches"""
+        started = 0
+        while self._pending:
+            await self._slots.acquire()
+            batch = [
+                self._pending.popitem(last=False)[1]
+                for _ in range(min(self.max_batch, len(self._pending)))
+            ]
+            if not batch:  # Drained while waiting for a slot
+                self._slots.release()
+                break
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            started += 1
+        return started
+
+    async def drain(self):
+        """Flush and wait for every running batch"""
+        await self.flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def run(self):
+        """Collect for ``window`` after each first trigger, then flush"""
+        try:
+            while True:
+                if not self._pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                await asyncio.sleep(self.window)
+                await self.flush()
+        except asyncio.CancelledError:
+            for task in list(self._tasks):
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._pending),
+            "in_flight": len(self._tasks),
+            "submitted": self.metrics.submitted,
+            "coalesced": self.metrics.coalesced,
+            "batches": self.metrics.batches,
+            "predictions": self.metrics.predictions,
+            "failed_batches": self.metrics.failed_batches,
+            "max_batch": self.metrics.max_batch,
+            "avg_batch": (
+                self.metrics.predictions / self.metrics.batches
+                if self.metrics.batches
+                else 0.0
+            ),
+            "trigger_to_broadcast": self.latency.get_stats(),
+        }
+
+    async def _run_batch(self, batch: List[_Pending]):
+        try:
+            await self.predict_batch([pending.trigger for pending in batch])
+            now = self.clock()
+            for pending in batch:
+                self.latency.record(now - pending.first_at)
+            self.metrics.batches += 1
+            self.metrics.predictions += len(batch)
+            self.metrics.max_batch = max(self.metrics.max_batch, len(batch))
+        except Exception as e:
+            self.metrics.failed_batches += 1
+            logger.error(f"Prediction batch failed: {e!s}")
+        finally:
+            self._slots.release()
@@ -3,18 +3,30 @@ High-frequency data processing, stream analytics, and real-time prediction updat
 """
 
 import asyncio
+import functools
 import json
 import logging
+import socket
 import uuid
-from collections import defaultdict, deque
+from collections import defaultdict
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
-import aioredis
+try:
+    import aioredis
+except ImportError:
+    from redis import asyncio as aioredis  # aioredis now ships inside redis-py
 from config import config_manager
 from ensemble_engine import PredictionContext, ultra_ensemble_engine
+from prediction_batcher import PredictionBatcher
+from stream_aggregation import WindowedAggregator
+from stream_delta import DeltaTracker, StreamProtocol
+from stream_encoding import StreamEncoding, StreamMessageEncoder, negotiate_encoding
+from stream_fanout import SlowConsumerPolicy, SubscriptionFanout
+from stream_lanes import PriorityLanes
+from stream_transport import RedisStreamTransport
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +68,12 @@ class StreamMessage:
     event_id: Optional[str] = None
     expiry: Optional[datetime] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
+    # Encoded bodies by StreamEncoding, shared by every subscriber
+    encoded: Dict[str, Any] = field(default_factory=dict, repr=False, compare=False)
+    # Streams transport delivery to acknowledge once processed
+    ack_token: Any = field(default=None, repr=False, compare=False)
+    # Versioned change to its state key, for delta-protocol subscribers
+    state_update: Any = field(default=None, repr=False, compare=False)
 
 
 @dataclass
@@ -67,6 +85,9 @@ class StreamSubscription:
     filters: Dict[str, Any]
     callback: Optional[Callable] = None
     websocket: Optional[Any] = None
+    encoding: StreamEncoding = StreamEncoding.JSON
+    protocol: StreamProtocol = StreamProtocol.FULL
+    versions: Dict[str, int] = field(default_factory=dict)  # State key -> sent
     last_activity: datetime = field(default_factory=datetime.utcnow)
     message_count: int = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
@@ -75,10 +96,16 @@ class StreamSubscription:
 class StreamAggregator:
     """Intelligent stream aggregation and deduplication"""
 
-    def __init__(self, window_size: int = 5):
+    def __init__(
+        self,
+        window_size: int = 5,
+        on_aggregate: Optional[Callable] = None,
+    ):
         self.window_size = window_size  # seconds
-        self.message_buffer: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
         self.aggregation_rules = self._initialize_aggregation_rules()
+        # Receives each aggregated message when its window closes
+        self.on_aggregate = on_aggregate
+        self.windows = WindowedAggregator(self._flush_window, max_messages=100)
 
     def _initialize_aggregation_rules(self) -> Dict[StreamType, Dict]:
         """Initialize aggregation rules for different stream types"""
@@ -106,7 +133,7 @@ class StreamAggregator:
         }
 
     async def process_message(self, message: StreamMessage) -> Optional[StreamMessage]:
-        """Process and potentially aggregate incoming message"""
+        """Pass through unaggregated streams; buffer the rest until the window closes"""
         try:
             stream_type = message.stream_type
 
@@ -114,38 +141,27 @@ class StreamAggregator:
                 return message  # No aggregation rule, pass through
 
             rule = self.aggregation_rules[stream_type]
-            dedup_key = rule["dedup_key"](message)
-            buffer_time = rule["buffer_time"]
-
-            # Add to buffer
-            self.message_buffer[dedup_key].append(message)
-
-            # Check if we should aggregate
-            current_time = datetime.utcnow()
-            buffer_messages = list(self.message_buffer[dedup_key])
-
-            if not buffer_messages:
-                return message
-
-            # Check if oldest message is beyond buffer time
-            oldest_message = buffer_messages[0]
-            if (current_time - oldest_message.timestamp).total_seconds() < buffer_time:
-                return None  # Still buffering
-
-            # Aggregate messages
-            aggregated = await self._aggregate_messages(
-                buffer_messages, rule["merge_strategy"]
+            await self.windows.add(
+                (stream_type, rule["dedup_key"](message)),
+                message,
+                rule["buffer_time"],
+                stream_type,
             )
-
-            # Clear buffer for this key
-            self.message_buffer[dedup_key].clear()
-
-            return aggregated
+            return None  # Emitted through on_aggregate when the window closes
 
         except Exception as e:
             logger.error(f"Message aggregation failed: {e!s}")
             return message  # Return original on error
 
+    async def _flush_window(
+        self, stream_type: StreamType, messages: List[StreamMessage]
+    ):
+        """Merge one closed window and hand the result on"""
+        rule = self.aggregation_rules[stream_type]
+        aggregated = await self._aggregate_messages(messages, rule["merge_strategy"])
+        if aggregated is not None and self.on_aggregate:
+            await self.on_aggregate(aggregated)
+
     async def _aggregate_messages(
         self, messages: List[StreamMessage], strategy: str
     ) -> StreamMessage:
@@ -354,17 +370,78 @@ class PredictionTriggerEngine:
         return elapsed >= cooldown_seconds
 
 
+def _serialize_message(message: StreamMessage, origin: Optional[str] = None) -> str:
+    return json.dumps(
+        {
+            "origin": origin,
+            "id": message.id,
+            "stream_type": message.stream_type.value,
+            "priority": message.priority.value,
+            "data": message.data,
+            "timestamp": message.timestamp.isoformat(),
+            "source": message.source,
+            "event_id": message.event_id,
+            "metadata": message.metadata,
+        }
+    )
+
+
+def _deserialize_message(data: Dict[str, Any]) -> StreamMessage:
+    return StreamMessage(
+        id=data.get("id", str(uuid.uuid4())),
+        stream_type=StreamType(data["stream_type"]),
+        priority=UpdatePriority(data.get("priority", "medium")),
+        data=data["data"],
+        timestamp=datetime.fromisoformat(data["timestamp"]),
+        source=data.get("source", "redis"),
+        event_id=data.get("event_id"),
+        metadata=data.get("metadata", {}),
+    )
+
+
 class RealTimeStreamManager:
     """Main real-time stream management system"""
 
     def __init__(self):
         self.redis_client: Optional[aioredis.Redis] = None
+        # Tags pub/sub messages so an instance skips its own echoes
+        self.instance_id = uuid.uuid4().hex
+        # Set when stream_transport is 'streams'; replaces pub/sub fan-in, and
+        # processed output is relayed to every node on stream_broadcast_channel
+        self.transport: Optional[RedisStreamTransport] = None
         self.subscribers: Dict[str, StreamSubscription] = {}
         self.websocket_connections: Set[Any] = set()
-        self.stream_aggregator = StreamAggregator()
+        self.stream_aggregator = StreamAggregator(
+            on_aggregate=self._process_aggregated_message
+        )
         self.prediction_trigger = PredictionTriggerEngine()
-        self.message_queue = asyncio.Queue(maxsize=10000)
+        # Triggers coalesced per (event, context) into bounded prediction batches
+        self.prediction_batcher = PredictionBatcher(
+            self._predict_triggers,
+            window=config_manager.config.prediction_trigger_window,
+            max_batch=config_manager.config.prediction_batch_size,
+            max_in_flight=config_manager.config.prediction_max_in_flight,
+        )
+        # One lane per UpdatePriority, drained weighted-fair in batches
+        self.message_lanes = PriorityLanes(
+            config_manager.config.stream_lane_weights,
+            maxsize=config_manager.config.stream_lane_size,
+        )
         self.processing_tasks: List[asyncio.Task] = []
+        # Per-message consumers that must see every update before aggregation
+        self.stream_listeners: Dict[StreamType, List[Callable]] = defaultdict(list)
+        # Subscribers indexed by stream/event/source, each with its own send queue
+        self.fanout = SubscriptionFanout(
+            queue_size=config_manager.config.stream_subscriber_queue_size,
+            policy=config_manager.config.stream_slow_consumer_policy,
+            coalesce_key=self._coalesce_key,
+            on_close=self._on_subscriber_closed,
+        )
+        self.encoder = StreamMessageEncoder()
+        self.delta_tracker = DeltaTracker(
+            resync_every=config_manager.config.stream_delta_resync_every,
+            max_keys=config_manager.config.stream_delta_max_keys,
+        )
         self.statistics = {
             "messages_processed": 0,
             "messages_sent": 0,
@@ -372,11 +449,11 @@ class RealTimeStreamManager:
             "uptime_start": datetime.utcnow(),
         }
 
-    async def initialize(self):
+    async def initialize(self, redis_client: Optional[Any] = None):
         """Initialize the real-time stream manager"""
         try:
-            # Initialize Redis for pub/sub
-            self.redis_client = aioredis.from_url(
+            # Initialize Redis for pub/sub (or use a supplied client)
+            self.redis_client = redis_client or aioredis.from_url(
                 config_manager.get_redis_url(), decode_responses=True
             )
 
@@ -385,11 +462,15 @@ class RealTimeStreamManager:
                 asyncio.create_task(self._message_processor()),
                 asyncio.create_task(self._heartbeat_monitor()),
                 asyncio.create_task(self._statistics_updater()),
-                asyncio.create_task(self._cleanup_task()),
+                asyncio.create_task(self.stream_aggregator.windows.run()),
+                asyncio.create_task(self.prediction_batcher.run()),
             ]
 
-            # Subscribe to Redis channels
-            await self._setup_redis_subscriptions()
+            # Join the partitioned consumer group, or subscribe to channels
+            if config_manager.config.stream_transport == "streams":
+                await self._setup_stream_transport()
+            else:
+                await self._setup_redis_subscriptions()
 
             logger.info("Real-time stream manager initialized")
 
@@ -407,33 +488,60 @@ class RealTimeStreamManager:
             await pubsub.subscribe(*channels)
 
             # Start Redis message handler
-            asyncio.create_task(self._redis_message_handler(pubsub))
+            self.processing_tasks.append(
+                asyncio.create_task(
+                    self._redis_message_handler(pubsub, self.message_lanes.put)
+                )
+            )
 
         except Exception as e:
             logger.error(f"Redis subscription setup failed: {e!s}")
 
-    async def _redis_message_handler(self, pubsub):
+    async def _setup_stream_transport(self):
+        """Consume owned Redis Streams partitions through the consumer group"""
+        cfg = config_manager.config
+        self.transport = RedisStreamTransport(
+            self.redis_client,
+            consumer=cfg.stream_consumer_name or socket.gethostname(),
+            partitions=cfg.stream_partitions,
+            maxlen=cfg.stream_maxlen,
+            batch_size=cfg.stream_batch_size,
+            claim_idle_ms=cfg.stream_claim_idle_ms,
+        )
+        await self.transport.start(self._transport_message_handler)
+
+        # Only partition owners process messages; everyone else hears the output
+        pubsub = self.redis_client.pubsub()
+        await pubsub.subscribe(cfg.stream_broadcast_channel)
+        self.processing_tasks.append(
+            asyncio.create_task(
+                self._redis_message_handler(pubsub, self._broadcast_locally)
+            )
+        )
+
+    async def _transport_message_handler(self, token: Any, payload: Any):
+        """Queue a partition entry; it is acknowledged once processed"""
+        try:
+            message = _deserialize_message(json.loads(payload))
+        except Exception as e:
+            logger.warning(f"Stream entry decoding failed: {e!s}")
+            await self.transport.ack(token)  # Never decodable; don't redeliver
+            return
+        message.ack_token = token
+        await self.message_lanes.put(message)
+
+    async def _redis_message_handler(
+        self, pubsub, on_message: Callable[[StreamMessage], Awaitable[None]]
+    ):
         """Handle messages from Redis pub/sub"""
         try:
             async for message in pubsub.listen():
                 if message["type"] == "message":
                     try:
-                        message["channel"]
                         data = json.loads(message["data"])
-
-                        # Convert to StreamMessage
-                        stream_message = StreamMessage(
-                            id=data.get("id", str(uuid.uuid4())),
-                            stream_type=StreamType(data["stream_type"]),
-                            priority=UpdatePriority(data.get("priority", "medium")),
-                            data=data["data"],
-                            timestamp=datetime.fromisoformat(data["timestamp"]),
-                            source=data.get("source", "redis"),
-                            event_id=data.get("event_id"),
-                            metadata=data.get("metadata", {}),
-                        )
-
-                        await self.message_queue.put(stream_message)
+                        if data.get("origin") == self.instance_id:
+                            continue  # Already handled locally when published
+                        await on_message(_deserialize_message(data))
 
                     except Exception as e:
                         logger.warning(f"Redis message processing failed: {e!s}")
@@ -443,19 +551,24 @@ class RealTimeStreamManager:
 
     async def _message_processor(self):
         """Main message processing loop"""
+        batch_size = config_manager.config.stream_batch_size
         try:
             while True:
                 try:
-                    # Get message with timeout
-                    message = await asyncio.wait_for(
-                        self.message_queue.get(), timeout=1.0
-                    )
+                    batch = await self.message_lanes.get_batch(batch_size)
 
-                    await self._process_stream_message(message)
-                    self.statistics["messages_processed"] += 1
+                    for message, enqueued_at in batch:
+                        await self._process_stream_message(message)
+                        self.message_lanes.record_latency(
+                            message.priority, enqueued_at
+                        )
+                    self.statistics["messages_processed"] += len(batch)
+
+                    # Buffered aggregation input counts as processed here
+                    tokens = [m.ack_token for m, _ in batch if m.ack_token]
+                    if tokens:
+                        await self.transport.ack_many(tokens)
 
-                except asyncio.TimeoutError:
-                    continue
                 except Exception as e:
                     logger.error(f"Message processing error: {e!s}")
                     await asyncio.sleep(0.1)
@@ -466,65 +579,112 @@ class RealTimeStreamManager:
     async def _process_stream_message(self, message: StreamMessage):
         """Process individual stream message"""
         try:
+            # Latency-sensitive listeners see each raw update
+            for listener in self.stream_listeners.get(message.stream_type, ()):
+                try:
+                    await listener(message)
+                except Exception as e:
+                    logger.error(f"Stream listener failed: {e!s}")
+
+            # Critical updates skip the aggregation window entirely
+            if (
+                message.priority == UpdatePriority.CRITICAL
+                and config_manager.config.stream_critical_bypass_aggregation
+            ):
+                await self._process_aggregated_message(message)
+                return
+
             # Aggregate message if needed
             aggregated_message = await self.stream_aggregator.process_message(message)
 
             if aggregated_message is None:
-                return  # Message was buffered for aggregation
+                return  # Buffered; emitted when its aggregation window closes
 
-            # Check for prediction triggers
-            triggers = await self.prediction_trigger.evaluate_triggers(
-                aggregated_message
-            )
-
-            # Process triggers
-            for trigger in triggers:
-                asyncio.create_task(self._handle_prediction_trigger(trigger))
-
-            # Broadcast to subscribers
-            await self._broadcast_message(aggregated_message)
+            await self._process_aggregated_message(aggregated_message)
 
         except Exception as e:
             logger.error(f"Stream message processing failed: {e!s}")
 
-    async def _handle_prediction_trigger(self, trigger: Dict[str, Any]):
-        """Handle prediction trigger"""
+    async def _process_aggregated_message(self, message: StreamMessage):
+        """Trigger predictions for and broadcast one aggregated message"""
         try:
-            event_id = trigger["event_id"]
-            context = trigger["prediction_context"]
+            # Check for prediction triggers
+            triggers = await self.prediction_trigger.evaluate_triggers(message)
 
-            # Get latest features for this event
-            features = await self._get_event_features(event_id)
+            # Process triggers
+            for trigger in triggers:
+                self.prediction_batcher.submit(trigger)
 
-            if features:
-                # Generate new prediction
-                prediction = await ultra_ensemble_engine.predict(
-                    features=features, context=context
-                )
+            # Broadcast to subscribers
+            await self._broadcast_message(message)
 
-                # Broadcast prediction update
-                prediction_message = StreamMessage(
-                    id=str(uuid.uuid4()),
-                    stream_type=StreamType.PREDICTIONS,
-                    priority=trigger["priority"],
-                    data={
-                        "event_id": event_id,
-                        "prediction": prediction.predicted_value,
-                        "confidence": prediction.prediction_probability,
-                        "trigger_type": trigger["trigger_type"],
-                        "models_used": prediction.metadata.get("selected_models", []),
-                        "context": context.value,
-                    },
-                    timestamp=datetime.utcnow(),
-                    source="prediction_engine",
-                    event_id=event_id,
-                    metadata=trigger["metadata"],
+        except Exception as e:
+            logger.error(f"Aggregated message processing failed: {e!s}")
+
+    async def _predict_triggers(self, triggers: List[Dict[str, Any]]):
+        """Predict a coalesced batch of triggers and broadcast the results"""
+        # Latest features for each event, fetched when the batch runs
+        features = await asyncio.gather(
+            *(self._get_event_features(trigger["event_id"]) for trigger in triggers)
+        )
+        ready = [(t, f) for t, f in zip(triggers, features) if f]
+        if not ready:
+            return
+
+        predictions = await ultra_ensemble_engine.predict_many(
+            [(f, trigger["prediction_context"]) for trigger, f in ready]
+        )
+        for (trigger, _), prediction in zip(ready, predictions):
+            try:
+                if isinstance(prediction, Exception):
+                    raise prediction
+                await self._broadcast_message(
+                    self._prediction_message(trigger, prediction)
                 )
+            except Exception as e:
+                logger.error(f"Prediction trigger handling failed: {e!s}")
 
-                await self._broadcast_message(prediction_message)
-
-        except Exception as e:
-            logger.error(f"Prediction trigger handling failed: {e!s}")
+    def _prediction_message(
+        self, trigger: Dict[str, Any], prediction: Any
+    ) -> StreamMessage:
+        """Prediction update for subscribers"""
+        event_id = trigger["event_id"]
+        context = trigger["prediction_context"]
+        return StreamMessage(
+            id=str(uuid.uuid4()),
+            stream_type=StreamType.PREDICTIONS,
+            priority=trigger["priority"],
+            data={
+                "event_id": event_id,
+                "prediction": prediction.predicted_value,
+                "confidence": prediction.prediction_probability,
+                "trigger_type": trigger["trigger_type"],
+                "models_used": prediction.metadata.get("selected_models", []),
+                "context": context.value,
+            },
+            timestamp=datetime.utcnow(),
+            source="prediction_engine",
+            event_id=event_id,
+            metadata=trigger["metadata"],
+        )
+
+    async def load_prediction(self, key: str) -> Optional[Dict[str, Any]]:
+        """Pre-game prediction for a ``prediction:<event_id>`` cache key"""
+        event_id = key.partition(":")[2]
+        features = await self._get_event_features(event_id)
+        if not event_id or not features:
+            return None
+        prediction = await ultra_ensemble_engine.predict(
+            features, PredictionContext.PRE_GAME
+        )
+        return {
+            "event_id": event_id,
+            "prediction": prediction.predicted_value,
+            "confidence": prediction.prediction_probability,
+            "models_used": prediction.metadata.get("selected_models", []),
+            "context": PredictionContext.PRE_GAME.value,
+            "timestamp": datetime.utcnow().isoformat(),
+        }
 
     async def _get_event_features(self, event_id: str) -> Optional[Dict[str, float]]:
         """Get latest features for an event"""
@@ -544,92 +704,82 @@ class RealTimeStreamManager:
             return None
 
     async def _broadcast_message(self, message: StreamMessage):
-        """Broadcast message to relevant subscribers"""
+        """Broadcast processed output here and, when partitioned, on other nodes"""
+        await self._broadcast_locally(message)
+        if not self.transport:
+            return
         try:
-            broadcast_count = 0
-
-            for subscriber_id, subscription in self.subscribers.items():
-                try:
-                    # Check if subscriber is interested in this stream type
-                    if message.stream_type not in subscription.stream_types:
-                        continue
-
-                    # Apply filters
-                    if not self._message_matches_filters(message, subscription.filters):
-                        continue
-
-                    # Send message
-                    if subscription.websocket:
-                        await self._send_websocket_message(
-                            subscription.websocket, message
-                        )
-                    elif subscription.callback:
-                        await subscription.callback(message)
-
-                    subscription.message_count += 1
-                    subscription.last_activity = datetime.utcnow()
-                    broadcast_count += 1
-
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to send message to subscriber {subscriber_id}: {e!s}"
-                    )
-                    # Mark subscription for removal
-                    self._mark_subscription_for_removal(subscriber_id)
-
-            self.statistics["messages_sent"] += broadcast_count
-
+            await self.redis_client.publish(
+                config_manager.config.stream_broadcast_channel,
+                _serialize_message(message, origin=self.instance_id),
+            )
         except Exception as e:
-            logger.error(f"Message broadcast failed: {e!s}")
+            logger.error(f"Message relay to other nodes failed: {e!s}")
 
-    def _message_matches_filters(
-        self, message: StreamMessage, filters: Dict[str, Any]
-    ) -> bool:
-        """Check if message matches subscription filters"""
+    async def _broadcast_locally(self, message: StreamMessage):
+        """Queue message for the subscribers whose index keys match it"""
         try:
-            for filter_key, filter_value in filters.items():
-                if filter_key == "event_ids":
-                    if message.event_id not in filter_value:
-                        return False
-                elif filter_key == "priority":
-                    if message.priority.value not in filter_value:
-                        return False
-                elif filter_key == "sources":
-                    if message.source not in filter_value:
-                        return False
-                # Add more filter types as needed
-
-            return True
+            key = self._state_key(message)
+            if key is not None:
+                self.delta_tracker.observe(key, message)
+            self.statistics["messages_sent"] += self.fanout.publish(message)
 
         except Exception as e:
-            logger.warning(f"Filter matching failed: {e!s}")
-            return True  # Default to allowing message
+            logger.error(f"Message broadcast failed: {e!s}")
 
-    async def _send_websocket_message(self, websocket, message: StreamMessage):
-        """Send message via WebSocket"""
+    async def _deliver(self, subscription: StreamSubscription, message: StreamMessage):
+        """Send one queued message; runs on the subscriber's drain task"""
+        if subscription.websocket:
+            await self._send_websocket_message(subscription, message)
+        elif subscription.callback:
+            await subscription.callback(message)
+
+        subscription.message_count += 1
+        subscription.last_activity = datetime.utcnow()
+
+    def _coalesce_key(self, message: StreamMessage) -> Any:
+        """Pending messages with the same key are superseded by the newest"""
+        rule = self.stream_aggregator.aggregation_rules.get(message.stream_type)
+        if rule:
+            return message.stream_type, rule["dedup_key"](message)
+        return message.stream_type, message.event_id
+
+    def _state_key(self, message: StreamMessage) -> Optional[str]:
+        """Key whose latest data delta subscribers hold, if the stream has one"""
+        if message.stream_type.value not in config_manager.config.stream_delta_streams:
+            return None
+        stream_type, identity = self._coalesce_key(message)
+        return None if identity is None else f"{stream_type.value}:{identity}"
+
+    async def _on_subscriber_closed(self, subscriber_id: str, reason: str):
+        queue = self.fanout.queues.get(subscriber_id)
+        if queue is None or queue.closed:
+            logger.info(f"Closing subscriber {subscriber_id}: {reason}")
+            await self.unsubscribe(subscriber_id)
+
+    async def _send_websocket_message(
+        self, subscription: StreamSubscription, message: StreamMessage
+    ):
+        """Send the shared encoding of message with this subscriber's sequence"""
         try:
-            message_data = {
-                "id": message.id,
-                "type": message.stream_type.value,
-                "priority": message.priority.value,
-                "data": message.data,
-                "timestamp": message.timestamp.isoformat(),
-                "source": message.source,
-                "event_id": message.event_id,
-                "metadata": message.metadata,
-            }
-
-            await websocket.send(json.dumps(message_data))
+            view = None
+            update = message.state_update
+            if subscription.protocol == StreamProtocol.DELTA and update is not None:
+                view = self.delta_tracker.view_for(subscription.versions, update)
+                if view is None:
+                    return  # Already holds this version or a newer one
+            frame = self.encoder.frame(
+                message,
+                subscription.encoding,
+                {"seq": subscription.message_count + 1},
+                view=view,
+            )
+            await subscription.websocket.send(frame)
 
         except Exception as e:
             logger.warning(f"WebSocket send failed: {e!s}")
             raise
 
-    def _mark_subscription_for_removal(self, subscriber_id: str):
-        """Mark subscription for removal (cleanup task will handle it)"""
-        if subscriber_id in self.subscribers:
-            self.subscribers[subscriber_id].last_activity = datetime.min
-
     async def _heartbeat_monitor(self):
         """Monitor subscriber heartbeats and connection health"""
         try:
@@ -660,7 +810,7 @@ class RealTimeStreamManager:
                 await asyncio.sleep(60)  # Update every minute
 
                 self.statistics["active_subscribers"] = len(self.subscribers)
-                self.statistics["queue_size"] = self.message_queue.qsize()
+                self.statistics["queue_size"] = self.message_lanes.qsize()
                 self.statistics["uptime_seconds"] = (
                     datetime.utcnow() - self.statistics["uptime_start"]
                 ).total_seconds()
@@ -671,33 +821,6 @@ class RealTimeStreamManager:
         except Exception as e:
             logger.error(f"Statistics updater error: {e!s}")
 
-    async def _cleanup_task(self):
-        """Periodic cleanup of resources"""
-        try:
-            while True:
-                await asyncio.sleep(300)  # Cleanup every 5 minutes
-
-                # Cleanup expired messages in aggregator
-                current_time = datetime.utcnow()
-
-                for key, messages in list(
-                    self.stream_aggregator.message_buffer.items()
-                ):
-                    # Remove messages older than 1 hour
-                    while (
-                        messages
-                        and (current_time - messages[0].timestamp).total_seconds()
-                        > 3600
-                    ):
-                        messages.popleft()
-
-                    # Remove empty buffers
-                    if not messages:
-                        del self.stream_aggregator.message_buffer[key]
-
-        except Exception as e:
-            logger.error(f"Cleanup task error: {e!s}")
-
     async def subscribe(
         self,
         subscriber_id: str,
@@ -705,6 +828,10 @@ class RealTimeStreamManager:
         filters: Optional[Dict[str, Any]] = None,
         websocket: Optional[Any] = None,
         callback: Optional[Callable] = None,
+        slow_consumer_policy: Optional[SlowConsumerPolicy] = None,
+        queue_size: Optional[int] = None,
+        encoding: Optional[str] = None,
+        protocol: Optional[str] = None,
     ) -> bool:
         """Subscribe to real-time streams"""
         try:
@@ -717,9 +844,21 @@ class RealTimeStreamManager:
                 filters=filters or {},
                 websocket=websocket,
                 callback=callback,
+                encoding=negotiate_encoding(encoding),
+                protocol=StreamProtocol(protocol or StreamProtocol.FULL),
             )
 
             self.subscribers[subscriber_id] = subscription
+            self.fanout.add(
+                subscriber_id,
+                subscription.stream_types,
+                subscription.filters,
+                functools.partial(self._deliver, subscription),
+                policy=slow_consumer_policy,
+                queue_size=queue_size,
+            )
+            if subscription.protocol == StreamProtocol.DELTA:
+                self._offer_current_state(subscriber_id)
 
             if websocket:
                 self.websocket_connections.add(websocket)
@@ -743,6 +882,7 @@ class RealTimeStreamManager:
                 ):
                     self.websocket_connections.remove(subscription.websocket)
 
+                self.fanout.remove(subscriber_id)
                 del self.subscribers[subscriber_id]
                 logger.info(f"Unsubscribed: {subscriber_id}")
                 return True
@@ -753,27 +893,64 @@ class RealTimeStreamManager:
             logger.error(f"Unsubscribe failed: {e!s}")
             return False
 
+    def request_resync(self, subscriber_id: str, key: Optional[str] = None) -> int:
+        """Queue fresh snapshots of one or all held state keys; returns how many"""
+        subscription = self.subscribers.get(subscriber_id)
+        queue = self.fanout.queues.get(subscriber_id)
+        if subscription is None or queue is None:
+            return 0
+
+        keys = [key] if key is not None else list(subscription.versions)
+        resent = 0
+        for state_key in keys:
+            latest = self.delta_tracker.latest(state_key)
+            if latest is None:
+                subscription.versions.pop(state_key, None)
+                continue
+            # Below any real version: the next frame for the key is a snapshot
+            subscription.versions[state_key] = -1
+            resent += queue.offer(latest)
+        return resent
+
+    def _offer_current_state(self, subscriber_id: str) -> int:
+        """Queue a snapshot of every state key a new delta subscriber matches"""
+        queue = self.fanout.queues[subscriber_id]
+        latest = [
+            message
+            for message in self.delta_tracker.messages()
+            if subscriber_id in self.fanout.index.match(message)
+        ]
+        # Keep the most recently updated keys when they do not all fit
+        return sum(queue.offer(message) for message in latest[-queue.maxsize :])
+
+    def add_stream_listener(self, stream_type: StreamType, listener: Callable):
+        """Call ``await listener(message)`` for every message of a stream type"""
+        self.stream_listeners[stream_type].append(listener)
+
+    async def broadcast(self, message: StreamMessage):
+        """Deliver a locally derived message to this instance's subscribers"""
+        await self._broadcast_locally(message)
+
     async def publish_message(self, message: StreamMessage):
         """Publish message to the stream"""
         try:
+            # Partitioned mode: the partition owner processes it once and relays
+            # the output to subscribers on every node
+            if self.transport:
+                await self.transport.publish(
+                    message.event_id or message.id, _serialize_message(message)
+                )
+                return
+
             # Add to local queue
-            await self.message_queue.put(message)
+            await self.message_lanes.put(message)
 
             # Publish to Redis for other instances
             if self.redis_client:
                 channel = f"stream:{message.stream_type.value}"
-                message_data = {
-                    "id": message.id,
-                    "stream_type": message.stream_type.value,
-                    "priority": message.priority.value,
-                    "data": message.data,
-                    "timestamp": message.timestamp.isoformat(),
-                    "source": message.source,
-                    "event_id": message.event_id,
-                    "metadata": message.metadata,
-                }
-
-                await self.redis_client.publish(channel, json.dumps(message_data))
+                await self.redis_client.publish(
+                    channel, _serialize_message(message, origin=self.instance_id)
+                )
 
         except Exception as e:
             logger.error(f"Message publishing failed: {e!s}")
@@ -785,14 +962,23 @@ class RealTimeStreamManager:
                 "status": "healthy",
                 "statistics": self.statistics,
                 "active_subscribers": len(self.subscribers),
+                "fanout": self.fanout.get_stats(),
+                "encoder": self.encoder.get_stats(),
+                "delta": self.delta_tracker.get_stats(),
                 "websocket_connections": len(self.websocket_connections),
-                "message_queue_size": self.message_queue.qsize(),
+                "message_queue_size": self.message_lanes.qsize(),
+                "message_lanes": self.message_lanes.get_stats(),
                 "processing_tasks": len(
                     [t for t in self.processing_tasks if not t.done()]
                 ),
                 "redis_connected": self.redis_client is not None,
-                "aggregator_buffers": len(self.stream_aggregator.message_buffer),
+                "transport": (
+                    self.transport.get_stats() if self.transport else "pubsub"
+                ),
+                "aggregator_buffers": len(self.stream_aggregator.windows),
+                "aggregation": self.stream_aggregator.windows.get_stats(),
                 "trigger_cooldowns": len(self.prediction_trigger.last_predictions),
+                "prediction_batching": self.prediction_batcher.get_stats(),
             }
 
         except Exception as e:
@@ -807,6 +993,9 @@ class RealTimeStreamManager:
             # Cancel processing tasks
             for task in self.processing_tasks:
                 task.cancel()
+            self.fanout.close()
+            if self.transport:
+                await self.transport.stop()
 
             # Close WebSocket connections
             for websocket in list(self.websocket_connections):
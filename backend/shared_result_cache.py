@@ -0,0 +1,392 @@
+"""Shared-Memory Result Cache
+Host-wide L0 tier: an open-addressing hash table in an mmap'd file shared by workers
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# File layout: a 64 byte header followed by slot_count fixed-size slots. Each slot
+# starts with a 32 byte header (sequence, state, key hash, expiry, key length,
+# value length) and holds the UTF-8 key followed by the value bytes.
+FILE_MAGIC = 0xA1CAC4E0
+LAYOUT_VERSION = 1
+FILE_HEADER_SIZE = 64
+SLOT_HEADER_SIZE = 32
+_FILE_HEADER = struct.Struct("<IIII")
+_SLOT_HEADER = struct.Struct("<IIQdHI")
+_SEQUENCE = struct.Struct("<I")
+_STATE = struct.Struct("<I")
+
+_EMPTY = 0
+_LIVE = 1
+_TOMBSTONE = 2
+
+
+@dataclass
+class SharedCacheMetrics:
+    """Per-process shared-memory cache metrics"""
+
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    oversize_rejections: int = 0
+    evictions: int = 0
+    read_retries: int = 0
+
+
+def default_shared_cache_path(name: str, directory: Optional[str] = None) -> str:
+    """Backing file for a named table, on tmpfs (/dev/shm) when available"""
+    if directory is None:
+        directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(directory, f"a1betting-{name}.l0")
+
+
+def _hash_key(key: bytes) -> int:
+    """64-bit key hash that is stable across processes (unlike hash())"""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class SharedResultCache:
+    """Fixed-slot hash table in shared memory, readable by every local worker.
+
+    Keys hash to a slot and collide into the next ``max_probes`` slots (linear
+    probing). Reads never take a lock or make a syscall: each slot carries a
+    sequence number that writers make odd while they modify it, and a reader
+    retries when the sequence changed underneath it. Writers are serialized
+    with ``flock`` on the backing file. When every probed slot is live, the
+    entry closest to expiry is replaced, so the table never needs resizing.
+
+    Values are opaque bytes; the caller decides their layout.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        slot_count: int = 8192,
+        slot_size: int = 2048,
+        max_probes: int = 8,
+        max_read_retries: int = 16,
+    ):
+        if slot_size % 8 or slot_size <= SLOT_HEADER_SIZE:
+            raise ValueError(
+                f"slot_size must be a multiple of 8 larger than {SLOT_HEADER_SIZE}"
+            )
+        if slot_count <= 0:
+            raise ValueError("slot_count must be positive")
+
+        self.path = path
+        self.max_read_retries = max_read_retries
+        self.metrics = SharedCacheMetrics()
+        self._thread_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            with self._locked():
+                self.slot_count, self.slot_size = self._open_table(
+                    slot_count, slot_size
+                )
+                self._mm = mmap.mmap(self._fd, self.table_size)
+        except Exception:
+            os.close(self._fd)
+            raise
+
+        self.max_probes = min(max_probes, self.slot_count)
+        self.payload_capacity = self.slot_size - SLOT_HEADER_SIZE
+
+    @property
+    def table_size(self) -> int:
+        """Size of the backing file in bytes"""
+        return FILE_HEADER_SIZE + self.slot_count * self.slot_size
+
+    def _open_table(self, slot_count: int, slot_size: int) -> Tuple[int, int]:
+        """Attach to the existing table or initialize a new one (lock held)"""
+        existing = os.pread(self._fd, _FILE_HEADER.size, 0)
+        if len(existing) == _FILE_HEADER.size:
+            magic, version, file_slots, file_slot_size = _FILE_HEADER.unpack(existing)
+            expected = FILE_HEADER_SIZE + file_slots * file_slot_size
+            if (
+                magic == FILE_MAGIC
+                and version == LAYOUT_VERSION
+                and os.fstat(self._fd).st_size == expected
+            ):
+                if (file_slots, file_slot_size) != (slot_count, slot_size):
+                    logger.info(
+                        f"Attaching to existing shared cache {self.path} with "
+                        f"{file_slots} slots of {file_slot_size} bytes"
+                    )
+                return file_slots, file_slot_size
+
+        # New (or incompatible) file: zero-fill and write the header
+        os.ftruncate(self._fd, 0)
+        os.ftruncate(self._fd, FILE_HEADER_SIZE + slot_count * slot_size)
+        os.pwrite(
+            self._fd,
+            _FILE_HEADER.pack(FILE_MAGIC, LAYOUT_VERSION, slot_count, slot_size),
+            0,
+        )
+        return slot_count, slot_size
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Exclusive writer lock across threads and processes"""
+        with self._thread_lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _probe(self, key_hash: int) -> Iterator[int]:
+        """Byte offsets of the slots a key may occupy"""
+        index = key_hash % self.slot_count
+        for _ in range(self.max_probes):
+            yield FILE_HEADER_SIZE + index * self.slot_size
+            index += 1
+            if index == self.slot_count:
+                index = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the value stored for key, or None"""
+        key_bytes = key.encode("utf-8")
+        key_hash = _hash_key(key_bytes)
+        mm = self._mm
+
+        for offset in self._probe(key_hash):
+            for _ in range(self.max_read_retries):
+                sequence, state, slot_hash, expires_at, key_len, value_len = (
+                    _SLOT_HEADER.unpack_from(mm, offset)
+                )
+                if sequence & 1:  # Writer in progress
+                    self.metrics.read_retries += 1
+                    continue
+                if state == _EMPTY:
+                    self.metrics.misses += 1
+                    return None
+                if state != _LIVE or slot_hash != key_hash:
+                    break  # Next probe
+
+                start = offset + SLOT_HEADER_SIZE
+                stored_key = mm[start : start + key_len]
+                value = mm[start + key_len : start + key_len + value_len]
+                if _SEQUENCE.unpack_from(mm, offset)[0] != sequence:
+                    self.metrics.read_retries += 1
+                    continue  # Slot was rewritten while copying
+
+                if stored_key != key_bytes:
+                    break
+                if expires_at and expires_at <= time.time():
+                    self.metrics.misses += 1
+                    return None
+                self.metrics.hits += 1
+                return value
+            else:
+                # Slot kept changing; treat as a miss rather than spin
+                break
+
+        self.metrics.misses += 1
+        return None
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        """Store value for key; returns False when it does not fit in a slot"""
+        key_bytes = key.encode("utf-8")
+        if len(key_bytes) + len(value) > self.payload_capacity:
+            self.metrics.oversize_rejections += 1
+            return False
+
+        key_hash = _hash_key(key_bytes)
+        now = time.time()
+        expires_at = now + ttl if ttl else 0.0
+
+        with self._locked():
+            offset, evicting = self._slot_for_write(key_bytes, key_hash, now)
+            self._write_slot(offset, _LIVE, key_hash, expires_at, key_bytes, value)
+
+        self.metrics.sets += 1
+        if evicting:
+            self.metrics.evictions += 1
+        return True
+
+    def _slot_for_write(
+        self, key_bytes: bytes, key_hash: int, now: float
+    ) -> Tuple[int, bool]:
+        """Pick the slot for key: its current slot, a free one, or a victim"""
+        free_offset = None
+        victim_offset = None
+        victim_expiry = float("inf")
+
+        for offset in self._probe(key_hash):
+            _, state, slot_hash, expires_at, key_len, _ = _SLOT_HEADER.unpack_from(
+                self._mm, offset
+            )
+            if state == _LIVE:
+                if slot_hash == key_hash:
+                    start = offset + SLOT_HEADER_SIZE
+                    if self._mm[start : start + key_len] == key_bytes:
+                        return offset, False
+                expiry = expires_at or float("inf")
+                if expiry <= now:
+                    if free_offset is None:
+                        free_offset = offset
+                elif victim_offset is None or expiry < victim_expiry:
+                    victim_offset = offset
+                    victim_expiry = expiry
+                continue
+
+            if free_offset is None:
+                free_offset = offset
+            if state == _EMPTY:
+                break  # The key cannot live further along the chain
+
+        if free_offset is not None:
+            return free_offset, False
+        return victim_offset, True
+
+    def _write_slot(
+        self,
+        offset: int,
+        state: int,
+        key_hash: int,
+        expires_at: float,
+        key_bytes: bytes = b"",
+        value: bytes = b"",
+    ):
+        """Rewrite a slot, keeping its sequence odd while it is inconsistent"""
+        mm = self._mm
+        sequence = (_SEQUENCE.unpack_from(mm, offset)[0] + 1) & 0xFFFFFFFF
+        _SEQUENCE.pack_into(mm, offset, sequence)
+        _SLOT_HEADER.pack_into(
+            mm,
+            offset,
+            sequence,
+            state,
+            key_hash,
+            expires_at,
+            len(key_bytes),
+            len(value),
+        )
+        if key_bytes or value:
+            start = offset + SLOT_HEADER_SIZE
+            mm[start : start + len(key_bytes)] = key_bytes
+            mm[start + len(key_bytes) : start + len(key_bytes) + len(value)] = value
+        _SEQUENCE.pack_into(mm, offset, (sequence + 1) & 0xFFFFFFFF)
+
+    def delete(self, key: str) -> bool:
+        """Remove key; returns whether it was present"""
+        key_bytes = key.encode("utf-8")
+        key_hash = _hash_key(key_bytes)
+
+        with self._locked():
+            for offset in self._probe(key_hash):
+                _, state, slot_hash, _, key_len, _ = _SLOT_HEADER.unpack_from(
+                    self._mm, offset
+                )
+                if state == _EMPTY:
+                    return False
+                if state != _LIVE or slot_hash != key_hash:
+                    continue
+                start = offset + SLOT_HEADER_SIZE
+                if self._mm[start : start + key_len] == key_bytes:
+                    # Tombstone keeps later entries of the probe chain reachable
+                    self._write_slot(offset, _TOMBSTONE, 0, 0.0)
+                    return True
+        return False
+
+    def delete_pattern(self, pattern: str) -> int:
+        """Remove every key matching a glob pattern (full table scan)"""
+        deleted = 0
+        with self._locked():
+            for offset, key in self._live_slots():
+                if fnmatchcase(key, pattern):
+                    self._write_slot(offset, _TOMBSTONE, 0, 0.0)
+                    deleted += 1
+        return deleted
+
+    def clear(self):
+        """Remove every entry"""
+        with self._locked():
+            for index in range(self.slot_count):
+                offset = FILE_HEADER_SIZE + index * self.slot_size
+                if _STATE.unpack_from(self._mm, offset + 4)[0] != _EMPTY:
+                    self._write_slot(offset, _EMPTY, 0, 0.0)
+
+    def _live_slots(self) -> Iterator[Tuple[int, str]]:
+        """Offsets and keys of live slots (call with the writer lock held)"""
+        for index in range(self.slot_count):
+            offset = FILE_HEADER_SIZE + index * self.slot_size
+            _, state, _, _, key_len, _ = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if state == _LIVE:
+                start = offset + SLOT_HEADER_SIZE
+                yield offset, self._mm[start : start + key_len].decode(
+                    "utf-8", "replace"
+                )
+
+    def close(self):
+        """Detach from the table; the file stays for other workers"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            os.close(self._fd)
+
+    def unlink(self):
+        """Detach and remove the backing file"""
+        self.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get table occupancy and this process's hit statistics"""
+        now = time.time()
+        live = tombstones = expired = 0
+        for index in range(self.slot_count):
+            offset = FILE_HEADER_SIZE + index * self.slot_size
+            _, state, _, expires_at, _, _ = _SLOT_HEADER.unpack_from(self._mm, offset)
+            if state == _LIVE:
+                if expires_at and expires_at <= now:
+                    expired += 1
+                else:
+                    live += 1
+            elif state == _TOMBSTONE:
+                tombstones += 1
+
+        lookups = self.metrics.hits + self.metrics.misses
+        return {
+            "path": self.path,
+            "slot_count": self.slot_count,
+            "slot_size": self.slot_size,
+            "table_size_mb": self.table_size / (1024 * 1024),
+            "live_entries": live,
+            "expired_entries": expired,
+            "tombstones": tombstones,
+            "load_factor": live / self.slot_count,
+            "hits": self.metrics.hits,
+            "misses": self.metrics.misses,
+            "hit_rate": self.metrics.hits / lookups if lookups else 0,
+            "sets": self.metrics.sets,
+            "oversize_rejections": self.metrics.oversize_rejections,
+            "evictions": self.metrics.evictions,
+            "read_retries": self.metrics.read_retries,
+        }
@@ -0,0 +1,215 @@
+"""Timer-driven Stream Aggregation
+Hashed timing wheel that flushes each aggregation window exactly when it closes
+"""
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+logger = logging.getLogger(__name__)
+
+
+class TimingWheel:
+    """Hashed timing wheel with O(1) schedule and cancel.
+
+    Deadlines are rounded up to the next tick, so a key never expires early
+    and expires at most one tick late. Each slot maps keys to their absolute
+    tick; deadlines further out than one revolution stay in their slot until
+    the wheel reaches that tick.
+    """
+
+    def __init__(self, tick: float = 0.01, slots: int = 512, start: float = 0.0):
+        self.tick = tick
+        self._slots: List[Dict[Hashable, int]] = [{} for _ in range(slots)]
+        self._ticks: Dict[Hashable, int] = {}
+        self._current = math.floor(start / tick)
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._ticks
+
+    def schedule(self, key: Hashable, deadline: float):
+        """Expire ``key`` at ``deadline`` (same clock as ``advance``)"""
+        self.cancel(key)
+        due = max(math.ceil(deadline / self.tick - 1e-9), self._current + 1)
+        self._slots[due % len(self._slots)][key] = due
+        self._ticks[key] = due
+
+    def cancel(self, key: Hashable):
+        due = self._ticks.pop(key, None)
+        if due is not None:
+            del self._slots[due % len(self._slots)][key]
+
+    def advance(self, now: float) -> List[Hashable]:
+        """Keys whose deadline is at or before ``now``, in deadline order"""
+        target = math.floor(now / self.tick + 1e-9)
+        expired = []
+        # A gap longer than one revolution still visits each slot only once
+        first = max(self._current + 1, target - len(self._slots) + 1)
+        for tick in range(first, target + 1):
+            slot = self._slots[tick % len(self._slots)]
+            if not slot:
+                continue
+            due_keys = sorted(
+                (due, index, key)
+                for index, (key, due) in enumerate(slot.items())
+                if due <= target
+            )
+            for _, _, key in due_keys:
+                del slot[key]
+                del self._ticks[key]
+                expired.append(key)
+        self._current = max(self._current, target)
+        return expired
+
+
+@dataclass
+class AggregationStats:
+    """Per-group aggregation metrics"""
+
+    messages_in: int = 0
+    messages_out: int = 0
+    overflow_flushes: int = 0
+    added_latency_ms_total: float = 0.0  # Summed over every buffered message
+    added_latency_ms_max: float = 0.0
+    flush_lag_ms_max: float = 0.0  # Flush time past the window's close
+
+
+class _Window:
+    __slots__ = ("group", "messages", "opened", "closes", "arrival_sum")
+
+    def __init__(self, group: Any, opened: float, closes: float):
+        self.group = group
+        self.messages: List[Any] = []
+        self.opened = opened
+        self.closes = closes
+        self.arrival_sum = 0.0
+
+
+class WindowedAggregator:
+    """Buffers messages per key and flushes each key when its window closes.
+
+    A key's window opens with its first message and closes ``window``
+    seconds later, when the buffered messages are handed to ``flush`` as one
+    list. Windows are driven by a timing wheel rather than by the next
+    message, so the last update for a key is never stranded. Closed windows
+    are dropped, so idle keys hold no memory, and a window that reaches
+    ``max_messages`` is flushed early.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Any, List[Any]], Awaitable[None]],
+        tick: float = 0.01,
+        slots: int = 512,
+        max_messages: int = 100,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.flush = flush
+        self.max_messages = max_messages
+        self.clock = clock
+        self.wheel = TimingWheel(tick, slots, start=clock())
+        self.windows: Dict[Hashable, _Window] = {}
+        self.stats: Dict[Any, AggregationStats] = {}
+        self._pending = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    async def add(self, key: Hashable, message: Any, window: float, group: Any = None):
+        """Buffer ``message`` in the window of ``key``"""
+        now = self.clock()
+        stats = self.stats.setdefault(group, AggregationStats())
+        stats.messages_in += 1
+
+        current = self.windows.get(key)
+        if current is None:
+            current = self.windows[key] = _Window(group, now, now + window)
+            self.wheel.schedule(key, current.closes)
+            self._pending.set()
+        current.messages.append(message)
+        current.arrival_sum += now
+
+        if len(current.messages) >= self.max_messages:
+            stats.overflow_flushes += 1
+            self.wheel.cancel(key)
+            await self._close(key, now)
+
+    async def flush_due(self) -> int:
+        """Flush every window that has closed; returns how many"""
+        now = self.clock()
+        expired = self.wheel.advance(now)
+        for key in expired:
+            await self._close(key, now)
+        return len(expired)
+
+    async def flush_all(self) -> int:
+        """Flush every open window now"""
+        now = self.clock()
+        keys = list(self.windows)
+        for key in keys:
+            self.wheel.cancel(key)
+            await self._close(key, now)
+        return len(keys)
+
+    async def run(self):
+        """Flush windows as they close; idles while nothing is buffered"""
+        try:
+            while True:
+                if not self.windows:
+                    self._pending.clear()
+                    await self._pending.wait()
+                await asyncio.sleep(self.wheel.tick)
+                await self.flush_due()
+        except asyncio.CancelledError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Aggregation ratio and added latency per group"""
+        groups = {}
+        for group, stats in self.stats.items():
+            name = getattr(group, "value", group)
+            groups[str(name)] = {
+                "messages_in": stats.messages_in,
+                "messages_out": stats.messages_out,
+                "aggregation_ratio": (
+                    stats.messages_in / stats.messages_out if stats.messages_out else 0
+                ),
+                "overflow_flushes": stats.overflow_flushes,
+                "avg_added_latency_ms": (
+                    stats.added_latency_ms_total / stats.messages_in
+                    if stats.messages_in
+                    else 0.0
+                ),
+                "max_added_latency_ms": stats.added_latency_ms_max,
+                "max_flush_lag_ms": stats.flush_lag_ms_max,
+            }
+        return {
+            "open_windows": len(self.windows),
+            "buffered_messages": sum(len(w.messages) for w in self.windows.values()),
+            "groups": groups,
+        }
+
+    async def _close(self, key: Hashable, now: float):
+        window = self.windows.pop(key, None)
+        if window is None:
+            return
+        stats = self.stats[window.group]
+        count = len(window.messages)
+        stats.messages_out += 1
+        stats.added_latency_ms_total += (count * now - window.arrival_sum) * 1000
+        stats.added_latency_ms_max = max(
+            stats.added_latency_ms_max, (now - window.opened) * 1000
+        )
+        stats.flush_lag_ms_max = max(
+            stats.flush_lag_ms_max, max(0.0, now - window.closes) * 1000
+        )
+        try:
+            await self.flush(window.group, window.messages)
+        except Exception as e:
+            logger.error(f"Aggregation flush failed: {e!s}")
@@ -0,0 +1,701 @@
+"""Real-time Stream Benchmark and Load Generator
+Drive RealTimeStreamManager with synthetic or recorded feeds and simulated subscribers
+
+Examples:
+    python stream_benchmark.py --feed odds scores --rate 2000 --messages 20000
+    python stream_benchmark.py --transport streams --subscribers 2000 --send-ms 1
+    python stream_benchmark.py --trace feed.jsonl --realtime --output stream.json
+    python stream_benchmark.py --baseline stream.json --tolerance 0.1  # CI gate
+
+Trace files hold one message per line in the Redis wire format, such as
+``{"stream_type": "betting_odds", "priority": "high", "event_id": "e1",
+"data": {"odds": 1.95, "sportsbook": "b1"}, "t": 0.25}`` where ``t`` is the
+offset in seconds (used with --realtime).
+
+Latency is measured per priority from ``publish_message`` until the frame
+reaches a subscriber socket, so it includes the transport, lane wait,
+aggregation windows and per-subscriber queues. Prediction updates derived
+from the feed are counted but carry no publish time of their own.
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import platform
+import resource
+import sys
+import time
+from array import array
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from cache_benchmark import zipfian_indices
+from config import config_manager
+from local_redis import LocalRedis
+from realtime_engine import (
+    RealTimeStreamManager,
+    StreamMessage,
+    StreamType,
+    UpdatePriority,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every frame starts with the message id (see stream_encoding.message_fields)
+_ID_PREFIX = '{"id":"'
+
+
+class FeedType(str, Enum):
+    """Synthetic feeds"""
+
+    ODDS = "odds"  # Price ticks from several books, high priority
+    SCORES = "scores"  # Live scores; goals are critical, the rest medium
+    MIXED = "mixed"  # Odds and scores plus player stats and social sentiment
+    TRACE = "trace"  # Replay of a recorded feed
+
+
+class Transport(str, Enum):
+    """How published messages reach the processing loop"""
+
+    PUBSUB = "pubsub"
+    STREAMS = "streams"
+
+
+@dataclass
+class FeedMessage:
+    """One message of a feed, in the Redis wire format"""
+
+    fields: Dict[str, Any]
+    at: Optional[float] = None  # Offset in seconds from the start of the feed
+
+
+@dataclass
+class FeedConfig:
+    """Feed shape and pacing"""
+
+    feed: FeedType = FeedType.MIXED
+    messages: int = 10_000
+    rate: float = 0.0  # Messages per second; 0 publishes flat out
+    events: int = 200
+    sportsbooks: int = 5
+    zipf_exponent: float = 1.1
+    goal_probability: float = 0.05
+    seed: int = 42
+    trace_path: Optional[str] = None
+    realtime: bool = False  # Honor trace offsets instead of rate
+
+
+@dataclass
+class ManagerConfig:
+    """Stream manager and subscriber settings being tuned"""
+
+    transport: Transport = Transport.PUBSUB
+    subscribers: int = 200
+    filtered_fraction: float = 0.8  # The rest receive every event
+    events_per_subscriber: int = 3
+    send_ms: float = 0.0  # Simulated socket write time per frame
+    redis_latency_ms: float = 0.0
+    buffer_scale: float = 1.0  # Multiplies every aggregation window
+    predict_ms: float = 5.0  # Simulated model time per prediction batch
+    drain_timeout: float = 30.0
+
+
+@dataclass
+class StreamBenchmarkResult:
+    """Machine-readable outcome of one feed/manager run"""
+
+    name: str
+    feed: str
+    transport: str
+    messages: int
+    subscribers: int
+    duration_seconds: float
+    publish_rate: float
+    throughput_messages: float
+    deliveries: int
+    deliveries_per_second: float
+    derived_deliveries: int
+    cpu_us_per_message: float
+    latency_ms: Dict[str, Dict[str, float]]
+    memory: Dict[str, float]
+    pipeline: Dict[str, Any]
+    feed_config: Dict[str, Any] = field(default_factory=dict)
+    manager_config: Dict[str, Any] = field(default_factory=dict)
+
+
+def event_name(index: int) -> str:
+    """Event id for the index-th synthetic event"""
+    return f"event-{index}"
+
+
+def load_trace(path: str) -> List[FeedMessage]:
+    """Read a JSON-lines feed recording"""
+    messages = []
+    with open(path, encoding="utf-8") as trace:
+        for line in trace:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            record = json.loads(line)
+            at = record.pop("t", None)
+            messages.append(FeedMessage(record, at=at))
+    return messages
+
+
+def _odds(rng: np.random.Generator, event: str, sportsbooks: int) -> Dict[str, Any]:
+    sportsbook = f"book-{rng.integers(sportsbooks)}"
+    return {
+        "stream_type": StreamType.BETTING_ODDS.value,
+        "priority": UpdatePriority.HIGH.value,
+        "event_id": event,
+        "source": sportsbook,
+        "data": {
+            "market_type": "h2h",
+            "sportsbook": sportsbook,
+            "odds": round(float(rng.uniform(1.5, 3.5)), 2),
+            "odds_change": round(float(rng.normal(0, 0.08)), 3),
+        },
+    }
+
+
+def _score(
+    rng: np.random.Generator,
+    event: str,
+    scores: Dict[str, List[int]],
+    goal_probability: float,
+) -> Dict[str, Any]:
+    state = scores.setdefault(event, [0, 0, 1])  # home, away, period
+    goal = bool(rng.random() < goal_probability)
+    if goal:
+        state[int(rng.integers(2))] += 1
+    elif rng.random() < 0.01:
+        state[2] += 1
+    return {
+        "stream_type": StreamType.LIVE_SCORES.value,
+        "priority": (UpdatePriority.CRITICAL if goal else UpdatePriority.MEDIUM).value,
+        "event_id": event,
+        "source": "scores",
+        "data": {
+            "home_score": state[0],
+            "away_score": state[1],
+            "period": state[2],
+            "score_change": int(goal),
+        },
+    }
+
+
+def _player(rng: np.random.Generator, event: str) -> Dict[str, Any]:
+    return {
+        "stream_type": StreamType.PLAYER_UPDATES.value,
+        "priority": UpdatePriority.MEDIUM.value,
+        "event_id": event,
+        "source": "stats",
+        "data": {
+            "player_id": f"{event}-player-{rng.integers(20)}",
+            "stat_type": str(rng.choice(["points", "rebounds", "assists"])),
+            "value": 1,
+        },
+    }
+
+
+def _sentiment(rng: np.random.Generator, event: str) -> Dict[str, Any]:
+    return {
+        "stream_type": StreamType.SOCIAL_SENTIMENT.value,
+        "priority": UpdatePriority.LOW.value,
+        "event_id": event,
+        "source": "social",
+        "data": {
+            "sentiment": round(float(rng.uniform(-1, 1)), 3),
+            "mentions": int(rng.integers(1, 500)),
+        },
+    }
+
+
+def build_feed(config: FeedConfig) -> List[FeedMessage]:
+    """Generate the messages of a feed"""
+    if config.feed == FeedType.TRACE:
+        if not config.trace_path:
+            raise ValueError("Trace feed requires trace_path")
+        return load_trace(config.trace_path)
+
+    rng = np.random.default_rng(config.seed)
+    events = zipfian_indices(
+        rng, config.messages, config.events, config.zipf_exponent
+    ).tolist()
+    scores: Dict[str, List[int]] = {}
+    feed = []
+    for index in events:
+        event = event_name(index)
+        if config.feed == FeedType.ODDS:
+            kind = "odds"
+        elif config.feed == FeedType.SCORES:
+            kind = "scores"
+        else:
+            kind = rng.choice(
+                ["odds", "scores", "player", "sentiment"], p=[0.6, 0.2, 0.1, 0.1]
+            )
+        if kind == "odds":
+            fields = _odds(rng, event, config.sportsbooks)
+        elif kind == "scores":
+            fields = _score(rng, event, scores, config.goal_probability)
+        elif kind == "player":
+            fields = _player(rng, event)
+        else:
+            fields = _sentiment(rng, event)
+        feed.append(FeedMessage(fields))
+    return feed
+
+
+def _latency_stats(seconds: array) -> Dict[str, float]:
+    if not len(seconds):
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    millis = np.frombuffer(seconds, dtype=np.float64) * 1000
+    p50, p95, p99 = np.percentile(millis, [50, 95, 99])
+    return {
+        "count": len(millis),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(millis.max()),
+    }
+
+
+def _rss_mb() -> float:
+    """Resident set size; peak RSS when psutil is unavailable"""
+    if psutil is not None:
+        return psutil.Process(os.getpid()).memory_info().rss / 2**20
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+class LatencyRecorder:
+    """Publish times by message id and per-priority delivery latencies"""
+
+    def __init__(self):
+        self.published_at: Dict[str, Tuple[float, str]] = {}
+        self.samples: Dict[str, array] = {
+            priority.value: array("d") for priority in UpdatePriority
+        }
+        self.deliveries = 0
+        self.derived = 0  # Frames for messages the feed did not publish
+
+    def published(self, message_id: str, priority: str):
+        self.published_at[message_id] = (time.perf_counter(), priority)
+
+    def received(self, frame: Any):
+        now = time.perf_counter()
+        self.deliveries += 1
+        if isinstance(frame, bytes):
+            frame = frame.decode("utf-8", "replace")
+        if not frame.startswith(_ID_PREFIX):
+            self.derived += 1
+            return
+        end = frame.find('"', len(_ID_PREFIX))
+        sent = self.published_at.get(frame[len(_ID_PREFIX) : end])
+        if sent is None:
+            self.derived += 1
+            return
+        self.samples[sent[1]].append(now - sent[0])
+
+    def latency_ms(self) -> Dict[str, Dict[str, float]]:
+        return {
+            priority: _latency_stats(samples)
+            for priority, samples in self.samples.items()
+        }
+
+    def sample_bytes(self) -> int:
+        return sum(samples.itemsize * len(samples) for samples in self.samples.values())
+
+
+class SimulatedSocket:
+    """WebSocket stand-in that timestamps every frame it is sent"""
+
+    def __init__(self, recorder: LatencyRecorder, send_ms: float = 0.0):
+        self.recorder = recorder
+        self.send_ms = send_ms
+        self.frames = 0
+        self.closed = False
+
+    async def send(self, frame: Any):
+        if self.send_ms:
+            await asyncio.sleep(self.send_ms / 1000)
+        self.frames += 1
+        self.recorder.received(frame)
+
+    async def close(self):
+        self.closed = True
+
+
+class StreamBenchmark:
+    """Run one feed through a stream manager with simulated subscribers"""
+
+    def __init__(self, feed: FeedConfig, manager: ManagerConfig):
+        self.feed = feed
+        self.manager = manager
+        self.recorder = LatencyRecorder()
+
+    @property
+    def name(self) -> str:
+        return (
+            f"{self.feed.feed.value}/{self.manager.transport.value}"
+            f"/{self.manager.subscribers}"
+        )
+
+    async def run(self) -> StreamBenchmarkResult:
+        feed = build_feed(self.feed)
+        config = config_manager.config
+        overrides = {
+            "stream_transport": self.manager.transport.value,
+            "stream_consumer_name": "stream-benchmark",
+        }
+        saved = {name: getattr(config, name) for name in overrides}
+        for name, value in overrides.items():
+            setattr(config, name, value)
+        try:
+            manager = RealTimeStreamManager()
+            for rule in manager.stream_aggregator.aggregation_rules.values():
+                rule["buffer_time"] *= self.manager.buffer_scale
+            manager.prediction_batcher.predict_batch = functools.partial(
+                self._simulated_predictions, manager
+            )
+            await manager.initialize(
+                redis_client=LocalRedis(latency_ms=self.manager.redis_latency_ms)
+            )
+            try:
+                await self._subscribe(manager, feed)
+                rss_start = _rss_mb()
+                cpu_start = time.process_time()
+                started = time.perf_counter()
+                await self._publish(manager, feed)
+                published_in = time.perf_counter() - started
+                await self._drain(manager, len(feed))
+                duration = time.perf_counter() - started
+                cpu = time.process_time() - cpu_start
+                rss_end = _rss_mb()
+                health = await manager.get_stream_health()
+            finally:
+                await manager.shutdown()
+        finally:
+            for name, value in saved.items():
+                setattr(config, name, value)
+
+        count = len(feed)
+        return StreamBenchmarkResult(
+            name=self.name,
+            feed=self.feed.feed.value,
+            transport=self.manager.transport.value,
+            messages=count,
+            subscribers=self.manager.subscribers,
+            duration_seconds=duration,
+            publish_rate=count / published_in if published_in else 0.0,
+            throughput_messages=count / duration if duration else 0.0,
+            deliveries=self.recorder.deliveries,
+            deliveries_per_second=(
+                self.recorder.deliveries / duration if duration else 0.0
+            ),
+            derived_deliveries=self.recorder.derived,
+            cpu_us_per_message=cpu / count * 1e6 if count else 0.0,
+            latency_ms=self.recorder.latency_ms(),
+            memory={
+                "rss_start_mb": rss_start,
+                "rss_end_mb": rss_end,
+                "rss_growth_mb": rss_end - rss_start,
+                "latency_samples_mb": self.recorder.sample_bytes() / 2**20,
+            },
+            pipeline=self._pipeline_stats(manager, health),
+            feed_config=_config_dict(self.feed),
+            manager_config=_config_dict(self.manager),
+        )
+
+    async def _subscribe(self, manager: RealTimeStreamManager, feed: List[FeedMessage]):
+        """Half-filtered subscriber population over the feed's streams and events"""
+        rng = np.random.default_rng(self.feed.seed + 1)
+        stream_types = sorted(
+            {StreamType(item.fields["stream_type"]) for item in feed}
+            | {StreamType.PREDICTIONS}
+        )
+        events = sorted({item.fields.get("event_id") for item in feed} - {None})
+        for index in range(self.manager.subscribers):
+            filters = None
+            if events and rng.random() < self.manager.filtered_fraction:
+                picked = rng.choice(
+                    events,
+                    size=min(self.manager.events_per_subscriber, len(events)),
+                    replace=False,
+                )
+                filters = {"event_ids": picked.tolist()}
+            await manager.subscribe(
+                subscriber_id=f"bench-subscriber-{index}",
+                stream_types=stream_types,
+                filters=filters,
+                websocket=SimulatedSocket(self.recorder, self.manager.send_ms),
+                encoding="json",
+            )
+
+    async def _publish(self, manager: RealTimeStreamManager, feed: List[FeedMessage]):
+        """Publish the feed at its recorded offsets, the configured rate or flat out"""
+        started = time.perf_counter()
+        for index, item in enumerate(feed):
+            if self.feed.realtime and item.at is not None:
+                due = item.at
+            elif self.feed.rate:
+                due = index / self.feed.rate
+            else:
+                due = None
+            if due is not None:
+                delay = started + due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+            fields = item.fields
+            message = StreamMessage(
+                id=f"bench-{index}",
+                stream_type=StreamType(fields["stream_type"]),
+                priority=UpdatePriority(fields.get("priority", "medium")),
+                data=dict(fields.get("data", {})),
+                timestamp=datetime.utcnow(),
+                source=fields.get("source", "stream-benchmark"),
+                event_id=fields.get("event_id"),
+                metadata=dict(fields.get("metadata", {})),
+            )
+            self.recorder.published(message.id, message.priority.value)
+            await manager.publish_message(message)
+
+    async def _drain(self, manager: RealTimeStreamManager, expected: int):
+        """Wait until every message is processed and every queue is empty"""
+        deadline = time.perf_counter() + self.manager.drain_timeout
+        settle = max(0.01, self.manager.send_ms / 1000 * 2)
+        idle_checks = 0
+        while time.perf_counter() < deadline:
+            idle = (
+                manager.statistics["messages_processed"] >= expected
+                and manager.message_lanes.qsize() == 0
+                and len(manager.stream_aggregator.windows) == 0
+                and len(manager.prediction_batcher) == 0
+                and not manager.prediction_batcher.get_stats()["in_flight"]
+                and all(queue.depth == 0 for queue in manager.fanout.queues.values())
+            )
+            # Twice in a row: a drain task may be mid-send on its last frame
+            idle_checks = idle_checks + 1 if idle else 0
+            if idle_checks >= 2:
+                return
+            await asyncio.sleep(settle)
+        logger.warning(f"{self.name}: not drained within {self.manager.drain_timeout}s")
+
+    async def _simulated_predictions(
+        self, manager: RealTimeStreamManager, triggers: List[Dict[str, Any]]
+    ):
+        """Stand-in for the ensemble: fixed model time, then broadcast as usual"""
+        await asyncio.sleep(self.manager.predict_ms / 1000)
+        for trigger in triggers:
+            prediction = SimpleNamespace(
+                predicted_value=0.5,
+                prediction_probability=0.5,
+                metadata={"selected_models": ["simulated"]},
+            )
+            await manager.broadcast(manager._prediction_message(trigger, prediction))
+
+    def _pipeline_stats(
+        self, manager: RealTimeStreamManager, health: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Where the time went, from the manager's own metrics"""
+        batching = health.get("prediction_batching", {})
+        return {
+            "messages_processed": manager.statistics["messages_processed"],
+            "queue_wait_p99_ms": {
+                lane: stats["queue_wait"]["p99_ms"]
+                for lane, stats in health.get("message_lanes", {}).items()
+            },
+            "aggregation": health.get("aggregation", {}),
+            "fanout": health.get("fanout", {}),
+            "delta": health.get("delta", {}),
+            "predictions": {
+                "submitted": batching.get("submitted", 0),
+                "coalesced": batching.get("coalesced", 0),
+                "batches": batching.get("batches", 0),
+                "trigger_to_broadcast_p99_ms": batching.get(
+                    "trigger_to_broadcast", {}
+                ).get("p99_ms", 0.0),
+            },
+        }
+
+
+def _config_dict(config: Any) -> Dict[str, Any]:
+    return {
+        key: value.value if isinstance(value, Enum) else value
+        for key, value in asdict(config).items()
+    }
+
+
+def find_regressions(
+    results: List[Dict[str, Any]],
+    baseline: List[Dict[str, Any]],
+    tolerance: float = 0.1,
+) -> List[str]:
+    """Compare results with a baseline run of the same names"""
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        base = previous.get(result["name"])
+        if base is None:
+            continue
+        name = result["name"]
+        if result["throughput_messages"] < base["throughput_messages"] * (
+            1 - tolerance
+        ):
+            regressions.append(
+                f"{name}: throughput {result['throughput_messages']:.0f} msg/s "
+                f"vs baseline {base['throughput_messages']:.0f}"
+            )
+        cpu, reference = result["cpu_us_per_message"], base["cpu_us_per_message"]
+        if reference and cpu > reference * (1 + tolerance):
+            regressions.append(
+                f"{name}: CPU {cpu:.1f}us/msg vs baseline {reference:.1f}us/msg"
+            )
+        for priority, latency in result["latency_ms"].items():
+            reference = base["latency_ms"].get(priority, {}).get("p99")
+            if reference and latency["p99"] > reference * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {priority} p99 latency {latency['p99']:.1f}ms "
+                    f"vs baseline {reference:.1f}ms"
+                )
+    return regressions
+
+
+async def run_benchmarks(
+    feeds: List[FeedConfig], managers: List[ManagerConfig]
+) -> List[Dict[str, Any]]:
+    """Run every feed against every manager configuration"""
+    results = []
+    for manager in managers:
+        for feed in feeds:
+            result = await StreamBenchmark(feed, manager).run()
+            critical = result.latency_ms[UpdatePriority.CRITICAL.value]["p99"]
+            logger.info(
+                f"{result.name}: {result.throughput_messages:.0f} msg/s, "
+                f"{result.deliveries_per_second:.0f} frames/s, "
+                f"critical p99 {critical:.1f}ms, "
+                f"{result.cpu_us_per_message:.0f}us CPU/msg"
+            )
+            results.append(asdict(result))
+    return results
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--feed",
+        nargs="+",
+        default=[FeedType.MIXED.value],
+        choices=[f.value for f in FeedType if f != FeedType.TRACE],
+    )
+    parser.add_argument("--trace", help="Replay a recorded feed instead")
+    parser.add_argument("--realtime", action="store_true")
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--rate", type=float, default=0.0, help="0 = flat out")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--sportsbooks", type=int, default=5)
+    parser.add_argument("--zipf-exponent", type=float, default=1.1)
+    parser.add_argument("--goal-probability", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--transport",
+        nargs="+",
+        default=[Transport.PUBSUB.value],
+        choices=[t.value for t in Transport],
+    )
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[200])
+    parser.add_argument("--filtered-fraction", type=float, default=0.8)
+    parser.add_argument("--events-per-subscriber", type=int, default=3)
+    parser.add_argument("--send-ms", type=float, default=0.0)
+    parser.add_argument("--redis-latency-ms", type=float, default=0.0)
+    parser.add_argument("--buffer-scale", type=float, default=1.0)
+    parser.add_argument("--predict-ms", type=float, default=5.0)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    parser.add_argument("--baseline", help="Fail on regressions against this JSON")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point; returns 1 when a regression is detected"""
+    args = _parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    for noisy in ("realtime_engine", "stream_transport", "stream_fanout"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    feed_types = [FeedType.TRACE] if args.trace else [FeedType(f) for f in args.feed]
+    feeds = [
+        FeedConfig(
+            feed=feed,
+            messages=args.messages,
+            rate=args.rate,
+            events=args.events,
+            sportsbooks=args.sportsbooks,
+            zipf_exponent=args.zipf_exponent,
+            goal_probability=args.goal_probability,
+            seed=args.seed,
+            trace_path=args.trace,
+            realtime=args.realtime,
+        )
+        for feed in feed_types
+    ]
+    managers = [
+        ManagerConfig(
+            transport=Transport(transport),
+            subscribers=subscribers,
+            filtered_fraction=args.filtered_fraction,
+            events_per_subscriber=args.events_per_subscriber,
+            send_ms=args.send_ms,
+            redis_latency_ms=args.redis_latency_ms,
+            buffer_scale=args.buffer_scale,
+            predict_ms=args.predict_ms,
+            drain_timeout=args.drain_timeout,
+        )
+        for transport in args.transport
+        for subscribers in args.subscribers
+    ]
+
+    results = asyncio.run(run_benchmarks(feeds, managers))
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            regressions = find_regressions(
+                results, json.load(baseline_file)["results"], args.tolerance
+            )
+
+    report = json.dumps(
+        {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "results": results,
+            "regressions": regressions,
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            output.write(report)
+    else:
+        print(report)
+
+    for regression in regressions:
+        logger.error(f"Stream regression: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
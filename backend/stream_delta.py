@@ -0,0 +1,237 @@
+"""Snapshot and Delta Stream Protocol
+Versioned per-key state so subscribers get one snapshot, then per-field deltas
+"""
+
+import copy
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StreamProtocol(str, Enum):
+    """What a WebSocket subscriber receives for each update"""
+
+    FULL = "full"  # Every message in full
+    DELTA = "delta"  # Snapshot per key, then changed fields only
+
+
+def _escape(part: Any) -> str:
+    return str(part).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(part: str) -> str:
+    return part.replace("~1", "/").replace("~0", "~")
+
+
+def diff(
+    old: Dict[str, Any], new: Dict[str, Any], path: str = ""
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Changed and removed fields of ``new`` against ``old`` as JSON Pointers.
+
+    Nested dicts are compared field by field; any other changed value,
+    including a list, is replaced whole.
+    """
+    changed: Dict[str, Any] = {}
+    removed: List[str] = []
+    for name, value in new.items():
+        pointer = f"{path}/{_escape(name)}"
+        if name not in old:
+            changed[pointer] = value
+            continue
+        previous = old[name]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested_changed, nested_removed = diff(previous, value, pointer)
+            changed.update(nested_changed)
+            removed.extend(nested_removed)
+        elif type(previous) is not type(value) or previous != value:
+            changed[pointer] = value
+    removed.extend(f"{path}/{_escape(name)}" for name in old if name not in new)
+    return changed, removed
+
+
+def apply_delta(state: Dict[str, Any], frame: Dict[str, Any]) -> Dict[str, Any]:
+    """Client-side reference: the state after applying a snapshot or delta frame"""
+    if frame["op"] == "snapshot":
+        return copy.deepcopy(frame["data"])
+    state = copy.deepcopy(state)
+    for pointer, value in frame.get("set", {}).items():
+        *parents, last = [_unescape(p) for p in pointer.split("/")[1:]]
+        target = state
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[last] = value
+    for pointer in frame.get("unset", ()):
+        *parents, last = [_unescape(p) for p in pointer.split("/")[1:]]
+        target = state
+        for part in parents:
+            target = target.get(part, {})
+        target.pop(last, None)
+    return state
+
+
+@dataclass
+class StateUpdate:
+    """One message's change to the state of its key"""
+
+    key: str
+    version: int
+    base: int  # Version this delta applies to; 0 for a new key
+    changed: Dict[str, Any] = field(default_factory=dict)
+    removed: List[str] = field(default_factory=list)
+    resync: bool = False  # Sent to everyone as a snapshot
+
+
+def snapshot_fields(message: Any) -> Dict[str, Any]:
+    """Snapshot frame: the full state of the message's key"""
+    update = message.state_update
+    return {
+        "op": "snapshot",
+        "key": update.key,
+        "v": update.version,
+        "type": message.stream_type.value,
+        "event_id": message.event_id,
+        "timestamp": message.timestamp.isoformat(),
+        "data": message.data,
+        "metadata": message.metadata,
+    }
+
+
+def delta_fields(message: Any) -> Dict[str, Any]:
+    """Delta frame: changed fields since ``base``"""
+    update = message.state_update
+    fields = {
+        "op": "delta",
+        "key": update.key,
+        "v": update.version,
+        "base": update.base,
+        "timestamp": message.timestamp.isoformat(),
+        "set": update.changed,
+    }
+    if update.removed:
+        fields["unset"] = update.removed
+    return fields
+
+
+@dataclass
+class DeltaMetrics:
+    """Snapshot/delta protocol metrics"""
+
+    updates: int = 0
+    unchanged: int = 0
+    resyncs: int = 0
+    snapshots_sent: int = 0
+    deltas_sent: int = 0
+    stale_skipped: int = 0
+    keys_evicted: int = 0
+
+
+class _KeyState:
+    __slots__ = ("version", "data", "since_snapshot", "message")
+
+    def __init__(self):
+        self.version = 0
+        self.data: Dict[str, Any] = {}
+        self.since_snapshot = 0
+        self.message: Any = None
+
+
+class DeltaTracker:
+    """Versions the latest data of every state key.
+
+    ``observe`` diffs each broadcast message against the previous state of
+    its key and attaches the result as ``message.state_update``, once for
+    all subscribers. Versions come from one counter across keys, so they
+    never repeat even after a key is evicted. Each delta-protocol
+    subscriber remembers the version it last received per key: a message
+    whose ``base`` matches goes out as a delta, anything else (a new
+    subscriber, a message dropped or coalesced from its queue, or an
+    explicit resync) as a snapshot. Every ``resync_every``-th update of a
+    key is a snapshot for everyone, bounding how long a client can drift.
+
+    Clients detect gaps the same way: a delta whose ``base`` is not the
+    version they hold means a missed frame, and they ask for a resync.
+    """
+
+    def __init__(self, resync_every: int = 100, max_keys: int = 50000):
+        self.resync_every = resync_every
+        self.max_keys = max_keys
+        self.metrics = DeltaMetrics()
+        self._states: "OrderedDict[str, _KeyState]" = OrderedDict()
+        self._version = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def observe(self, key: str, message: Any) -> StateUpdate:
+        """Version ``message`` as the new state of ``key``"""
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState()
+            if len(self._states) > self.max_keys:
+                self._states.popitem(last=False)
+                self.metrics.keys_evicted += 1
+        else:
+            self._states.move_to_end(key)
+
+        changed, removed = diff(state.data, message.data)
+        if state.version and not changed and not removed:
+            # Nothing for current holders; still a snapshot for newcomers
+            self.metrics.unchanged += 1
+            update = StateUpdate(key, state.version, state.version)
+            state.message = message
+            message.state_update = update
+            return update
+
+        self._version += 1
+        state.since_snapshot += 1
+        resync = state.since_snapshot >= self.resync_every
+        if resync:
+            state.since_snapshot = 0
+            self.metrics.resyncs += 1
+        update = StateUpdate(
+            key, self._version, state.version, changed, removed, resync
+        )
+        state.version, state.data, state.message = self._version, message.data, message
+        message.state_update = update
+        self.metrics.updates += 1
+        return update
+
+    def latest(self, key: str) -> Any:
+        """The message holding the current state of ``key``"""
+        state = self._states.get(key)
+        return state.message if state else None
+
+    def messages(self) -> Iterator[Any]:
+        """Latest message of every key, least recently updated first"""
+        return (state.message for state in self._states.values() if state.message)
+
+    def view_for(
+        self, versions: Dict[str, int], update: StateUpdate
+    ) -> Optional[Callable[[Any], Dict[str, Any]]]:
+        """Frame view for a subscriber holding ``versions``; None if nothing new"""
+        held = versions.get(update.key)
+        if held is not None and update.version <= held:
+            self.metrics.stale_skipped += 1
+            return None
+        versions[update.key] = update.version
+        if held == update.base and update.base and not update.resync:
+            self.metrics.deltas_sent += 1
+            return delta_fields
+        self.metrics.snapshots_sent += 1
+        return snapshot_fields
+
+    def get_stats(self) -> Dict[str, Any]:
+        sent = self.metrics.snapshots_sent + self.metrics.deltas_sent
+        return {
+            "keys": len(self._states),
+            "version": self._version,
+            "updates": self.metrics.updates,
+            "unchanged": self.metrics.unchanged,
+            "resyncs": self.metrics.resyncs,
+            "snapshots_sent": self.metrics.snapshots_sent,
+            "deltas_sent": self.metrics.deltas_sent,
+            "delta_ratio": self.metrics.deltas_sent / sent if sent else 0.0,
+            "stale_skipped": self.metrics.stale_skipped,
+            "keys_evicted": self.metrics.keys_evicted,
+        }
@@ -0,0 +1,148 @@
+"""Stream Message Encoding
+Encode each broadcast message once and share the result across subscribers
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[str, bytes]
+View = Callable[[Any], Dict[str, Any]]
+
+
+class StreamEncoding(str, Enum):
+    """Wire encodings a subscriber can negotiate"""
+
+    JSON = "json"  # Text frames
+    MSGPACK = "msgpack"  # Binary frames: [envelope, message]
+
+
+def available_encodings() -> List[StreamEncoding]:
+    encodings = [StreamEncoding.JSON]
+    if msgpack is not None:
+        encodings.append(StreamEncoding.MSGPACK)
+    return encodings
+
+
+def negotiate_encoding(requested: Optional[str]) -> StreamEncoding:
+    """The requested encoding if supported here, JSON otherwise"""
+    try:
+        encoding = StreamEncoding(requested) if requested else StreamEncoding.JSON
+    except ValueError:
+        logger.warning(f"Unknown stream encoding requested: {requested}")
+        return StreamEncoding.JSON
+    if encoding not in available_encodings():
+        logger.warning(f"Stream encoding {encoding.value} unavailable, using json")
+        return StreamEncoding.JSON
+    return encoding
+
+
+def message_fields(message: Any) -> Dict[str, Any]:
+    """The flat WebSocket representation of a stream message"""
+    return {
+        "id": message.id,
+        "type": message.stream_type.value,
+        "priority": message.priority.value,
+        "data": message.data,
+        "timestamp": message.timestamp.isoformat(),
+        "source": message.source,
+        "event_id": message.event_id,
+        "metadata": message.metadata,
+    }
+
+
+def _default(value: Any) -> str:
+    # Dates as orjson writes them natively; anything else as its str()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def _json(value: Any) -> str:
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS
+        return orjson.dumps(value, default=_default, option=options).decode()
+    return json.dumps(value, default=_default, separators=(",", ":"))
+
+
+@dataclass
+class EncoderMetrics:
+    """Stream encoding metrics"""
+
+    encodes: int = 0
+    reuses: int = 0
+    bytes_encoded: int = 0
+
+
+class StreamMessageEncoder:
+    """Encodes a message once per encoding and frames it per subscriber.
+
+    The encoded body is cached on the message's ``encoded`` dict, so every
+    subscriber queue holding the message shares it. A ``view`` renders the
+    message differently (a delta frame, say) and is cached separately under
+    its name. Per-subscriber fields
+    go in a small envelope: spliced into the JSON object for text frames,
+    and sent as the first element of a two-item array for MessagePack.
+    """
+
+    def __init__(self):
+        self.metrics = EncoderMetrics()
+
+    def encode(
+        self, message: Any, encoding: StreamEncoding, view: Optional[View] = None
+    ) -> Frame:
+        """Shared encoded body of ``message``, or of ``view(message)``"""
+        cache_key = encoding if view is None else (view.__name__, encoding)
+        body = message.encoded.get(cache_key)
+        if body is not None:
+            self.metrics.reuses += 1
+            return body
+
+        fields = message_fields(message) if view is None else view(message)
+        if encoding == StreamEncoding.MSGPACK:
+            body = msgpack.packb(fields, default=_default, use_bin_type=True)
+        else:
+            body = _json(fields)
+        message.encoded[cache_key] = body
+        self.metrics.encodes += 1
+        self.metrics.bytes_encoded += len(body)
+        return body
+
+    def frame(
+        self,
+        message: Any,
+        encoding: StreamEncoding,
+        envelope: Optional[Dict[str, Any]] = None,
+        view: Optional[View] = None,
+    ) -> Frame:
+        """The shared body with ``envelope`` added for one subscriber"""
+        body = self.encode(message, encoding, view)
+        if encoding == StreamEncoding.MSGPACK:
+            # fixarray of two: the envelope, then the shared message
+            return b"\x92" + msgpack.packb(envelope or {}) + body
+        if not envelope:
+            return body
+        return body[:-1] + "," + _json(envelope)[1:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "encodings": [encoding.value for encoding in available_encodings()],
+            "fast_json": orjson is not None,
+            "encodes": self.metrics.encodes,
+            "reuses": self.metrics.reuses,
+            "bytes_encoded": self.metrics.bytes_encoded,
+        }
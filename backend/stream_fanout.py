@@ -0,0 +1,290 @@
+"""Indexed Stream Fan-out
+Subscription index and bounded per-subscriber send queues for real-time streams
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Matches any event or source in an index key
+ANY = object()
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a subscriber's send queue is full"""
+
+    DROP_OLDEST = "drop_oldest"  # Evict the oldest pending message
+    COALESCE = "coalesce"  # Keep only the latest pending message per key
+    DISCONNECT = "disconnect"  # Close the subscriber
+
+
+@dataclass
+class FanoutMetrics:
+    """Fan-out delivery metrics"""
+
+    messages: int = 0
+    queued: int = 0
+    sent: int = 0
+    dropped: int = 0
+    coalesced: int = 0
+    disconnected: int = 0
+    send_failures: int = 0
+
+
+class SubscriberQueue:
+    """Bounded send queue drained by its own task.
+
+    ``offer`` never waits, so one slow client cannot hold up a broadcast;
+    the subscriber's policy decides what happens once ``maxsize`` messages
+    are pending. Under ``COALESCE`` a pending message with the same key is
+    replaced in place whether or not the queue is full.
+    """
+
+    def __init__(
+        self,
+        subscriber_id: str,
+        send: Callable[[Any], Awaitable[None]],
+        maxsize: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        coalesce_key: Optional[Callable[[Any], Any]] = None,
+        on_close: Optional[Callable[[str, str], Awaitable[None]]] = None,
+        metrics: Optional[FanoutMetrics] = None,
+    ):
+        self.subscriber_id = subscriber_id
+        self.send = send
+        self.maxsize = max(1, maxsize)
+        self.policy = SlowConsumerPolicy(policy)
+        self.coalesce_key = coalesce_key
+        self.on_close = on_close
+        self.metrics = metrics or FanoutMetrics()
+        self.sent = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.closed = False
+        self._pending: "OrderedDict[Any, Any]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._drain())
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def offer(self, message: Any) -> bool:
+        """Queue ``message`` without waiting; False if it was not queued"""
+        if self.closed:
+            return False
+        if self.policy == SlowConsumerPolicy.COALESCE and self.coalesce_key:
+            key = (0, self.coalesce_key(message))
+            if key in self._pending:
+                self._pending[key] = message
+                self.metrics.coalesced += 1
+                return True
+        else:
+            key = (1, next(self._sequence))
+
+        if len(self._pending) >= self.maxsize:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                self.metrics.disconnected += 1
+                self._shutdown("slow consumer")
+                return False
+            self._pending.popitem(last=False)
+            self.dropped += 1
+            self.metrics.dropped += 1
+
+        self._pending[key] = message
+        self.max_depth = max(self.max_depth, len(self._pending))
+        self.metrics.queued += 1
+        self._ready.set()
+        return True
+
+    def close(self):
+        """Stop draining and discard pending messages"""
+        self.closed = True
+        self._pending.clear()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+    async def _drain(self):
+        try:
+            while True:
+                if not self._pending:
+                    self._ready.clear()
+                    await self._ready.wait()
+                    continue
+                _, message = self._pending.popitem(last=False)
+                try:
+                    await self.send(message)
+                except Exception as e:
+                    self.metrics.send_failures += 1
+                    logger.warning(
+                        f"Send to subscriber {self.subscriber_id} failed: {e!s}"
+                    )
+                    self._shutdown("send failed")
+                    return
+                self.sent += 1
+                self.metrics.sent += 1
+        except asyncio.CancelledError:
+            pass
+
+    def _shutdown(self, reason: str):
+        self.close()
+        if self.on_close:
+            asyncio.get_running_loop().create_task(
+                self.on_close(self.subscriber_id, reason)
+            )
+
+
+class SubscriptionIndex:
+    """Subscribers keyed by (stream type, event id, source).
+
+    A subscription registers one key per stream type, event id and source it
+    filters on, with ``ANY`` for an unfiltered dimension, so a message is
+    matched with four dictionary lookups instead of a scan of every
+    subscriber. Each subscription lands in exactly one of those four buckets
+    for any given message. Priority filters are checked on the candidates.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[tuple, Set[str]] = defaultdict(set)
+        self._keys: Dict[str, List[tuple]] = {}
+        self._priorities: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def key_count(self) -> int:
+        return len(self._buckets)
+
+    def add(
+        self, subscriber_id: str, stream_types: Iterable[Any], filters: Dict[str, Any]
+    ):
+        self.remove(subscriber_id)
+        events = list(filters["event_ids"]) if "event_ids" in filters else [ANY]
+        sources = list(filters["sources"]) if "sources" in filters else [ANY]
+        keys = [
+            (stream_type, event_id, source)
+            for stream_type in stream_types
+            for event_id in events
+            for source in sources
+        ]
+        for key in keys:
+            self._buckets[key].add(subscriber_id)
+        self._keys[subscriber_id] = keys
+        if "priority" in filters:
+            self._priorities[subscriber_id] = set(filters["priority"])
+
+    def remove(self, subscriber_id: str):
+        for key in self._keys.pop(subscriber_id, ()):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(subscriber_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._priorities.pop(subscriber_id, None)
+
+    def match(self, message: Any) -> List[str]:
+        """Subscribers whose stream type and filters accept ``message``"""
+        stream_type, event_id, source = (
+            message.stream_type,
+            message.event_id,
+            message.source,
+        )
+        priority = getattr(message.priority, "value", message.priority)
+        matched = []
+        for key in (
+            (stream_type, event_id, source),
+            (stream_type, event_id, ANY),
+            (stream_type, ANY, source),
+            (stream_type, ANY, ANY),
+        ):
+            for subscriber_id in self._buckets.get(key, ()):
+                priorities = self._priorities.get(subscriber_id)
+                if priorities is None or priority in priorities:
+                    matched.append(subscriber_id)
+        return matched
+
+
+class SubscriptionFanout:
+    """Routes each message to the queues of matching subscribers only"""
+
+    def __init__(
+        self,
+        queue_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.DROP_OLDEST,
+        coalesce_key: Optional[Callable[[Any], Any]] = None,
+        on_close: Optional[Callable[[str, str], Awaitable[None]]] = None,
+    ):
+        self.queue_size = queue_size
+        self.policy = SlowConsumerPolicy(policy)
+        self.coalesce_key = coalesce_key
+        self.on_close = on_close
+        self.index = SubscriptionIndex()
+        self.queues: Dict[str, SubscriberQueue] = {}
+        self.metrics = FanoutMetrics()
+
+    def add(
+        self,
+        subscriber_id: str,
+        stream_types: Iterable[Any],
+        filters: Dict[str, Any],
+        send: Callable[[Any], Awaitable[None]],
+        policy: Optional[SlowConsumerPolicy] = None,
+        queue_size: Optional[int] = None,
+    ):
+        """Index a subscriber and start its send queue"""
+        self.remove(subscriber_id)
+        self.index.add(subscriber_id, stream_types, filters)
+        self.queues[subscriber_id] = SubscriberQueue(
+            subscriber_id,
+            send,
+            maxsize=queue_size or self.queue_size,
+            policy=policy or self.policy,
+            coalesce_key=self.coalesce_key,
+            on_close=self.on_close,
+            metrics=self.metrics,
+        )
+
+    def remove(self, subscriber_id: str):
+        self.index.remove(subscriber_id)
+        queue = self.queues.pop(subscriber_id, None)
+        if queue is not None:
+            queue.close()
+
+    def publish(self, message: Any) -> int:
+        """Queue ``message`` for every matching subscriber; returns the count"""
+        self.metrics.messages += 1
+        queued = 0
+        for subscriber_id in self.index.match(message):
+            queue = self.queues.get(subscriber_id)
+            if queue is not None and queue.offer(message):
+                queued += 1
+        return queued
+
+    def close(self):
+        for subscriber_id in list(self.queues):
+            self.remove(subscriber_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depths and delivery counters"""
+        depths = [queue.depth for queue in self.queues.values()]
+        return {
+            "subscribers": len(self.queues),
+            "index_keys": self.index.key_count,
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "messages": self.metrics.messages,
+            "queued": self.metrics.queued,
+            "sent": self.metrics.sent,
+            "dropped": self.metrics.dropped,
+            "coalesced": self.metrics.coalesced,
+            "disconnected": self.metrics.disconnected,
+            "send_failures": self.metrics.send_failures,
+        }
@@ -0,0 +1,163 @@
+"""Priority Message Lanes
+Per-priority queues drained weighted-fair in batches, with latency histograms
+"""
+
+import asyncio
+import bisect
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds of the latency buckets in milliseconds; the last is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with approximate percentiles"""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, seconds: float):
+        latency_ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+        self.count += 1
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the ``fraction`` quantile"""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index < len(self.buckets_ms):
+                    return float(self.buckets_ms[index])
+                break
+        return self.max_ms
+
+    def within(self, budget_ms: float) -> float:
+        """Fraction of samples at or under ``budget_ms`` (a bucket bound)"""
+        if not self.count:
+            return 1.0
+        index = bisect.bisect_right(self.buckets_ms, budget_ms)
+        return sum(self.counts[:index]) / self.count
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": self.max_ms,
+            "buckets": {
+                **{
+                    f"le_{bound}ms": count
+                    for bound, count in zip(self.buckets_ms, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class PriorityLanes:
+    """Bounded per-priority lanes drained weighted-fair in batches.
+
+    Each batch visits the lanes in priority order and takes up to ``weight``
+    messages from each, repeating until the batch is full or every lane is
+    empty, so a backlog of low-priority ticks costs a critical message at
+    most one batch of waiting. Producers wait when their own lane is full;
+    other lanes are unaffected. Queue wait and end-to-end latency are
+    recorded per lane.
+    """
+
+    def __init__(
+        self,
+        weights: Dict[str, int],
+        maxsize: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        # Lanes in descending weight order; ties keep the given order
+        self.weights = dict(sorted(weights.items(), key=lambda item: -item[1]))
+        self.maxsize = maxsize
+        self.clock = clock
+        self._lanes: Dict[str, Deque[Tuple[Any, float]]] = {
+            lane: deque() for lane in self.weights
+        }
+        self._space = {lane: asyncio.Event() for lane in self.weights}
+        self._ready = asyncio.Event()
+        self.enqueued = {lane: 0 for lane in self.weights}
+        self.queue_wait = {lane: LatencyHistogram() for lane in self.weights}
+        self.latency = {lane: LatencyHistogram() for lane in self.weights}
+
+    def lane_of(self, priority: Any) -> str:
+        lane = getattr(priority, "value", priority)
+        return lane if lane in self._lanes else next(reversed(self._lanes))
+
+    def qsize(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    async def put(self, message: Any):
+        """Queue ``message`` in its priority's lane, waiting while it is full"""
+        lane = self.lane_of(message.priority)
+        queue = self._lanes[lane]
+        while len(queue) >= self.maxsize:
+            self._space[lane].clear()
+            await self._space[lane].wait()
+        queue.append((message, self.clock()))
+        self.enqueued[lane] += 1
+        self._ready.set()
+
+    async def get_batch(
+        self, max_batch: int = 64, timeout: Optional[float] = None
+    ) -> List[Tuple[Any, float]]:
+        """Up to ``max_batch`` (message, enqueued_at) pairs, weighted-fair"""
+        if not self.qsize():
+            self._ready.clear()
+            if timeout is None:
+                await self._ready.wait()
+            else:
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return []
+
+        now = self.clock()
+        batch = []
+        while len(batch) < max_batch and self.qsize():
+            for lane, weight in self.weights.items():
+                queue = self._lanes[lane]
+                taken = 0
+                while queue and taken < weight and len(batch) < max_batch:
+                    message, enqueued_at = queue.popleft()
+                    self.queue_wait[lane].record(now - enqueued_at)
+                    batch.append((message, enqueued_at))
+                    taken += 1
+                if taken:
+                    self._space[lane].set()
+        return batch
+
+    def record_latency(self, priority: Any, enqueued_at: float):
+        """Record enqueue-to-done latency once a message has been handled"""
+        self.latency[self.lane_of(priority)].record(self.clock() - enqueued_at)
+
+    def get_stats(self, budget_ms: float = 100) -> Dict[str, Any]:
+        return {
+            lane: {
+                "weight": weight,
+                "depth": len(self._lanes[lane]),
+                "enqueued": self.enqueued[lane],
+                "queue_wait": self.queue_wait[lane].get_stats(),
+                "latency": self.latency[lane].get_stats(),
+                f"within_{budget_ms}ms": self.latency[lane].within(budget_ms),
+            }
+            for lane, weight in self.weights.items()
+        }
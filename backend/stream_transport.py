@@ -0,0 +1,290 @@
+"""Redis Streams Transport
+Partitioned consumer-group delivery of stream messages across stream-manager nodes
+"""
+
+import asyncio
+import hashlib
+import logging
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (stream key, entry id): identifies one delivery for acknowledgement
+Token = Tuple[str, str]
+Handler = Callable[[Token, Any], Awaitable[None]]
+
+
+def _text(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _rank(node: str, partition: int) -> bytes:
+    return hashlib.blake2b(f"{node}:{partition}".encode(), digest_size=8).digest()
+
+
+def partition_owners(nodes: Iterable[str], partitions: int) -> Dict[int, str]:
+    """Rendezvous-hash each partition onto one of ``nodes``"""
+    nodes = sorted(nodes)
+    if not nodes:
+        return {}
+    return {
+        partition: max(nodes, key=lambda node: _rank(node, partition))
+        for partition in range(partitions)
+    }
+
+
+@dataclass
+class TransportMetrics:
+    """Streams transport metrics"""
+
+    published: int = 0
+    delivered: int = 0
+    acked: int = 0
+    replayed: int = 0  # Own pending entries redelivered after a restart
+    claimed: int = 0  # Stale entries taken over from other consumers
+    trimmed: int = 0  # Pending entries trimmed from the stream before delivery
+    duplicates_skipped: int = 0
+    rebalances: int = 0
+    errors: int = 0
+
+
+class RedisStreamTransport:
+    """Stream messages over Redis Streams consumer groups.
+
+    Messages are appended to one of ``partitions`` streams chosen by a hash
+    of their event ID, so every update for an event stays in order on one
+    stream. All nodes share one consumer group and each node reads only the
+    partitions it owns; ownership is rendezvous-hashed over the nodes whose
+    heartbeat in the ``<prefix>:nodes`` sorted set is recent, so adding or
+    losing a node moves only that node's share.
+
+    Entries are handed to the handler with a token and stay pending until
+    ``ack`` is called. On start a node replays its own pending entries, and
+    entries left pending by a dead consumer for ``claim_idle_ms`` are
+    claimed by the partition's current owner. Each entry is therefore
+    processed by exactly one live node, and again only if that node died
+    before acknowledging it. Consumer names must be unique per node and
+    stable across restarts.
+    """
+
+    def __init__(
+        self,
+        redis: Any,
+        consumer: str,
+        group: str = "stream-managers",
+        prefix: str = "stream:partition",
+        partitions: int = 16,
+        maxlen: Optional[int] = 100000,
+        batch_size: int = 100,
+        block_ms: int = 1000,
+        claim_idle_ms: int = 30000,
+        claim_interval: float = 5.0,
+    ):
+        self.redis = redis
+        self.consumer = consumer
+        self.group = group
+        self.prefix = prefix
+        self.partitions = partitions
+        self.maxlen = maxlen
+        self.batch_size = batch_size
+        self.block_ms = block_ms
+        self.claim_idle_ms = claim_idle_ms
+        self.claim_interval = claim_interval
+        self.node_ttl = max(1, round(claim_interval * 3))
+        self.nodes_key = f"{prefix}:nodes"
+        self.owned: List[int] = []
+        self.nodes: List[str] = []
+        self.metrics = TransportMetrics()
+        self._handler: Optional[Handler] = None
+        self._in_flight: set = set()
+        self._task: Optional[asyncio.Task] = None
+        self._next_maintenance = 0.0
+
+    def partition_of(self, key: Optional[str]) -> int:
+        return zlib.crc32((key or "").encode("utf-8")) % self.partitions
+
+    def stream_key(self, partition: int) -> str:
+        return f"{self.prefix}:{partition}"
+
+    async def publish(self, key: Optional[str], payload: Any) -> str:
+        """Append ``payload`` to the partition of ``key``; returns the entry id"""
+        entry_id = await self.redis.xadd(
+            self.stream_key(self.partition_of(key)),
+            {"payload": payload},
+            maxlen=self.maxlen,
+            approximate=True,
+        )
+        self.metrics.published += 1
+        return _text(entry_id)
+
+    async def start(self, handler: Handler):
+        """Join the group, replay own pending entries, then consume"""
+        self._handler = handler
+        await self.ensure_groups()
+        await self.maintain()
+        await self.replay_pending()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop consuming and leave; unacknowledged entries stay pending"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.redis.zrem(self.nodes_key, self.consumer)
+        except Exception as e:
+            logger.warning(f"Stream transport leave failed: {e!s}")
+
+    async def ensure_groups(self):
+        """Create the consumer group on every partition stream"""
+        for partition in range(self.partitions):
+            try:
+                await self.redis.xgroup_create(
+                    self.stream_key(partition), self.group, id="0", mkstream=True
+                )
+            except Exception as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    async def maintain(self):
+        """Heartbeat, recompute owned partitions, and claim stale entries"""
+        # Heartbeats are scored by each node's clock; node_ttl absorbs the skew
+        now = time.time()
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(self.nodes_key, {self.consumer: now})
+        pipe.zremrangebyscore(self.nodes_key, "-inf", now - self.node_ttl)
+        pipe.zrange(self.nodes_key, 0, -1)
+        _, _, members = await pipe.execute()
+        nodes = sorted(_text(member) for member in members)
+        owners = partition_owners(nodes, self.partitions)
+        owned = [p for p, node in owners.items() if node == self.consumer]
+        if owned != self.owned:
+            self.metrics.rebalances += 1
+            logger.info(f"Stream partitions owned by {self.consumer}: {owned}")
+        self.owned, self.nodes = owned, nodes
+        await self.claim_stale()
+
+    async def replay_pending(self):
+        """Redeliver entries this consumer read but never acknowledged"""
+        for partition in range(self.partitions):
+            key = self.stream_key(partition)
+            last_id = "0"
+            while True:
+                reply = await self.redis.xreadgroup(
+                    self.group, self.consumer, {key: last_id}, count=self.batch_size
+                )
+                entries = reply[0][1] if reply else []
+                if not entries:
+                    break
+                self.metrics.replayed += await self._deliver(key, entries)
+                last_id = _text(entries[-1][0])
+
+    async def claim_stale(self):
+        """Take over entries idle past ``claim_idle_ms`` on owned partitions"""
+        for partition in self.owned:
+            key = self.stream_key(partition)
+            start_id = "0-0"
+            while True:
+                next_id, entries, deleted = await self.redis.xautoclaim(
+                    key,
+                    self.group,
+                    self.consumer,
+                    self.claim_idle_ms,
+                    start_id=start_id,
+                    count=self.batch_size,
+                )
+                self.metrics.trimmed += len(deleted)
+                self.metrics.claimed += await self._deliver(key, entries)
+                start_id = _text(next_id)
+                if start_id in ("0-0", "0"):
+                    break
+
+    async def ack(self, token: Token):
+        await self.ack_many([token])
+
+    async def ack_many(self, tokens: Iterable[Token]):
+        """Acknowledge handled entries, one XACK per stream"""
+        by_stream: Dict[str, List[str]] = {}
+        for key, entry_id in tokens:
+            by_stream.setdefault(key, []).append(entry_id)
+        for key, entry_ids in by_stream.items():
+            self.metrics.acked += await self.redis.xack(key, self.group, *entry_ids)
+            self._in_flight.difference_update((key, i) for i in entry_ids)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "consumer": self.consumer,
+            "group": self.group,
+            "nodes": self.nodes,
+            "owned_partitions": self.owned,
+            "in_flight": len(self._in_flight),
+            "published": self.metrics.published,
+            "delivered": self.metrics.delivered,
+            "acked": self.metrics.acked,
+            "replayed": self.metrics.replayed,
+            "claimed": self.metrics.claimed,
+            "trimmed": self.metrics.trimmed,
+            "duplicates_skipped": self.metrics.duplicates_skipped,
+            "rebalances": self.metrics.rebalances,
+            "errors": self.metrics.errors,
+        }
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                if loop.time() >= self._next_maintenance:
+                    await self.maintain()
+                    self._next_maintenance = loop.time() + self.claim_interval
+                if not self.owned:
+                    await asyncio.sleep(self.block_ms / 1000)
+                    continue
+                reply = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    {self.stream_key(p): ">" for p in self.owned},
+                    count=self.batch_size,
+                    block=self.block_ms,
+                )
+                for key, entries in reply or []:
+                    await self._deliver(_text(key), entries)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.metrics.errors += 1
+                logger.error(f"Stream transport read failed: {e!s}")
+                await asyncio.sleep(1)
+
+    async def _deliver(self, key: str, entries: List) -> int:
+        delivered = 0
+        trimmed = []
+        for entry_id, fields in entries:
+            token = (key, _text(entry_id))
+            if fields is None:
+                trimmed.append(token)  # Trimmed by MAXLEN while pending
+                continue
+            if token in self._in_flight:
+                self.metrics.duplicates_skipped += 1
+                continue
+            payload = fields.get(b"payload", fields.get("payload"))
+            self._in_flight.add(token)
+            self.metrics.delivered += 1
+            delivered += 1
+            try:
+                await self._handler(token, payload)
+            except Exception as e:
+                # Left pending for the partition owner to claim once idle
+                self._in_flight.discard(token)
+                self.metrics.errors += 1
+                logger.error(f"Stream transport handler failed: {e!s}")
+        if trimmed:
+            self.metrics.trimmed += len(trimmed)
+            await self.ack_many(trimmed)
+        return delivered
@@ -12,13 +12,87 @@ from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum, IntEnum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import redis.asyncio as redis
 from config import config_manager
 
 logger = logging.getLogger(__name__)
 
+# Claim the oldest due task of the highest non-empty priority: take it off
+# its queue, lease it in the in-flight set and return its data, atomically
+# and in one round trip. KEYS: priority queues (highest first), in-flight
+# set. ARGV: now, lease deadline, worker id, task key prefix, lock key
+# prefix, lock TTL. Returns {id, data}, {"", next due score} or {}.
+CLAIM_NEXT_SCRIPT = """-- claim_next_task
+local now = tonumber(ARGV[1])
+local next_due = nil
+for i = 1, #KEYS - 1 do
+    while true do
+        local head = redis.call('ZRANGE', KEYS[i], 0, 0, 'WITHSCORES')
+        if #head == 0 then
+            break
+        end
+        if tonumber(head[2]) > now then
+            if next_due == nil or tonumber(head[2]) < tonumber(next_due) then
+                next_due = head[2]
+            end
+            break
+        end
+        local task_id = head[1]
+        redis.call('ZREM', KEYS[i], task_id)
+        local data = redis.call('GET', ARGV[4] .. task_id)
+        if data then
+            redis.call('ZADD', KEYS[#KEYS], ARGV[2], task_id)
+            redis.call('SET', ARGV[5] .. task_id, ARGV[3], 'EX', ARGV[6])
+            return {task_id, data}
+        end
+        -- Task data expired: drop the orphaned id and keep looking
+    end
+end
+if next_due then
+    return {'', next_due}
+end
+return {}
+"""
+
+# Claim up to ARGV[8] more due tasks batchable under function ARGV[7],
+# looking at the first ARGV[9] due ids of each priority queue. KEYS:
+# priority queues (highest first), in-flight set, batchable hash. ARGV[1-6]
+# as for CLAIM_NEXT_SCRIPT. Returns {id, data, id, data, ...}.
+CLAIM_BATCH_SCRIPT = """-- claim_task_batch
+local limit = tonumber(ARGV[8])
+local in_flight = KEYS[#KEYS - 1]
+local batchable = KEYS[#KEYS]
+local claimed = {}
+for i = 1, #KEYS - 2 do
+    local ids = redis.call(
+        'ZRANGEBYSCORE', KEYS[i], '-inf', ARGV[1], 'LIMIT', 0, ARGV[9]
+    )
+    for _, task_id in ipairs(ids) do
+        if redis.call('HGET', batchable, task_id) == ARGV[7] then
+            redis.call('ZREM', KEYS[i], task_id)
+            local data = redis.call('GET', ARGV[4] .. task_id)
+            if data then
+                redis.call('ZADD', in_flight, ARGV[2], task_id)
+                redis.call('SET', ARGV[5] .. task_id, ARGV[3], 'EX', ARGV[6])
+                claimed[#claimed + 1] = task_id
+                claimed[#claimed + 1] = data
+                if #claimed / 2 >= limit then
+                    return claimed
+                end
+            else
+                redis.call('HDEL', batchable, task_id)
+            end
+        end
+    end
+end
+return claimed
+"""
+
+# Unconsumed wake-up tokens kept on the ready list
+READY_TOKENS_MAX = 1000
+
 
 class TaskPriority(IntEnum):
     """Task priority levels (higher number = higher priority)"""
@@ -82,6 +156,9 @@ class TaskDefinition:
     recurring: bool = False
     cron_expression: Optional[str] = None
 
+    # Batching: claimed and run together with queued tasks of the same function
+    batchable: bool = False
+
     # Dependencies
     depends_on: List[str] = field(default_factory=list)
     blocks: List[str] = field(default_factory=list)
@@ -131,7 +208,9 @@ class TaskResult:
 class TaskQueue:
     """High-performance priority task queue with Redis backend"""
 
-    def __init__(self, queue_name: str = "a1betting_tasks"):
+    def __init__(
+        self, queue_name: str = "a1betting_tasks", lease_seconds: Optional[int] = None
+    ):
         self.queue_name = queue_name
         self.redis_client: Optional[redis.Redis] = None
         self.priority_queues = {
@@ -140,6 +219,15 @@ class TaskQueue:
         }
         self.result_store = f"{queue_name}:results"
         self.lock_prefix = f"{queue_name}:locks"
+        # Claimed task ids scored by lease deadline, until their result is stored
+        self.in_flight_key = f"{queue_name}:in_flight"
+        # Wake-up tokens pushed on enqueue; idle workers block on this list
+        self.ready_key = f"{queue_name}:ready"
+        # Function name of every queued batchable task
+        self.batchable_key = f"{queue_name}:batchable"
+        self.lease_seconds = lease_seconds or config_manager.config.task_lease_seconds
+        self._claim_script = None
+        self._claim_batch_script = None
 
     async def initialize(self):
         """Initialize Redis connection"""
@@ -156,116 +244,223 @@ class TaskQueue:
 
     async def enqueue(self, task: TaskDefinition) -> bool:
         """Add task to appropriate priority queue"""
+        enqueued = await self.enqueue_many([task])
+        if enqueued:
+            logger.debug(f"Enqueued task {task.id} with priority {task.priority}")
+        return enqueued == 1
+
+    async def enqueue_many(self, tasks: List[TaskDefinition]) -> int:
+        """Add tasks in one pipelined round trip; returns how many were added"""
+        if not tasks:
+            return 0
         try:
             if not self.redis_client:
                 await self.initialize()
 
-            # Serialize task
-            task_data = pickle.dumps(task)
+            pipe = self.redis_client.pipeline(transaction=False)
+            now = time.time()
+            for index, task in enumerate(tasks):
+                # Microsecond steps keep submission order within one call
+                self._queue_task(pipe, task, now + index * 1e-6)
+            self._queue_wakeups(pipe, len(tasks))
+            await pipe.execute()
+            return len(tasks)
 
-            # Add to priority queue
-            queue_key = self.priority_queues[task.priority]
+        except Exception as e:
+            logger.error(f"Failed to enqueue {len(tasks)} tasks: {e!s}")
+            return 0
+
+    def _queue_task(self, pipe: Any, task: TaskDefinition, score: float):
+        """Queue the writes that enqueue one task"""
+        # Use timestamp as score for FIFO within same priority
+        if task.scheduled_at:
+            score = task.scheduled_at.timestamp()
+        pipe.zadd(self.priority_queues[task.priority], {task.id: score})
+
+        # Store task data
+        task_key = f"{self.queue_name}:task:{task.id}"
+        pipe.setex(task_key, 86400, pickle.dumps(task))  # 24 hours TTL
+
+        # Set expiry if specified
+        if task.expires_at:
+            expire_key = f"{self.queue_name}:expire:{task.id}"
+            pipe.setex(
+                expire_key,
+                int((task.expires_at - datetime.utcnow()).total_seconds()),
+                "expired",
+            )
 
-            # Use timestamp as score for FIFO within same priority
-            score = time.time()
-            if task.scheduled_at:
-                score = task.scheduled_at.timestamp()
+        if task.batchable:
+            pipe.hset(self.batchable_key, task.id, task.function_name)
 
-            await self.redis_client.zadd(queue_key, {task.id: score})
+    def _queue_wakeups(self, pipe: Any, count: int):
+        """Queue wake-up tokens for up to ``count`` blocked workers"""
+        pipe.lpush(self.ready_key, *([1] * min(count, READY_TOKENS_MAX)))
+        # Tokens nobody waited for only cause a spare wake-up; keep a few
+        pipe.ltrim(self.ready_key, 0, READY_TOKENS_MAX - 1)
 
-            # Store task data
-            task_key = f"{self.queue_name}:task:{task.id}"
-            await self.redis_client.setex(task_key, 86400, task_data)  # 24 hours TTL
+    async def dequeue(
+        self, worker_id: str, timeout: float = 0.0
+    ) -> Optional[TaskDefinition]:
+        """Claim the highest priority due task, waiting up to timeout for one"""
+        try:
+            if not self.redis_client:
+                await self.initialize()
 
-            # Set expiry if specified
-            if task.expires_at:
-                expire_key = f"{self.queue_name}:expire:{task.id}"
-                await self.redis_client.setex(
-                    expire_key,
-                    int((task.expires_at - datetime.utcnow()).total_seconds()),
-                    "expired",
+            deadline = time.monotonic() + timeout
+            while True:
+                task, next_due = await self._claim_next(worker_id)
+                if task is not None:
+                    logger.debug(f"Dequeued task {task.id} by worker {worker_id}")
+                    return task
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                # Sleep until an enqueue wakes us or a scheduled task comes due
+                if next_due is not None:
+                    remaining = min(remaining, next_due - time.time())
+                await self.redis_client.blpop(
+                    [self.ready_key], timeout=max(remaining, 0.01)
                 )
 
-            logger.debug(f"Enqueued task {task.id} with priority {task.priority}")
-            return True
-
         except Exception as e:
-            logger.error(f"Failed to enqueue task {task.id}: {e!s}")
-            return False
+            logger.error(f"Failed to dequeue task: {e!s}")
+            return None
 
-    async def dequeue(self, worker_id: str) -> Optional[TaskDefinition]:
-        """Dequeue highest priority task"""
+    async def _claim_next(
+        self, worker_id: str
+    ) -> Tuple[Optional[TaskDefinition], Optional[float]]:
+        """One CLAIM_NEXT_SCRIPT call: the claimed task, else the next due time"""
+        if self._claim_script is None:
+            self._claim_script = self.redis_client.register_script(CLAIM_NEXT_SCRIPT)
+
+        reply = await self._claim_script(
+            keys=self._claim_keys(), args=self._claim_args(worker_id)
+        )
+        if not reply:
+            return None, None
+        task_id, payload = reply
+        if not task_id:
+            return None, float(payload)
+        return pickle.loads(payload), None
+
+    async def claim_batch(
+        self, worker_id: str, function_name: str, limit: int
+    ) -> List[TaskDefinition]:
+        """Claim up to ``limit`` due batchable tasks of one function"""
         try:
             if not self.redis_client:
                 await self.initialize()
-
-            # Check priority queues from highest to lowest
-            for priority in sorted(TaskPriority, reverse=True):
-                queue_key = self.priority_queues[priority]
-
-                # Get next task (FIFO within priority)
-                now = time.time()
-                result = await self.redis_client.zrangebyscore(
-                    queue_key, 0, now, start=0, num=1, withscores=True
+            if limit <= 0:
+                return []
+            if self._claim_batch_script is None:
+                self._claim_batch_script = self.redis_client.register_script(
+                    CLAIM_BATCH_SCRIPT
                 )
 
-                if result:
-                    task_id, score = result[0]
-                    task_id = task_id.decode("utf-8")
+            reply = await self._claim_batch_script(
+                keys=[*self._claim_keys(), self.batchable_key],
+                args=[
+                    *self._claim_args(worker_id),
+                    function_name,
+                    limit,
+                    limit * 4,  # Due ids examined per priority queue
+                ],
+            )
+            return [pickle.loads(data) for data in reply[1::2]]
 
-                    # Try to acquire lock on this task
-                    lock_key = f"{self.lock_prefix}:{task_id}"
-                    lock_acquired = await self.redis_client.set(
-                        lock_key, worker_id, nx=True, ex=3600  # 1 hour lock
-                    )
+        except Exception as e:
+            logger.error(f"Failed to claim {function_name} batch: {e!s}")
+            return []
+
+    def _claim_keys(self) -> List[str]:
+        """Priority queues, highest first, then the in-flight set"""
+        return [
+            *(self.priority_queues[p] for p in sorted(TaskPriority, reverse=True)),
+            self.in_flight_key,
+        ]
 
-                    if lock_acquired:
-                        # Remove from queue
-                        await self.redis_client.zrem(queue_key, task_id)
+    def _claim_args(self, worker_id: str) -> List[Any]:
+        now = time.time()
+        return [
+            repr(now),
+            repr(now + self.lease_seconds),
+            worker_id,
+            f"{self.queue_name}:task:",
+            f"{self.lock_prefix}:",
+            self.lease_seconds,
+        ]
 
-                        # Get task data
-                        task_key = f"{self.queue_name}:task:{task_id}"
-                        task_data = await self.redis_client.get(task_key)
+    async def requeue_expired_leases(self) -> int:
+        """Return claimed tasks whose lease ran out to their queues"""
+        try:
+            if not self.redis_client:
+                await self.initialize()
 
-                        if task_data:
-                            task = pickle.loads(task_data)
-                            logger.debug(
-                                f"Dequeued task {task_id} by worker {worker_id}"
-                            )
-                            return task
-                        else:
-                            # Task data not found, release lock
-                            await self.redis_client.delete(lock_key)
+            expired = await self.redis_client.zrangebyscore(
+                self.in_flight_key, 0, time.time()
+            )
+            requeued = 0
+            for task_id in expired:
+                task_id = task_id.decode("utf-8")
+                # Only the caller that removes the id requeues it
+                if not await self.redis_client.zrem(self.in_flight_key, task_id):
+                    continue
+                await self.redis_client.delete(f"{self.lock_prefix}:{task_id}")
+                task_data = await self.redis_client.get(
+                    f"{self.queue_name}:task:{task_id}"
+                )
+                if not task_data:
+                    continue
+                task = pickle.loads(task_data)
+                await self.redis_client.zadd(
+                    self.priority_queues[task.priority], {task_id: time.time()}
+                )
+                requeued += 1
 
-            return None
+            if requeued:
+                pipe = self.redis_client.pipeline(transaction=False)
+                self._queue_wakeups(pipe, requeued)
+                await pipe.execute()
+                logger.warning(f"Requeued {requeued} tasks with expired leases")
+            return requeued
 
         except Exception as e:
-            logger.error(f"Failed to dequeue task: {e!s}")
-            return None
+            logger.error(f"Failed to requeue expired leases: {e!s}")
+            return 0
 
     async def store_result(self, result: TaskResult):
         """Store task execution result"""
+        await self.store_results([result])
+
+    async def store_results(self, results: List[TaskResult]):
+        """Store task results and release their claims in one round trip"""
+        if not results:
+            return
         try:
             if not self.redis_client:
                 await self.initialize()
 
-            result_data = pickle.dumps(result)
-            result_key = f"{self.result_store}:{result.task_id}"
-
-            # Store result with 7 days TTL
-            await self.redis_client.setex(result_key, 604800, result_data)
+            pipe = self.redis_client.pipeline(transaction=False)
+            for result in results:
+                # Store result with 7 days TTL
+                result_key = f"{self.result_store}:{result.task_id}"
+                pipe.setex(result_key, 604800, pickle.dumps(result))
 
-            # Release task lock
-            lock_key = f"{self.lock_prefix}:{result.task_id}"
-            await self.redis_client.delete(lock_key)
+                # Release task lock and lease
+                pipe.delete(f"{self.lock_prefix}:{result.task_id}")
+                pipe.zrem(self.in_flight_key, result.task_id)
+                pipe.hdel(self.batchable_key, result.task_id)
 
-            # Clean up task data if completed successfully
-            if result.status == TaskStatus.COMPLETED:
-                task_key = f"{self.queue_name}:task:{result.task_id}"
-                await self.redis_client.delete(task_key)
+                # Clean up task data if completed successfully
+                if result.status == TaskStatus.COMPLETED:
+                    pipe.delete(f"{self.queue_name}:task:{result.task_id}")
+            await pipe.execute()
 
         except Exception as e:
-            logger.error(f"Failed to store result for task {result.task_id}: {e!s}")
+            task_ids = ", ".join(result.task_id for result in results)
+            logger.error(f"Failed to store results for tasks {task_ids}: {e!s}")
 
     async def get_result(self, task_id: str) -> Optional[TaskResult]:
         """Get task execution result"""
@@ -297,6 +492,7 @@ class TaskQueue:
                 "newest_task_age": 0,
                 "total_results": 0,
                 "active_locks": 0,
+                "in_flight": await self.redis_client.zcard(self.in_flight_key),
             }
 
             # Get counts for each priority
@@ -348,6 +544,10 @@ class TaskWorker:
     def __init__(self, worker_id: str, concurrency: int = 4):
         self.worker_id = worker_id
         self.concurrency = concurrency
+        # Longest block on an empty queue before re-checking is_running
+        self.idle_wait = config_manager.config.task_idle_wait
+        self.batch_max_size = config_manager.config.task_batch_max_size
+        self.batch_max_wait = config_manager.config.task_batch_max_wait
         self.is_running = False
         self.task_queue = TaskQueue()
         self.thread_executor = ThreadPoolExecutor(max_workers=concurrency)
@@ -363,6 +563,8 @@ class TaskWorker:
 
         # Task registry
         self.task_functions = {}
+        # Functions that run a whole batch of batchable tasks in one call
+        self.batch_functions = {}
         self._register_default_tasks()
 
     def _register_default_tasks(self):
@@ -381,12 +583,24 @@ class TaskWorker:
                 "analytics_computation_task": self._analytics_computation_task,
             }
         )
+        self.batch_functions.update(
+            {"prediction_batch_task": self._prediction_batch_many}
+        )
 
     def register_task(self, name: str, function: Callable):
         """Register custom task function"""
         self.task_functions[name] = function
         logger.info(f"Registered task function: {name}")
 
+    def register_batch_task(self, name: str, function: Callable):
+        """Register ``await function(tasks)`` for batchable tasks of ``name``.
+
+        It returns one result per task, in order; an exception in place of a
+        result fails only that task.
+        """
+        self.batch_functions[name] = function
+        logger.info(f"Registered batch task function: {name}")
+
     async def start(self):
         """Start the worker"""
         if self.is_running:
@@ -430,10 +644,19 @@ class TaskWorker:
         """Main worker processing loop"""
         while self.is_running:
             try:
-                # Get next task
-                task = await self.task_queue.dequeue(worker_thread_id)
+                # Get next task, blocking until one is enqueued or comes due
+                task = await self.task_queue.dequeue(
+                    worker_thread_id, timeout=self.idle_wait
+                )
+
+                if task and self._runs_batched(task):
+                    # Claim queued tasks of the same function and run them together
+                    tasks = await self._fill_batch(task, worker_thread_id)
+                    results = await self._execute_batch(tasks, worker_thread_id)
+                    await self.task_queue.store_results(results)
+                    self._record_results(results)
 
-                if task:
+                elif task:
                     # Execute task
                     result = await self._execute_task(task, worker_thread_id)
 
@@ -441,19 +664,93 @@ class TaskWorker:
                     await self.task_queue.store_result(result)
 
                     # Update stats
-                    self.tasks_processed += 1
-                    if result.status == TaskStatus.FAILED:
-                        self.tasks_failed += 1
-                    self.total_execution_time += result.execution_time
-
-                else:
-                    # No tasks available, wait before checking again
-                    await asyncio.sleep(1)
+                    self._record_results([result])
 
             except Exception as e:
                 logger.error(f"Worker loop error: {e!s}")
                 await asyncio.sleep(5)  # Wait before retrying
 
+    def _runs_batched(self, task: TaskDefinition) -> bool:
+        return task.batchable and task.function_name in self.batch_functions
+
+    def _record_results(self, results: List[TaskResult]):
+        self.tasks_processed += len(results)
+        for result in results:
+            if result.status == TaskStatus.FAILED:
+                self.tasks_failed += 1
+            self.total_execution_time += result.execution_time
+
+    async def _fill_batch(
+        self, first: TaskDefinition, worker_thread_id: str
+    ) -> List[TaskDefinition]:
+        """Add queued tasks of first's function, waiting batch_max_wait if short"""
+        batch = [first]
+        batch += await self.task_queue.claim_batch(
+            worker_thread_id, first.function_name, self.batch_max_size - 1
+        )
+        if len(batch) < self.batch_max_size and self.batch_max_wait > 0:
+            await asyncio.sleep(self.batch_max_wait)
+            batch += await self.task_queue.claim_batch(
+                worker_thread_id,
+                first.function_name,
+                self.batch_max_size - len(batch),
+            )
+        return batch
+
+    async def _execute_batch(
+        self, tasks: List[TaskDefinition], worker_thread_id: str
+    ) -> List[TaskResult]:
+        """Run a batch in one call, keeping a result per task"""
+        started_at = datetime.utcnow()
+        results = [
+            TaskResult(
+                task_id=task.id,
+                status=TaskStatus.RUNNING,
+                started_at=started_at,
+                worker_id=worker_thread_id,
+                worker_node=self.worker_id,
+                metadata={"batch_size": len(tasks)},
+            )
+            for task in tasks
+        ]
+
+        try:
+            function = self.batch_functions[tasks[0].function_name]
+            outcomes = await asyncio.wait_for(
+                function(tasks), timeout=max(task.timeout_seconds for task in tasks)
+            )
+            if len(outcomes) != len(tasks):
+                raise ValueError(
+                    f"Batch function returned {len(outcomes)} results "
+                    f"for {len(tasks)} tasks"
+                )
+            for result, outcome in zip(results, outcomes):
+                if isinstance(outcome, Exception):
+                    result.status = TaskStatus.FAILED
+                    result.error = str(outcome)
+                else:
+                    result.status = TaskStatus.COMPLETED
+                    result.result = outcome
+
+        except asyncio.TimeoutError:
+            for result in results:
+                result.status = TaskStatus.TIMEOUT
+                result.error = "Batch timed out"
+
+        except Exception as e:
+            for result in results:
+                result.status = TaskStatus.FAILED
+                result.error = str(e)
+                result.traceback = traceback.format_exc()
+
+        finally:
+            completed_at = datetime.utcnow()
+            for result in results:
+                result.completed_at = completed_at
+                result.execution_time = (completed_at - started_at).total_seconds()
+
+        return results
+
     async def _execute_task(
         self, task: TaskDefinition, worker_thread_id: str
     ) -> TaskResult:
@@ -528,6 +825,9 @@ class TaskWorker:
             try:
                 await asyncio.sleep(60)  # Monitor every minute
 
+                # Recover tasks claimed by workers that died mid-execution
+                await self.task_queue.requeue_expired_leases()
+
                 # Log performance stats
                 uptime = (
                     (datetime.utcnow() - self.start_time).total_seconds()
@@ -607,15 +907,9 @@ class TaskWorker:
 
             predictions = []
             for event_id in event_ids:
-                # Mock features for batch prediction
-                features = {
-                    "team_1_rating": 1500 + (hash(event_id) % 200),
-                    "team_2_rating": 1500 + (hash(event_id[::-1]) % 200),
-                    "home_advantage": 100,
-                }
-
                 prediction = await ultra_ensemble_engine.predict(
-                    features=features, context=kwargs.get("context", "pre_game")
+                    features=self._prediction_features(event_id),
+                    context=kwargs.get("context", "pre_game"),
                 )
 
                 predictions.append(
@@ -637,6 +931,55 @@ class TaskWorker:
             logger.error(f"Batch prediction task failed: {e!s}")
             return {"status": "failed", "error": str(e)}
 
+    async def _prediction_batch_many(self, tasks: List[TaskDefinition]) -> List[Any]:
+        """Batch prediction tasks merged into one predict_many call"""
+        # Import here to avoid circular imports
+        from ensemble_engine import ultra_ensemble_engine
+
+        logger.info(f"Executing {len(tasks)} batch prediction tasks together")
+        requests, spans = [], []
+        for task in tasks:
+            event_ids = task.kwargs.get("event_ids", task.args[0] if task.args else [])
+            context = task.kwargs.get("context", "pre_game")
+            spans.append((len(requests), event_ids))
+            requests.extend(
+                (self._prediction_features(event_id), context) for event_id in event_ids
+            )
+        predictions = await ultra_ensemble_engine.predict_many(requests)
+
+        outcomes = []
+        for start, event_ids in spans:
+            own = predictions[start : start + len(event_ids)]
+            failure = next((p for p in own if isinstance(p, Exception)), None)
+            if failure is not None:
+                outcomes.append(failure)
+                continue
+            outcomes.append(
+                {
+                    "status": "success",
+                    "predictions": [
+                        {
+                            "event_id": event_id,
+                            "prediction": prediction.predicted_value,
+                            "confidence": prediction.prediction_probability,
+                        }
+                        for event_id, prediction in zip(event_ids, own)
+                    ],
+                    "count": len(own),
+                    "timestamp": datetime.utcnow().isoformat(),
+                }
+            )
+        return outcomes
+
+    @staticmethod
+    def _prediction_features(event_id: str) -> Dict[str, float]:
+        # Mock features for batch prediction
+        return {
+            "team_1_rating": 1500 + (hash(event_id) % 200),
+            "team_2_rating": 1500 + (hash(event_id[::-1]) % 200),
+            "home_advantage": 100,
+        }
+
     async def _risk_analysis_task(self, portfolio: Dict[str, Any], **kwargs):
         """Risk analysis task"""
         logger.info("Executing risk analysis task")
@@ -673,7 +1016,9 @@ class TaskWorker:
             from arbitrage_engine import ultra_arbitrage_engine
 
             opportunities = await ultra_arbitrage_engine.scan_for_opportunities(
-                market_data=market_data, historical_data=kwargs.get("historical_data")
+                market_data=market_data,
+                historical_data=kwargs.get("historical_data"),
+                sharded=kwargs.get("sharded"),
             )
 
             return {
@@ -910,6 +1255,11 @@ class UltraTaskProcessor:
         await self.task_queue.enqueue(task)
         return task.id
 
+    async def submit_many(self, tasks: List[TaskDefinition]) -> List[str]:
+        """Submit tasks in one pipelined enqueue"""
+        await self.task_queue.enqueue_many(tasks)
+        return [task.id for task in tasks]
+
     async def get_task_result(self, task_id: str) -> Optional[TaskResult]:
         """Get task execution result"""
         return await self.task_queue.get_result(task_id)
@@ -0,0 +1,33 @@
+"""Real stream messages for the stream tests."""
+
+import os
+import sys
+from datetime import datetime
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from realtime_engine import StreamMessage, StreamType, UpdatePriority
+
+
+def stream_message(
+    data: Any = None,
+    stream_type: StreamType = StreamType.BETTING_ODDS,
+    event_id: Optional[str] = "e1",
+    source: str = "feed",
+    priority: UpdatePriority = UpdatePriority.HIGH,
+    id: str = "m1",
+    timestamp: datetime = datetime(2024, 1, 1, 12, 0, 0, 123456),
+    **fields: Any,
+) -> StreamMessage:
+    """StreamMessage with defaults for the fields a test does not care about"""
+    return StreamMessage(
+        id=id,
+        stream_type=stream_type,
+        priority=priority,
+        data=data,
+        timestamp=timestamp,
+        source=source,
+        event_id=event_id,
+        **fields,
+    )
@@ -0,0 +1,160 @@
+"""Tests for the incremental arbitrage price book."""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_book import ArbitrageSignalType, IncrementalPriceBook
+from arbitrage_engine import ArbitrageType, UltraArbitrageEngine
+
+
+def _quote(outcome, odds, sportsbook, event_id="e1", market_type="total"):
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "outcome": outcome,
+        "odds": odds,
+        "sportsbook": sportsbook,
+    }
+
+
+def test_single_update_opens_updates_and_closes_arbitrage():
+    """Each quote update emits the arbitrage change it causes."""
+    book = IncrementalPriceBook()
+    assert book.apply_quote(_quote("over", 2.10, "book_a")) is None
+    assert book.apply_quote(_quote("under", 1.85, "book_b")) is None
+
+    opened = book.apply_quote(_quote("under", 2.05, "book_c"))
+    assert opened.signal_type == ArbitrageSignalType.OPENED
+    assert [q["sportsbook"] for q in opened.hit.quotes] == ["book_a", "book_c"]
+
+    updated = book.apply_quote(_quote("over", 2.15, "book_d"))
+    assert updated.signal_type == ArbitrageSignalType.UPDATED
+    assert abs(updated.hit.margin - (1 / 2.15 + 1 / 2.05)) < 1e-12
+
+    # A price below the current best does not touch the market
+    assert book.apply_quote(_quote("over", 1.70, "book_e")) is None
+
+    closed = book.apply_quote(_quote("under", 1.80, "book_c"))
+    assert closed.signal_type == ArbitrageSignalType.CLOSED
+    assert book.active_hits() == []
+    assert book.best_prices("e1", "total")["under"]["sportsbook"] == "book_b"
+
+
+def test_withdrawn_best_price_falls_back_to_second_best():
+    """Withdrawing the best price re-ranks the remaining books."""
+    book = IncrementalPriceBook()
+    book.apply_quotes(
+        [
+            _quote("over", 2.20, "book_a"),
+            _quote("over", 2.05, "book_b"),
+            _quote("under", 2.00, "book_c"),
+        ]
+    )
+    assert len(book.active_hits()) == 1
+
+    signal = book.remove_quote("e1", "total", "over", "book_a")
+    assert signal.signal_type == ArbitrageSignalType.UPDATED
+    assert signal.hit.quotes[0]["sportsbook"] == "book_b"
+
+    assert book.apply_quote(_quote("over", None, "book_b")).signal_type == (
+        ArbitrageSignalType.CLOSED
+    )
+
+
+def test_same_book_best_prices_pair_with_runner_up():
+    """A book holding both best prices is paired with the other side's second."""
+    book = IncrementalPriceBook()
+    book.apply_quotes(
+        [
+            _quote("yes", 2.20, "book_a"),
+            _quote("no", 2.20, "book_a"),
+            _quote("no", 1.70, "book_b"),
+        ]
+    )
+    assert book.active_hits() == []
+
+    signal = book.apply_quote(_quote("yes", 2.15, "book_c"))
+    assert signal.signal_type == ArbitrageSignalType.OPENED
+    assert {q["sportsbook"] for q in signal.hit.quotes} == {"book_a", "book_c"}
+
+
+def test_three_way_market_opens_once_complete():
+    """Three outcomes are evaluated together, never as a two-way pair."""
+    book = IncrementalPriceBook()
+    signals = book.apply_quotes(
+        [
+            _quote("draw", 3.6, "book_c", market_type="moneyline"),
+            _quote("home", 3.2, "book_a", market_type="moneyline"),
+            _quote("away", 3.4, "book_b", market_type="moneyline"),
+            _quote("home", 2.9, "book_b", market_type="moneyline"),
+        ]
+    )
+
+    assert [s.signal_type for s in signals] == [ArbitrageSignalType.OPENED]
+    assert signals[0].hit.outcome_count == 3
+
+
+def test_replace_and_remove_event():
+    """Snapshots withdraw missing quotes and finished events close their arbs."""
+    book = IncrementalPriceBook()
+    book.replace_event(
+        "e1", [_quote("over", 2.10, "book_a"), _quote("under", 2.05, "book_b")]
+    )
+    book.replace_event(
+        "e2", [_quote("over", 2.10, "book_a"), _quote("under", 2.05, "book_b")]
+    )
+    assert len(book.active_hits()) == 2
+
+    signals = book.replace_event("e1", [_quote("over", 2.10, "book_a")])
+    assert [s.signal_type for s in signals] == [ArbitrageSignalType.CLOSED]
+
+    signals = book.remove_event("e2")
+    assert [s.hit.event_id for s in signals] == ["e2"]
+    assert book.get_stats()["events"] == 1
+
+
+def test_engine_emits_signals_from_odds_messages():
+    """UltraArbitrageEngine turns stream updates into listener calls."""
+    engine = UltraArbitrageEngine()
+    received = []
+
+    async def listener(signal):
+        received.append(signal.signal_type)
+
+    async def run():
+        engine.add_signal_listener(listener)
+        for quote in (_quote("over", 2.10, "book_a"), _quote("under", 2.05, "b")):
+            message = SimpleNamespace(
+                data={k: v for k, v in quote.items() if k != "event_id"},
+                event_id="e1",
+                timestamp=datetime.utcnow(),
+            )
+            await engine.on_odds_message(message)
+
+    asyncio.run(run())
+
+    assert received == [ArbitrageSignalType.OPENED]
+    assert engine.performance_metrics["opportunities_detected"] == 1
+    opportunities = engine.current_arbitrage_opportunities()
+    assert [o.arbitrage_type for o in opportunities] == [ArbitrageType.TWO_WAY]
+
+
+def test_scan_for_opportunities_leaves_the_price_book_alone():
+    """Snapshot scans are stateless: old quotes cannot form phantom arbitrage."""
+    engine = UltraArbitrageEngine()
+    market_data = [_quote("over", 2.10, "book_a"), _quote("under", 2.05, "book_b")]
+
+    result = asyncio.run(engine.scan_for_opportunities(market_data))
+    # book_b is no longer quoted; its old price must not pair with book_a
+    later = [_quote("over", 2.10, "book_a"), _quote("under", 1.80, "book_c")]
+    again = asyncio.run(engine.scan_for_opportunities(later))
+
+    assert len(result["arbitrage_opportunities"]) == 1
+    assert again["arbitrage_opportunities"] == []
+    assert engine.price_book.metrics.opened == 0
+    assert engine.current_arbitrage_opportunities() == []
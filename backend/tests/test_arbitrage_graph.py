@@ -0,0 +1,212 @@
+"""Tests for multi-leg arbitrage on the market graph."""
+
+import asyncio
+import itertools
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_book import ArbitrageSignalType
+from arbitrage_engine import ArbitrageCalculator, ArbitrageType
+from arbitrage_graph import MarketGraph, find_cover, outcome_interval
+
+
+def _quote(market_type, outcome, odds, sportsbook, line=None, event_id="e1"):
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "outcome": outcome,
+        "odds": odds,
+        "sportsbook": sportsbook,
+        "line": line,
+    }
+
+
+def test_outcome_intervals():
+    """Outcomes map to the integer range on which they win."""
+    assert outcome_interval(_quote("h2h", "home", 2.0, "a")) == ("margin", 1, math.inf)
+    assert outcome_interval(_quote("spread", "home", 2.0, "a", -1.5)) == (
+        "margin",
+        2,
+        math.inf,
+    )
+    assert outcome_interval(_quote("spread", "away", 2.0, "a", 1.5)) == (
+        "margin",
+        -math.inf,
+        1,
+    )
+    assert outcome_interval(_quote("totals", "under", 2.0, "a", 2.5)) == (
+        "total",
+        -math.inf,
+        2,
+    )
+    # Whole-number lines can push and are not modelled
+    assert outcome_interval(_quote("spread", "home", 2.0, "a", -1.0)) is None
+    assert outcome_interval(_quote("player_points", "over", 2.0, "a", 20.5)) is None
+
+
+def test_cross_market_pair():
+    """A moneyline side and the opposite +0.5 handicap cover every result."""
+    graph = MarketGraph()
+    assert graph.apply_quote(_quote("moneyline", "home", 2.30, "book_a")) is None
+
+    signal = graph.apply_quote(_quote("spread", "away", 1.90, "book_b", 0.5))
+    assert signal.signal_type == ArbitrageSignalType.OPENED
+    assert signal.hit.arbitrage_type == "cross_market"
+    assert abs(signal.hit.margin - (1 / 2.30 + 1 / 1.90)) < 1e-12
+
+    closed = graph.apply_quote(_quote("spread", "away", 1.60, "book_b", 0.5))
+    assert closed.signal_type == ArbitrageSignalType.CLOSED
+
+
+def test_triangular_and_synthetic_covers():
+    """Three disjoint legs are triangular; overlapping legs are synthetic."""
+    graph = MarketGraph()
+    signals = graph.apply_quotes(
+        [
+            _quote("moneyline", "away", 4.4, "book_a"),
+            _quote("moneyline", "draw", 4.0, "book_b"),
+            _quote("spread", "home", 2.05, "book_c", -0.5),
+            _quote("totals", "over", 2.05, "book_a", 2.5),
+            _quote("totals", "under", 2.02, "book_b", 3.5),
+        ]
+    )
+
+    types = {signal.hit.market_type: signal.hit.arbitrage_type for signal in signals}
+    assert types == {"margin": "triangular", "total": "synthetic"}
+
+
+def test_single_market_books_are_left_to_the_price_book():
+    """Plain two-way books are not reported again as multi-leg arbitrage."""
+    graph = MarketGraph()
+    signals = graph.apply_quotes(
+        [
+            _quote("totals", "over", 2.10, "book_a", 2.5),
+            _quote("totals", "under", 2.10, "book_b", 2.5),
+        ]
+    )
+
+    assert signals == []
+
+
+def test_cheaper_single_market_book_does_not_hide_a_cross_market_cover():
+    """The search skips a one-market book and still finds the mixed cover."""
+    graph = MarketGraph()
+    signals = graph.apply_quotes(
+        [
+            _quote("moneyline", "home", 2.3, "book_a"),
+            _quote("moneyline", "draw", 3.8, "book_b"),
+            _quote("moneyline", "away", 4.4, "book_c"),
+            _quote("double_chance", "x2", 1.9, "book_d"),
+        ]
+    )
+
+    hit = signals[-1].hit
+    assert hit.arbitrage_type == "cross_market"
+    assert hit.outcomes == ["double_chance:x2", "moneyline:home"]
+    assert abs(hit.margin - (1 / 2.3 + 1 / 1.9)) < 1e-12
+
+
+def test_leg_limit_bounds_the_search():
+    """Covers needing more legs than max_legs are not found."""
+    quotes = [
+        _quote("moneyline", "away", 4.4, "book_a"),
+        _quote("moneyline", "draw", 4.0, "book_b"),
+        _quote("spread", "home", 2.05, "book_c", -0.5),
+    ]
+    assert MarketGraph(max_legs=2).apply_quotes(quotes) == []
+    assert len(MarketGraph(max_legs=3).apply_quotes(quotes)) == 1
+
+
+def test_find_cover_matches_brute_force():
+    """Bellman-Ford returns the cheapest cover among all leg subsets."""
+    rng = random.Random(7)
+    for _ in range(200):
+        edges = {}
+        for _ in range(rng.randint(2, 7)):
+            start = rng.choice([-math.inf, -2, -1, 0, 1, 2])
+            end = rng.choice([-1, 0, 1, 2, 3, math.inf])
+            if start < end:
+                edges[(start, end)] = (rng.uniform(0.2, 0.7), (start, end), {})
+
+        expected = None
+        spans = list(edges)
+        for size in range(1, 4):
+            for subset in itertools.combinations(spans, size):
+                if _covers(subset):
+                    cost = sum(edges[span][0] for span in subset)
+                    expected = cost if expected is None else min(expected, cost)
+
+        cover = find_cover(edges, max_legs=3)
+        if expected is None:
+            assert cover is None
+        else:
+            assert abs(cover[0] - expected) < 1e-12
+
+
+def test_mixed_find_cover_matches_brute_force():
+    """Mixed search returns the cheapest cover of two or more needed markets."""
+    rng = random.Random(11)
+    for _ in range(200):
+        edges = {}
+        for _ in range(rng.randint(2, 7)):
+            start = rng.choice([-math.inf, -2, -1, 0, 1, 2])
+            end = rng.choice([-1, 0, 1, 2, 3, math.inf])
+            if start < end:
+                market = rng.choice(["moneyline", "spread", "double_chance"])
+                edges[(start, end)] = (rng.uniform(0.2, 0.7), (market, None), {})
+
+        expected = None
+        spans = list(edges)
+        for size in range(2, 4):
+            for subset in itertools.combinations(spans, size):
+                markets = {edges[span][1] for span in subset}
+                if len(markets) > 1 and _minimal_cover(subset):
+                    cost = sum(edges[span][0] for span in subset)
+                    expected = cost if expected is None else min(expected, cost)
+
+        cover = find_cover(edges, max_legs=3, mixed=True)
+        if expected is None:
+            assert cover is None
+        else:
+            assert abs(cover[0] - expected) < 1e-12
+            assert len({leg for leg, _, _ in cover[1]}) > 1
+
+
+def _minimal_cover(spans):
+    return _covers(spans) and not any(
+        _covers(spans[:i] + spans[i + 1 :]) for i in range(len(spans))
+    )
+
+
+def _covers(spans):
+    reach = -math.inf
+    for start, end in sorted(spans):
+        if start > reach:
+            return False
+        reach = max(reach, end)
+    return reach == math.inf
+
+
+def test_calculator_reports_multi_leg_opportunities():
+    """ArbitrageCalculator fills the cross-market/triangular/synthetic types."""
+    odds_data = [
+        _quote("moneyline", "home", 2.30, "book_a"),
+        _quote("spread", "away", 1.90, "book_b", 0.5),
+        _quote("totals", "over", 2.05, "book_a", 2.5, event_id="e2"),
+        _quote("totals", "under", 2.02, "book_b", 3.5, event_id="e2"),
+    ]
+
+    opportunities = asyncio.run(
+        ArbitrageCalculator().detect_arbitrage_opportunities(odds_data)
+    )
+
+    by_type = {opp.arbitrage_type: opp for opp in opportunities}
+    assert set(by_type) == {ArbitrageType.CROSS_MARKET, ArbitrageType.SYNTHETIC}
+    cross = by_type[ArbitrageType.CROSS_MARKET]
+    assert cross.event_id == "e1"
+    assert cross.profit_percentage > 0
+    assert set(cross.stake_distribution) == {"book_a", "book_b"}
@@ -0,0 +1,131 @@
+"""Tests for the vectorized arbitrage scanner."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_engine import ArbitrageCalculator, ArbitrageType
+from arbitrage_scanner import OddsColumns, VectorizedArbitrageScanner
+
+
+def _quote(event_id, outcome, odds, sportsbook, market_type="total"):
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "outcome": outcome,
+        "odds": odds,
+        "sportsbook": sportsbook,
+    }
+
+
+def test_two_way_hit_uses_best_price_per_side():
+    """The best over and best under across books form one opportunity."""
+    hits = VectorizedArbitrageScanner().scan(
+        [
+            _quote("e1", "Over", 2.10, "book_a"),
+            _quote("e1", "Over", 1.95, "book_b"),
+            _quote("e1", "Under", 2.05, "book_b"),
+            _quote("e1", "Under", 1.90, "book_c"),
+        ]
+    )
+
+    assert len(hits) == 1
+    hit = hits[0]
+    assert (hit.event_id, hit.market_type) == ("e1", "total")
+    assert hit.outcomes == ["over", "under"]
+    assert [q["sportsbook"] for q in hit.quotes] == ["book_a", "book_b"]
+    assert abs(hit.margin - (1 / 2.10 + 1 / 2.05)) < 1e-12
+
+
+def test_efficient_markets_and_bad_prices_produce_no_hits():
+    """Margins at or above one and unusable prices are ignored."""
+    scanner = VectorizedArbitrageScanner()
+    hits = scanner.scan(
+        [
+            _quote("e1", "over", 1.91, "book_a"),
+            _quote("e1", "under", 1.91, "book_b"),
+            _quote("e2", "over", "n/a", "book_a"),
+            _quote("e2", "under", 0.5, "book_b"),
+        ]
+    )
+
+    assert hits == []
+    assert scanner.metrics.quotes == 2
+    assert scanner.metrics.total_scans == 1
+
+
+def test_same_book_best_prices_fall_back_to_cross_book_pair():
+    """When one book has both best prices, the best cross-book pair is used."""
+    hits = VectorizedArbitrageScanner().scan(
+        [
+            _quote("e1", "over", 2.20, "book_a"),
+            _quote("e1", "under", 2.20, "book_a"),
+            _quote("e1", "over", 2.05, "book_b"),
+            _quote("e1", "under", 2.02, "book_c"),
+        ]
+    )
+
+    assert len(hits) == 1
+    books = {q["sportsbook"] for q in hits[0].quotes}
+    assert len(books) == 2
+    assert abs(hits[0].margin - (1 / 2.20 + 1 / 2.05)) < 1e-12
+
+
+def test_three_way_hit_and_no_two_way_inside_three_outcome_market():
+    """Three-outcome markets are checked as a whole, never pairwise."""
+    scanner = VectorizedArbitrageScanner()
+    hits = scanner.scan(
+        [
+            _quote("e1", "home", 3.2, "book_a", "moneyline"),
+            _quote("e1", "draw", 3.6, "book_b", "moneyline"),
+            _quote("e1", "away", 3.4, "book_c", "moneyline"),
+            _quote("e2", "home", 2.3, "book_a", "moneyline"),
+            _quote("e2", "draw", 2.9, "book_b", "moneyline"),
+            _quote("e2", "away", 2.3, "book_c", "moneyline"),
+        ]
+    )
+
+    assert [(hit.event_id, hit.outcome_count) for hit in hits] == [("e1", 3)]
+    assert scanner.metrics.markets == 2
+
+
+def test_scan_columns_accepts_prepacked_quotes():
+    """Packing once lets the same columns be scanned repeatedly."""
+    columns = OddsColumns.from_records(
+        [_quote("e1", "yes", 2.1, "book_a"), _quote("e1", "no", 2.1, "book_b")]
+    )
+    scanner = VectorizedArbitrageScanner(min_edge=0.1)
+
+    assert len(columns) == 2
+    assert scanner.scan_columns(columns) == []
+    scanner.min_edge = 0.0
+    assert len(scanner.scan_columns(columns)) == 1
+
+
+def test_calculator_builds_opportunities_from_scanner_hits():
+    """ArbitrageCalculator returns full opportunities for vectorized hits."""
+    calculator = ArbitrageCalculator()
+    odds_data = [
+        _quote("e1", "over", 2.10, "book_a"),
+        _quote("e1", "under", 2.05, "book_b"),
+        _quote("e2", "home", 3.2, "book_a", "moneyline"),
+        _quote("e2", "draw", 3.6, "book_b", "moneyline"),
+        _quote("e2", "away", 3.4, "book_c", "moneyline"),
+    ]
+
+    opportunities = asyncio.run(calculator.detect_arbitrage_opportunities(odds_data))
+
+    types = sorted(opp.arbitrage_type for opp in opportunities)
+    assert types == sorted([ArbitrageType.TWO_WAY, ArbitrageType.THREE_WAY])
+    assert all(opp.profit_percentage > 0 for opp in opportunities)
+
+
+def test_different_lines_are_different_markets():
+    """Over and under on different lines never form a two-way book."""
+    over = _quote("e1", "over", 2.10, "book_a")
+    under = _quote("e1", "under", 2.10, "book_b")
+    over["line"], under["line"] = 2.5, 3.5
+
+    assert VectorizedArbitrageScanner().scan([over, under]) == []
@@ -0,0 +1,244 @@
+"""Tests for sharded full-market opportunity scanning."""
+
+import asyncio
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_engine import (
+    ArbitrageCalculator,
+    ArbitrageType,
+    MarketInefficiencyDetector,
+    MarketInefficiencyType,
+    UltraArbitrageEngine,
+)
+from arbitrage_sharding import (
+    InefficiencyScreen,
+    ShardedOpportunityScanner,
+    event_shard,
+    pack_columns,
+    screen_inefficiencies,
+)
+
+
+def _quote(event_id, market_type, outcome, odds, sportsbook, line=None, **extra):
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "outcome": outcome,
+        "odds": odds,
+        "sportsbook": sportsbook,
+        "line": line,
+        **extra,
+    }
+
+
+def _market_data():
+    return [
+        _quote("e1", "totals", "over", 2.10, "book_a", 2.5),
+        _quote("e1", "totals", "under", 2.05, "book_b", 2.5),
+        _quote("e2", "moneyline", "home", 3.2, "book_a"),
+        _quote("e2", "moneyline", "draw", 3.6, "book_b"),
+        _quote("e2", "moneyline", "away", 3.4, "book_c"),
+        _quote("e3", "moneyline", "home", 2.30, "book_a"),
+        _quote("e3", "spread", "away", 1.90, "book_b", 0.5),
+        _quote("e4", "totals", "over", 1.91, "book_a", 2.5),
+        _quote("e4", "totals", "under", "n/a", "book_b", 2.5),
+    ]
+
+
+def _signature(opportunity):
+    return (
+        opportunity.arbitrage_type,
+        opportunity.event_id,
+        round(opportunity.profit_percentage, 9),
+    )
+
+
+def test_pack_columns_groups_events_into_contiguous_shards():
+    """Every shard is one slice holding whole events."""
+    market_data = [
+        _quote(f"e{i % 13}", "totals", "over", 2.0, "book_a") for i in range(100)
+    ]
+    packed = pack_columns(market_data, shard_count=4)
+    try:
+        assert len(packed) == 100
+        assert sorted(packed.order.tolist()) == list(range(100))
+        assert packed.bounds[0][0] == 0 and packed.bounds[-1][1] == 100
+        for shard, (start, stop) in enumerate(packed.bounds):
+            for position in range(start, stop):
+                event_id = market_data[packed.order[position]]["event_id"]
+                assert event_shard(event_id, 4) == shard
+    finally:
+        os.unlink(packed.path)
+
+
+def test_sharded_scan_matches_in_process_detection():
+    """Merged shard results equal the single-process calculator."""
+    market_data = _market_data()
+    scanner = ShardedOpportunityScanner(workers=2)
+    engine = UltraArbitrageEngine()
+    engine._sharded_scanner = scanner
+    try:
+        result = asyncio.run(engine.scan_for_opportunities(market_data, sharded=True))
+    finally:
+        scanner.shutdown()
+
+    expected = asyncio.run(
+        ArbitrageCalculator().detect_arbitrage_opportunities(market_data)
+    )
+    assert sorted(map(_signature, result["arbitrage_opportunities"])) == sorted(
+        map(_signature, expected)
+    )
+    assert {o.arbitrage_type for o in result["arbitrage_opportunities"]} == {
+        ArbitrageType.TWO_WAY,
+        ArbitrageType.THREE_WAY,
+        ArbitrageType.CROSS_MARKET,
+    }
+    assert result["sharded_scan"]["shards_completed"] == result["sharded_scan"][
+        "shards"
+    ]
+    assert not result["sharded_scan"]["deadline_exceeded"]
+    # Sharded scans are snapshots; the incremental book is left untouched
+    assert engine.price_book.get_stats()["events"] == 0
+
+
+def test_sharded_and_unsharded_scans_report_the_same_opportunities():
+    """Both scan paths find the same arbitrage and inefficiencies."""
+    now = datetime(2024, 1, 1, 12, 0)
+    market_data = _market_data() + [
+        _quote("e5", "moneyline", "home", 2.0, "book_a", public_percentage=80),
+        _quote("e6", "moneyline", "away", 2.6, "book_b", consensus_odds=2.1),
+        _quote(
+            "e7",
+            "moneyline",
+            "home",
+            1.8,
+            "book_c",
+            last_info_update=now,
+            last_odds_update=now + timedelta(minutes=10),
+            info_impact_score=0.6,
+        ),
+    ]
+    historical_data = [{"odds": 2.2, "closing_odds": 2.0}, {"odds": 2.1}, {"odds": 1.9}]
+    scanner = ShardedOpportunityScanner(workers=2)
+    engine = UltraArbitrageEngine()
+    engine._sharded_scanner = scanner
+
+    async def run():
+        sharded = await engine.scan_for_opportunities(
+            market_data, historical_data, sharded=True
+        )
+        unsharded = await engine.scan_for_opportunities(
+            market_data, historical_data, sharded=False
+        )
+        return sharded, unsharded
+
+    try:
+        sharded, unsharded = asyncio.run(run())
+    finally:
+        scanner.shutdown()
+
+    def inefficiencies(result):
+        return sorted(
+            (i.id.rsplit("_", 1)[0], i.sportsbook, i.market_price)
+            for i in result["market_inefficiencies"]
+        )
+
+    assert "error" not in sharded and "error" not in unsharded
+    assert sorted(map(_signature, sharded["arbitrage_opportunities"])) == sorted(
+        map(_signature, unsharded["arbitrage_opportunities"])
+    )
+    assert inefficiencies(sharded) == inefficiencies(unsharded)
+    assert {i.inefficiency_type for i in sharded["market_inefficiencies"]} >= {
+        MarketInefficiencyType.BEHAVIORAL_BIAS,
+        MarketInefficiencyType.INFORMATION_LAG,
+        MarketInefficiencyType.STEAM_MOVE,
+    }
+    assert sharded["total_opportunities"] == unsharded["total_opportunities"]
+
+
+def test_screen_keeps_every_row_the_detector_reports():
+    """Rows rejected by the columnar screen never produce an inefficiency."""
+    rng = random.Random(3)
+    now = datetime(2024, 1, 1, 12, 0)
+    market_data = []
+    for i in range(400):
+        quote = _quote(
+            f"e{i}",
+            "moneyline",
+            "home",
+            rng.choice([1.5, 1.9, 2.0, 2.4, 3.0, 4.2, "n/a"]),
+            "book_a",
+        )
+        for name, value in (
+            ("consensus_odds", rng.uniform(1.4, 3.0)),
+            ("home_power_rating", rng.uniform(1300, 1700)),
+            ("ml_prediction_odds", rng.uniform(1.4, 3.0)),
+            ("sample_size", rng.choice([0, 10, 100, 1000])),
+            ("public_percentage", rng.uniform(20, 90)),
+            ("is_home_team", rng.random() < 0.5),
+            ("is_favorite", rng.random() < 0.5),
+            ("last_info_update", now),
+            ("last_odds_update", now + timedelta(seconds=rng.uniform(0, 900))),
+            ("info_impact_score", rng.uniform(0, 1)),
+        ):
+            if rng.random() < 0.6:
+                quote[name] = value
+        market_data.append(quote)
+    historical_data = [{"odds": 2.2, "closing_odds": 2.0}, {"odds": 2.1}, {"odds": 1.9}]
+
+    detector = MarketInefficiencyDetector()
+    packed = pack_columns(market_data, shard_count=1)
+    try:
+        raw = np.fromfile(packed.path, dtype=np.uint8)
+        columns = {
+            name: raw[offset : offset + len(packed) * 8].view(dtype)
+            for name, (offset, dtype) in packed.layout.items()
+        }
+        mask = screen_inefficiencies(
+            columns, InefficiencyScreen.from_detector(detector, historical_data)
+        )
+    finally:
+        os.unlink(packed.path)
+
+    candidates = sorted(packed.order[np.flatnonzero(mask)].tolist())
+    everything = asyncio.run(
+        detector.detect_market_inefficiencies(market_data, historical_data)
+    )
+    screened = asyncio.run(
+        detector.detect_market_inefficiencies(
+            [market_data[row] for row in candidates], historical_data
+        )
+    )
+
+    def keys(found):
+        return sorted((i.id.rsplit("_", 1)[0], i.event_id) for i in found)
+
+    assert everything
+    assert len(candidates) < len(market_data)
+    assert keys(screened) == keys(everything)
+
+
+def test_deadline_returns_partial_results():
+    """Shards still running at the deadline are abandoned, not awaited."""
+    with tempfile.TemporaryDirectory() as directory:
+        scanner = ShardedOpportunityScanner(
+            workers=2, deadline_seconds=0.0, directory=directory
+        )
+        screen = InefficiencyScreen.from_detector(MarketInefficiencyDetector(), None)
+        try:
+            result = asyncio.run(scanner.scan(_market_data(), screen))
+        finally:
+            scanner.shutdown()
+
+        assert result.deadline_exceeded
+        assert result.shards_completed < result.shards
+        assert scanner.metrics.deadline_misses == 1
+        assert os.listdir(directory) == []
@@ -0,0 +1,146 @@
+"""Tests for the cache benchmark and replay harness."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import cache_optimizer
+from cache_benchmark import (
+    BenchmarkTarget,
+    CacheBenchmark,
+    TargetConfig,
+    WorkloadConfig,
+    WorkloadType,
+    build_workload,
+    find_regressions,
+    main,
+)
+
+
+def _run(workload: WorkloadConfig, target: TargetConfig):
+    return asyncio.run(CacheBenchmark(workload, target).run())
+
+
+@pytest.mark.parametrize("target", list(BenchmarkTarget))
+def test_zipfian_run_reports_every_metric(target):
+    """Each target produces throughput, hit rates, percentiles and memory."""
+    result = _run(
+        WorkloadConfig(operations=2000, key_space=500),
+        TargetConfig(target=target, origin_latency_ms=0, redis_latency_ms=0),
+    )
+
+    assert result.operations == 2000
+    assert result.throughput_ops > 0
+    assert 0.5 < result.hit_rate < 1, "Zipfian reads should mostly hit"
+    assert result.tier_hit_rates["l1"] > 0
+    assert result.latency_us["p50"] <= result.latency_us["p99"]
+    assert result.latency_us["p99"] <= result.latency_us["p999"]
+    assert result.memory["l1_heap_bytes_per_entry"] > 0
+    json.dumps(result.__dict__)  # Machine-readable as-is
+
+
+def test_decorator_target_restores_global_cache():
+    """The @cached target swaps the optimizer cache only for the run."""
+    original = cache_optimizer.ultra_cache_optimizer.cache
+    _run(
+        WorkloadConfig(operations=200, key_space=50),
+        TargetConfig(target=BenchmarkTarget.DECORATOR, origin_latency_ms=0),
+    )
+    assert cache_optimizer.ultra_cache_optimizer.cache is original
+
+
+def test_burst_on_expiry_coalesces_concurrent_misses():
+    """Concurrent readers of an expired key share one origin load."""
+    workload = WorkloadConfig(
+        workload=WorkloadType.BURST_ON_EXPIRY,
+        operations=400,
+        burst_size=100,
+        burst_keys=5,
+        burst_interval=0.06,
+        ttl=0.05,
+    )
+    result = _run(workload, TargetConfig(origin_latency_ms=5, redis_latency_ms=0))
+
+    assert result.origin_loads <= 4 * 5, "At most one load per key per burst"
+    assert result.tier_hit_rates["coalesced"] > 0
+
+
+def test_scan_heavy_mixes_cold_scans_into_hot_reads():
+    """Scan-heavy workloads read keys outside the hot key space."""
+    workload = WorkloadConfig(
+        workload=WorkloadType.SCAN_HEAVY,
+        operations=5000,
+        key_space=100,
+        scan_fraction=0.5,
+        scan_length=100,
+    )
+    keys = [op.key for batch in build_workload(workload) for op in batch.operations]
+
+    assert len(keys) == 5000
+    assert any(int(key.split(":")[1]) >= 100 for key in keys)
+
+
+def test_trace_replay(tmp_path):
+    """Plain-key and JSON traces replay gets, sets and deletes."""
+    trace = tmp_path / "trace.log"
+    trace.write_text(
+        "prediction:e1\n"
+        "prediction:e1\n"
+        '{"key": "prediction:e1", "op": "delete"}\n'
+        '{"key": "prediction:e1", "op": "get", "ttl": 30}\n'
+        '{"key": "odds:e2", "op": "set"}\n'
+        "odds:e2\n"
+    )
+    result = _run(
+        WorkloadConfig(
+            workload=WorkloadType.TRACE, trace_path=str(trace), concurrency=1
+        ),
+        TargetConfig(target=BenchmarkTarget.MEMORY),
+    )
+
+    assert result.operations == 6
+    assert result.origin_loads == 2, "First read and the read after delete miss"
+
+
+def test_regressions_detected_against_baseline():
+    """Slower, colder or higher-latency runs are flagged."""
+    baseline = [
+        {
+            "name": "memory/zipfian",
+            "throughput_ops": 1000.0,
+            "hit_rate": 0.9,
+            "latency_us": {"p99": 10.0, "p999": 20.0},
+        }
+    ]
+    current = [
+        {
+            "name": "memory/zipfian",
+            "throughput_ops": 800.0,
+            "hit_rate": 0.9,
+            "latency_us": {"p99": 10.5, "p999": 40.0},
+        }
+    ]
+
+    regressions = find_regressions(current, baseline, tolerance=0.1)
+    assert len(regressions) == 2
+    assert find_regressions(baseline, baseline) == []
+
+
+def test_cli_writes_json_and_fails_on_regression(tmp_path):
+    """The CLI writes JSON and exits non-zero when the baseline is beaten."""
+    output = tmp_path / "bench.json"
+    args = ["--target", "memory", "--operations", "500", "--output", str(output)]
+    assert main(args) == 0
+
+    report = json.loads(output.read_text())
+    assert report["results"][0]["name"] == "memory/zipfian"
+
+    report["results"][0]["throughput_ops"] *= 1000
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report))
+    assert main(args + ["--baseline", str(baseline)]) == 1
@@ -0,0 +1,90 @@
+"""Tests for the shared cache codec."""
+
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache_codec import (
+    CacheCodec,
+    CodecError,
+    CompressionRule,
+    CompressionType,
+    available_compressions,
+)
+
+
+def test_small_values_are_not_compressed():
+    """Values under the threshold are framed without compression."""
+    codec = CacheCodec()
+    encoded = codec.encode({"event_id": "e1", "prediction": 0.65}, "prediction:e1")
+
+    assert encoded.compression == CompressionType.NONE
+    assert codec.decode(encoded.data) == {"event_id": "e1", "prediction": 0.65}
+
+
+def test_numpy_arrays_round_trip_out_of_band():
+    """NumPy arrays survive encoding as writable arrays."""
+    codec = CacheCodec(default_rule=CompressionRule(CompressionType.NONE))
+    features = {"matrix": np.arange(10000, dtype=np.float64).reshape(100, 100)}
+    encoded = codec.encode(features, "features:game")
+
+    decoded = codec.decode(encoded.data)
+    np.testing.assert_array_equal(decoded["matrix"], features["matrix"])
+    decoded["matrix"][0, 0] = -1.0
+    assert encoded.raw_size >= features["matrix"].nbytes
+
+
+@pytest.mark.parametrize("compression", available_compressions())
+def test_each_available_compression_round_trips(compression):
+    """Every installed compressor produces frames that decode to the input."""
+    codec = CacheCodec(default_rule=CompressionRule(compression, threshold_bytes=0))
+    value = {"lines": [{"book": "b", "odds": 1.9}] * 500}
+    encoded = codec.encode(value, "odds:nba")
+
+    assert codec.decode(encoded.data) == value
+    if compression != CompressionType.NONE:
+        assert encoded.size < encoded.raw_size
+
+
+def test_namespace_rules_override_default():
+    """Namespace rules select compression and threshold per key prefix."""
+    codec = CacheCodec(
+        default_rule=CompressionRule(CompressionType.NONE),
+        namespace_rules={"features": CompressionRule(CompressionType.ZLIB, 64)},
+    )
+    value = "x" * 512
+
+    assert codec.encode(value, "features:1").compression == CompressionType.ZLIB
+    assert codec.encode(value, "odds:1").compression == CompressionType.NONE
+
+
+def test_describe_reports_uncompressed_size():
+    """describe() recovers the raw payload size from the frame header."""
+    codec = CacheCodec(default_rule=CompressionRule(CompressionType.ZLIB, 0))
+    encoded = codec.encode(list(range(1000)), "k")
+
+    described = codec.describe(encoded.data)
+    assert described.raw_size == encoded.raw_size
+    assert described.compression == CompressionType.ZLIB
+
+
+def test_bytes_and_legacy_pickles_decode():
+    """Raw bytes pass through and pre-codec pickles still decode."""
+    codec = CacheCodec()
+
+    assert codec.decode(codec.encode(b"\x00\x01raw").data) == b"\x00\x01raw"
+    assert codec.decode(pickle.dumps({"legacy": True})) == {"legacy": True}
+
+
+def test_corrupt_frame_raises_codec_error():
+    """Truncated headers are reported as CodecError."""
+    codec = CacheCodec()
+    data = codec.encode({"a": 1}).data
+
+    with pytest.raises(CodecError):
+        codec.decode(data[:5])
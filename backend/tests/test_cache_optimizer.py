@@ -0,0 +1,767 @@
+"""Tests for the cache_optimizer caching tiers and eviction policies."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache_invalidation import InvalidationBus, UnixSocketInvalidationTransport
+from cache_prefetcher import BoundedCounter, PredictivePrefetcher, PrefetchSource
+from cache_optimizer import (
+    CacheLayer,
+    CacheStrategy,
+    FrequencySketch,
+    InMemoryCache,
+    LFUPolicy,
+    MultiTierCache,
+    StaleableValue,
+    create_eviction_policy,
+)
+from shared_result_cache import SharedResultCache
+
+
+class FakeRedisClient:
+    """In-process stand-in for the redis.asyncio client used by RedisCache."""
+
+    def __init__(self):
+        self.store = {}
+        self.expiry = {}
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        await asyncio.sleep(0)
+        return self.store.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+
+    async def set(self, key, value):
+        self.round_trips += 1
+        return self._set(key, value)
+
+    async def setex(self, key, ttl, value):
+        self.round_trips += 1
+        return self._setex(key, ttl, value)
+
+    async def delete(self, *keys):
+        self.round_trips += 1
+        return self._delete(*keys)
+
+    async def info(self):
+        return {"used_memory": 0, "connected_clients": 1}
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def _set(self, key, value):
+        self.store[key] = value
+        self.expiry.pop(key, None)
+        return True
+
+    def _setex(self, key, ttl, value):
+        self.store[key] = value
+        self.expiry[key] = ttl * 1000
+        return True
+
+    def _delete(self, *keys):
+        return sum(1 for key in keys if self.store.pop(key, None) is not None)
+
+    def _pttl(self, key):
+        if key not in self.store:
+            return -2
+        return self.expiry.get(key, -1)
+
+
+class FakePipeline:
+    """Queues commands and runs them in a single round trip."""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def mget(self, keys):
+        self.commands.append(lambda: [self.client.store.get(key) for key in keys])
+
+    def pttl(self, key):
+        self.commands.append(lambda: self.client._pttl(key))
+
+    def set(self, key, value):
+        self.commands.append(lambda: self.client._set(key, value))
+
+    def setex(self, key, ttl, value):
+        self.commands.append(lambda: self.client._setex(key, ttl, value))
+
+    async def execute(self):
+        self.client.round_trips += 1
+        return [command() for command in self.commands]
+
+
+@pytest.fixture
+def multi_tier_cache():
+    cache = MultiTierCache()
+    cache.l2_cache.redis_client = FakeRedisClient()
+    return cache
+
+
+def test_lru_evicts_least_recently_used():
+    """LRU keeps recently read keys and evicts the oldest untouched one."""
+    cache = InMemoryCache(max_size=3, strategy=CacheStrategy.LRU)
+    for key in ("a", "b", "c"):
+        cache.set(key, key.upper())
+
+    assert cache.get("a") == "A"
+    cache.set("d", "D")
+
+    assert cache.get("b") is None, "Expected 'b' to be evicted"
+    assert cache.get("a") == "A"
+    assert cache.get_stats()["evictions"] == 1
+
+
+def test_fifo_ignores_hits():
+    """FIFO evicts in insertion order regardless of reads."""
+    cache = InMemoryCache(max_size=2, strategy=CacheStrategy.FIFO)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+
+
+def test_lfu_evicts_least_frequently_used():
+    """LFU evicts the key with the fewest hits, oldest first on ties."""
+    cache = InMemoryCache(max_size=3, strategy=CacheStrategy.LFU)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+    for _ in range(3):
+        cache.get("a")
+    cache.get("c")
+
+    cache.set("d", 4)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.frequency_counter["a"] == 5
+
+
+def test_lfu_policy_recovers_after_removing_min_bucket():
+    """Deleting every key at the lowest frequency must not break victim lookup."""
+    policy = LFUPolicy(max_size=10)
+    policy.record_insert("a")
+    policy.record_insert("b")
+    policy.record_access("b")
+    policy.remove("a")
+
+    assert policy.pop_victim() == "b"
+    assert policy.pop_victim() is None
+
+
+HOT_KEYS = [f"hot:{i}" for i in range(50)]
+
+
+def _hot_keys_after_scan(strategy: CacheStrategy) -> InMemoryCache:
+    cache = InMemoryCache(max_size=100, strategy=strategy)
+    for key in HOT_KEYS:
+        cache.set(key, key)
+    for _ in range(5):
+        for key in HOT_KEYS:
+            cache.get(key)
+
+    for i in range(1000):
+        cache.set(f"scan:{i}", i)
+    return cache
+
+
+def test_w_tinylfu_protects_frequent_keys_from_scans():
+    """A one-off scan must not flush keys with an established access history."""
+    lru = _hot_keys_after_scan(CacheStrategy.LRU)
+    tinylfu = _hot_keys_after_scan(CacheStrategy.W_TINYLFU)
+
+    lru_retained = sum(1 for key in HOT_KEYS if lru.get(key) is not None)
+    retained = sum(1 for key in HOT_KEYS if tinylfu.get(key) is not None)
+    assert lru_retained == 0
+    assert retained >= 45, f"Expected hot keys to survive the scan, got {retained}"
+
+    stats = tinylfu.get_stats()
+    assert stats["total_entries"] <= 100
+    assert stats["eviction_policy"]["admission_rejections"] > 0
+
+
+def test_memory_limit_triggers_eviction():
+    """Entries are evicted once the memory budget is exceeded."""
+    cache = InMemoryCache(max_size=1000, max_memory_mb=1)
+    payload = "x" * (400 * 1024)
+    cache.set("a", payload)
+    cache.set("b", payload)
+    cache.set("c", payload)
+
+    stats = cache.get_stats()
+    assert stats["total_entries"] == 2
+    assert stats["memory_usage_mb"] <= 1
+    assert cache.get("a") is None
+
+
+def test_overwrite_does_not_count_as_eviction():
+    """Replacing a key keeps one entry and does not report an eviction."""
+    cache = InMemoryCache(max_size=2)
+    cache.set("a", 1)
+    cache.set("a", 2)
+
+    stats = cache.get_stats()
+    assert cache.get("a") == 2
+    assert stats["total_entries"] == 1
+    assert stats["evictions"] == 0
+
+
+def test_frequency_sketch_saturates_and_ages():
+    """Sketch counters cap at 15 and are halved after the sample period."""
+    sketch = FrequencySketch(capacity=16)
+    for _ in range(20):
+        sketch.increment("key")
+    assert sketch.frequency("key") == 15
+
+    sketch._reset()
+    assert sketch.frequency("key") == 7
+
+    sketch.additions = sketch.sample_size - 1
+    sketch.increment("other")
+    assert sketch.additions < sketch.sample_size
+    assert sketch.frequency("key") <= 4
+
+
+def test_unsupported_strategy_is_rejected():
+    """Strategies without an eviction policy raise a ValueError."""
+    with pytest.raises(ValueError):
+        create_eviction_policy(CacheStrategy.RANDOM, 10)
+
+
+def test_concurrent_misses_share_one_computation(multi_tier_cache):
+    """Concurrent callers of a missing key wait on a single computation."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"prediction": 0.65}
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                multi_tier_cache.get_or_compute("event:1", compute, ttl=60)
+                for _ in range(20)
+            ]
+        )
+
+    results = asyncio.run(run())
+
+    assert calls == 1, f"Expected one computation, got {calls}"
+    assert all(result == {"prediction": 0.65} for result in results)
+    assert multi_tier_cache.coalescing_metrics.coalesced_computations == 19
+
+
+def test_failed_computation_propagates_to_waiters(multi_tier_cache):
+    """Every coalesced caller sees the leader's exception and nothing is cached."""
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("odds feed down")
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                multi_tier_cache.get_or_compute("event:2", compute, ttl=60)
+                for _ in range(5)
+            ],
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert not multi_tier_cache._inflight
+    assert asyncio.run(multi_tier_cache.get("event:2")) is None
+
+
+def test_cancelled_leader_does_not_cancel_waiters(multi_tier_cache):
+    """A waiter still gets the result after the leader's caller is cancelled."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"prediction": 0.58}
+
+    async def run():
+        leader = asyncio.create_task(
+            multi_tier_cache.get_or_compute("event:3", compute, ttl=60)
+        )
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(
+            multi_tier_cache.get_or_compute("event:3", compute, ttl=60)
+        )
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        result = await waiter
+        return leader.cancelled(), result, await multi_tier_cache.get("event:3")
+
+    leader_cancelled, result, cached = asyncio.run(run())
+
+    assert leader_cancelled
+    assert result == cached == {"prediction": 0.58}
+    assert calls == 1
+    assert not multi_tier_cache._inflight
+
+
+def test_stale_value_served_while_refreshing(multi_tier_cache):
+    """Expired soft-TTL values are returned immediately and refreshed once."""
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return calls
+
+    async def run():
+        await multi_tier_cache.set(
+            "odds:1", StaleableValue(value=0, fresh_until=time.time() - 1), ttl=120
+        )
+        stale = await asyncio.gather(
+            *[
+                multi_tier_cache.get_or_compute("odds:1", compute, ttl=60, stale_ttl=60)
+                for _ in range(10)
+            ]
+        )
+        await asyncio.gather(*multi_tier_cache._refresh_tasks.values())
+        fresh = await multi_tier_cache.get_or_compute(
+            "odds:1", compute, ttl=60, stale_ttl=60
+        )
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+
+    assert stale == [0] * 10
+    assert fresh == 1
+    assert calls == 1
+    stats = asyncio.run(multi_tier_cache.get_comprehensive_stats())["coalescing"]
+    assert stats["stale_serves"] == 10
+    assert stats["background_refreshes"] == 1
+
+
+def test_compressed_l1_entries_round_trip():
+    """Compressed L1 entries are stored as frames and decoded on read."""
+    cache = InMemoryCache(max_size=10)
+    value = {"props": ["points"] * 2000}
+    cache.set("props:nba", value, compress=True)
+
+    entry = cache.cache["props:nba"]
+    assert entry.compressed
+    assert entry.size < 2000
+    assert cache.get("props:nba") == value
+
+
+def test_unpicklable_values_stay_in_l1_by_reference(multi_tier_cache):
+    """Values the codec cannot serialize are kept in L1 but never compressed."""
+    handler = lambda odds: odds * 2  # noqa: E731
+    cache = InMemoryCache(max_size=10)
+
+    assert cache.set("handler", handler)
+    assert cache.get("handler") is handler
+    assert cache.cache["handler"].size > 0
+    assert not cache.set("compressed", handler, compress=True)
+
+    async def run():
+        stored = await multi_tier_cache.set("handler", handler)
+        redis_only = await multi_tier_cache.set(
+            "handler", handler, tier=CacheLayer.L2_REDIS
+        )
+        return stored, redis_only, await multi_tier_cache.get("handler")
+
+    stored, redis_only, value = asyncio.run(run())
+    assert (stored, redis_only) == (True, False)
+    assert value is handler
+    assert multi_tier_cache.l2_cache.redis_client.store == {}
+
+
+def test_set_many_keeps_unpicklable_values_in_l1(multi_tier_cache):
+    """Batch writes hold unserializable values locally instead of raising."""
+    lock = threading.Lock()
+
+    async def run():
+        stored = await multi_tier_cache.set_many({"lock": lock, "odds:1": 1.9})
+        redis_only = await multi_tier_cache.set_many(
+            {"lock": lock, "odds:2": 2.1}, tier=CacheLayer.L2_REDIS
+        )
+        return stored, redis_only, await multi_tier_cache.get("lock")
+
+    stored, redis_only, value = asyncio.run(run())
+    assert stored == {"lock": True, "odds:1": True}
+    assert redis_only == {"lock": False, "odds:2": True}
+    assert value is lock
+    assert set(multi_tier_cache.l2_cache.redis_client.store) == {"a1betting:odds:2"}
+
+
+def test_promotion_reuses_redis_frame(multi_tier_cache):
+    """Values promoted from L2 are sized from the Redis frame."""
+
+    async def run():
+        await multi_tier_cache.l2_cache.set("odds:2", {"home": 1.91})
+        for _ in range(multi_tier_cache.promotion_threshold):
+            await multi_tier_cache.get("odds:2")
+
+    asyncio.run(run())
+
+    assert "odds:2" in multi_tier_cache.l1_cache.cache
+    assert multi_tier_cache.l1_cache.get("odds:2") == {"home": 1.91}
+
+
+def test_redis_batch_operations_use_one_round_trip(multi_tier_cache):
+    """set_many/get_many/delete_many each cost one round trip per batch."""
+    redis_cache = multi_tier_cache.l2_cache
+    client = redis_cache.redis_client
+    items = {f"odds:{i}": {"price": 1.5 + i / 1000} for i in range(3000)}
+
+    async def run():
+        stored = await redis_cache.set_many(items, ttl=60, ttls={"odds:0": 5})
+        fetched = await redis_cache.get_many(list(items) + ["odds:missing"])
+        deleted = await redis_cache.delete_many(list(items))
+        return stored, fetched, deleted
+
+    stored, fetched, deleted = asyncio.run(run())
+
+    assert all(stored.values())
+    assert fetched == items
+    assert deleted == 3000
+    assert client.round_trips == 3
+    assert redis_cache.metrics.misses == 1
+
+
+def test_redis_batches_are_split_by_max_batch_size(multi_tier_cache):
+    """Sweeps larger than max_batch_size take one round trip per batch."""
+    redis_cache = multi_tier_cache.l2_cache
+    keys = [f"k:{i}" for i in range(10000)]
+
+    asyncio.run(redis_cache.get_many(keys))
+
+    assert redis_cache.redis_client.round_trips == 2
+
+
+def test_multi_tier_get_many_fills_l1_with_remaining_ttl(multi_tier_cache):
+    """L2 hits are copied into L1 without outliving their Redis TTL."""
+
+    async def run():
+        await multi_tier_cache.l2_cache.set_many(
+            {"props:1": 1, "props:2": 2}, ttl=600, ttls={"props:2": 30}
+        )
+        multi_tier_cache.l1_cache.set("props:3", 3)
+        return await multi_tier_cache.get_many(
+            ["props:1", "props:2", "props:3", "props:4"], fill_l1=True
+        )
+
+    results = asyncio.run(run())
+
+    assert results == {"props:1": 1, "props:2": 2, "props:3": 3}
+    l1 = multi_tier_cache.l1_cache.cache
+    assert l1["props:1"].ttl == 600
+    assert l1["props:2"].ttl == 30
+
+
+def test_multi_tier_set_many_routes_large_values_to_l2(multi_tier_cache):
+    """Small values land in L1, large ones in Redis, in one batch each."""
+    items = {"small": {"a": 1}, "large": "x" * 20000}
+
+    results = asyncio.run(multi_tier_cache.set_many(items, ttl=60))
+
+    assert results == {"small": True, "large": True}
+    assert "small" in multi_tier_cache.l1_cache.cache
+    assert "large" not in multi_tier_cache.l1_cache.cache
+    assert multi_tier_cache.l2_cache.redis_client.round_trips == 1
+    assert asyncio.run(multi_tier_cache.get("large")) == "x" * 20000
+
+
+def _worker_cache(socket_dir, name):
+    cache = MultiTierCache()
+    cache.l2_cache.redis_client = FakeRedisClient()
+    transport = UnixSocketInvalidationTransport(socket_dir, node_id=name)
+    return cache, InvalidationBus(transport, flush_interval=0.001, node_id=name)
+
+
+def test_invalidation_bus_propagates_between_workers(tmp_path):
+    """Writes, deletes and version bumps in one worker drop other workers' L1."""
+    socket_dir = str(tmp_path)
+    worker_a, bus_a = _worker_cache(socket_dir, "a")
+    worker_b, bus_b = _worker_cache(socket_dir, "b")
+
+    async def settle():
+        await asyncio.sleep(0.05)
+
+    async def run():
+        await worker_a.enable_invalidation_bus(bus_a)
+        await worker_b.enable_invalidation_bus(bus_b)
+
+        for key in ("odds:1", "odds:2", "props:1", "props:2"):
+            await worker_b.set(key, "old", tier=CacheLayer.L1_MEMORY)
+
+        await worker_a.set("odds:1", "new")
+        await worker_a.delete("props:1")
+        await settle()
+        after_write = set(worker_b.l1_cache.cache)
+
+        worker_a.bump_version("odds")
+        await settle()
+        after_bump = set(worker_b.l1_cache.cache)
+
+        stats = (await worker_b.get_comprehensive_stats())["invalidation"]
+        await worker_a.disable_invalidation_bus()
+        await worker_b.disable_invalidation_bus()
+        return after_write, after_bump, stats
+
+    after_write, after_bump, stats = asyncio.run(run())
+
+    assert after_write == {"odds:2", "props:2"}
+    assert after_bump == {"props:2"}
+    assert worker_b.namespace_version("odds") == 1
+    assert stats["received_batches"] == 2
+    assert stats["propagation_lag_ms"]["max"] >= 0
+
+
+def test_invalidation_bus_batches_pending_invalidations(tmp_path):
+    """Invalidations queued together are published as one message."""
+    cache, bus = _worker_cache(str(tmp_path), "solo")
+
+    async def run():
+        await cache.enable_invalidation_bus(bus)
+        await cache.delete_many([f"odds:{i}" for i in range(100)])
+        await cache.clear("props:*")
+        await asyncio.sleep(0.05)
+        await cache.disable_invalidation_bus()
+
+    asyncio.run(run())
+
+    assert bus.metrics.published_batches == 1
+    assert bus.metrics.published_invalidations == 101
+
+
+def test_invalidation_bus_splits_large_batches(tmp_path):
+    """A batch beyond max_batch_size is sent as several datagrams that all land."""
+    socket_dir = str(tmp_path)
+    worker_a, bus_a = _worker_cache(socket_dir, "a")
+    worker_b, bus_b = _worker_cache(socket_dir, "b")
+    keys = [f"odds:event:{i:05d}:moneyline" for i in range(10000)]
+
+    async def run():
+        await worker_a.enable_invalidation_bus(bus_a)
+        await worker_b.enable_invalidation_bus(bus_b)
+        for key in keys:
+            worker_b.l1_cache.set(key, "old")
+        # A socket that is not listening must not stop delivery to worker b
+        open(os.path.join(socket_dir, "stale.sock"), "w").close()
+
+        await worker_a.delete_many(keys)
+        await asyncio.sleep(0.2)
+        await worker_a.disable_invalidation_bus()
+        await worker_b.disable_invalidation_bus()
+
+    asyncio.run(run())
+
+    assert bus_a.metrics.publish_errors == 0
+    assert bus_a.metrics.published_batches == 20
+    assert bus_a.metrics.published_invalidations == 10000
+    assert not worker_b.l1_cache.cache
+
+
+def test_delete_pattern_matches_globs():
+    """L1 pattern deletes support prefixes and general globs."""
+    cache = InMemoryCache(max_size=10)
+    for key in ("odds:nba:1", "odds:nfl:1", "props:nba:1"):
+        cache.set(key, 1)
+
+    assert cache.delete_pattern("odds:*") == 2
+    assert cache.delete_pattern("*:nba:?") == 1
+    assert not cache.cache
+
+
+def test_bounded_counter_forgets_cold_keys():
+    """Access counters stay within max_keys, dropping the least recent."""
+    counter = BoundedCounter(max_keys=3)
+    for key in ("a", "b", "c", "a", "d"):
+        counter[key] += 1
+
+    assert list(counter) == ["c", "a", "d"]
+    assert counter["a"] == 2
+    assert counter["missing"] == 0
+
+
+def test_prefetcher_promotes_co_occurring_keys(multi_tier_cache):
+    """A key that reliably follows another is pulled into L1 ahead of demand."""
+    prefetcher = PredictivePrefetcher(multi_tier_cache, min_confidence=0.5)
+    multi_tier_cache.prefetcher = prefetcher
+
+    async def run():
+        await multi_tier_cache.l2_cache.set_many(
+            {"game:1": "game", "props:1": "props"}, ttl=600
+        )
+        for _ in range(3):
+            await multi_tier_cache.get("game:1")
+            await multi_tier_cache.get("props:1")
+            multi_tier_cache.l1_cache.clear()
+
+        await multi_tier_cache.get("game:1")
+        await prefetcher._drain_task
+        in_l1 = "props:1" in multi_tier_cache.l1_cache.cache
+        await multi_tier_cache.get("props:1")
+        return in_l1
+
+    assert asyncio.run(run())
+    stats = prefetcher.get_stats()
+    assert stats["issued_by_source"][PrefetchSource.CO_OCCURRENCE] >= 1
+    assert stats["prefetch_hits"] >= 1
+
+
+def test_prefetcher_refreshes_scheduled_event_keys(multi_tier_cache):
+    """Keys of an event starting within the lead time are recomputed once."""
+    prefetcher = PredictivePrefetcher(multi_tier_cache, schedule_lead_time=900)
+    multi_tier_cache.prefetcher = prefetcher
+    loads = []
+
+    async def load_prediction(key):
+        loads.append(key)
+        return {"key": key, "prediction": 0.6}
+
+    prefetcher.register_loader("prediction:*", load_prediction, ttl=300)
+    now = datetime.utcnow()
+    prefetcher.schedule_event("soon", now + timedelta(minutes=10), ["prediction:soon"])
+    prefetcher.schedule_event("later", now + timedelta(hours=3), ["prediction:later"])
+
+    async def run():
+        first = await prefetcher.run_cycle(now)
+        # The next odds snapshot announces the same start time again
+        prefetcher.schedule_event(
+            "soon", now + timedelta(minutes=10), ["prediction:soon"]
+        )
+        second = await prefetcher.run_cycle(now)
+        value = await multi_tier_cache.get("prediction:soon")
+        return first, second, value
+
+    first, second, value = asyncio.run(run())
+
+    assert (first, second) == (1, 0)
+    assert loads == ["prediction:soon"]
+    assert value == {"key": "prediction:soon", "prediction": 0.6}
+    assert prefetcher.get_stats()["hits_by_source"] == {PrefetchSource.SCHEDULE: 1}
+
+
+def test_prefetcher_respects_redis_budget(multi_tier_cache):
+    """Predictions beyond the per-interval Redis budget are skipped."""
+    prefetcher = PredictivePrefetcher(multi_tier_cache, max_redis_ops=2)
+    for i in range(5):
+        prefetcher._queue[f"odds:{i}"] = PrefetchSource.TIME_OF_DAY
+
+    asyncio.run(prefetcher.drain())
+
+    assert prefetcher.get_stats()["budget"]["redis_ops_used"] == 2
+    assert prefetcher.metrics.skipped_over_budget == 3
+
+
+def test_l0_shares_entries_between_workers(tmp_path):
+    """A value set by one worker is served to another from L0 without Redis."""
+    path = str(tmp_path / "cache.l0")
+    writer = MultiTierCache()
+    reader = MultiTierCache()
+    redis_client = FakeRedisClient()
+    writer.l2_cache.redis_client = redis_client
+    reader.l2_cache.redis_client = redis_client
+    writer.enable_shared_memory_tier(SharedResultCache(path, 64, 1024))
+    reader.enable_shared_memory_tier(SharedResultCache(path, 64, 1024))
+
+    async def run():
+        await writer.set("prediction:e1", {"value": 0.61}, ttl=60)
+        round_trips = redis_client.round_trips
+        value = await reader.get("prediction:e1")
+        return value, redis_client.round_trips - round_trips
+
+    value, round_trips = asyncio.run(run())
+    assert value == {"value": 0.61}
+    assert round_trips == 0, "L0 hit should not touch Redis"
+    assert reader.l0_cache.metrics.hits == 1
+
+    asyncio.run(writer.delete("prediction:e1"))
+    assert reader.l0_cache.get("prediction:e1") is None
+    writer.disable_shared_memory_tier()
+    reader.disable_shared_memory_tier()
+
+
+def test_l2_hits_fill_l0_and_tier_writes_drop_it(tmp_path, multi_tier_cache):
+    """Redis hits are copied into L0; L1/L2-only writes remove the L0 copy."""
+    multi_tier_cache.enable_shared_memory_tier(
+        SharedResultCache(str(tmp_path / "cache.l0"), 64, 1024)
+    )
+    l0 = multi_tier_cache.l0_cache
+
+    async def run():
+        await multi_tier_cache.set("odds:e1", 1.91, tier=CacheLayer.L2_REDIS)
+        assert await multi_tier_cache.get("odds:e1") == 1.91
+        filled = l0.get("odds:e1") is not None
+        await multi_tier_cache.set("odds:e1", 1.95, tier=CacheLayer.L1_MEMORY)
+        return filled
+
+    assert asyncio.run(run()), "L2 hit should be copied into L0"
+    assert l0.get("odds:e1") is None, "Worker-local write must drop stale L0 copy"
+    multi_tier_cache.disable_shared_memory_tier()
+
+
+def test_same_host_invalidations_keep_the_shared_l0_entry(tmp_path):
+    """A peer still hits L0 after set(); writes from another host drop it."""
+    socket_dir = str(tmp_path / "bus")
+    path = str(tmp_path / "cache.l0")
+    redis_client = FakeRedisClient()
+    workers = []
+    for name, host in (("a", "host-1"), ("b", "host-1"), ("c", "host-2")):
+        cache = MultiTierCache()
+        cache.l2_cache.redis_client = redis_client
+        transport = UnixSocketInvalidationTransport(socket_dir, node_id=name)
+        bus = InvalidationBus(transport, flush_interval=0.001, host_id=host)
+        workers.append((cache, bus))
+    (writer, _), (peer, peer_bus), (remote, _) = workers
+    writer.enable_shared_memory_tier(SharedResultCache(path, 64, 1024))
+    peer.enable_shared_memory_tier(SharedResultCache(path, 64, 1024))
+
+    async def run():
+        for cache, bus in workers:
+            await cache.enable_invalidation_bus(bus)
+
+        await writer.set("prediction:e1", {"value": 0.61}, ttl=60)
+        await asyncio.sleep(0.05)
+        round_trips = redis_client.round_trips
+        value = await peer.get("prediction:e1")
+        same_host = (value, redis_client.round_trips - round_trips)
+
+        await remote.set("prediction:e1", {"value": 0.64}, ttl=60)
+        await asyncio.sleep(0.05)
+        after_remote = peer.l0_cache.get("prediction:e1")
+
+        for cache, _ in workers:
+            await cache.disable_invalidation_bus()
+        return same_host, after_remote
+
+    (value, round_trips), after_remote = asyncio.run(run())
+
+    assert value == {"value": 0.61}
+    assert round_trips == 0, "Peer on the same host should hit L0"
+    assert peer.l0_cache.metrics.hits == 1
+    assert peer_bus.metrics.received_batches == 2
+    assert after_remote is None, "A write from another host must drop the L0 copy"
+    writer.disable_shared_memory_tier()
+    peer.disable_shared_memory_tier()
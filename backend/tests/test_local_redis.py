@@ -0,0 +1,159 @@
+"""Tests for the in-process Redis stand-in."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from local_redis import LocalRedis
+
+
+def test_strings_expiry_and_round_trips():
+    """Values come back as bytes, expire, and each command is one round trip."""
+    client = LocalRedis()
+
+    async def run():
+        await client.set("a", "1")
+        await client.setex("b", 0.05, b"2")
+        assert await client.get("a") == b"1"
+        assert await client.mget(["a", "b", "missing"]) == [b"1", b"2", None]
+        assert await client.pttl("a") == -1
+        assert 0 < await client.pttl("b") <= 50
+        await asyncio.sleep(0.08)
+        assert await client.get("b") is None
+        assert await client.pttl("b") == -2
+
+    asyncio.run(run())
+    assert client.round_trips == 8
+
+
+def test_pipeline_executes_in_one_round_trip():
+    """Queued commands run together and return replies in order."""
+    client = LocalRedis()
+
+    async def run():
+        pipe = client.pipeline(transaction=False)
+        pipe.set("x", 1)
+        pipe.incrby("x", 4)
+        pipe.mget(["x"])
+        pipe.delete("x", "y")
+        return await pipe.execute()
+
+    assert asyncio.run(run()) == [True, 5, [b"5"], 1]
+    assert client.round_trips == 1
+    assert client.commands == 4
+
+
+def test_keys_and_unknown_commands():
+    """keys() matches globs; commands the stand-in lacks raise AttributeError."""
+    client = LocalRedis()
+
+    async def run():
+        await client.set("cache:a", 1)
+        await client.set("cache:b", 2, nx=True)
+        assert await client.set("cache:b", 3, nx=True) is None
+        return sorted(await client.keys("cache:*"))
+
+    assert asyncio.run(run()) == [b"cache:a", b"cache:b"]
+    with pytest.raises(AttributeError):
+        client.hgetall
+
+
+def test_stream_consumer_group_delivery_and_ack():
+    """Each entry goes to one consumer and stays pending until acknowledged."""
+    client = LocalRedis()
+
+    async def run():
+        await client.xgroup_create("s", "g", id="0", mkstream=True)
+        with pytest.raises(Exception, match="BUSYGROUP"):
+            await client.xgroup_create("s", "g")
+        ids = [await client.xadd("s", {"n": i}) for i in range(5)]
+        first = await client.xreadgroup("g", "a", {"s": ">"}, count=3)
+        second = await client.xreadgroup("g", "b", {"s": ">"}, count=10)
+        assert await client.xreadgroup("g", "b", {"s": ">"}, block=20) == []
+        assert await client.xack("s", "g", ids[0], ids[3]) == 2
+        pending = await client.xpending_range("s", "g", "-", "+", 10)
+        history = await client.xreadgroup("g", "a", {"s": "0"})
+        return ids, first, second, pending, history
+
+    ids, first, second, pending, history = asyncio.run(run())
+
+    assert [entry_id for entry_id, _ in first[0][1]] == ids[:3]
+    assert first[0][1][0][1] == {b"n": b"0"}
+    assert [entry_id for entry_id, _ in second[0][1]] == ids[3:]
+    assert [(p["message_id"], p["consumer"]) for p in pending] == [
+        (ids[1], b"a"),
+        (ids[2], b"a"),
+        (ids[4], b"b"),
+    ]
+    # Reading from "0" replays the consumer's own pending entries
+    assert [entry_id for entry_id, _ in history[0][1]] == ids[1:3]
+
+
+def test_stream_autoclaim_trim_and_blocking_read():
+    """Idle entries move to a new consumer; a blocked read wakes on XADD."""
+    client = LocalRedis()
+
+    async def run():
+        await client.xgroup_create("s", "g", mkstream=True)
+        for i in range(3):
+            await client.xadd("s", {"n": i}, maxlen=10)
+        await client.xreadgroup("g", "dead", {"s": ">"})
+        await client.xadd("s", {"n": 3}, maxlen=3)  # Trims the first entry
+        assert await client.xlen("s") == 3
+        fresh = await client.xautoclaim("s", "g", "live", 50)
+        await asyncio.sleep(0.06)
+        _, claimed, deleted = await client.xautoclaim("s", "g", "live", 50)
+        await client.xreadgroup("g", "live", {"s": ">"})
+
+        reader = asyncio.create_task(
+            client.xreadgroup("g", "live", {"s": ">"}, block=1000)
+        )
+        await asyncio.sleep(0.01)
+        assert not reader.done()
+        await client.xadd("s", {"n": 4})
+        woken = await asyncio.wait_for(reader, 1)
+        return fresh, claimed, deleted, woken
+
+    fresh, claimed, deleted, woken = asyncio.run(run())
+
+    assert fresh[1] == []
+    assert [fields[b"n"] for _, fields in claimed] == [b"1", b"2"]
+    assert len(deleted) == 1
+    assert [fields[b"n"] for _, fields in woken[0][1]] == [b"4"]
+
+
+def test_pubsub_delivers_to_current_subscribers():
+    """Messages reach every subscriber of the channel, after subscribing only."""
+    client = LocalRedis()
+
+    async def run():
+        assert await client.publish("news", "early") == 0
+        first, second = client.pubsub(), client.pubsub()
+        await first.subscribe("news", "scores")
+        await second.subscribe("news")
+        assert await client.publish("news", "hello") == 2
+        await client.publish("scores", b"1-0")
+
+        received = []
+        async for message in first.listen():
+            received.append((message["type"], message["channel"], message["data"]))
+            if len(received) == 4:
+                break
+        other = await second.get_message(ignore_subscribe_messages=True)
+        await second.close()
+        return received, other, await client.publish("news", "late")
+
+    received, other, late = asyncio.run(run())
+
+    assert received == [
+        ("subscribe", b"news", 1),
+        ("subscribe", b"scores", 2),
+        ("message", b"news", b"hello"),
+        ("message", b"scores", b"1-0"),
+    ]
+    assert other["data"] == b"hello"
+    assert late == 1
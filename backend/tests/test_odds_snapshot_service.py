@@ -0,0 +1,230 @@
+"""Tests for the shared odds snapshot service."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from odds_snapshot_service import OddsSnapshotService
+
+
+def _event(event_id, home_price, away_price, bookmaker="Pinnacle"):
+    return {
+        "id": event_id,
+        "sport_key": "soccer_epl",
+        "sport_title": "EPL",
+        "home_team": "Arsenal",
+        "away_team": "Chelsea",
+        "commence_time": "2024-01-01T15:00:00Z",
+        "bookmakers": [
+            {
+                "title": bookmaker,
+                "markets": [
+                    {
+                        "key": "h2h",
+                        "outcomes": [
+                            {"name": "Arsenal", "price": home_price},
+                            {"name": "Chelsea", "price": away_price},
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+class _Response:
+    def __init__(self, status, body=b"", headers=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class _FakeOddsApi:
+    """Serves one payload per sport and honours If-None-Match"""
+
+    def __init__(self):
+        self.payloads = {}
+        self.etags = {}
+        self.requests = []
+
+    def set(self, sport, events, etag=True):
+        self.payloads[sport] = json.dumps(events).encode()
+        self.etags[sport] = f'"{len(self.requests)}-{hash(self.payloads[sport])}"'
+        if not etag:
+            del self.etags[sport]
+
+    def get(self, url, params=None, headers=None):
+        sport = url.split("/sports/")[1].split("/")[0]
+        self.requests.append((sport, params, dict(headers or {})))
+        etag = self.etags.get(sport)
+        if etag and (headers or {}).get("If-None-Match") == etag:
+            return _Response(304)
+        return _Response(200, self.payloads[sport], {"ETag": etag} if etag else {})
+
+
+def _service(api, sports=None):
+    return OddsSnapshotService(
+        api_key="key",
+        sports=sports or {"soccer_epl": 60.0},
+        markets=["h2h", "totals"],
+        session=api,
+    )
+
+
+def test_conditional_requests_only_publish_changes():
+    """304s and identical bodies keep the version; new odds bump it once."""
+    api = _FakeOddsApi()
+    service = _service(api)
+    published = []
+
+    async def listener(snapshot):
+        published.append(snapshot)
+
+    service.add_listener(listener)
+    etags = []
+
+    async def run():
+        api.set("soccer_epl", [_event("e1", 2.1, 1.8)])
+        etags.append(api.etags["soccer_epl"])
+        first = await service.refresh("soccer_epl")
+        assert await service.refresh("soccer_epl") is None
+        api.set("soccer_epl", [_event("e1", 2.2, 1.8)])
+        second = await service.refresh("soccer_epl")
+        # Same body without validators is detected by its digest
+        api.set("soccer_epl", [_event("e1", 2.2, 1.8)], etag=False)
+        assert await service.refresh("soccer_epl") is None
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert [s.version for s in published] == [1, 2]
+    assert published == [first, second]
+    assert api.requests[0][1]["markets"] == "h2h,totals"
+    assert "If-None-Match" not in api.requests[0][2]
+    assert api.requests[1][2]["If-None-Match"] == etags[0]
+    stats = service.get_stats()
+    assert (stats["requests"], stats["not_modified"], stats["unchanged"]) == (4, 1, 1)
+    assert stats["sports"]["soccer_epl"]["version"] == 2
+
+
+def test_snapshot_is_normalized_once_and_read_only():
+    """Quotes carry home/away sides and cannot be changed by a consumer."""
+    api = _FakeOddsApi()
+    api.set("soccer_epl", [_event("e1", 2.1, 1.8), _event("e2", 3.0, 1.4)])
+    service = _service(api)
+    snapshot = asyncio.run(service.refresh("soccer_epl"))
+
+    assert snapshot.title == "EPL"
+    assert set(snapshot.events) == {"e1", "e2"}
+    home = snapshot.events["e1"][0]
+    assert (home["outcome"], home["name"], home["odds"]) == ("home", "Arsenal", 2.1)
+    assert home["sportsbook"] == "Pinnacle"
+    with pytest.raises(TypeError):
+        home["odds"] = 5.0
+    with pytest.raises(TypeError):
+        snapshot.events["e3"] = ()
+    assert service.snapshot("soccer_epl") is snapshot
+
+
+def test_removed_events_and_listener_isolation():
+    """Dropped events are reported, and a failing listener does not stop others."""
+    api = _FakeOddsApi()
+    service = _service(api)
+    seen = []
+
+    async def broken(snapshot):
+        raise RuntimeError("boom")
+
+    async def listener(snapshot):
+        seen.append((snapshot.version, snapshot.removed_events))
+
+    service.add_listener(broken)
+    service.add_listener(listener)
+
+    async def run():
+        api.set("soccer_epl", [_event("e1", 2.1, 1.8), _event("e2", 3.0, 1.4)])
+        await service.refresh("soccer_epl")
+        api.set("soccer_epl", [_event("e2", 3.1, 1.4)])
+        await service.refresh("soccer_epl")
+
+    asyncio.run(run())
+
+    assert seen == [(1, frozenset()), (2, frozenset({"e1"}))]
+
+
+def test_each_sport_polls_on_its_own_cadence():
+    """start() runs one task per sport; stop() cancels them."""
+    api = _FakeOddsApi()
+    api.set("soccer_epl", [_event("e1", 2.1, 1.8)])
+    api.set("basketball_nba", [_event("n1", 1.9, 1.9)])
+    service = _service(api, {"soccer_epl": 0.01, "basketball_nba": 60.0})
+
+    async def run():
+        await service.start()
+        await asyncio.sleep(0.1)
+        await service.stop()
+
+    asyncio.run(run())
+
+    counts = {}
+    for sport, _, _ in api.requests:
+        counts[sport] = counts.get(sport, 0) + 1
+    assert counts["basketball_nba"] == 1
+    assert counts["soccer_epl"] > 2
+    assert not service.get_stats()["running"]
+    assert set(service.snapshots()) == {"soccer_epl", "basketball_nba"}
+
+
+def test_disabled_without_api_key():
+    """No key means no polling and no requests."""
+    api = _FakeOddsApi()
+    service = OddsSnapshotService(api_key=None, session=api)
+
+    asyncio.run(service.start())
+
+    assert api.requests == []
+    assert not service.get_stats()["running"]
+
+
+def test_arbitrage_book_consumes_snapshots_directly():
+    """The incremental book takes snapshot events and removals as they are."""
+    from arbitrage_engine import UltraArbitrageEngine
+
+    api = _FakeOddsApi()
+    service = _service(api)
+    engine = UltraArbitrageEngine()
+
+    async def apply(snapshot):
+        await engine.apply_odds_snapshot(snapshot.events)
+        await engine.remove_events(list(snapshot.removed_events))
+
+    service.add_listener(apply)
+
+    async def run():
+        event = _event("e1", 2.1, 1.8)
+        event["bookmakers"] += _event("e1", 1.7, 2.2, "Bet365")["bookmakers"]
+        api.set("soccer_epl", [event])
+        await service.refresh("soccer_epl")
+        opened = [hit.event_id for hit in engine.active_hits()]
+        api.set("soccer_epl", [])
+        await service.refresh("soccer_epl")
+        return opened, engine.active_hits()
+
+    opened, remaining = asyncio.run(run())
+
+    assert opened == ["e1"]
+    assert remaining == []
@@ -0,0 +1,142 @@
+"""Tests for the columnar opportunity history."""
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_engine import ArbitrageOpportunity, UltraArbitrageEngine
+from betting_opportunity_service import (
+    BettingOpportunity,
+    MarketData,
+    OpportunityType,
+    RiskLevel,
+)
+from opportunity_history import OpportunityHistory
+
+START = datetime(2024, 1, 1, 12, 0)
+
+
+def _append(history, index, event_id="e1", kind="arbitrage", payload=None):
+    history.append(
+        kind,
+        payload if payload is not None else {"index": index},
+        opportunity_type="two_way",
+        event_id=event_id,
+        market_type="totals",
+        sportsbook="book_a",
+        value=float(index),
+        confidence=0.9,
+        timestamp=START + timedelta(minutes=index),
+    )
+
+
+def test_ring_buffer_keeps_the_newest_rows():
+    """Once full, each append overwrites the oldest row."""
+    history = OpportunityHistory(capacity=5)
+    for index in range(12):
+        _append(history, index)
+
+    assert len(history) == 5
+    assert [r.value for r in history.records()] == [11.0, 10.0, 9.0, 8.0, 7.0]
+    assert [o["index"] for o in history.opportunities(limit=2)] == [11, 10]
+    assert history.get_stats()["total_appended"] == 12
+
+
+def test_time_range_event_and_kind_queries():
+    """Filters combine as vectorized masks over the live rows."""
+    history = OpportunityHistory(capacity=100)
+    for index in range(30):
+        _append(
+            history,
+            index,
+            event_id=f"e{index % 3}",
+            kind="arbitrage" if index % 2 else "inefficiency",
+        )
+
+    records = history.records(
+        start=START + timedelta(minutes=10),
+        end=START + timedelta(minutes=20),
+        event_id="e1",
+    )
+    assert [r.value for r in records] == [19.0, 16.0, 13.0, 10.0]
+    assert records[0].timestamp == START + timedelta(minutes=19)
+
+    summary = history.summary(event_id="e1", kind="arbitrage")
+    assert summary["count"] == 5
+    assert summary["by_type"] == {"two_way": 5}
+    assert summary["max_value"] == 25.0
+    assert history.records(event_id="missing") == []
+    assert history.summary(event_id="missing")["count"] == 0
+
+
+def test_interned_values_are_compacted():
+    """Churning events do not grow the intern table without bound."""
+    history = OpportunityHistory(capacity=4, keep_details=False)
+    for index in range(3000):
+        _append(history, index, event_id=f"event-{index}")
+
+    assert history.get_stats()["interned_values"] < 4 * 4 + 1024 + 10
+    assert [r.event_id for r in history.records()] == [
+        "event-2999",
+        "event-2998",
+        "event-2997",
+        "event-2996",
+    ]
+    assert history.opportunities() == []
+
+
+def test_dataclasses_round_trip_through_lazy_details():
+    """Materialized details equal the recorded slots dataclasses."""
+    opportunity = BettingOpportunity(
+        opportunity_id="op1",
+        opportunity_type=OpportunityType.VALUE_BET,
+        event_id="e1",
+        market_type="moneyline",
+        selection="home",
+        expected_value=0.08,
+        confidence=0.7,
+        kelly_fraction=0.05,
+        risk_level=RiskLevel.LOW,
+        best_odds=2.2,
+        worst_odds=2.0,
+        line_value=None,
+        market_data=[
+            MarketData("book_a", 2.2, None, 100.0, START, "up", 0.8),
+        ],
+        ensemble_prediction=None,
+        feature_importance={},
+        shap_values={},
+        model_consensus=0.6,
+        volatility=0.1,
+        liquidity_risk=0.1,
+        model_uncertainty=0.1,
+        created_at=START,
+        expires_at=None,
+        time_sensitivity=0.5,
+    )
+    history = OpportunityHistory(capacity=10)
+    _append(history, 0, payload=opportunity)
+
+    assert not hasattr(opportunity, "__dict__")
+    assert history.opportunities() == [opportunity]
+
+
+def test_engine_records_scanned_opportunities():
+    """UltraArbitrageEngine keeps summaries and materializes on request."""
+    engine = UltraArbitrageEngine()
+    market_data = [
+        dict(event_id="e1", market_type="total", outcome=o, odds=p, sportsbook=b)
+        for o, p, b in (("over", 2.10, "book_a"), ("under", 2.05, "book_b"))
+    ]
+    asyncio.run(engine.scan_for_opportunities(market_data, sharded=False))
+
+    records = engine.get_opportunity_history(event_id="e1", kind="arbitrage")
+    assert [r.opportunity_type for r in records] == ["two_way"]
+    assert records[0].sportsbook == "book_a,book_b"
+
+    opportunities = engine.get_opportunity_history(event_id="e1", materialize=True)
+    assert isinstance(opportunities[0], ArbitrageOpportunity)
+    assert opportunities[0].profit_percentage == records[0].value
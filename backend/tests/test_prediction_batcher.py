@@ -0,0 +1,105 @@
+"""Tests for coalesced, batched prediction triggers."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from prediction_batcher import PredictionBatcher
+
+
+def _trigger(event_id, context="live_game", n=0):
+    return {"event_id": event_id, "prediction_context": context, "n": n}
+
+
+def test_burst_for_one_event_becomes_one_prediction_of_the_newest_trigger():
+    """Triggers per (event, context) collapse; the last one is predicted."""
+    batches = []
+
+    async def predict_batch(triggers):
+        batches.append(
+            [(t["event_id"], t["prediction_context"], t["n"]) for t in triggers]
+        )
+
+    async def run():
+        batcher = PredictionBatcher(predict_batch, window=0.02)
+        driver = asyncio.create_task(batcher.run())
+        for n in range(30):
+            batcher.submit(_trigger("e1", n=n))
+        batcher.submit(_trigger("e1", context="pre_game"))
+        batcher.submit(_trigger("e2"))
+        await asyncio.sleep(0.06)
+        driver.cancel()
+        await driver
+        return batcher.get_stats()
+
+    stats = asyncio.run(run())
+
+    assert batches == [
+        [("e1", "live_game", 29), ("e1", "pre_game", 0), ("e2", "live_game", 0)]
+    ]
+    assert (stats["submitted"], stats["coalesced"], stats["predictions"]) == (32, 29, 3)
+    assert stats["trigger_to_broadcast"]["count"] == 3
+    assert stats["trigger_to_broadcast"]["max_ms"] >= 20
+
+
+def test_in_flight_batches_are_bounded_and_triggers_keep_coalescing():
+    """At most max_in_flight batches run; later triggers wait and merge."""
+    running, peak = 0, 0
+    seen = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def predict_batch(triggers):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            seen.append([t["event_id"] for t in triggers])
+            await gate.wait()
+            running -= 1
+
+        batcher = PredictionBatcher(predict_batch, max_batch=2, max_in_flight=2)
+        for i in range(4):
+            batcher.submit(_trigger(f"e{i}"))
+        flushing = asyncio.create_task(batcher.flush())
+        await asyncio.sleep(0.01)
+        # Both slots busy: new triggers for e5 pile up as one pending entry
+        for n in range(10):
+            batcher.submit(_trigger("e5", n=n))
+        assert len(batcher) == 1 and running == 2
+        gate.set()
+        await flushing
+        await batcher.drain()
+        return batcher.get_stats()
+
+    stats = asyncio.run(run())
+
+    assert peak == 2
+    assert seen == [["e0", "e1"], ["e2", "e3"], ["e5"]]
+    assert stats["coalesced"] == 9 and stats["batches"] == 3
+    assert stats["max_batch"] == 2
+
+
+def test_failed_batch_is_counted_and_releases_its_slot():
+    """A raising predict_batch does not leak an in-flight slot."""
+    calls = []
+
+    async def predict_batch(triggers):
+        calls.append(len(triggers))
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+
+    async def run():
+        batcher = PredictionBatcher(predict_batch, max_in_flight=1)
+        batcher.submit(_trigger("e1"))
+        await batcher.drain()
+        batcher.submit(_trigger("e2"))
+        await asyncio.wait_for(batcher.drain(), 1)
+        return batcher.get_stats()
+
+    stats = asyncio.run(run())
+
+    assert calls == [1, 1]
+    assert stats["failed_batches"] == 1 and stats["predictions"] == 1
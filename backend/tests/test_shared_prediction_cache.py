@@ -0,0 +1,93 @@
+"""Tests for ensemble predictions shared through the L0 table."""
+
+import json
+import os
+import struct
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import BackendConfig
+from ensemble_engine import (
+    _PREDICTION_RECORD,
+    ModelType,
+    PredictionContext,
+    PredictionOutput,
+    SharedPredictionCache,
+)
+from shared_result_cache import SharedResultCache
+
+
+def _prediction(feature_count=1, metadata=None):
+    names = [f"home_team_rolling_feature_{i:02d}_avg" for i in range(feature_count)]
+    return PredictionOutput(
+        model_name="ensemble",
+        model_type=list(ModelType)[0],
+        predicted_value=0.61,
+        confidence_interval=(0.55, 0.67),
+        prediction_probability=0.7,
+        feature_importance={name: np.float32(0.25) for name in names},
+        shap_values={name: np.float32(-0.125) for name in names},
+        uncertainty_metrics={"std": np.float64(0.03)},
+        model_agreement=0.9,
+        prediction_context=list(PredictionContext)[0],
+        metadata=metadata or {"models_used": np.int64(4)},
+        processing_time=0.002,
+        timestamp=datetime.now(timezone.utc),
+    )
+
+
+def test_numpy_values_round_trip_as_plain_numbers(tmp_path):
+    """Feature maps come back as floats equal to the numpy values, not strings."""
+    table = SharedResultCache(str(tmp_path / "predictions.l0"), 64, 1024)
+    cache = SharedPredictionCache(table)
+    output = _prediction()
+
+    assert cache.set("prediction:e1", output, ttl=60)
+    shared = cache.get("prediction:e1")
+    table.close()
+
+    name = "home_team_rolling_feature_00_avg"
+    assert shared == output
+    assert type(shared.feature_importance[name]) is float
+    assert shared.shap_values[name] == np.float32(-0.125)
+    assert shared.metadata["models_used"] == 4
+
+
+def test_record_tail_is_plain_json():
+    """The tail after the fixed fields decodes without unpickling."""
+    record = SharedPredictionCache.pack(_prediction())
+    (tail_len,) = struct.unpack_from("<I", record, _PREDICTION_RECORD.size - 4)
+    tail = json.loads(record[_PREDICTION_RECORD.size :])
+
+    assert len(record) == _PREDICTION_RECORD.size + tail_len
+    assert tail["f"] == {"home_team_rolling_feature_00_avg": 0.25}
+
+
+def test_default_slot_holds_a_full_ensemble_prediction(tmp_path):
+    """A prediction with a realistic feature set fits the configured slot."""
+    settings = BackendConfig()
+    table = SharedResultCache(
+        str(tmp_path / "predictions.l0"), 64, settings.cache_l0_prediction_slot_bytes
+    )
+    cache = SharedPredictionCache(table)
+    models = ["xgboost", "lightgbm", "random_forest", "neural_network", "lstm"]
+    output = _prediction(
+        feature_count=28,
+        metadata={
+            "selected_models": models,
+            "model_weights": {name: 0.2 for name in models},
+            "ensemble_config": {"base_models": models, "min_models": 3},
+        },
+    )
+
+    assert cache.set("prediction:e2", output, ttl=60)
+    shared = cache.get("prediction:e2")
+    table.close()
+
+    assert shared.feature_importance == output.feature_importance
+    assert "ensemble_config" not in shared.metadata
+    assert shared.metadata["selected_models"] == models
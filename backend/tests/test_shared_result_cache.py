@@ -0,0 +1,124 @@
+"""Tests for the shared-memory L0 result table."""
+
+import multiprocessing
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared_result_cache import SharedResultCache
+
+
+@pytest.fixture
+def table(tmp_path):
+    cache = SharedResultCache(
+        str(tmp_path / "results.l0"), slot_count=64, slot_size=256
+    )
+    yield cache
+    cache.close()
+
+
+def _write_from_child(path: str):
+    child = SharedResultCache(path)
+    child.set("prediction:e1", b"from-child", ttl=60)
+    child.close()
+
+
+def test_set_get_delete(table):
+    """Values round trip and deleted keys miss."""
+    assert table.set("prediction:e1", b"payload", ttl=60)
+    assert table.get("prediction:e1") == b"payload"
+    assert table.get("prediction:e2") is None
+
+    assert table.delete("prediction:e1")
+    assert table.get("prediction:e1") is None
+    assert not table.delete("prediction:e1")
+
+
+def test_expired_entries_miss(table):
+    """Entries past their TTL are not served."""
+    table.set("odds:e1", b"stale", ttl=0.05)
+    time.sleep(0.1)
+
+    assert table.get("odds:e1") is None
+
+
+def test_oversize_values_are_rejected(table):
+    """Values larger than a slot are refused rather than truncated."""
+    assert not table.set("big", b"x" * table.payload_capacity)
+    assert table.get("big") is None
+    assert table.metrics.oversize_rejections == 1
+
+
+def test_tombstones_keep_probe_chains_reachable(tmp_path):
+    """Deleting a colliding key does not hide the keys probed after it."""
+    table = SharedResultCache(str(tmp_path / "tiny.l0"), slot_count=4, slot_size=128)
+    for index in range(4):
+        table.set(f"k{index}", f"v{index}".encode(), ttl=60)
+
+    table.delete("k0")
+    for index in range(1, 4):
+        assert table.get(f"k{index}") == f"v{index}".encode(), f"k{index} lost"
+    table.close()
+
+
+def test_full_probe_window_replaces_entry_closest_to_expiry(tmp_path):
+    """With no free slot, the entry expiring soonest is replaced."""
+    table = SharedResultCache(
+        str(tmp_path / "full.l0"), slot_count=4, slot_size=128, max_probes=4
+    )
+    for index in range(3):
+        table.set(f"k{index}", b"v", ttl=100 + index)
+    table.set("short", b"v", ttl=1)
+
+    assert table.set("new", b"v", ttl=50)
+    assert table.get("new") == b"v"
+    assert table.get("short") is None, "Entry closest to expiry should be replaced"
+    assert table.metrics.evictions == 1
+    for index in range(3):
+        assert table.get(f"k{index}") == b"v"
+    table.close()
+
+
+def test_instances_share_one_table(tmp_path):
+    """A second attachment sees the first's writes and keeps its geometry."""
+    path = str(tmp_path / "shared.l0")
+    first = SharedResultCache(path, slot_count=64, slot_size=256)
+    second = SharedResultCache(path, slot_count=1024, slot_size=512)
+
+    first.set("models:xgb", b"weights", ttl=60)
+    assert second.get("models:xgb") == b"weights"
+    assert (second.slot_count, second.slot_size) == (64, 256)
+
+    second.delete_pattern("models:*")
+    assert first.get("models:xgb") is None
+    first.close()
+    second.unlink()
+    assert not os.path.exists(path)
+
+
+def test_other_processes_write_visible_without_reopen(table):
+    """Writes from another process are visible to an existing mapping."""
+    process = multiprocessing.get_context("spawn").Process(
+        target=_write_from_child, args=(table.path,)
+    )
+    process.start()
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
+    assert table.get("prediction:e1") == b"from-child"
+
+
+def test_clear_and_stats(table):
+    """clear empties the table and stats reflect occupancy."""
+    for index in range(10):
+        table.set(f"k{index}", b"v", ttl=60)
+    assert table.get_stats()["live_entries"] == 10
+
+    table.clear()
+    stats = table.get_stats()
+    assert stats["live_entries"] == 0
+    assert stats["tombstones"] == 0
@@ -0,0 +1,149 @@
+"""Tests for timer-driven stream aggregation."""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from stream_aggregation import TimingWheel, WindowedAggregator
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_wheel_never_expires_early_and_at_most_one_tick_late():
+    """Random deadlines, including several revolutions out, expire on time."""
+    rng = random.Random(5)
+    wheel = TimingWheel(tick=0.01, slots=16, start=0.0)
+    deadlines = {f"k{i}": rng.uniform(0.0, 2.0) for i in range(500)}
+    for key, deadline in deadlines.items():
+        wheel.schedule(key, deadline)
+    wheel.cancel("k0")
+    del deadlines["k0"]
+
+    now, expired_at = 0.0, {}
+    while len(wheel):
+        now += rng.choice([0.003, 0.01, 0.07, 0.4])
+        for key in wheel.advance(now):
+            expired_at[key] = now
+
+    assert expired_at.keys() == deadlines.keys()
+    for key, deadline in deadlines.items():
+        assert expired_at[key] >= deadline - 1e-9
+        # Late only by the step size plus one tick of rounding
+        assert expired_at[key] - deadline <= 0.4 + 0.01 + 1e-9
+
+
+def test_window_flushes_on_time_without_a_later_message():
+    """The last update for a key is emitted when its window closes."""
+    clock = _Clock()
+    flushed = []
+
+    async def flush(group, messages):
+        flushed.append((group, list(messages), clock.now))
+
+    async def run():
+        aggregator = WindowedAggregator(flush, tick=0.01, clock=clock)
+        await aggregator.add("odds:e1", "a", window=1.0, group="odds")
+        clock.now += 0.5
+        await aggregator.add("odds:e1", "b", window=1.0, group="odds")
+        await aggregator.add("odds:e2", "c", window=1.0, group="odds")
+        clock.now += 0.49
+        assert await aggregator.flush_due() == 0
+        clock.now += 0.02
+        assert await aggregator.flush_due() == 1
+        clock.now += 0.5
+        assert await aggregator.flush_due() == 1
+        return aggregator
+
+    aggregator = asyncio.run(run())
+
+    assert [(group, messages) for group, messages, _ in flushed] == [
+        ("odds", ["a", "b"]),
+        ("odds", ["c"]),
+    ]
+    assert len(aggregator) == 0
+    assert aggregator.windows == {}
+    stats = aggregator.get_stats()["groups"]["odds"]
+    assert stats["aggregation_ratio"] == 1.5
+    assert abs(stats["max_added_latency_ms"] - 1010) < 1e-6
+    # Added latency averaged over a (1.01s), b (0.51s) and c (1.01s)
+    assert abs(stats["avg_added_latency_ms"] - 843.333333) < 1e-3
+
+
+def test_full_window_is_flushed_early():
+    """A busy key cannot grow its buffer past max_messages."""
+    clock = _Clock()
+    flushed = []
+
+    async def flush(group, messages):
+        flushed.append(len(messages))
+
+    async def run():
+        aggregator = WindowedAggregator(flush, max_messages=10, clock=clock)
+        for i in range(25):
+            await aggregator.add("k", i, window=5.0, group="stats")
+        clock.now += 5.0
+        await aggregator.flush_due()
+        return aggregator
+
+    aggregator = asyncio.run(run())
+
+    assert flushed == [10, 10, 5]
+    assert aggregator.get_stats()["groups"]["stats"]["overflow_flushes"] == 2
+
+
+def test_run_loop_emits_windows_in_real_time():
+    """The driver task flushes each window within a tick or so of closing."""
+    flushed = []
+
+    async def run():
+        loop = asyncio.get_running_loop()
+
+        async def flush(group, messages):
+            flushed.append((messages, loop.time()))
+
+        aggregator = WindowedAggregator(flush, tick=0.005, clock=loop.time)
+        driver = asyncio.create_task(aggregator.run())
+        started = loop.time()
+        await aggregator.add("a", 1, window=0.05, group="scores")
+        await aggregator.add("b", 2, window=0.02, group="scores")
+        await asyncio.sleep(0.12)
+        driver.cancel()
+        await driver
+        return started, aggregator
+
+    started, aggregator = asyncio.run(run())
+
+    assert [messages for messages, _ in flushed] == [[2], [1]]
+    assert 0.02 <= flushed[0][1] - started < 0.06
+    assert 0.05 <= flushed[1][1] - started < 0.09
+    assert aggregator.get_stats()["groups"]["scores"]["max_flush_lag_ms"] < 40
+
+
+def test_failing_flush_does_not_stop_other_windows():
+    """An exception in one flush is logged and later windows still flush."""
+    clock = _Clock()
+    flushed = []
+
+    async def flush(group, messages):
+        if messages == ["bad"]:
+            raise ValueError("merge failed")
+        flushed.append(messages)
+
+    async def run():
+        aggregator = WindowedAggregator(flush, clock=clock)
+        await aggregator.add("a", "bad", window=1.0, group="g")
+        await aggregator.add("b", "good", window=1.0, group="g")
+        clock.now += 1.0
+        return await aggregator.flush_due()
+
+    assert asyncio.run(run()) == 2
+    assert flushed == [["good"]]
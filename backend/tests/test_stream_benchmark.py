@@ -0,0 +1,121 @@
+"""Tests for the real-time stream benchmark harness."""
+
+import asyncio
+import json
+import os
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from stream_benchmark import (
+    FeedConfig,
+    FeedType,
+    ManagerConfig,
+    StreamBenchmark,
+    Transport,
+    build_feed,
+    find_regressions,
+    main,
+)
+
+
+def _manager(**overrides):
+    settings = dict(subscribers=20, buffer_scale=0.01, predict_ms=1, drain_timeout=10)
+    settings.update(overrides)
+    return ManagerConfig(**settings)
+
+
+def test_mixed_feed_is_reproducible_and_covers_every_priority():
+    """The same seed yields the same feed; goals are the critical messages."""
+    config = FeedConfig(messages=2000, events=50, seed=7)
+    feed = build_feed(config)
+
+    assert [m.fields for m in feed] == [m.fields for m in build_feed(config)]
+    priorities = Counter(m.fields["priority"] for m in feed)
+    assert set(priorities) == {"critical", "high", "medium", "low"}
+    goals = [m for m in feed if m.fields["priority"] == "critical"]
+    assert all(m.fields["data"]["score_change"] == 1 for m in goals)
+
+
+def test_pubsub_run_reports_latency_per_priority():
+    """Every delivered frame is attributed; the result is JSON-ready."""
+    benchmark = StreamBenchmark(FeedConfig(messages=300, events=20), _manager())
+    result = asyncio.run(benchmark.run())
+
+    assert result.pipeline["messages_processed"] == 300
+    assert result.deliveries > 0
+    attributed = sum(stats["count"] for stats in result.latency_ms.values())
+    assert attributed + result.derived_deliveries == result.deliveries
+    assert result.latency_ms["high"]["count"] > 0
+    assert result.latency_ms["high"]["p99"] >= result.latency_ms["high"]["p50"]
+    assert result.cpu_us_per_message > 0
+    json.dumps(result.__dict__)
+
+
+def test_streams_transport_processes_the_whole_feed():
+    """The consumer-group path delivers the same feed end to end."""
+    benchmark = StreamBenchmark(
+        FeedConfig(feed=FeedType.SCORES, messages=200, events=10),
+        _manager(transport=Transport.STREAMS),
+    )
+    result = asyncio.run(benchmark.run())
+
+    assert result.transport == "streams"
+    assert result.pipeline["messages_processed"] == 200
+    assert result.latency_ms["medium"]["count"] > 0
+
+
+def test_find_regressions_flags_throughput_cpu_and_tail_latency():
+    """Slower, costlier or higher-p99 runs are reported; faster ones are not."""
+    base = {
+        "name": "mixed/pubsub/200",
+        "throughput_messages": 1000.0,
+        "cpu_us_per_message": 100.0,
+        "latency_ms": {"critical": {"p99": 2.0}, "low": {"p99": 0.0}},
+    }
+    worse = dict(
+        base,
+        throughput_messages=800.0,
+        cpu_us_per_message=150.0,
+        latency_ms={"critical": {"p99": 3.0}, "low": {"p99": 9.0}},
+    )
+    better = dict(base, throughput_messages=1200.0, cpu_us_per_message=90.0)
+
+    regressions = find_regressions([worse], [base])
+    assert len(regressions) == 3
+    assert any("critical p99" in r for r in regressions)
+    assert find_regressions([better], [base]) == []
+    assert find_regressions([dict(worse, name="other")], [base]) == []
+
+
+def test_main_writes_a_comparable_report(tmp_path):
+    """Each message reaches each subscriber once; the report is a baseline."""
+    trace = tmp_path / "feed.jsonl"
+    trace.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "stream_type": "social_sentiment",
+                    "priority": "low",
+                    "event_id": f"e{i % 3}",
+                    "data": {"sentiment": 0.1, "mentions": i},
+                    "t": i / 1000,
+                }
+            )
+            for i in range(50)
+        )
+    )
+    output = tmp_path / "report.json"
+    argv = [
+        "--trace", str(trace), "--realtime", "--subscribers", "5",
+        "--filtered-fraction", "0", "--buffer-scale", "0.01", "--output", str(output),
+    ]  # fmt: skip
+
+    assert main(argv) == 0
+    report = json.loads(output.read_text())
+    (result,) = report["results"]
+    assert result["name"] == "trace/pubsub/5"
+    # Unaggregated and unfiltered: exactly one frame per message per socket
+    assert result["latency_ms"]["low"]["count"] == 50 * 5
+    assert main(argv + ["--baseline", str(output), "--tolerance", "100"]) == 0
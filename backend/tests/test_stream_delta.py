@@ -0,0 +1,163 @@
+"""Tests for the snapshot-plus-delta stream protocol."""
+
+import asyncio
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from realtime_engine import RealTimeStreamManager, StreamType
+from stream_delta import (
+    DeltaTracker,
+    apply_delta,
+    delta_fields,
+    diff,
+    snapshot_fields,
+)
+from stream_encoding import StreamEncoding, StreamMessageEncoder
+from tests.stream_messages import stream_message
+
+
+def _odds(home=1.9, away=2.1, **extra):
+    return {
+        "market_type": "h2h",
+        "sportsbook": "book",
+        "odds": {"home": home, "away": away},
+        "line": None,
+        **extra,
+    }
+
+
+def test_diff_round_trips_through_apply_delta():
+    """Applying the delta of random nested edits reproduces the new state."""
+    rng = random.Random(3)
+
+    def mutate(value, depth=0):
+        value = dict(value)
+        for name in rng.sample(["a", "b/c", "d~e", "f", "g"], 3):
+            roll = rng.random()
+            if roll < 0.2:
+                value.pop(name, None)
+            elif roll < 0.5 and depth < 2:
+                nested = value.get(name)
+                nested = nested if isinstance(nested, dict) else {}
+                value[name] = mutate(nested, depth + 1)
+            else:
+                value[name] = rng.choice([1, 1.0, "1", [1, 2], None, True])
+        return value
+
+    state = {}
+    for _ in range(300):
+        new = mutate(state)
+        changed, removed = diff(state, new)
+        frame = {"op": "delta", "set": changed, "unset": removed}
+        assert apply_delta(state, frame) == new
+        state = new
+
+
+def test_subscriber_gets_snapshot_then_deltas_and_snapshot_after_a_gap():
+    """Matching base -> delta; missed version or periodic resync -> snapshot."""
+    tracker = DeltaTracker(resync_every=5)
+    versions = {}
+    views = []
+    for i in range(7):
+        message = stream_message(_odds(home=round(1.9 + i / 100, 2)))
+        update = tracker.observe("betting_odds:e1", message)
+        if i == 2:
+            continue  # Dropped from this subscriber's queue
+        views.append(tracker.view_for(versions, update))
+
+    assert views == [
+        snapshot_fields,  # First sight of the key
+        delta_fields,
+        snapshot_fields,  # Base 2 was never received
+        snapshot_fields,  # Periodic resync (5th update)
+        delta_fields,
+        delta_fields,
+    ]
+    assert versions == {"betting_odds:e1": 7}
+
+    # An unchanged tick sends nothing to holders, a snapshot to newcomers
+    repeat = tracker.observe("betting_odds:e1", stream_message(_odds(home=1.96)))
+    assert tracker.view_for(versions, repeat) is None
+    assert tracker.view_for({}, repeat) is snapshot_fields
+    # A stale or already-held version is never sent
+    assert tracker.view_for({"betting_odds:e1": 9}, update) is None
+
+
+def test_delta_frames_are_small_and_rebuild_the_state():
+    """Encoded deltas carry only changed prices and apply to the snapshot."""
+    tracker = DeltaTracker(resync_every=1000)
+    encoder = StreamMessageEncoder()
+    versions, client_state, held = {}, None, None
+    full_bytes = delta_bytes = 0
+    rng = random.Random(8)
+
+    for i in range(200):
+        data = _odds(
+            home=round(rng.uniform(1.5, 2.5), 2),
+            away=2.1,
+            teams={"home": "Arsenal", "away": "Chelsea"},
+            commence_time="2024-01-01T15:00:00Z",
+        )
+        message = stream_message(data, metadata={"provider": "the-odds-api", "i": i})
+        update = tracker.observe("betting_odds:e1", message)
+        view = tracker.view_for(versions, update)
+        full_bytes += len(encoder.frame(message, StreamEncoding.JSON, {"seq": i}))
+        if view is None:
+            continue
+        frame = json.loads(
+            encoder.frame(message, StreamEncoding.JSON, {"seq": i}, view=view)
+        )
+        delta_bytes += len(json.dumps(frame, separators=(",", ":")))
+        if frame["op"] == "delta":
+            assert frame["base"] == held  # Client-side gap check
+        client_state = apply_delta(client_state, frame)
+        held = frame["v"]
+        assert client_state == data
+
+    assert delta_bytes < full_bytes / 2
+    assert tracker.get_stats()["delta_ratio"] > 0.9
+
+
+def test_tracker_evicts_least_recently_updated_keys():
+    """Past max_keys the oldest key is dropped; versions never repeat."""
+    tracker = DeltaTracker(max_keys=2)
+    first = tracker.observe("a", stream_message({"x": 1}))
+    tracker.observe("b", stream_message({"x": 1}))
+    tracker.observe("a", stream_message({"x": 2}))
+    tracker.observe("c", stream_message({"x": 1}))
+
+    assert tracker.latest("b") is None
+    assert tracker.latest("a").data == {"x": 2}
+    again = tracker.observe("b", stream_message({"x": 1}))
+    assert again.base == 0 and again.version > first.version
+    assert tracker.get_stats()["keys_evicted"] == 2
+
+
+def test_delta_subscriber_gets_current_state_on_subscribe():
+    """A new delta subscriber is sent the latest state of its matching keys."""
+    received = []
+
+    async def on_message(message):
+        received.append((message.event_id, message.data["odds"]["home"]))
+
+    async def run():
+        manager = RealTimeStreamManager()
+        for event_id, home in (("e1", 1.9), ("e2", 2.4), ("e1", 1.95)):
+            await manager.broadcast(stream_message(_odds(home=home), event_id=event_id))
+        await manager.subscribe(
+            "late",
+            [StreamType.BETTING_ODDS],
+            filters={"event_ids": ["e1"]},
+            callback=on_message,
+            protocol="delta",
+        )
+        await asyncio.sleep(0.05)
+        await manager.unsubscribe("late")
+
+    asyncio.run(run())
+
+    assert received == [("e1", 1.95)]
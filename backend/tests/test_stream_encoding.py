@@ -0,0 +1,85 @@
+"""Tests for serialize-once stream message encoding."""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import stream_encoding
+from realtime_engine import StreamType
+from stream_encoding import (
+    StreamEncoding,
+    StreamMessageEncoder,
+    message_fields,
+    negotiate_encoding,
+)
+from stream_fanout import SubscriptionFanout
+from tests.stream_messages import stream_message
+
+
+def _legacy_payload(message):
+    """What the per-subscriber json.dumps used to send"""
+    return json.loads(json.dumps(message_fields(message)))
+
+
+def test_json_frames_keep_the_flat_format_plus_envelope():
+    """Clients still receive the old object, with their sequence added."""
+    message = stream_message({"odds": 2.1, "books": ["a", "b"], "line": None})
+    encoder = StreamMessageEncoder()
+
+    frame = encoder.frame(message, StreamEncoding.JSON, {"seq": 7})
+
+    decoded = json.loads(frame)
+    assert decoded.pop("seq") == 7
+    assert decoded == _legacy_payload(message)
+    assert decoded["timestamp"] == "2024-01-01T12:00:00.123456"
+    assert json.loads(encoder.frame(message, StreamEncoding.JSON)) == decoded
+
+
+def test_body_is_encoded_once_for_all_subscribers():
+    """Two thousand subscribers share one encoding of the message."""
+    encoder = StreamMessageEncoder()
+    frames = []
+
+    async def run():
+        fanout = SubscriptionFanout()
+        for i in range(2000):
+
+            async def send(message, seq=i):
+                frames.append(encoder.frame(message, StreamEncoding.JSON, {"seq": seq}))
+
+            fanout.add(f"s{i}", [StreamType.BETTING_ODDS], {}, send)
+        fanout.publish(stream_message({"odds": 2.1}))
+        await asyncio.sleep(0.05)
+        fanout.close()
+
+    asyncio.run(run())
+
+    assert len(frames) == 2000
+    assert encoder.metrics.encodes == 1
+    assert encoder.metrics.reuses == 1999
+    assert {json.loads(frame)["seq"] for frame in frames} == set(range(2000))
+
+
+def test_stdlib_fallback_matches_fast_encoder(monkeypatch):
+    """Without orjson the same JSON object is produced."""
+    message = stream_message({"odds": 2.1, "at": datetime(2024, 1, 2), 3: "x"})
+    fast = json.loads(StreamMessageEncoder().frame(message, StreamEncoding.JSON))
+
+    monkeypatch.setattr(stream_encoding, "orjson", None)
+    message.encoded.clear()
+    slow = json.loads(StreamMessageEncoder().frame(message, StreamEncoding.JSON))
+
+    assert fast == slow
+    assert fast["data"]["at"] == "2024-01-02T00:00:00"
+
+
+def test_negotiation_falls_back_to_json(monkeypatch):
+    """Unknown or unavailable encodings are served as JSON."""
+    assert negotiate_encoding(None) == StreamEncoding.JSON
+    assert negotiate_encoding("xml") == StreamEncoding.JSON
+    monkeypatch.setattr(stream_encoding, "msgpack", None)
+    assert negotiate_encoding("msgpack") == StreamEncoding.JSON
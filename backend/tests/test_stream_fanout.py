@@ -0,0 +1,230 @@
+"""Tests for indexed subscription fan-out."""
+
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from realtime_engine import StreamType, UpdatePriority
+from stream_fanout import SlowConsumerPolicy, SubscriptionFanout, SubscriptionIndex
+from tests.stream_messages import stream_message
+
+ODDS = StreamType.BETTING_ODDS
+SCORES = StreamType.LIVE_SCORES
+
+
+def _message(stream_type, event_id, source, priority=UpdatePriority.MEDIUM, data=None):
+    return stream_message(data, stream_type, event_id, source, priority)
+
+
+def _matches(message, stream_types, filters):
+    """Reference semantics: a linear check of one subscription"""
+    if message.stream_type not in stream_types:
+        return False
+    if "event_ids" in filters and message.event_id not in filters["event_ids"]:
+        return False
+    if "priority" in filters and message.priority not in filters["priority"]:
+        return False
+    if "sources" in filters and message.source not in filters["sources"]:
+        return False
+    return True
+
+
+def test_index_matches_the_linear_filter_scan():
+    """Indexed lookup returns exactly the subscribers a full scan would."""
+    rng = random.Random(7)
+    streams = [ODDS, SCORES, StreamType.NEWS_SENTIMENT]
+    events = [f"e{i}" for i in range(20)] + [None]
+    sources = ["feed_a", "feed_b", "feed_c"]
+    priorities = list(UpdatePriority)
+
+    index = SubscriptionIndex()
+    subscriptions = {}
+    for i in range(300):
+        stream_types = set(rng.sample(streams, rng.randint(1, 3)))
+        filters = {}
+        if rng.random() < 0.6:
+            filters["event_ids"] = rng.sample(events, rng.randint(1, 4))
+        if rng.random() < 0.3:
+            filters["sources"] = rng.sample(sources, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            filters["priority"] = rng.sample(priorities, rng.randint(1, 2))
+        subscriptions[f"s{i}"] = (stream_types, filters)
+        index.add(f"s{i}", stream_types, filters)
+    for i in range(0, 300, 7):
+        index.remove(f"s{i}")
+        del subscriptions[f"s{i}"]
+
+    for _ in range(500):
+        message = _message(
+            rng.choice(streams),
+            rng.choice(events),
+            rng.choice(sources),
+            rng.choice(priorities),
+        )
+        expected = {
+            subscriber_id
+            for subscriber_id, (stream_types, filters) in subscriptions.items()
+            if _matches(message, stream_types, filters)
+        }
+        matched = index.match(message)
+        assert len(matched) == len(set(matched))
+        assert set(matched) == expected
+
+
+def test_messages_reach_only_matching_subscribers_in_order():
+    """Each subscriber's drain task delivers its own messages in order."""
+    received = {}
+
+    def sender(subscriber_id):
+        async def send(message):
+            received.setdefault(subscriber_id, []).append(message.data)
+
+        return send
+
+    async def run():
+        fanout = SubscriptionFanout()
+        fanout.add("all", [ODDS], {}, sender("all"))
+        fanout.add("e1", [ODDS], {"event_ids": ["e1"]}, sender("e1"))
+        fanout.add("scores", [SCORES], {}, sender("scores"))
+        for i in range(5):
+            fanout.publish(_message(ODDS, "e1" if i % 2 else "e2", "feed", data=i))
+        await asyncio.sleep(0.01)
+        stats = fanout.get_stats()
+        fanout.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert received == {"all": [0, 1, 2, 3, 4], "e1": [1, 3]}
+    assert (stats["messages"], stats["queued"], stats["sent"]) == (5, 7, 7)
+    assert stats["queue_depth_total"] == 0
+
+
+def _slow_fanout(policy, queue_size=3):
+    release = asyncio.Event()
+    delivered = []
+    closed = []
+
+    async def slow(message):
+        await release.wait()
+        delivered.append(message.data)
+
+    async def fast(message):
+        delivered_fast.append(message.data)
+
+    async def on_close(subscriber_id, reason):
+        closed.append((subscriber_id, reason))
+
+    delivered_fast = []
+    fanout = SubscriptionFanout(
+        queue_size=queue_size,
+        policy=policy,
+        coalesce_key=lambda message: message.event_id,
+        on_close=on_close,
+    )
+    fanout.add("slow", [ODDS], {}, slow)
+    fanout.add("fast", [ODDS], {}, fast)
+    return fanout, release, delivered, delivered_fast, closed
+
+
+def test_drop_oldest_bounds_a_slow_subscriber():
+    """A stalled client loses its oldest messages without delaying others."""
+
+    async def run():
+        fanout, release, delivered, fast, _ = _slow_fanout(
+            SlowConsumerPolicy.DROP_OLDEST
+        )
+        fanout.publish(_message(ODDS, "e0", "feed", data=0))
+        await asyncio.sleep(0)  # The slow sender now holds message 0
+        for i in range(1, 10):
+            fanout.publish(_message(ODDS, f"e{i}", "feed", data=i))
+            await asyncio.sleep(0)  # The fast subscriber keeps up
+        await asyncio.sleep(0.01)
+        depth = fanout.get_stats()["queue_depth_max"]
+        release.set()
+        await asyncio.sleep(0.01)
+        stats = fanout.get_stats()
+        fanout.close()
+        return delivered, fast, depth, stats
+
+    delivered, fast, depth, stats = asyncio.run(run())
+
+    assert fast == list(range(10))
+    assert depth == 3
+    assert delivered == [0, 7, 8, 9]
+    assert stats["dropped"] == 6
+
+
+def test_coalesce_keeps_the_latest_message_per_key():
+    """Pending messages with the same key are replaced in place."""
+
+    async def run():
+        fanout, release, delivered, _, _ = _slow_fanout(SlowConsumerPolicy.COALESCE)
+        fanout.publish(_message(ODDS, "e0", "feed", data="first"))
+        await asyncio.sleep(0)
+        for version in range(5):
+            for event_id in ("e1", "e2"):
+                update = (event_id, version)
+                fanout.publish(_message(ODDS, event_id, "feed", data=update))
+                await asyncio.sleep(0)
+        release.set()
+        await asyncio.sleep(0.01)
+        stats = fanout.get_stats()
+        fanout.close()
+        return delivered, stats
+
+    delivered, stats = asyncio.run(run())
+
+    assert delivered == ["first", ("e1", 4), ("e2", 4)]
+    assert stats["coalesced"] == 8
+    assert stats["dropped"] == 0
+
+
+def test_disconnect_policy_and_send_failures_close_the_subscriber():
+    """Overflow or a failing send closes the queue and reports why."""
+
+    async def run():
+        fanout, _, _, _, closed = _slow_fanout(SlowConsumerPolicy.DISCONNECT)
+
+        async def broken(message):
+            raise ConnectionError("gone")
+
+        fanout.add("broken", [ODDS], {}, broken)
+        for i in range(6):
+            fanout.publish(_message(ODDS, f"e{i}", "feed", data=i))
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        stats = fanout.get_stats()
+        fanout.close()
+        return closed, stats
+
+    closed, stats = asyncio.run(run())
+
+    assert sorted(closed) == [("broken", "send failed"), ("slow", "slow consumer")]
+    assert (stats["disconnected"], stats["send_failures"]) == (1, 1)
+
+
+def test_fan_out_cost_follows_matches_not_subscribers():
+    """Thousands of event-filtered subscribers add no per-message work."""
+
+    async def run():
+        async def send(message):
+            pass
+
+        fanout = SubscriptionFanout()
+        for i in range(5000):
+            fanout.add(f"s{i}", [ODDS], {"event_ids": [f"e{i}"]}, send)
+        queued = [fanout.publish(_message(ODDS, f"e{i}", "feed")) for i in range(50)]
+        await asyncio.sleep(0.01)
+        stats = fanout.get_stats()
+        fanout.close()
+        return queued, stats
+
+    queued, stats = asyncio.run(run())
+
+    assert queued == [1] * 50
+    assert stats["sent"] == 50
+    assert stats["index_keys"] == 5000
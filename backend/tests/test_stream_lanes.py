@@ -0,0 +1,116 @@
+"""Tests for priority message lanes."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from realtime_engine import UpdatePriority
+from stream_lanes import LatencyHistogram, PriorityLanes
+from tests.stream_messages import stream_message
+
+WEIGHTS = {"critical": 8, "high": 4, "medium": 2, "low": 1}
+
+
+def _message(priority, index=0):
+    return stream_message({"index": index}, priority=priority)
+
+
+def test_batches_are_weighted_fair_across_lanes():
+    """Each round takes up to weight messages from every lane, highest first."""
+
+    async def run():
+        lanes = PriorityLanes(WEIGHTS)
+        for priority in reversed(list(UpdatePriority)):
+            for i in range(20):
+                await lanes.put(_message(priority, i))
+        first = await lanes.get_batch(30)
+        rest = await lanes.get_batch(1000)
+        return first, rest
+
+    first, rest = asyncio.run(run())
+
+    lanes = [message.priority.value for message, _ in first]
+    assert lanes == (["critical"] * 8 + ["high"] * 4 + ["medium"] * 2 + ["low"]) * 2
+    assert len(rest) == 80 - 30
+    # Order within a lane is preserved
+    critical = [m.data["index"] for m, _ in first + rest if m.priority == "critical"]
+    assert critical == list(range(20))
+
+
+def test_critical_message_overtakes_a_low_priority_backlog():
+    """A critical update queued behind 10,000 low ticks is in the next batch."""
+
+    async def run():
+        lanes = PriorityLanes(WEIGHTS)
+        for i in range(10000):
+            await lanes.put(_message(UpdatePriority.LOW, i))
+        await lanes.put(_message(UpdatePriority.CRITICAL))
+        batch = await lanes.get_batch(64)
+        for message, enqueued_at in batch:
+            lanes.record_latency(message.priority, enqueued_at)
+        return batch, lanes.get_stats()
+
+    batch, stats = asyncio.run(run())
+
+    assert batch[0][0].priority == UpdatePriority.CRITICAL
+    assert stats["critical"]["latency"]["count"] == 1
+    assert stats["critical"]["within_100ms"] == 1.0
+    assert stats["low"]["depth"] == 10000 - 63
+
+
+def test_full_lane_blocks_only_its_producers():
+    """Producers wait for space in their own lane; other lanes keep flowing."""
+
+    async def run():
+        lanes = PriorityLanes(WEIGHTS, maxsize=2)
+        await lanes.put(_message(UpdatePriority.LOW, 0))
+        await lanes.put(_message(UpdatePriority.LOW, 1))
+        blocked = asyncio.create_task(lanes.put(_message(UpdatePriority.LOW, 2)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        await asyncio.wait_for(lanes.put(_message(UpdatePriority.HIGH)), 1)
+
+        batch = await lanes.get_batch(2)
+        await asyncio.wait_for(blocked, 1)
+        return batch, lanes.qsize()
+
+    batch, remaining = asyncio.run(run())
+
+    assert [m.priority for m, _ in batch] == [UpdatePriority.HIGH, UpdatePriority.LOW]
+    assert remaining == 2
+
+
+def test_empty_lanes_wait_for_the_next_message():
+    """get_batch sleeps until a put, or returns nothing on timeout."""
+
+    async def run():
+        lanes = PriorityLanes(WEIGHTS)
+        assert await lanes.get_batch(10, timeout=0.01) == []
+        waiter = asyncio.create_task(lanes.get_batch(10))
+        await asyncio.sleep(0.01)
+        await lanes.put(_message("unknown"))
+        return await asyncio.wait_for(waiter, 1), lanes
+
+    batch, lanes = asyncio.run(run())
+
+    assert len(batch) == 1
+    # Unknown priorities go to the lowest-weight lane
+    assert lanes.enqueued["low"] == 1
+
+
+def test_latency_histogram_percentiles():
+    """Percentiles report the bucket bound holding the quantile."""
+    histogram = LatencyHistogram()
+    for _ in range(90):
+        histogram.record(0.003)
+    for _ in range(9):
+        histogram.record(0.080)
+    histogram.record(7.0)
+
+    stats = histogram.get_stats()
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (5.0, 100.0, 100.0)
+    assert stats["max_ms"] == 7000.0
+    assert stats["buckets"]["inf"] == 1
+    assert histogram.within(100) == 0.99
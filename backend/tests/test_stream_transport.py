@@ -0,0 +1,224 @@
+"""Tests for the Redis Streams consumer-group transport."""
+
+import asyncio
+import os
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from config import config_manager
+from local_redis import LocalRedis
+from realtime_engine import (
+    RealTimeStreamManager,
+    StreamMessage,
+    StreamType,
+    UpdatePriority,
+)
+from stream_transport import RedisStreamTransport, partition_owners
+
+
+def _node(redis, name, received, ack=True, **kwargs):
+    transport = RedisStreamTransport(
+        redis, name, partitions=8, block_ms=20, claim_interval=0.05, **kwargs
+    )
+
+    async def handler(token, payload):
+        received.append((name, payload))
+        if ack:
+            await transport.ack(token)
+
+    return transport, handler
+
+
+async def _settle(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition() and loop.time() < deadline:
+        await asyncio.sleep(0.01)
+
+
+def test_rendezvous_ownership_moves_only_the_lost_nodes_share():
+    """Removing a node reassigns its partitions and leaves the rest in place."""
+    before = partition_owners(["a", "b", "c"], 64)
+    after = partition_owners(["a", "b"], 64)
+
+    assert set(Counter(before.values())) == {"a", "b", "c"}
+    assert all(after[p] == owner for p, owner in before.items() if owner != "c")
+
+
+def test_two_nodes_split_partitions_without_loss_or_duplicates():
+    """Every message is handled exactly once, by the owner of its partition."""
+    redis = LocalRedis()
+    received = []
+
+    async def run():
+        a, handle_a = _node(redis, "node-a", received)
+        b, handle_b = _node(redis, "node-b", received)
+        await a.start(handle_a)
+        await b.start(handle_b)
+        await _settle(lambda: len(a.nodes) == 2 and len(b.nodes) == 2)
+
+        for i in range(400):
+            await a.publish(f"event-{i % 40}", f"m{i}")
+        await _settle(lambda: len(received) >= 400)
+        await a.stop()
+        await b.stop()
+        return a, b
+
+    a, b = asyncio.run(run())
+
+    payloads = Counter(payload for _, payload in received)
+    assert len(payloads) == 400 and set(payloads.values()) == {1}
+    assert sorted(a.owned + b.owned) == list(range(8))
+    assert {name for name, _ in received} == {"node-a", "node-b"}
+    # Every update for an event was handled by one node, in publish order
+    by_event = {}
+    for name, payload in received:
+        i = int(payload[1:])
+        by_event.setdefault(i % 40, []).append((name, i))
+    for handled in by_event.values():
+        assert len({name for name, _ in handled}) == 1
+        assert [i for _, i in handled] == sorted(i for _, i in handled)
+
+
+def test_dead_consumers_pending_entries_are_claimed():
+    """Entries a crashed node read but never acked are handled by a survivor."""
+    redis = LocalRedis()
+    received = []
+
+    async def run():
+        dead, handle_dead = _node(redis, "node-dead", received, ack=False)
+        await dead.start(handle_dead)
+        for i in range(50):
+            await dead.publish(f"event-{i}", f"m{i}")
+        await _settle(lambda: len(received) >= 50)
+        dead._task.cancel()  # Crash: no acks, heartbeat left to expire
+        await redis.zrem(dead.nodes_key, "node-dead")
+
+        live, handle_live = _node(redis, "node-live", received, claim_idle_ms=50)
+        await live.start(handle_live)
+        await _settle(lambda: len(received) >= 100)
+        await live.stop()
+        return live
+
+    live = asyncio.run(run())
+
+    assert Counter(p for name, p in received if name == "node-live") == Counter(
+        p for name, p in received if name == "node-dead"
+    )
+    assert live.metrics.claimed == 50
+    assert live.get_stats()["in_flight"] == 0
+
+
+def test_restarted_node_replays_its_unacknowledged_entries():
+    """A node restarting under the same name handles its pending entries first."""
+    redis = LocalRedis()
+    first_run, second_run = [], []
+
+    async def run():
+        node, handler = _node(redis, "node-a", first_run, ack=False)
+        await node.start(handler)
+        for i in range(10):
+            await node.publish(f"event-{i}", f"m{i}")
+        await _settle(lambda: len(first_run) >= 10)
+        await node.stop()
+
+        restarted, handler = _node(redis, "node-a", second_run)
+        await restarted.start(handler)
+        replayed = list(second_run)
+        await restarted.publish("event-x", "late")
+        await _settle(lambda: len(second_run) >= 11)
+        await restarted.stop()
+        return restarted, replayed
+
+    restarted, replayed = asyncio.run(run())
+
+    assert sorted(p for _, p in replayed) == sorted(p for _, p in first_run)
+    assert second_run[-1] == ("node-a", b"late")
+    assert restarted.metrics.replayed == 10
+
+
+def test_heartbeats_expire_from_the_node_set_in_one_round_trip():
+    """Maintenance is one pipelined call; silent nodes drop out of ownership."""
+    redis = LocalRedis()
+
+    async def run():
+        node, _ = _node(redis, "node-a", [])
+        await node.ensure_groups()
+        await redis.zadd(node.nodes_key, {"node-gone": 0, "node-b": 1e12})
+        before = redis.round_trips
+        await node.maintain()
+        heartbeat_trips = redis.round_trips - before
+        members = await redis.zrange(node.nodes_key, 0, -1)
+        return node, heartbeat_trips, members
+
+    node, heartbeat_trips, members = asyncio.run(run())
+
+    assert node.nodes == ["node-a", "node-b"]
+    assert sorted(members) == [b"node-a", b"node-b"]
+    # Heartbeat pipeline, then one XAUTOCLAIM per owned partition
+    assert heartbeat_trips == 1 + len(node.owned)
+
+
+def test_subscribers_on_other_nodes_receive_the_owners_output():
+    """Processed messages reach subscribers on the node that does not own them."""
+    redis = LocalRedis()
+    config = config_manager.config
+    saved = (config.stream_transport, config.stream_consumer_name)
+    received = {"node-a": [], "node-b": []}
+
+    async def start(name):
+        config.stream_consumer_name = name
+        manager = RealTimeStreamManager()
+        await manager.initialize(redis_client=redis)
+
+        async def on_message(message):
+            received[name].append(message.data)
+
+        await manager.subscribe(
+            f"{name}-client", [StreamType.LIVE_SCORES], callback=on_message
+        )
+        return manager
+
+    async def run():
+        a = await start("node-a")
+        b = await start("node-b")
+        await a.transport.maintain()  # Both nodes now see each other
+        event_id = next(
+            f"event-{i}"
+            for i in range(100)
+            if a.transport.partition_of(f"event-{i}") in a.transport.owned
+        )
+        await b.publish_message(
+            StreamMessage(
+                id=str(uuid.uuid4()),
+                stream_type=StreamType.LIVE_SCORES,
+                priority=UpdatePriority.CRITICAL,
+                data={"score_change": 1},
+                timestamp=datetime.utcnow(),
+                source="test",
+                event_id=event_id,
+            )
+        )
+        await _settle(lambda: received["node-b"])
+        await asyncio.sleep(0.05)
+        processed = (
+            a.statistics["messages_processed"],
+            b.statistics["messages_processed"],
+        )
+        await a.shutdown()
+        await b.shutdown()
+        return processed
+
+    config.stream_transport = "streams"
+    try:
+        processed = asyncio.run(run())
+    finally:
+        config.stream_transport, config.stream_consumer_name = saved
+
+    assert processed == (1, 0), "Only the partition owner processes the message"
+    assert received["node-a"] == [{"score_change": 1}]
+    assert received["node-b"] == [{"score_change": 1}]
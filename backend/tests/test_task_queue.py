@@ -0,0 +1,223 @@
+"""Tests for task queue claims, bulk enqueue and batched execution."""
+
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from local_redis import LocalRedis
+from task_processor import (
+    TaskDefinition,
+    TaskPriority,
+    TaskQueue,
+    TaskResult,
+    TaskStatus,
+    TaskType,
+    TaskWorker,
+)
+
+
+def _task(
+    task_id, priority=TaskPriority.MEDIUM, function_name="prediction_batch_task", **kwargs
+):
+    return TaskDefinition(
+        id=task_id,
+        task_type=TaskType.PREDICTION_BATCH,
+        priority=priority,
+        function_name=function_name,
+        **kwargs,
+    )
+
+
+def _queue():
+    queue = TaskQueue("test_tasks")
+    queue.redis_client = LocalRedis()
+    return queue
+
+
+def test_claims_by_priority_then_fifo_in_one_round_trip_each():
+    """Each dequeue is a single script call that leases the task."""
+    queue = _queue()
+
+    async def run():
+        await queue.enqueue(_task("low-1", TaskPriority.LOW))
+        await queue.enqueue(_task("critical", TaskPriority.CRITICAL))
+        await queue.enqueue(_task("low-2", TaskPriority.LOW))
+        await queue.enqueue(
+            _task(
+                "later",
+                TaskPriority.HIGH,
+                scheduled_at=datetime.utcnow() + timedelta(hours=1),
+            )
+        )
+        order, trips = [], []
+        for _ in range(4):
+            before = queue.redis_client.round_trips
+            task = await queue.dequeue("w1")
+            trips.append(queue.redis_client.round_trips - before)
+            order.append(task.id if task else None)
+        stats = await queue.get_queue_stats()
+        await queue.store_result(TaskResult("critical", TaskStatus.COMPLETED))
+        remaining = await queue.get_queue_stats()
+        return order, trips, stats, remaining
+
+    order, trips, stats, remaining = asyncio.run(run())
+
+    assert order == ["critical", "low-1", "low-2", None]  # "later" is not due
+    assert trips == [1, 1, 1, 1]
+    assert stats["in_flight"] == 3 and stats["active_locks"] == 3
+    assert stats["priority_breakdown"]["HIGH"] == 1
+    assert remaining["in_flight"] == 2
+
+
+def test_idle_dequeue_wakes_on_enqueue_and_when_a_task_comes_due():
+    """Blocked workers start new work in milliseconds, not on a poll tick."""
+    queue = _queue()
+
+    async def run():
+        waiting = asyncio.create_task(queue.dequeue("w1", timeout=5))
+        await asyncio.sleep(0.05)
+        enqueued_at = time.monotonic()
+        await queue.enqueue(_task("now"))
+        task = await waiting
+        wake = time.monotonic() - enqueued_at
+
+        # Enqueued before the wait; becomes due with no further enqueue
+        await queue.enqueue(
+            _task("soon", scheduled_at=datetime.utcnow() + timedelta(seconds=0.1))
+        )
+        assert await queue.dequeue("w1") is None
+        started = time.monotonic()
+        scheduled = await queue.dequeue("w1", timeout=5)
+        due_wait = time.monotonic() - started
+        timed_out = await queue.dequeue("w1", timeout=0.05)
+        return task, wake, scheduled, due_wait, timed_out
+
+    task, wake, scheduled, due_wait, timed_out = asyncio.run(run())
+
+    assert task.id == "now" and wake < 0.05
+    assert scheduled.id == "soon" and due_wait < 1
+    assert timed_out is None
+
+
+def test_concurrent_workers_never_claim_the_same_task():
+    """Competing claims hand out every task exactly once."""
+    queue = _queue()
+
+    async def run():
+        for i in range(50):
+            await queue.enqueue(_task(f"t{i}"))
+        claimed = await asyncio.gather(
+            *(queue.dequeue(f"w{i}", timeout=0.1) for i in range(80))
+        )
+        return [task.id for task in claimed if task]
+
+    claimed = asyncio.run(run())
+
+    assert sorted(claimed) == sorted(f"t{i}" for i in range(50))
+
+
+def test_expired_lease_returns_task_to_its_queue():
+    """A claim whose worker died is requeued once, then claimable again."""
+    queue = _queue()
+
+    async def run():
+        await queue.enqueue(_task("stuck", TaskPriority.HIGH))
+        await queue.enqueue(_task("done", TaskPriority.HIGH))
+        await queue.dequeue("dead-worker")
+        await queue.dequeue("w1")
+        await queue.store_result(TaskResult("done", TaskStatus.COMPLETED))
+        # Lease of the first claim runs out
+        await queue.redis_client.zadd(queue.in_flight_key, {"stuck": time.time() - 1})
+        requeued = await queue.requeue_expired_leases()
+        again = await queue.requeue_expired_leases()
+        task = await queue.dequeue("w2")
+        return requeued, again, task
+
+    requeued, again, task = asyncio.run(run())
+
+    assert (requeued, again) == (1, 0)
+    assert task.id == "stuck"
+
+
+def test_submit_many_enqueues_in_one_round_trip():
+    """A bulk submit is one pipeline; priorities and FIFO order still hold."""
+    queue = _queue()
+    tasks = [
+        _task(f"t{i}", TaskPriority.HIGH if i % 10 == 0 else TaskPriority.LOW)
+        for i in range(100)
+    ]
+
+    async def run():
+        before = queue.redis_client.round_trips
+        added = await queue.enqueue_many(tasks)
+        trips = queue.redis_client.round_trips - before
+        first = [(await queue.dequeue("w1")).id for _ in range(12)]
+        return added, trips, first
+
+    added, trips, first = asyncio.run(run())
+
+    assert (added, trips) == (100, 1)
+    assert first == [f"t{i}" for i in range(0, 100, 10)] + ["t1", "t2"]
+
+
+def test_worker_runs_batchable_tasks_together_with_results_per_task():
+    """Batchable tasks of one function share calls; failures stay per task."""
+    worker = TaskWorker("batch-worker", concurrency=1)
+    worker.task_queue = _queue()
+    worker.batch_max_size, worker.batch_max_wait = 4, 0.01
+    calls = []
+
+    async def echo_batch(tasks):
+        calls.append([task.id for task in tasks])
+        return [
+            ValueError("bad event") if task.kwargs.get("fail") else task.id.upper()
+            for task in tasks
+        ]
+
+    worker.register_batch_task("echo", echo_batch)
+    worker.register_task("echo", lambda **kwargs: "single")
+    tasks = [
+        TaskDefinition(
+            id=f"b{i}",
+            task_type=TaskType.PREDICTION_BATCH,
+            priority=TaskPriority.MEDIUM,
+            function_name="echo",
+            kwargs={"fail": i == 3},
+            batchable=True,
+        )
+        for i in range(10)
+    ]
+    tasks.insert(5, _task("plain", function_name="echo"))
+
+    async def run():
+        await worker.task_queue.enqueue_many(tasks)
+        worker.is_running = True
+        loop = asyncio.create_task(worker._worker_loop("w1"))
+        while worker.tasks_processed < len(tasks):
+            await asyncio.sleep(0.01)
+        worker.is_running = False
+        loop.cancel()
+        results = {
+            task.id: await worker.task_queue.get_result(task.id) for task in tasks
+        }
+        stats = await worker.task_queue.get_queue_stats()
+        return results, stats
+
+    try:
+        results, stats = asyncio.run(run())
+    finally:
+        worker.thread_executor.shutdown()
+        worker.process_executor.shutdown()
+
+    assert calls == [["b0", "b1", "b2", "b3"], ["b4", "b5", "b6", "b7"], ["b8", "b9"]]
+    assert results["b0"].result == "B0"
+    assert results["b3"].status == TaskStatus.FAILED
+    assert results["b3"].error == "bad event"
+    assert results["b4"].metadata == {"batch_size": 4}
+    assert results["plain"].result == "single"  # Not batchable: runs on its own
+    assert worker.tasks_failed == 1
+    assert stats["in_flight"] == 0
@@ -0,0 +1,182 @@
+"""Tests for the WebSocket room broker."""
+
+import asyncio
+import json
+import os
+import sys
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import ws
+from fastapi import WebSocketDisconnect
+from ws_broker import RoomBroker, event_topic, sport_topic, user_topic
+
+
+class _Socket:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.client = name
+        self.delay = delay
+        self.fail = fail
+        self.sent = []
+        self.closed = False
+
+    async def send_text(self, text):
+        if self.fail:
+            raise RuntimeError("connection reset")
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self):
+        self.closed = True
+
+
+def test_publish_reaches_only_room_members():
+    """A room publish costs one send per member, whatever else is connected."""
+    broker = RoomBroker()
+    sockets = [_Socket(f"c{i}") for i in range(1000)]
+    for i, socket in enumerate(sockets):
+        broker.register(socket, [sport_topic("nba" if i < 10 else "nfl")])
+    broker.join(sockets[0], event_topic("e1"))
+
+    async def run():
+        nba = await broker.publish(sport_topic("nba"), {"score": 1})
+        event = await broker.publish(event_topic("e1"), "goal")
+        empty = await broker.publish(event_topic("nobody"), "x")
+        return nba, event, empty
+
+    assert asyncio.run(run()) == (10, 1, 0)
+    assert sockets[0].sent == ['{"score": 1}', "goal"]
+    assert sum(len(s.sent) for s in sockets) == 11
+
+
+def test_slow_and_broken_sockets_are_evicted_without_stalling_others():
+    """Sends run concurrently; a stuck or failing client is dropped."""
+    broker = RoomBroker(send_timeout=0.05)
+    healthy = [_Socket(f"ok{i}", delay=0.01) for i in range(50)]
+    stuck, broken = _Socket("stuck", delay=10), _Socket("broken", fail=True)
+    for socket in healthy + [stuck, broken]:
+        broker.register(socket, [sport_topic("nba")])
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        delivered = await broker.publish(sport_topic("nba"), "tick")
+        elapsed = loop.time() - started
+        again = await broker.publish(sport_topic("nba"), "tick")
+        return delivered, elapsed, again
+
+    delivered, elapsed, again = asyncio.run(run())
+
+    assert delivered == again == 50
+    # All fifty 10ms sends overlap; the stuck one costs at most the timeout
+    assert elapsed < 0.2
+    assert stuck.closed and broken.closed
+    assert stuck not in broker.connections() and broken not in broker.connections()
+    stats = broker.get_stats()
+    assert (stats["timeouts"], stats["send_errors"], stats["evicted"]) == (1, 1, 2)
+
+
+def test_join_leave_protocol():
+    """Clients join and leave sport/event rooms but cannot join user rooms."""
+    broker = RoomBroker(max_topics=2)
+    socket = _Socket("c")
+    broker.register(socket, [user_topic("u1")])
+
+    async def run():
+        handled = await broker.handle_message(
+            socket,
+            json.dumps(
+                {
+                    "action": "join",
+                    "topics": ["sport:nba", "user:u2", "event:e1", "event:e2"],
+                }
+            ),
+        )
+        joined = broker.topics_of(socket)
+        await broker.handle_message(
+            socket, json.dumps({"action": "leave", "topic": "sport:nba"})
+        )
+        other = await broker.handle_message(socket, "plain text")
+        return handled, joined, other
+
+    handled, joined, other = asyncio.run(run())
+
+    assert handled and not other
+    # user:u1 plus sport:nba fill the two-topic limit
+    assert joined == {"user:u1", "sport:nba"}
+    assert broker.topics_of(socket) == {"user:u1"}
+    replies = [json.loads(text) for text in socket.sent]
+    assert replies[0] == {
+        "type": "joined",
+        "topics": ["sport:nba"],
+        "rejected": ["user:u2", "event:e1", "event:e2"],
+    }
+    assert replies[1]["type"] == "left"
+    assert "sport:nba" not in broker.rooms
+
+
+def test_unregister_empties_rooms():
+    """A disconnected socket leaves no empty rooms behind."""
+    broker = RoomBroker()
+    a, b = _Socket("a"), _Socket("b")
+    broker.register(a, [sport_topic("nba"), event_topic("e1")])
+    broker.register(b, [sport_topic("nba")])
+    broker.unregister(a)
+
+    assert set(broker.rooms) == {"sport:nba"}
+    assert broker.connections() == [b]
+
+
+def test_stream_updates_reach_event_and_sport_rooms_once():
+    """Odds and prediction updates go to their rooms, once per member."""
+    broker = RoomBroker()
+    event_fan, sport_fan, both, other = (_Socket(n) for n in ("e", "s", "b", "o"))
+    broker.register(event_fan, [event_topic("e1")])
+    broker.register(sport_fan, [sport_topic("nba")])
+    broker.register(both, [event_topic("e1"), sport_topic("nba")])
+    broker.register(other, [event_topic("e2"), sport_topic("nfl")])
+    update = SimpleNamespace(
+        stream_type=SimpleNamespace(value="predictions"),
+        event_id="e1",
+        data={"prediction": 0.61},
+        metadata={"sport": "NBA"},
+        timestamp=datetime(2024, 1, 1, 12, 0),
+    )
+
+    delivered = asyncio.run(broker.publish_stream_update(update))
+
+    assert delivered == 3
+    assert [len(s.sent) for s in (event_fan, sport_fan, both)] == [1, 1, 1]
+    assert other.sent == []
+    frame = json.loads(both.sent[0])
+    assert frame["type"] == "predictions" and frame["data"] == {"prediction": 0.61}
+
+
+def test_client_text_is_not_relayed_to_other_sockets(monkeypatch):
+    """Frames other than join/leave reach nobody, not even the sender's rooms."""
+    broker = RoomBroker()
+    monkeypatch.setattr(ws, "manager", ws.ConnectionManager(broker))
+    listener = _Socket("listener")
+    broker.register(listener, [sport_topic("nba")])
+
+    class _Client(_Socket):
+        def __init__(self, frames):
+            super().__init__("sender")
+            self.frames = list(frames)
+
+        async def accept(self):
+            pass
+
+        async def receive_text(self):
+            if not self.frames:
+                raise WebSocketDisconnect()
+            return self.frames.pop(0)
+
+    sender = _Client([json.dumps({"action": "join", "topic": "sport:nba"}), "spam"])
+    asyncio.run(ws.websocket_endpoint(sender))
+
+    assert listener.sent == []
+    assert [json.loads(text)["type"] for text in sender.sent] == ["joined"]
+    assert broker.connections() == [listener]
@@ -2,35 +2,38 @@ import logging
 from typing import List
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from ws_broker import RoomBroker, room_broker
 
 router = APIRouter()
 
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, broker: RoomBroker = room_broker):
+        self.broker = broker
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return self.broker.connections()
 
     async def connect(self, websocket: WebSocket):
         try:
             await websocket.accept()
-            self.active_connections.append(websocket)
+            # No rooms until the client joins sport/event rooms
+            self.broker.register(websocket)
             logging.info({"event": "ws_connect", "client": str(websocket.client)})
         except Exception as e:
             logging.error({"event": "ws_connect_error", "error": str(e)})
 
     def disconnect(self, websocket: WebSocket):
         try:
-            self.active_connections.remove(websocket)
+            self.broker.unregister(websocket)
             logging.info({"event": "ws_disconnect", "client": str(websocket.client)})
         except Exception as e:
             logging.error({"event": "ws_disconnect_error", "error": str(e)})
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logging.error({"event": "ws_broadcast_error", "error": str(e)})
+    async def broadcast(self, message: str, topic: str) -> int:
+        # Concurrent, time-bounded sends; broken sockets are evicted
+        return await self.broker.publish(topic, message)
 
 
 manager = ConnectionManager()
@@ -42,7 +45,9 @@ async def websocket_endpoint(websocket: WebSocket):
     try:
         while True:
             data = await websocket.receive_text()
-            await manager.broadcast(f"Prediction update: {data}")
+            # {"action": "join" | "leave", "topics": ["sport:nba", "event:123"]}
+            # Anything else is ignored: clients never publish to other sockets
+            await manager.broker.handle_message(websocket, data)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         logging.info({"event": "ws_disconnect", "reason": "client disconnected"})
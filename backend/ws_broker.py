@@ -0,0 +1,292 @@
+"""WebSocket Room Broker
+Topic rooms with concurrent, time-bounded sends shared by every WebSocket router
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from config import config_manager
+
+logger = logging.getLogger(__name__)
+
+# Rooms clients may join themselves; user rooms are assigned by the server
+CLIENT_TOPIC_PREFIXES = ("sport:", "event:")
+USER_TOPIC_PREFIX = "user:"
+
+
+def sport_topic(sport: str) -> str:
+    return f"sport:{sport.lower()}"
+
+
+def event_topic(event_id: str) -> str:
+    return f"event:{event_id}"
+
+
+def user_topic(user_id: str) -> str:
+    return f"{USER_TOPIC_PREFIX}{user_id}"
+
+
+def update_topics(event_id: Optional[str], sport: Optional[str]) -> List[str]:
+    """Rooms an odds or prediction update for an event is published to"""
+    topics = []
+    if event_id:
+        topics.append(event_topic(str(event_id)))
+    if sport:
+        topics.append(sport_topic(str(sport)))
+    return topics
+
+
+@dataclass
+class BrokerMetrics:
+    """Room broker metrics"""
+
+    published: int = 0
+    delivered: int = 0
+    timeouts: int = 0
+    send_errors: int = 0
+    evicted: int = 0
+    joins: int = 0
+    leaves: int = 0
+    rejected: int = 0
+
+
+class _Connection:
+    __slots__ = ("websocket", "topics", "lock")
+
+    def __init__(self, websocket: Any):
+        self.websocket = websocket
+        self.topics: Set[str] = set()
+        self.lock = asyncio.Lock()  # One frame at a time per socket
+
+
+class RoomBroker:
+    """Topic rooms over WebSocket connections.
+
+    A publish goes only to the members of one room, so its cost follows the
+    room size rather than the number of open sockets. Members are sent to
+    concurrently; each send (including waiting behind an earlier frame to
+    the same socket) is bounded by ``send_timeout``, and a socket that
+    fails or times out is evicted from every room and closed, so one stuck
+    client never holds up the rest.
+
+    Clients manage their own ``sport:`` and ``event:`` rooms by sending
+    ``{"action": "join" | "leave", "topics": [...]}``; ``user:`` rooms are
+    joined by the server for the authenticated user only.
+    """
+
+    def __init__(self, send_timeout: float = 2.0, max_topics: int = 100):
+        self.send_timeout = send_timeout
+        self.max_topics = max_topics
+        self.rooms: Dict[str, Set[_Connection]] = {}
+        self._connections: Dict[Any, _Connection] = {}
+        self.metrics = BrokerMetrics()
+
+    @classmethod
+    def from_config(cls, config: Any) -> "RoomBroker":
+        return cls(
+            send_timeout=config.ws_send_timeout,
+            max_topics=config.ws_max_topics_per_connection,
+        )
+
+    def connections(self) -> List[Any]:
+        return list(self._connections)
+
+    def register(self, websocket: Any, topics: Iterable[str] = ()):
+        """Track an accepted socket and place it in ``topics``"""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            connection = self._connections[websocket] = _Connection(websocket)
+        for topic in topics:
+            self._join(connection, topic)
+
+    def unregister(self, websocket: Any):
+        """Forget a socket and remove it from every room"""
+        connection = self._connections.pop(websocket, None)
+        if connection is None:
+            return
+        for topic in connection.topics:
+            members = self.rooms.get(topic)
+            if members is not None:
+                members.discard(connection)
+                if not members:
+                    del self.rooms[topic]
+        connection.topics.clear()
+
+    def join(self, websocket: Any, topic: str) -> bool:
+        connection = self._connections.get(websocket)
+        return connection is not None and self._join(connection, topic)
+
+    def leave(self, websocket: Any, topic: str) -> bool:
+        connection = self._connections.get(websocket)
+        if connection is None or topic not in connection.topics:
+            return False
+        connection.topics.discard(topic)
+        members = self.rooms[topic]
+        members.discard(connection)
+        if not members:
+            del self.rooms[topic]
+        self.metrics.leaves += 1
+        return True
+
+    def topics_of(self, websocket: Any) -> Set[str]:
+        connection = self._connections.get(websocket)
+        return set(connection.topics) if connection else set()
+
+    async def handle_message(self, websocket: Any, text: str) -> bool:
+        """Apply a join/leave request from a client; False if not one"""
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return False
+        action = request.get("action") if isinstance(request, dict) else None
+        if action not in ("join", "leave"):
+            return False
+
+        topics = request.get("topics") or [request.get("topic")]
+        if isinstance(topics, str):
+            topics = [topics]
+        applied, rejected = [], []
+        for topic in topics:
+            if not (isinstance(topic, str) and topic.startswith(CLIENT_TOPIC_PREFIXES)):
+                rejected.append(topic)
+            elif action == "join":
+                (applied if self.join(websocket, topic) else rejected).append(topic)
+            else:
+                self.leave(websocket, topic)
+                applied.append(topic)
+        self.metrics.rejected += len(rejected)
+
+        await self.send(
+            websocket,
+            {
+                "type": "joined" if action == "join" else "left",
+                "topics": applied,
+                "rejected": rejected,
+            },
+        )
+        return True
+
+    async def publish(self, topic: str, message: Any) -> int:
+        """Send ``message`` to every member of ``topic``; returns deliveries"""
+        members = self.rooms.get(topic)
+        self.metrics.published += 1
+        if not members:
+            return 0
+        return await self._send_all(list(members), self._frame(message))
+
+    async def publish_many(self, topics: Iterable[str], message: Any) -> int:
+        """Send ``message`` once to every member of any of ``topics``"""
+        members = set()
+        for topic in topics:
+            members.update(self.rooms.get(topic, ()))
+        self.metrics.published += 1
+        if not members:
+            return 0
+        return await self._send_all(list(members), self._frame(message))
+
+    async def publish_stream_update(self, message: Any) -> int:
+        """Send a stream manager update to its event room and sport room"""
+        data = message.data or {}
+        sport = data.get("sport") or message.metadata.get("sport")
+        topics = update_topics(message.event_id, sport)
+        if not topics:
+            return 0
+        return await self.publish_many(
+            topics,
+            {
+                "type": getattr(message.stream_type, "value", message.stream_type),
+                "event_id": message.event_id,
+                "data": data,
+                "timestamp": message.timestamp.isoformat(),
+            },
+        )
+
+    async def broadcast(self, message: Any) -> int:
+        """Send ``message`` to every registered socket"""
+        self.metrics.published += 1
+        return await self._send_all(
+            list(self._connections.values()), self._frame(message)
+        )
+
+    async def send(self, websocket: Any, message: Any) -> bool:
+        """Send to one socket, evicting it on failure"""
+        connection = self._connections.get(websocket)
+        if connection is None:
+            connection = _Connection(websocket)  # Unregistered: no rooms to leave
+        return await self._send(connection, self._frame(message))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self._connections),
+            "rooms": len(self.rooms),
+            "largest_room": max((len(m) for m in self.rooms.values()), default=0),
+            "published": self.metrics.published,
+            "delivered": self.metrics.delivered,
+            "timeouts": self.metrics.timeouts,
+            "send_errors": self.metrics.send_errors,
+            "evicted": self.metrics.evicted,
+            "joins": self.metrics.joins,
+            "leaves": self.metrics.leaves,
+            "rejected": self.metrics.rejected,
+        }
+
+    def _join(self, connection: _Connection, topic: str) -> bool:
+        if topic in connection.topics:
+            return True
+        if len(connection.topics) >= self.max_topics:
+            return False
+        connection.topics.add(topic)
+        self.rooms.setdefault(topic, set()).add(connection)
+        self.metrics.joins += 1
+        return True
+
+    def _frame(self, message: Any) -> str:
+        # Serialized once per publish, shared by every member
+        return message if isinstance(message, str) else json.dumps(message)
+
+    async def _send_all(self, connections: List[_Connection], frame: str) -> int:
+        if len(connections) == 1:
+            return int(await self._send(connections[0], frame))
+        results = await asyncio.gather(
+            *(self._send(connection, frame) for connection in connections)
+        )
+        return sum(results)
+
+    async def _send(self, connection: _Connection, frame: str) -> bool:
+        try:
+            await asyncio.wait_for(
+                self._locked_send(connection, frame), self.send_timeout
+            )
+        except asyncio.TimeoutError:
+            self.metrics.timeouts += 1
+            await self._evict(connection, "send timed out")
+            return False
+        except Exception as e:
+            self.metrics.send_errors += 1
+            await self._evict(connection, f"send failed: {e!s}")
+            return False
+        self.metrics.delivered += 1
+        return True
+
+    async def _locked_send(self, connection: _Connection, frame: str):
+        async with connection.lock:
+            await connection.websocket.send_text(frame)
+
+    async def _evict(self, connection: _Connection, reason: str):
+        if self._connections.get(connection.websocket) is not connection:
+            return  # Already evicted by a concurrent send
+        self.unregister(connection.websocket)
+        self.metrics.evicted += 1
+        client = getattr(connection.websocket, "client", None)
+        logger.warning({"event": "ws_evicted", "client": str(client), "reason": reason})
+        try:
+            await asyncio.wait_for(connection.websocket.close(), self.send_timeout)
+        except Exception:
+            pass
+
+
+# Global instance shared by every WebSocket router
+room_broker = RoomBroker.from_config(config_manager.config)